@@ -0,0 +1 @@
+"""Offline end-to-end benchmarks (see run.py and compare.py)."""
@@ -0,0 +1,109 @@
+"""
+Compare two benchmark reports and fail on regressions.
+
+    python -m benchmarks.compare base.json new.json --max-regression 0.15
+
+Every field of every scenario total and phase is compared. A field regresses
+when it grew by more than the relative threshold and, for wall time, by more
+than an absolute noise floor as well (tiny phases jitter by large ratios).
+Exits 1 if anything regressed.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# fields that are compared; lower is better for all of them
+GATED = [
+    "wall_seconds", "llm_calls", "prompt_tokens", "completion_tokens",
+    "pages_fetched", "bytes_downloaded", "browser_pages", "peak_rss_mb",
+]
+
+
+def _rows(scenario: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    rows = {"total": scenario.get("total", {})}
+    rows.update(scenario.get("phases", {}))
+    return rows
+
+
+def compare(
+    base: Dict[str, Any],
+    new: Dict[str, Any],
+    max_regression: float = 0.15,
+    min_seconds: float = 0.05
+) -> List[Dict[str, Any]]:
+    """Per-field comparison of two reports; each row has a `regressed` flag."""
+    results = []
+    for name, new_scenario in new.get("scenarios", {}).items():
+        base_scenario = base.get("scenarios", {}).get(name)
+        if base_scenario is None:
+            continue
+        base_rows = _rows(base_scenario)
+        for row, values in _rows(new_scenario).items():
+            before_values = base_rows.get(row)
+            if before_values is None:
+                continue
+            for field in GATED:
+                before = float(before_values.get(field, 0))
+                after = float(values.get(field, 0))
+                change = _relative(before, after)
+                regressed = change is not None and change > max_regression
+                if field == "wall_seconds" and after - before < min_seconds:
+                    regressed = False
+                results.append({
+                    "scenario": name, "phase": row, "field": field,
+                    "base": before, "new": after, "change": change, "regressed": regressed,
+                })
+    return results
+
+
+def _relative(before: float, after: float) -> Optional[float]:
+    if before == after:
+        return 0.0
+    if before == 0:
+        return None if after == 0 else float("inf")
+    return (after - before) / before
+
+
+def _format(rows: List[Dict[str, Any]], show_all: bool) -> Tuple[str, int]:
+    lines = [f"{'scenario':<10} {'phase':<24} {'field':<18} {'base':>12} {'new':>12} {'change':>9}"]
+    regressions = 0
+    for row in rows:
+        if row["regressed"]:
+            regressions += 1
+        elif not show_all and not row["change"]:
+            continue
+        change = row["change"]
+        change_text = "-" if change is None else ("new" if change == float("inf") else f"{change:+.1%}")
+        mark = "  REGRESSED" if row["regressed"] else ""
+        lines.append(
+            f"{row['scenario']:<10} {row['phase']:<24} {row['field']:<18} "
+            f"{row['base']:>12.4g} {row['new']:>12.4g} {change_text:>9}{mark}"
+        )
+    return "\n".join(lines), regressions
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare two benchmark reports")
+    parser.add_argument("base", help="baseline report (benchmarks.run output)")
+    parser.add_argument("new", help="report to check")
+    parser.add_argument("--max-regression", type=float, default=0.15,
+                        help="allowed relative increase per field (default: 0.15)")
+    parser.add_argument("--min-seconds", type=float, default=0.05,
+                        help="wall time increases below this many seconds are noise (default: 0.05)")
+    parser.add_argument("--all", action="store_true", help="also list unchanged fields")
+    args = parser.parse_args(argv)
+
+    base = json.loads(Path(args.base).read_text(encoding="utf-8"))
+    new = json.loads(Path(args.new).read_text(encoding="utf-8"))
+    rows = compare(base, new, args.max_regression, args.min_seconds)
+    table, regressions = _format(rows, args.all)
+    print(table)
+    print(f"\n{regressions} regression(s) over {args.max_regression:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""
+Static web corpus for offline benchmarks.
+
+build_corpus() writes a deterministic set of HTML articles (with figures,
+tables and numbers, so the visualisation and image paths have something to
+chew on), CorpusServer serves the directory on 127.0.0.1 and CorpusSearcher
+stands in for the search engine, returning corpus URLs in DuckDuckGo's
+result format.
+"""
+
+import io
+import random
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+
+TOPICS = [
+    "model training efficiency", "inference hardware", "open-source ecosystems",
+    "enterprise adoption", "regulation and policy", "energy consumption",
+    "agents and tool use", "multimodal systems", "evaluation benchmarks",
+    "data licensing", "edge deployment", "safety research",
+]
+
+_WORDS = (
+    "market growth adoption latency throughput cost model data compute cluster "
+    "research product deployment customer revenue benchmark accuracy training "
+    "inference policy framework pipeline vendor platform capacity region quarter"
+).split()
+
+
+def _image_bytes(seed: int) -> bytes:
+    """A small chart-sized PNG (the article markup advertises 640x360)."""
+    from PIL import Image
+
+    image = Image.new("RGB", (640, 360), ((seed * 37) % 256, (seed * 91) % 256, 200))
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _paragraph(rng: random.Random, topic: str) -> str:
+    words = [rng.choice(_WORDS) for _ in range(rng.randint(60, 110))]
+    figures = [
+        f"{topic} grew {rng.randint(5, 95)}% in {rng.choice([2022, 2023, 2024, 2025])}",
+        f"spending reached ${rng.randint(10, 900)} million",
+        f"{rng.randint(2, 60)} of {rng.randint(61, 120)} surveyed teams reported gains",
+    ]
+    for figure in figures:
+        words.insert(rng.randrange(len(words)), figure)
+    text = " ".join(words)
+    return text[0].upper() + text[1:] + "."
+
+
+def build_corpus(directory: Path, pages: int = 12, paragraphs: int = 24, seed: int = 7) -> List[Dict[str, str]]:
+    """Write `pages` articles into `directory`; returns their index (slug, title, topic)."""
+    rng = random.Random(seed)
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / "img").mkdir(exist_ok=True)
+    index = []
+    for i in range(pages):
+        topic = TOPICS[i % len(TOPICS)]
+        slug = f"article-{i:03d}"
+        title = f"{topic.title()}: report {i + 1}"
+        (directory / "img" / f"{slug}.png").write_bytes(_image_bytes(i))
+
+        body = []
+        for p in range(paragraphs):
+            if p % 6 == 0:
+                body.append(f"<h2>{topic.title()} section {p // 6 + 1}</h2>")
+            body.append(f"<p>{_paragraph(rng, topic)}</p>")
+            if p == 3:
+                body.append(
+                    f'<figure><img src="img/{slug}.png" alt="{topic} chart" width="640" height="360">'
+                    f"<figcaption>{topic} trend</figcaption></figure>"
+                )
+            if p == 8:
+                rows = "".join(
+                    f"<tr><td>{year}</td><td>{rng.randint(10, 500)}</td></tr>" for year in range(2020, 2026)
+                )
+                body.append(f"<table><tr><th>Year</th><th>Value</th></tr>{rows}</table>")
+
+        html = (
+            f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>{title}</title></head>"
+            f"<body><nav>Home | Topics</nav><main><article><h1>{title}</h1>"
+            f"{''.join(body)}</article></main><footer>Benchmark corpus</footer></body></html>"
+        )
+        (directory / f"{slug}.html").write_text(html, encoding="utf-8")
+        index.append({"slug": slug, "title": title, "topic": topic})
+    return index
+
+
+class CorpusServer:
+    """Serves a corpus directory on 127.0.0.1."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.base_url = ""
+        self._runner: Optional[web.AppRunner] = None
+
+    async def start(self, port: int = 0) -> str:
+        app = web.Application()
+        app.router.add_static("/", str(self.directory))
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", port)
+        await site.start()
+        bound_port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{bound_port}"
+        return self.base_url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+class CorpusSearcher:
+    """
+    Search engine over the corpus: a query maps deterministically to a
+    rotation of the articles, so different sub-queries overlap partially.
+    """
+
+    def __init__(self, index: List[Dict[str, str]], base_url: str, with_snippets: bool = True):
+        self.index = index
+        self.base_url = base_url
+        self.with_snippets = with_snippets
+        self.queries: List[str] = []
+
+    async def search(
+        self,
+        query: str,
+        max_results: int = 10,
+        force_duckduckgo: bool = False,
+        time_filter: Optional[str] = None,
+        region: str = "cn-zh"
+    ) -> List[Dict[str, Any]]:
+        self.queries.append(query)
+        start = zlib.crc32(query.encode("utf-8")) % len(self.index)
+        results = []
+        for offset in range(min(max_results, len(self.index))):
+            page = self.index[(start + offset) % len(self.index)]
+            results.append({
+                "title": page["title"],
+                "url": f"{self.base_url}/{page['slug']}.html",
+                # without a snippet the deep searcher falls back to fetching the page over HTTP
+                "snippet": f"Coverage of {page['topic']}." if self.with_snippets else "",
+                "source": "duckduckgo"
+            })
+        return results
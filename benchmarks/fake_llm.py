@@ -0,0 +1,173 @@
+"""
+Local OpenAI-compatible chat completions server for offline benchmarks.
+
+Serves `POST /v1/chat/completions` (plain and streamed) with content from a
+responder function (see responses.py). Usage is reported with the same token
+estimator the client uses, and an optional per-call latency and per-token
+delay model the upstream service.
+"""
+
+import asyncio
+import json
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from aiohttp import web
+
+from src.utils.tokens import estimate_tokens
+
+
+_SCHEMA_RE = re.compile(r"JSON Schema\s*```json\s*(\{.*?\})\s*```", re.DOTALL)
+
+# (prompt, request body) -> response content
+Responder = Callable[[str, Dict[str, Any]], str]
+
+
+def _resolve(schema: Dict[str, Any], root: Dict[str, Any]) -> Dict[str, Any]:
+    ref = schema.get("$ref")
+    if ref and ref.startswith("#/"):
+        node: Any = root
+        for part in ref[2:].split("/"):
+            node = node.get(part, {})
+        return node
+    for key in ("anyOf", "oneOf", "allOf"):
+        options = [s for s in schema.get(key, []) if s.get("type") != "null"]
+        if options:
+            return _resolve(options[0], root)
+    return schema
+
+
+def schema_in_prompt(prompt: str) -> Optional[Dict[str, Any]]:
+    """JSON schema appended by the client's structured-output fallback, if any."""
+    match = _SCHEMA_RE.search(prompt)
+    return json.loads(match.group(1)) if match else None
+
+
+def synthesize(schema: Dict[str, Any], root: Optional[Dict[str, Any]] = None, name: str = "value", depth: int = 0) -> Any:
+    """Deterministic instance of a JSON schema (defaults and enums win)."""
+    root = root or schema
+    schema = _resolve(schema, root)
+    if "default" in schema:
+        return schema["default"]
+    if "enum" in schema:
+        return schema["enum"][0]
+    if "const" in schema:
+        return schema["const"]
+
+    kind = schema.get("type", "object" if "properties" in schema else "string")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), "string")
+
+    if kind == "object":
+        return {
+            key: synthesize(prop, root, key, depth + 1)
+            for key, prop in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        count = max(schema.get("minItems", 3), 1) if depth < 4 else 1
+        return [synthesize(schema.get("items", {}), root, name, depth + 1) for _ in range(count)]
+    if kind == "integer":
+        return max(schema.get("minimum", 3), 1)
+    if kind == "number":
+        return max(schema.get("minimum", 0.8), 0.8)
+    if kind == "boolean":
+        return True
+    return f"{schema.get('title', name)} (benchmark)"
+
+
+class FakeLLMServer:
+    """OpenAI-compatible endpoint on 127.0.0.1 backed by a responder function."""
+
+    def __init__(
+        self,
+        responder: Responder,
+        latency: float = 0.0,
+        seconds_per_token: float = 0.0,
+        model: str = "bench-model",
+        log_path: Optional[str] = None
+    ):
+        self.responder = responder
+        self.latency = latency
+        self.seconds_per_token = seconds_per_token
+        self.model = model
+        self.log_path = log_path
+        self.requests = 0
+        self._runner: Optional[web.AppRunner] = None
+        self.base_url = ""
+
+    async def start(self, port: int = 0) -> str:
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_post("/v1/chat/completions", self._handle)
+        app.router.add_get("/v1/models", self._models)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", port)
+        await site.start()
+        bound_port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{bound_port}/v1"
+        return self.base_url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _models(self, request: web.Request) -> web.Response:
+        return web.json_response({"object": "list", "data": [{"id": self.model, "object": "model"}]})
+
+    def _respond(self, body: Dict[str, Any]) -> str:
+        messages: List[Dict[str, Any]] = body.get("messages", [])
+        prompt = "\n\n".join(str(m.get("content", "")) for m in messages)
+        return self.responder(prompt, body)
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        self.requests += 1
+        content = self._respond(body)
+        prompt_tokens = sum(estimate_tokens(str(m.get("content", ""))) for m in body.get("messages", []))
+        completion_tokens = estimate_tokens(content)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+        if self.log_path:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"messages": body.get("messages"), "response": content}, ensure_ascii=False) + "\n")
+
+        delay = self.latency + self.seconds_per_token * completion_tokens
+        completion_id = f"chatcmpl-bench-{self.requests}"
+        created = int(time.time())
+
+        if body.get("stream"):
+            response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+            await response.prepare(request)
+            pieces = [content[i:i + 64] for i in range(0, len(content), 64)] or [""]
+            for piece in pieces:
+                if delay:
+                    await asyncio.sleep(delay / len(pieces))
+                chunk = {
+                    "id": completion_id, "object": "chat.completion.chunk", "created": created,
+                    "model": self.model,
+                    "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]
+                }
+                await response.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+            await response.write(b"data: [DONE]\n\n")
+            await response.write_eof()
+            return response
+
+        if delay:
+            await asyncio.sleep(delay)
+        return web.json_response({
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": self.model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": usage
+        })
@@ -0,0 +1,285 @@
+"""
+End-to-end offline benchmark of the report, fiction and PPT pipelines.
+
+Each scenario drives DeepSearchCoordinator.process_query (then the export)
+against a local fake OpenAI-compatible server and a local static corpus, and
+reports per phase: wall time, LLM calls, prompt/completion tokens, pages
+fetched, bytes downloaded and peak RSS. Scenarios run in separate processes
+so peak RSS is not inherited from the previous one.
+
+    python -m benchmarks.run                          # all scenarios
+    python -m benchmarks.run -s report --repeat 3 -o benchmarks/results/base.json
+    python -m benchmarks.compare base.json new.json   # regression gate
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SCENARIOS: Dict[str, Dict[str, Any]] = {
+    "report": {
+        "query": "AI industry trends 2025",
+        "context": {
+            "output_type": "report",
+            "report_type": "comprehensive",
+            "search_depth": "deep",
+            "max_results": 20,
+            "output_format": "html",
+            "html_template": "enhanced_professional",
+            "html_theme": "light",
+        },
+        "export": "docx",
+    },
+    "fiction": {
+        "query": "A mystery set in a lighthouse",
+        "context": {
+            "output_type": "fiction",
+            "fiction_requirements": {
+                "genre": "mystery",
+                "length": "short",
+                "viewpoint": "first",
+                "constraints": [],
+            },
+            "output_format": "html",
+            "html_template": "novel",
+            "html_theme": "sepia",
+        },
+        "export": "docx",
+    },
+    "ppt": {
+        "query": "State of AI infrastructure",
+        "context": {
+            "output_type": "ppt",
+            "ppt_config": {"style": "business", "slides": 6, "depth": "medium", "theme": "default"},
+        },
+        # the multi-page (v3) deck has no PPT_DATA.json for the PPTX exporter
+        "export": None,
+    },
+}
+
+# phase counter -> report field
+FIELDS = {
+    "seconds": "wall_seconds",
+    "calls": "calls",
+    "llm.upstream_calls": "llm_calls",
+    "llm.prompt_tokens": "prompt_tokens",
+    "llm.completion_tokens": "completion_tokens",
+    "web.pages_fetched": "pages_fetched",
+    "web.bytes_downloaded": "bytes_downloaded",
+    "web.images_fetched": "images_fetched",
+    "web.fetch_tier.http": "http_pages",
+    "web.fetch_tier.browser": "browser_pages",
+    "web.page_cache.hits": "page_cache_hits",
+    "web.serp_cache.hits": "serp_cache_hits",
+    "dedup.tokens_saved": "dedup_tokens_saved",
+    "extract.parse_seconds": "parse_seconds",
+    "peak_rss_mb": "peak_rss_mb",
+}
+
+
+def _phase_report(counters: Dict[str, float]) -> Dict[str, float]:
+    return {field: round(counters.get(name, 0), 4) for name, field in FIELDS.items()}
+
+
+async def run_scenario(name: str, workdir: Path, args: argparse.Namespace) -> Dict[str, Any]:
+    """Run one scenario in this process and return its measurements."""
+    from loguru import logger
+
+    from benchmarks.corpus import CorpusSearcher, CorpusServer, build_corpus
+    from benchmarks.fake_llm import FakeLLMServer
+    from benchmarks.responses import Responder
+
+    logger.remove()
+    logger.add(sys.stderr, level=args.log_level)
+
+    corpus_dir = workdir / "corpus"
+    index = build_corpus(corpus_dir, pages=args.pages)
+    corpus = CorpusServer(corpus_dir)
+    fake_llm = FakeLLMServer(
+        Responder(),
+        latency=args.llm_latency,
+        seconds_per_token=args.llm_token_delay,
+        log_path=str(workdir / f"{name}.llm.jsonl") if args.log_prompts else None,
+    )
+    corpus_url = await corpus.start()
+    llm_url = await fake_llm.start()
+
+    os.environ.update({
+        "DEFAULT_LLM_PROVIDER": "openai",
+        "OPENAI_API_KEY": "benchmark",
+        "LLM_BASE_URL": llm_url,
+        "DEFAULT_LLM_MODEL": fake_llm.model,
+        "LLM_CACHE_ENABLED": "false",
+        "CASSETTE_MODE": "off",
+        # plain HTTP keeps the transport independent of the optional h2 package
+        "LLM_POOL_HTTP2": "false",
+        # a fresh page cache per run: only repeats within the run hit it
+        "PAGE_CACHE_DIR": str(workdir / "page_cache"),
+        "SERP_CACHE_DIR": str(workdir / "serp_cache"),
+        "DOMAIN_HEALTH_DIR": str(workdir / "domain_health"),
+        "SELECTOR_RECIPES_DIR": str(workdir / "selector_recipes"),
+        "DOCUMENT_CACHE_DIR": str(workdir / "documents"),
+        # the corpus is one host standing in for many sites: do not throttle it
+        "HOST_SCHEDULER_RATE": "1000",
+        "HOST_SCHEDULER_BURST": "1000",
+        "HOST_SCHEDULER_MAX_PER_HOST": "64",
+        # --browser renders every page instead of trying plain HTTP first
+        "FETCH_HTTP_FIRST": "false" if args.browser else "true",
+    })
+
+    # imported after the environment is set: managers read it at construction
+    from src.agents.coordinator import DeepSearchCoordinator
+    from src.export.export_manager import ExportManager
+    from src.llm import LLMManager, PromptManager
+    from src.monitoring.metrics import metrics
+    from src.storage.search_storage import SearchStorage
+
+    storage_dir = workdir / "storage"
+    coordinator = DeepSearchCoordinator(
+        llm_manager=LLMManager(),
+        prompt_manager=PromptManager(),
+        storage=SearchStorage(base_dir=str(storage_dir))
+    )
+    searcher = CorpusSearcher(index, corpus_url)
+    web_searcher = coordinator.agents["deep_searcher"].web_searcher
+    # the engine call only: SERP caching and coalescing above it stay in the measured path
+    web_searcher._search_duckduckgo = searcher.search
+    if web_searcher.image_downloader is not None:
+        # downloaded images are cached by file name; keep them out of the repo and between runs
+        web_searcher.image_downloader.storage_dir = workdir / "images"
+        web_searcher.image_downloader.storage_dir.mkdir(parents=True, exist_ok=True)
+
+    spec = SCENARIOS[name]
+    metrics.reset()
+    start = time.perf_counter()
+    try:
+        result = await coordinator.process_query(spec["query"], dict(spec["context"]))
+        export = {"status": "skipped"}
+        if spec.get("export") and result.get("project_id"):
+            export = await ExportManager(base_dir=str(storage_dir)).export_project(
+                result["project_id"], export_type=spec["export"]
+            )
+        elapsed = time.perf_counter() - start
+    finally:
+        from src.tools.browser_pool import close_browser_pool
+        from src.tools.http_session import close_http_session
+        from src.tools.extraction_pool import shutdown_extraction_pool
+
+        await close_browser_pool()
+        await close_http_session()
+        shutdown_extraction_pool()
+        await fake_llm.stop()
+        await corpus.stop()
+
+    from src.monitoring.metrics import peak_rss_mb
+
+    totals = metrics.get()
+    return {
+        "scenario": name,
+        "status": result.get("status"),
+        "export_status": export.get("status"),
+        "errors": result.get("errors", [])[:10],
+        "total": {
+            **_phase_report({**totals, "seconds": elapsed, "calls": 1, "peak_rss_mb": peak_rss_mb()}),
+            "fake_llm_requests": fake_llm.requests,
+            "search_queries": len(searcher.queries),
+        },
+        "phases": {phase: _phase_report(counters) for phase, counters in sorted(metrics.phases().items())},
+    }
+
+
+def _median_runs(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Median of every numeric field across repeated runs of one scenario."""
+    merged = dict(runs[-1])
+
+    def _median(values: List[Any]) -> Any:
+        return round(statistics.median(values), 4) if all(isinstance(v, (int, float)) for v in values) else values[-1]
+
+    merged["total"] = {key: _median([r["total"].get(key, 0) for r in runs]) for key in runs[-1]["total"]}
+    phases = {}
+    for phase in sorted({p for r in runs for p in r["phases"]}):
+        present = [r["phases"][phase] for r in runs if phase in r["phases"]]
+        phases[phase] = {key: _median([p.get(key, 0) for p in present]) for key in present[-1]}
+    merged["phases"] = phases
+    merged["repeats"] = len(runs)
+    return merged
+
+
+def _run_in_subprocess(name: str, args: argparse.Namespace) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix=f"xunlong-bench-{name}-") as tmp:
+        out_file = Path(tmp) / "result.json"
+        cmd = [
+            sys.executable, "-m", "benchmarks.run", "--worker", name,
+            "--worker-out", str(out_file), "--workdir", tmp,
+            "--pages", str(args.pages), "--llm-latency", str(args.llm_latency),
+            "--llm-token-delay", str(args.llm_token_delay), "--log-level", args.log_level,
+        ]
+        if args.browser:
+            cmd.append("--browser")
+        if args.log_prompts:
+            cmd.append("--log-prompts")
+        # the pipeline prints progress; keep stdout for the JSON report
+        subprocess.run(cmd, cwd=str(ROOT), check=True, stdout=sys.stderr)
+        return json.loads(out_file.read_text(encoding="utf-8"))
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline end-to-end pipeline benchmark")
+    parser.add_argument("-s", "--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="scenario to run (repeatable; default: all)")
+    parser.add_argument("-o", "--output", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per scenario; the median is reported")
+    parser.add_argument("--pages", type=int, default=12, help="articles in the static corpus")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="fake LLM seconds per call")
+    parser.add_argument("--llm-token-delay", type=float, default=0.0, help="fake LLM seconds per completion token")
+    parser.add_argument("--browser", action="store_true", help="render every page in the headless browser (needs Playwright Chromium)")
+    parser.add_argument("--log-prompts", action="store_true", help="keep the fake LLM request log in the work dir")
+    parser.add_argument("--log-level", default="ERROR")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--worker-out", help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        sys.path.insert(0, str(ROOT))
+        os.chdir(ROOT)
+        result = asyncio.run(run_scenario(args.worker, Path(args.workdir), args))
+        Path(args.worker_out).write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+        return 0
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {
+            "pages": args.pages, "llm_latency": args.llm_latency,
+            "llm_token_delay": args.llm_token_delay, "browser": args.browser, "repeat": args.repeat,
+        },
+        "scenarios": {},
+    }
+    for name in args.scenario or list(SCENARIOS):
+        runs = [_run_in_subprocess(name, args) for _ in range(max(args.repeat, 1))]
+        report["scenarios"][name] = _median_runs(runs)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(text, encoding="utf-8")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
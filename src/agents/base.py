@@ -6,6 +6,7 @@ from dataclasses import dataclass
 from loguru import logger
 
 from ..llm import LLMManager, PromptManager
+from ..llm.budget import ContextBudgeter
 
 
 @dataclass
@@ -61,6 +62,11 @@ class BaseAgent(ABC):
             logger.error(f"LLM ({self.name}): {e}")
             raise
     
+    def get_budgeter(self, cap: Optional[int] = None, reserved: int = 0) -> ContextBudgeter:
+        """Token budget for evidence in this agent's prompts, bounded by its model's context window."""
+        client = self.llm_manager.get_client(self.config.llm_config_name)
+        return client.budgeter(cap=cap, reserved=reserved)
+    
     def get_prompt(self, prompt_name: str, **kwargs) -> str:
         """TODO: Add docstring."""
         try:
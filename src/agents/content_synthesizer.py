@@ -5,6 +5,7 @@ from typing import Dict, Any, List
 from loguru import logger
 
 from .base import BaseAgent, AgentConfig
+from .subtask_scheduler import format_upstream_findings
 from ..llm import LLMManager, PromptManager
 
 
@@ -196,6 +197,7 @@ Markdown
 ****: {subtask_context.get('title', query)}
 ****: {subtask_context.get('description', '')}
 
+{format_upstream_findings(subtask_context)}
 #
 
 **: {', '.join(key_insights) if key_insights else ''}
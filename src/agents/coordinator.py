@@ -1,8 +1,9 @@
 """ - """
 
 import asyncio
+import os
 from typing import Dict, Any, List, Optional, TypedDict
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from loguru import logger
 
@@ -30,12 +31,16 @@ from ..pipeline import DeepSearchPipeline
 from .base import BaseAgent
 from .task_decomposer import TaskDecomposer as TaskDecomposerAgent
 from .deep_searcher import DeepSearcher as DeepSearcherAgent
+from .subtask_scheduler import SubtaskScheduler, UpstreamFindings
 from .query_optimizer import QueryOptimizerAgent
 from .search_analyzer import SearchAnalyzerAgent
 from .content_synthesizer import ContentSynthesizerAgent
 from .report_generator import ReportGenerator as ReportGeneratorAgent
 from .content_evaluator import ContentEvaluator
 from ..tools.time_tool import time_tool
+from ..tools.url_registry import get_url_registry
+from ..monitoring.metrics import metrics, bind_task, unbind_task, phase
+from ..utils.near_duplicates import deduplicate_documents
 try:
     from src.storage import SearchStorage
 except ModuleNotFoundError:
@@ -115,6 +120,8 @@ class DeepSearchConfig:
     llm_config_name: str = "default"
     search_depth: str = "deep"  # surface, medium, deep
     max_search_results: int = 20
+    # subtasks searched at the same time (1 when enable_parallel is off)
+    max_parallel_subtasks: int = field(default_factory=lambda: int(os.getenv("DEEP_SEARCH_MAX_PARALLEL_SUBTASKS", "3")))
 
 
 class DeepSearchCoordinator:
@@ -269,6 +276,7 @@ class DeepSearchCoordinator:
             traceback.print_exc()
             return None
     
+    @phase("task_decomposer")
     async def _task_decomposer_node(self, state: DeepSearchState) -> DeepSearchState:
         """TODO: Add docstring."""
         try:
@@ -312,6 +320,7 @@ class DeepSearchCoordinator:
 
         return state
     
+    @phase("deep_searcher")
     async def _deep_searcher_node(self, state: DeepSearchState) -> DeepSearchState:
         """TODO: Add docstring."""
         try:
@@ -365,44 +374,56 @@ class DeepSearchCoordinator:
                     "agent": "document_loader"
                 })
             
-            # 
-            for subtask in subtasks:
-                if subtask.get("type") == "search":
-                    logger.info(f": {subtask.get('title', 'Unknown')}")
-                    
-                    time_context = subtask.get("time_context") or state.get("time_context")
-
-                    search_input = {
-                        "query": state.get("query", ""),
-                        "decomposition": {"subtasks": [subtask]},  # 
-                        "context": state.get("context", {}),
-                        "time_context": time_context
-                    }
+            # independent subtasks run concurrently; results keep the subtask order.
+            # a subtask starts after its `depends_on` subtasks and sees their summaries
+            upstream = UpstreamFindings()
 
-                    search_result = await self.agents["deep_searcher"].process(search_input)
-                    logger.debug(f": status={search_result.get('status')}, keys={list(search_result.keys())}")
+            async def run_subtask(subtask: Dict[str, Any]) -> Dict[str, Any]:
+                logger.info(f": {subtask.get('title', 'Unknown')}")
+                subtask = upstream.attach(subtask)
 
-                    if search_result.get("status") == "success":
-                        # result
-                        result_data = search_result.get("result", {})
-                        task_results = result_data.get("all_content", [])
-                        refined_subtasks = result_data.get("refined_subtasks", [])  # NEW
+                time_context = subtask.get("time_context") or state.get("time_context")
 
-                        logger.debug(f" {len(task_results)}  {len(refined_subtasks)} ")
-                        if task_results:
-                            logger.debug(f": {task_results[0]}")
+                search_input = {
+                    "query": state.get("query", ""),
+                    "decomposition": {"subtasks": [subtask]},  # 
+                    "context": state.get("context", {}),
+                    "time_context": time_context
+                }
 
-                        all_search_results.extend(task_results)
+                search_result = await self.agents["deep_searcher"].process(search_input)
+                logger.debug(f": status={search_result.get('status')}, keys={list(search_result.keys())}")
+                if search_result.get("status") == "success":
+                    for refined in search_result.get("result", {}).get("refined_subtasks", []):
+                        upstream.record(subtask, refined.get("refined_content", ""))
+                return search_result
 
-                        # NEW: Store refined subtasks separately
-                        if refined_subtasks:
-                            if "refined_subtasks" not in state:
-                                state["refined_subtasks"] = []
-                            state["refined_subtasks"].extend(refined_subtasks)
+            search_subtasks = [subtask for subtask in subtasks if subtask.get("type") == "search"]
+            concurrency = self.config.max_parallel_subtasks if self.config.enable_parallel else 1
+            search_results = await SubtaskScheduler(concurrency).run(search_subtasks, run_subtask)
+
+            for search_result in search_results:
+                if isinstance(search_result, dict) and search_result.get("status") == "success":
+                    # result
+                    result_data = search_result.get("result", {})
+                    task_results = result_data.get("all_content", [])
+                    refined_subtasks = result_data.get("refined_subtasks", [])  # NEW
+
+                    logger.debug(f" {len(task_results)}  {len(refined_subtasks)} ")
+                    if task_results:
+                        logger.debug(f": {task_results[0]}")
+
+                    all_search_results.extend(task_results)
+
+                    # NEW: Store refined subtasks separately
+                    if refined_subtasks:
+                        if "refined_subtasks" not in state:
+                            state["refined_subtasks"] = []
+                        state["refined_subtasks"].extend(refined_subtasks)
+
+            # across subtasks: drop near-duplicates before the limit so it keeps distinct sources
+            all_search_results, _ = deduplicate_documents(all_search_results, label="search results")
 
-                    #
-                    await asyncio.sleep(1)
-            
             # 
             if len(all_search_results) > self.config.max_search_results:
                 all_search_results = all_search_results[:self.config.max_search_results]
@@ -428,6 +449,7 @@ class DeepSearchCoordinator:
         
         return state
     
+    @phase("search_analyzer")
     async def _search_analyzer_node(self, state: DeepSearchState) -> DeepSearchState:
         """TODO: Add docstring."""
         try:
@@ -461,6 +483,7 @@ class DeepSearchCoordinator:
         
         return state
     
+    @phase("content_synthesizer")
     async def _content_synthesizer_node(self, state: DeepSearchState) -> DeepSearchState:
         """TODO: Add docstring."""
         try:
@@ -490,6 +513,7 @@ class DeepSearchCoordinator:
         
         return state
     
+    @phase("report_generator")
     async def _report_generator_node(self, state: DeepSearchState) -> DeepSearchState:
         """TODO: Add docstring."""
         try:
@@ -574,6 +598,7 @@ class DeepSearchCoordinator:
 
         return state
 
+    @phase("output_type_detector")
     async def _output_type_detector_node(self, state: DeepSearchState) -> DeepSearchState:
         """TODO: Add docstring."""
         try:
@@ -662,6 +687,7 @@ class DeepSearchCoordinator:
 
         return state
 
+    @phase("fiction_elements_designer")
     async def _fiction_elements_designer_node(self, state: DeepSearchState) -> DeepSearchState:
         """TODO: Add docstring."""
         try:
@@ -695,6 +721,7 @@ class DeepSearchCoordinator:
 
         return state
 
+    @phase("fiction_outline_generator")
     async def _fiction_outline_generator_node(self, state: DeepSearchState) -> DeepSearchState:
         """TODO: Add docstring."""
         try:
@@ -730,6 +757,7 @@ class DeepSearchCoordinator:
 
         return state
 
+    @phase("fiction_writer")
     async def _fiction_writer_node(self, state: DeepSearchState) -> DeepSearchState:
         """ - SectionWriter"""
         try:
@@ -872,6 +900,7 @@ class DeepSearchCoordinator:
 
         return state
 
+    @phase("ppt_generator")
     async def _ppt_generator_node(self, state: DeepSearchState) -> DeepSearchState:
         """PPT - V3"""
         try:
@@ -1051,10 +1080,14 @@ class DeepSearchCoordinator:
 
     async def process_query(self, query: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """TODO: Add docstring."""
+        project_id = None
+        task_token = None
         try:
             # 
             project_id = self.storage.create_project(query)
             logger.info(f": {project_id}")
+            # attribute LLM call metrics of this run to the project
+            task_token = bind_task(project_id)
 
             # 
             workflow_id = f"deep_search_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
@@ -1149,7 +1182,9 @@ class DeepSearchCoordinator:
                     "total_search_results": final_state["total_results"],
                     "subtasks_count": len(final_state["task_analysis"].get("subtasks", [])),
                     "execution_time": datetime.now().isoformat(),
-                    "errors_count": len(final_state["errors"])
+                    "errors_count": len(final_state["errors"]),
+                    "llm_calls": metrics.get(project_id),
+                    "phases": metrics.phases(project_id)
                 },
 
                 "errors": final_state["errors"],
@@ -1174,6 +1209,12 @@ class DeepSearchCoordinator:
                 "statistics": {},
                 "errors": [str(e)]
             }
+        finally:
+            if task_token is not None:
+                unbind_task(task_token)
+            if project_id:
+                metrics.pop(project_id)
+                get_url_registry().forget(project_id)
     
     async def _simple_deep_search_workflow(self, state: DeepSearchState) -> DeepSearchState:
         """LangGraph"""
@@ -1345,6 +1386,7 @@ class DeepSearchCoordinator:
             logger.error(f": {e}")
             return f": {e}"
     
+    @phase("html_conversion")
     async def _convert_fiction_to_html(
         self,
         fiction_data: Dict[str, Any],
@@ -2,6 +2,8 @@
  - 
 """
 import asyncio
+import math
+import os
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 from loguru import logger
@@ -11,6 +13,8 @@ from ..llm.prompts import PromptManager
 from ..tools.web_searcher import WebSearcher
 from ..tools.content_extractor import ContentExtractor
 from ..tools.time_tool import time_tool
+from ..monitoring.metrics import metrics
+from ..utils.near_duplicates import deduplicate_documents
 
 class DeepSearcher:
     """TODO: Add docstring."""
@@ -21,6 +25,10 @@ class DeepSearcher:
         self.web_searcher = WebSearcher()
         self.content_extractor = ContentExtractor()
         self.name = ""
+        # start analysis once this share of the expected documents is in ...
+        self.sufficient_ratio = float(os.getenv("DEEP_SEARCH_SUFFICIENT_RATIO", "0.75"))
+        # ... or after this many seconds, whichever comes first
+        self.fetch_deadline = float(os.getenv("DEEP_SEARCH_FETCH_DEADLINE", "45"))
 
         # Import analyzer and synthesizer for subtask-level processing
         from .search_analyzer import SearchAnalyzerAgent
@@ -71,38 +79,19 @@ class DeepSearcher:
             if subtask.get("type") == "search" or not subtask.get("type"):
                 logger.info(f"[{self.name}]  {i+1}/{len(subtasks)}: {subtask.get('title', 'Unknown')}")
 
-                # Step 1: Search for this subtask
-                search_result = await self._execute_subtask_search(subtask, time_context, i)
+                # search, analysis and synthesis of this subtask, streamed
+                pipeline_result = await self._execute_subtask_pipeline(subtask, time_context, i)
 
-                if isinstance(search_result, Exception):
-                    logger.error(f"[{self.name}]  {i} : {search_result}")
-                    continue
-
-                if not search_result or not search_result.get("content"):
+                subtask_content = pipeline_result["content"]
+                if not subtask_content:
                     logger.warning(f"[{self.name}]  {i} ")
                     continue
 
-                subtask_content = search_result["content"]
+                analysis_result = pipeline_result["analysis"]
+                synthesis_result = pipeline_result["synthesis"]
                 logger.info(f"[{self.name}]  {i}  {len(subtask_content)} ")
 
-                # Step 2: Analyze this subtask's results
-                logger.info(f"[{self.name}]  {i} ...")
-                analysis_result = await self.analyzer.analyze_subtask(
-                    query=subtask.get("title", ""),
-                    search_results=subtask_content,
-                    subtask_context=subtask
-                )
-
-                # Step 3: Synthesize this subtask's content
-                logger.info(f"[{self.name}]  {i} ...")
-                synthesis_result = await self.synthesizer.synthesize_subtask(
-                    query=subtask.get("title", ""),
-                    search_results=subtask_content,
-                    analysis_results=analysis_result,
-                    subtask_context=subtask
-                )
-
-                # Step 4: Store refined subtask content
+                # Store refined subtask content
                 refined_subtask = {
                     "subtask_id": subtask.get("id", f"task_{i}"),
                     "subtask_title": subtask.get("title", ""),
@@ -114,7 +103,8 @@ class DeepSearcher:
                     "metadata": {
                         "results_count": len(subtask_content),
                         "analysis_quality": analysis_result.get("status", "unknown"),
-                        "synthesis_quality": synthesis_result.get("status", "unknown")
+                        "synthesis_quality": synthesis_result.get("status", "unknown"),
+                        "abandoned_fetches": pipeline_result["abandoned"]
                     }
                 }
 
@@ -148,169 +138,202 @@ class DeepSearcher:
             "subtasks_executed": len(subtasks),
             "time_context": time_context
         }
-    
-    async def _execute_subtask_search(
-        self, 
-        subtask: Dict[str, Any], 
+
+    async def _execute_subtask_pipeline(
+        self,
+        subtask: Dict[str, Any],
         time_context: Dict[str, Any],
         task_index: int
     ) -> Dict[str, Any]:
-        """TODO: Add docstring."""
-        
+        """
+        Search, analyze and synthesize one subtask as a streaming pipeline.
+
+        Every query streams its documents into a queue as pages finish. Analysis
+        starts once `sufficient_ratio` of the expected documents are in (or
+        `fetch_deadline` seconds have passed, or every fetch is done); documents
+        arriving meanwhile still reach synthesis. Fetches still running after
+        synthesis are abandoned, so a hung URL cannot stall the subtask.
+        """
+        logger.info(f"[{self.name}]  {task_index}: {subtask.get('title', 'Unknown')}")
+        subtask_time_context = subtask.get("time_context") or time_context or {}
+        time_filter = subtask.get("time_filter") or subtask_time_context.get("time_filter")
+
+        search_queries = subtask.get("search_queries", [])[:3]  # 3
+        expected_results = subtask.get("expected_results", 5)
+
+        queue: asyncio.Queue = asyncio.Queue()
+        producers = [
+            asyncio.create_task(self._stream_query(
+                queue, query_index, query, subtask, expected_results, task_index, subtask_time_context, time_filter
+            ))
+            for query_index, query in enumerate(search_queries)
+        ]
+        documents: Dict[str, Any] = {}
+        finished = 0
+
+        def add(item) -> None:
+            nonlocal finished
+            if item is None:
+                finished += 1
+                return
+            order, record = item
+            key = record.get("url") or f"#{order}"
+            if key not in documents or order < documents[key][0]:
+                documents[key] = (order, record)
+
+        def drain() -> None:
+            while not queue.empty():
+                add(queue.get_nowait())
+
+        def ordered(final: bool = False) -> List[Dict[str, Any]]:
+            # query order, then search rank: independent of which page finished first;
+            # mirrors and syndicated copies collapse before they reach a prompt.
+            # the list only grows, so removals are counted once, on the final pass
+            records = [record for _, record in sorted(documents.values(), key=lambda item: item[0])]
+            return deduplicate_documents(records, label=f"subtask {task_index}", record=final)[0]
+
+        sufficient = max(1, math.ceil(self.sufficient_ratio * expected_results * len(search_queries)))
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.fetch_deadline
         try:
-            logger.info(f"[{self.name}]  {task_index}: {subtask.get('title', 'Unknown')}")
-            subtask_time_context = subtask.get("time_context") or time_context or {}
-            time_filter = subtask.get("time_filter") or subtask_time_context.get("time_filter")
+            while finished < len(producers) and len(documents) < sufficient:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    logger.warning(f"[{self.name}]  {task_index} fetch deadline reached with {len(documents)} documents")
+                    break
+                try:
+                    add(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    continue
 
-            search_queries = subtask.get("search_queries", [])
-            expected_results = subtask.get("expected_results", 5)
+            drain()
+            subtask_content = ordered()
+            if not subtask_content:
+                return {"content": [], "analysis": {}, "synthesis": {}, "abandoned": 0}
+            logger.info(f"[{self.name}]  {task_index}: analysing {len(subtask_content)} documents")
 
-            all_task_content = []
+            analysis_result = await self.analyzer.analyze_subtask(
+                query=subtask.get("title", ""),
+                search_results=subtask_content,
+                subtask_context=subtask
+            )
 
-            # 
-            query_tasks = []
-            for query in search_queries[:3]:  # 3
-                task = self._execute_single_query(
-                    query, subtask, expected_results, task_index, subtask_time_context, time_filter
-                )
-                query_tasks.append(task)
-
-            if query_tasks:
-                query_results = await asyncio.gather(*query_tasks, return_exceptions=True)
-
-                # 
-                for result in query_results:
-                    if isinstance(result, Exception):
-                        logger.error(f"[{self.name}] : {result}")
-                        continue
+            drain()
+            subtask_content = ordered()
+            synthesis_result = await self.synthesizer.synthesize_subtask(
+                query=subtask.get("title", ""),
+                search_results=subtask_content,
+                analysis_results=analysis_result,
+                subtask_context=subtask
+            )
 
-                    if result and isinstance(result, list):
-                        all_task_content.extend(result)
-            
-            logger.info(f"[{self.name}]  {task_index}  {len(all_task_content)} ")
-            
-            return {
-                "subtask": subtask,
-                "content": all_task_content,
-                "queries_executed": len(search_queries)
-            }
-            
-        except Exception as e:
-            logger.error(f"[{self.name}]  {task_index} : {e}")
+            drain()
+            abandoned = sum(1 for task in producers if not task.done())
+            if abandoned:
+                metrics.incr("deep_search.abandoned_queries", abandoned)
+                logger.info(f"[{self.name}]  {task_index}: abandoning {abandoned} unfinished queries")
             return {
-                "subtask": subtask,
-                "content": [],
-                "error": str(e)
+                "content": ordered(final=True),
+                "analysis": analysis_result,
+                "synthesis": synthesis_result,
+                "abandoned": abandoned
             }
+        finally:
+            for task in producers:
+                task.cancel()
 
-    async def _execute_single_query(
+    async def _stream_query(
         self,
+        queue: asyncio.Queue,
+        query_index: int,
         query: str,
         subtask: Dict[str, Any],
         expected_results: int,
         task_index: int,
         time_context: Dict[str, Any],
         time_filter: Optional[str] = None
-    ) -> List[Dict[str, Any]]:
-        """TODO: Add docstring."""
-
+    ):
+        """Put `((query_index, rank), record)` on the queue per usable document, then None."""
         try:
             logger.info(f"[{self.name}]  {task_index} : {query}")
 
-            # 
-            search_results = await self.web_searcher.search(
-                query,
-                max_results=expected_results,
-                time_filter=time_filter
-            )
-
-            logger.info(f"[{self.name}]  '{query}'  {len(search_results) if search_results else 0} ")
-
-            if not search_results:
-                logger.warning(f"[{self.name}]  '{query}' ")
-                return []
-
-            query_content = []
-            fallback_requests = []
-
-            for rank, result in enumerate(search_results[:expected_results]):
-                if not isinstance(result, dict):
-                    continue
-
-                # Markdown
-                full_content = (result.get("full_content") or result.get("content") or result.get("snippet") or "").strip()
-                images = result.get("images", []) or []
-
-                base_record = {
-                    "url": result.get("url", ""),
-                    "title": result.get("title", ""),
-                    "snippet": result.get("snippet", ""),
-                    "content": full_content,  # 
-                    "full_content": full_content,
-                    "content_length": len(full_content),
-                    "search_query": query,
-                    "subtask_id": subtask.get("id"),
-                    "subtask_title": subtask.get("title"),
-                    "extraction_time": datetime.now().isoformat(),
-                    "source": result.get("source", "web"),
-                    "rank": rank + 1,
-                    "images": images,
-                    "image_count": len(images),
-                    "has_images": bool(images),
-                    "images_inserted": result.get("images_inserted", False),
-                    "image_insert_mode": result.get("image_insert_mode"),
-                    "has_full_content": bool(full_content),
-                    "extraction_status": "success" if full_content else "pending",
-                    "time_context": time_context,
-                    "time_filter": time_filter
-                }
-
-                if full_content:
-                    query_content.append(base_record)
-                else:
-                    fallback_requests.append((base_record, result))
+            stream = self.web_searcher.search_stream(query, max_results=expected_results, time_filter=time_filter)
+            try:
+                async for rank, result in stream:
+                    if rank >= expected_results or not isinstance(result, dict):
+                        continue
+                    record = await self._build_record(query, rank, result, subtask, time_context, time_filter)
+                    if record is not None:
+                        await queue.put(((query_index, rank), record))
+            finally:
+                await stream.aclose()
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"[{self.name}]  '{query}' : {e}")
+        finally:
+            queue.put_nowait(None)
 
-            # 
-            if fallback_requests:
-                logger.info(f"[{self.name}]  {len(fallback_requests)} ")
-
-                extraction_tasks = []
-                valid_requests = []
-                for record, result in fallback_requests:
-                    url = result.get("url")
-                    if url:
-                        extraction_tasks.append(self.content_extractor.extract_content(url))
-                        valid_requests.append((record, result))
-
-                if extraction_tasks:
-                    extracted_contents = await asyncio.gather(*extraction_tasks, return_exceptions=True)
-
-                    for (record, result), extracted in zip(valid_requests, extracted_contents):
-                        if isinstance(extracted, Exception):
-                            logger.warning(f"[{self.name}] : {extracted}")
-                            record["extraction_status"] = "error"
-                            record["error"] = str(extracted)
-                            continue
-
-                        if extracted and extracted.get("content"):
-                            record["content"] = extracted.get("content", "")
-                            record["full_content"] = record["content"]
-                            record["content_length"] = extracted.get("content_length")
-                            record["extraction_status"] = "success"
-                            record["title"] = record["title"] or extracted.get("title", "")
-                            if record["content"] or record["image_count"] > 0:
-                                query_content.append(record)
-                        else:
-                            record["extraction_status"] = "no_content"
-                            if record["content"] or record["image_count"] > 0:
-                                query_content.append(record)
-
-            logger.info(f"[{self.name}]  '{query}'  {len(query_content)} ")
-            return query_content
+    async def _build_record(
+        self,
+        query: str,
+        rank: int,
+        result: Dict[str, Any],
+        subtask: Dict[str, Any],
+        time_context: Dict[str, Any],
+        time_filter: Optional[str]
+    ) -> Optional[Dict[str, Any]]:
+        """Document record of one search result; pages without text go through the content extractor."""
+        # Markdown
+        full_content = (result.get("full_content") or result.get("content") or result.get("snippet") or "").strip()
+        images = result.get("images", []) or []
+
+        record = {
+            "url": result.get("url", ""),
+            "title": result.get("title", ""),
+            "snippet": result.get("snippet", ""),
+            "content": full_content,  # 
+            "full_content": full_content,
+            "content_length": len(full_content),
+            "search_query": query,
+            "subtask_id": subtask.get("id"),
+            "subtask_title": subtask.get("title"),
+            "extraction_time": datetime.now().isoformat(),
+            "source": result.get("source", "web"),
+            "rank": rank + 1,
+            "images": images,
+            "image_count": len(images),
+            "has_images": bool(images),
+            "images_inserted": result.get("images_inserted", False),
+            "image_insert_mode": result.get("image_insert_mode"),
+            "has_full_content": bool(full_content),
+            "extraction_status": "success" if full_content else "pending",
+            "time_context": time_context,
+            "time_filter": time_filter
+        }
+        if full_content:
+            return record
 
+        # 
+        url = result.get("url")
+        if not url:
+            return None
+        try:
+            extracted = await self.content_extractor.extract_content(url)
         except Exception as e:
-            logger.error(f"[{self.name}]  '{query}' : {e}")
-            return []
+            logger.warning(f"[{self.name}] : {e}")
+            return None
+
+        if extracted and extracted.get("content"):
+            record["content"] = extracted.get("content", "")
+            record["full_content"] = record["content"]
+            record["content_length"] = extracted.get("content_length")
+            record["extraction_status"] = "success"
+            record["title"] = record["title"] or extracted.get("title", "")
+        else:
+            record["extraction_status"] = "no_content"
+        return record if record["content"] or record["image_count"] > 0 else None
 
     def _deduplicate_content(self, content_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """TODO: Add docstring."""
@@ -323,6 +346,7 @@ class DeepSearcher:
                 seen_urls.add(url)
                 unique_content.append(content)
         
+        unique_content, _ = deduplicate_documents(unique_content, label=self.name or "deep search")
         return unique_content
     
     def _rank_content_by_relevance(
@@ -183,7 +183,8 @@ JSON
             client = self.llm_manager.get_client("default")
             response = await client.simple_chat(
                 prompt,
-                ""
+                "",
+                cache=True
             )
 
             # 
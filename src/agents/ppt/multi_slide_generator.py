@@ -290,6 +290,18 @@ class MultiSlidePPTGenerator:
             return content_html
         else:
             # 不是完整HTML，需要完整包装
+            prev_slide = slide_meta.get('prev')
+            next_slide = slide_meta.get('next')
+            total_slides = ppt_metadata.get('total_slides', '')
+            # built outside the f-string: backslashes in f-string expressions need Python 3.12
+            if prev_slide:
+                prev_button = f'<button class="nav-btn" onclick="window.location.href=\'{prev_slide}\'"><i class="fas fa-arrow-left"></i> 上一页</button>'
+            else:
+                prev_button = '<button class="nav-btn" disabled><i class="fas fa-arrow-left"></i> 上一页</button>'
+            if next_slide:
+                next_button = f'<button class="nav-btn" onclick="window.location.href=\'{next_slide}\'">下一页 <i class="fas fa-arrow-right"></i></button>'
+            else:
+                next_button = '<button class="nav-btn" disabled>下一页 <i class="fas fa-arrow-right"></i></button>'
             return f"""<!DOCTYPE html>
 <html lang="zh-CN">
 <head>
@@ -359,8 +371,8 @@ class MultiSlidePPTGenerator:
         <button class="nav-btn" onclick="window.location.href='../index.html'">
             <i class="fas fa-home"></i> 首页
         </button>
-        {'<button class="nav-btn" onclick="window.location.href=\'' + prev_slide + '\'"><i class="fas fa-arrow-left"></i> 上一页</button>' if prev_slide else '<button class="nav-btn" disabled><i class="fas fa-arrow-left"></i> 上一页</button>'}
-        {'<button class="nav-btn" onclick="window.location.href=\'' + next_slide + '\'">下一页 <i class="fas fa-arrow-right"></i></button>' if next_slide else '<button class="nav-btn" disabled>下一页 <i class="fas fa-arrow-right"></i></button>'}
+        {prev_button}
+        {next_button}
     </div>
 
     <script>
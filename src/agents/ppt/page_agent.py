@@ -4,10 +4,12 @@ PageAgent - PPT
 PageAgentPPTHTML
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from pydantic import BaseModel, Field
 import logging
 
+from ...llm.prompt_cache import build_cached_messages
+
 logger = logging.getLogger(__name__)
 
 
@@ -62,12 +64,14 @@ class PageAgent:
             - html_content: HTMLdiv
             - speech_notes: 
         """
-        prompt = self._build_prompt(page_spec, global_context, content_data)
+        shared, prompt = self._build_prompt(page_spec, global_context, content_data)
 
         logger.info(f"[PageAgent] {page_spec.slide_number}: {page_spec.topic}")
 
+        # the style guide, CSS guide and output rules are identical for every
+        # slide of the deck, so they go first as a provider-cached prefix
         response = await self.llm_client.chat_completion(
-            messages=[{"role": "user", "content": prompt}],
+            messages=build_cached_messages(shared, prompt),
             max_tokens=2000,
             temperature=0.9  #
         )
@@ -114,8 +118,8 @@ class PageAgent:
         page_spec: PageSpec,
         global_context: GlobalContext,
         content_data: str
-    ) -> str:
-        """TODO: Add docstring."""
+    ) -> Tuple[str, str]:
+        """Build the prompt as (shared prefix for the whole deck, slide-specific part)."""
 
         # page_type
         layout_hints = {
@@ -237,10 +241,7 @@ class PageAgent:
 - **script标签中的ID**: 必须与canvas的ID完全一致
 """
 
-        return f"""你是一个HTML代码生成器。你只能输出HTML代码，不能输出任何其他内容。
-
-# 任务
-为PPT第{page_spec.slide_number}页生成完整的HTML代码
+        shared = f"""你是一个HTML代码生成器。你只能输出HTML代码，不能输出任何其他内容。
 
 # 全局信息
 - PPT标题: {global_context.ppt_title}
@@ -248,23 +249,9 @@ class PageAgent:
 - 配色: {global_context.colors}
 - 总页数: {global_context.total_slides}
 
-# 本页信息
-- 页码: {page_spec.slide_number}/{global_context.total_slides}
-- 类型: {page_spec.page_type}
-- 主题: {page_spec.topic}
-- 要点: {page_spec.key_points}
-
 # 风格要求
 {style_hint}
 
-# 布局建议
-{layout_hints.get(page_spec.page_type, '')}
-
-{chart_hint}
-
-# 内容数据
-{content_data[:1000]}
-
 {self.css_guide}
 
 # ================================
@@ -295,10 +282,30 @@ class PageAgent:
 - 页眉（标题区）占10-15%，使用text-4xl或text-5xl
 - 内容区占70-80%，使用flex-1
 - 页脚（页码等）占5-10%，使用text-sm或text-base
+"""
+
+        prompt = f"""# 任务
+为PPT第{page_spec.slide_number}页生成完整的HTML代码
+
+# 本页信息
+- 页码: {page_spec.slide_number}/{global_context.total_slides}
+- 类型: {page_spec.page_type}
+- 主题: {page_spec.topic}
+- 要点: {page_spec.key_points}
+
+# 布局建议
+{layout_hints.get(page_spec.page_type, '')}
+
+{chart_hint}
+
+# 内容数据
+{content_data[:1000]}
 
 **再次强调：只输出HTML代码！不要任何解释！立即开始输出HTML代码：**
 """
 
+        return shared, prompt
+
     async def _generate_speech_notes(
         self,
         page_spec: PageSpec,
@@ -11,6 +11,8 @@ from pydantic import BaseModel, Field
 
 from ...llm.manager import LLMManager
 from ...llm.prompts import PromptManager
+from ...llm.budget import BudgetItem
+from ...monitoring.metrics import phase
 from .outline_generator import PPTOutlineGenerator
 from .slide_content_generator import SlideContentGenerator
 from .multi_slide_generator import MultiSlidePPTGenerator, create_slide_data
@@ -70,6 +72,9 @@ class PPTData(BaseModel):
 class PPTCoordinator:
     """PPT - PPT"""
 
+    # prompt tokens for the search result summary
+    SEARCH_SUMMARY_TOKENS = 6000
+
     def __init__(
         self,
         llm_manager: LLMManager,
@@ -251,19 +256,20 @@ class PPTCoordinator:
             # Phase 4: 使用MultiSlidePPTGenerator生成多页HTML PPT文件
             logger.info(f"[{self.name}] Phase 4: 生成多页HTML文件")
             print(f"\n📦 正在生成多页HTML文件和导航页面...")
-            result = await self.multi_slide_generator.generate_ppt(
-                slides_data=slides_data,
-                ppt_config={
-                    'ppt_title': outline['title'],
-                    'subtitle': outline.get('subtitle', ''),
-                    'colors': outline['colors'],
-                    'style': style,
-                    'theme': theme,
-                    'author': 'XunLong AI',
-                    'date': datetime.now().strftime('%Y-%m-%d')
-                },
-                output_dir=output_dir
-            )
+            async with phase("html_conversion"):
+                result = await self.multi_slide_generator.generate_ppt(
+                    slides_data=slides_data,
+                    ppt_config={
+                        'ppt_title': outline['title'],
+                        'subtitle': outline.get('subtitle', ''),
+                        'colors': outline['colors'],
+                        'style': style,
+                        'theme': theme,
+                        'author': 'XunLong AI',
+                        'date': datetime.now().strftime('%Y-%m-%d')
+                    },
+                    output_dir=output_dir
+                )
 
             logger.info(f"[{self.name}] 多页HTML PPT生成完成")
             print(f"✅ PPT生成完成！")
@@ -607,14 +613,23 @@ class PPTCoordinator:
         """TODO: Add docstring."""
         summary_parts = []
 
-        for i, result in enumerate(search_results[:15], 1):  # 15
+        # 15 results, best first, sharing one token budget
+        budgeter = self.llm_manager.get_client("outline_generator").budgeter(cap=self.SEARCH_SUMMARY_TOKENS)
+        packed = budgeter.pack(
+            [BudgetItem(text=result.get("content", ""), priority=-i, payload=result)
+             for i, result in enumerate(search_results[:15])],
+            overhead_per_item=40
+        )
+
+        for i, item in enumerate(packed, 1):
+            result = item.payload
             title = result.get("title", "")
-            content = result.get("content", "")[:800]  # 800
+            content = item.text
             url = result.get("url", "")
 
             summary_parts.append(f"""{i}{title}
 : {url}
-: {content}...
+: {content}
 ---""")
 
         return "\n\n".join(summary_parts)
@@ -1104,6 +1119,7 @@ JSON
 
         return ppt_data
 
+    @phase("html_conversion")
     async def _convert_to_html(
         self,
         ppt_data: Dict[str, Any],
@@ -1283,6 +1299,7 @@ HTML
 </html>
 """
 
+    @phase("outline_generation")
     async def _generate_outline_v2(
         self,
         topic: str,
@@ -1376,6 +1393,7 @@ JSON
 
         return outline_result.model_dump()
 
+    @phase("page_generation")
     async def _parallel_generate_pages(
         self,
         outline: Dict[str, Any],
@@ -14,6 +14,8 @@ except ImportError:  # pragma: no cover
 
 from ...llm.manager import LLMManager
 from ...llm.prompts import PromptManager
+from ...monitoring.metrics import phase
+from ...utils.near_duplicates import deduplicate_documents
 # Image functionality disabled to save time and network resources
 # from ...tools.image_searcher import ImageSearcher
 # from ...tools.image_downloader import ImageDownloader
@@ -95,12 +97,16 @@ class ReportCoordinator:
             logger.info(f"[{self.name}] ")
             available_content = search_results
 
+        # section prompts should not carry the same article twice
+        available_content, _ = deduplicate_documents(available_content, label="report sources")
+
         try:
             # Phase 1:
             logger.info(f"[{self.name}] Phase 1: ")
-            outline_result = await self.outline_generator.generate_outline(
-                query, available_content, synthesis_results, report_type, refined_subtasks
-            )
+            async with phase("outline_generation"):
+                outline_result = await self.outline_generator.generate_outline(
+                    query, available_content, synthesis_results, report_type, refined_subtasks
+                )
 
             if outline_result["status"] != "success":
                 raise Exception("")
@@ -173,6 +179,7 @@ class ReportCoordinator:
                 "error": str(e)
             }
 
+    @phase("section_writing")
     async def _parallel_section_writing(
         self,
         sections: List[Dict[str, Any]],
@@ -270,6 +277,7 @@ class ReportCoordinator:
 
         return writer_result
 
+    @phase("iterative_optimization")
     async def _iterative_optimization(
         self,
         section_results: List[Dict[str, Any]],
@@ -365,6 +373,7 @@ class ReportCoordinator:
 
         return optimized
 
+    @phase("report_assembly")
     async def _assemble_report(
         self,
         outline: Dict[str, Any],
@@ -484,6 +493,7 @@ class ReportCoordinator:
 
         return report
 
+    @phase("html_conversion")
     async def _convert_to_html(
         self,
         report: Dict[str, Any],
@@ -530,6 +540,7 @@ class ReportCoordinator:
             # Re-raise the exception instead of returning Markdown as HTML
             raise Exception(f"Failed to convert to HTML: {e}") from e
 
+    @phase("visualization")
     async def _add_visualizations(
         self,
         sections: List[Dict[str, Any]]
@@ -46,7 +46,8 @@ class SectionEvaluator:
             client = self.llm_manager.get_client("default")
             response = await client.simple_chat(
                 evaluation_prompt,
-                ""
+                "",
+                cache=True
             )
 
             # 
@@ -7,11 +7,15 @@ from loguru import logger
 
 from ...llm.manager import LLMManager
 from ...llm.prompts import PromptManager
+from ...llm.budget import BudgetItem
 
 
 class SectionWriter:
     """TODO: Add docstring."""
 
+    # prompt tokens for the reference material of one section
+    REFERENCE_TOKENS = 3500
+
     def __init__(self, llm_manager: LLMManager, prompt_manager: PromptManager):
         self.llm_manager = llm_manager
         self.prompt_manager = prompt_manager
@@ -322,15 +326,23 @@ class SectionWriter:
             return ""
 
         formatted = []
-        for i, content in enumerate(content_list[:8], 1):
+        # up to 8 references, most relevant first, sharing one token budget
+        budgeter = self.llm_manager.get_client("default").budgeter(cap=self.REFERENCE_TOKENS)
+        packed = budgeter.pack(
+            [BudgetItem(text=content.get("content", ""), priority=-i, payload=content)
+             for i, content in enumerate(content_list[:8])],
+            overhead_per_item=40
+        )
+        for i, item in enumerate(packed, 1):
+            content = item.payload
             title = content.get("title", "")
             url = content.get("url", "")
-            text = content.get("content", "")[:500]
+            text = item.text
 
             formatted.append(f"""
 ###  {i}: {title}
 **URL**: {url}
-****: {text}...
+****: {text}
 """)
 
         return "\n".join(formatted)
@@ -5,12 +5,17 @@ from typing import Dict, Any, List
 from loguru import logger
 
 from .base import BaseAgent, AgentConfig
+from .subtask_scheduler import format_upstream_findings
 from ..llm import LLMManager, PromptManager
+from ..llm.budget import BudgetItem
 
 
 class SearchAnalyzerAgent(BaseAgent):
     """ - """
 
+    # prompt tokens for result previews
+    EVIDENCE_TOKENS = 1500
+
     def __init__(
         self,
         llm_manager: LLMManager,
@@ -52,12 +57,19 @@ class SearchAnalyzerAgent(BaseAgent):
             
             # 
             results_summary = []
-            for i, result in enumerate(search_results[:5]):  # 5
+            budgeter = self.get_budgeter(cap=self.EVIDENCE_TOKENS)
+            packed = budgeter.pack(
+                [BudgetItem(text=result.get("content", ""), priority=-i, payload=(i, result))
+                 for i, result in enumerate(search_results[:5])],  # 5
+                overhead_per_item=40
+            )
+            for item in packed:
+                i, result = item.payload
                 summary = {
                     "index": i + 1,
                     "title": result.get("title", ""),
                     "url": result.get("url", ""),
-                    "content_preview": result.get("content", "")[:300] + "..." if result.get("content") else ""
+                    "content_preview": item.text
                 }
                 results_summary.append(summary)
             
@@ -186,6 +198,7 @@ JSON
 ****: {subtask_context.get('title', query)}
 ****: {subtask_context.get('description', '')}
 
+{format_upstream_findings(subtask_context)}
 #
 
 {json.dumps(results_summary, ensure_ascii=False, indent=2)}
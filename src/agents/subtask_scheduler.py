@@ -0,0 +1,145 @@
+"""
+Concurrent execution of decomposed subtasks.
+
+Subtasks from the task decomposer may name the subtasks they build on in
+`depends_on` (an id or a list of ids). The scheduler starts every subtask
+whose dependencies have finished, at most `max_concurrency` at a time, in
+input order. Results come back in input order whatever the completion
+order, so downstream agents see the same sequence as with a sequential
+loop. Unknown ids are ignored; a dependency cycle is broken by starting its
+first subtask anyway.
+
+:class:`UpstreamFindings` carries the refined summary of each finished
+subtask to the subtasks that depend on it; the analysis and synthesis
+prompts show them under `upstream_findings`.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Set
+
+from loguru import logger
+
+from ..utils.tokens import truncate_to_tokens
+
+
+# token cap for each dependency summary handed to a dependent subtask
+UPSTREAM_SUMMARY_TOKENS = 400
+
+
+class SubtaskScheduler:
+    """Bounded, dependency-aware runner for subtasks."""
+
+    def __init__(self, max_concurrency: int = 3):
+        self.max_concurrency = max(1, int(max_concurrency))
+
+    @staticmethod
+    def dependencies(subtask: Dict[str, Any]) -> List[str]:
+        """Ids listed in a subtask's `depends_on`."""
+        deps = subtask.get("depends_on") or []
+        if isinstance(deps, str):
+            deps = [deps]
+        return [str(d) for d in deps]
+
+    def _dependency_graph(self, subtasks: List[Dict[str, Any]]) -> List[Set[int]]:
+        index: Dict[str, int] = {}
+        for i, subtask in enumerate(subtasks):
+            index.setdefault(str(subtask.get("id", i)), i)
+
+        graph = []
+        for i, subtask in enumerate(subtasks):
+            deps = set()
+            for dep in self.dependencies(subtask):
+                if dep not in index:
+                    logger.warning(f"[SubtaskScheduler] {subtask.get('id', i)} depends on unknown subtask {dep}")
+                elif index[dep] != i:
+                    deps.add(index[dep])
+            graph.append(deps)
+        return graph
+
+    @staticmethod
+    async def _run_one(worker: Callable[[Dict[str, Any]], Awaitable[Any]], subtask: Dict[str, Any]) -> Any:
+        try:
+            return await worker(subtask)
+        except Exception as e:
+            logger.error(f"[SubtaskScheduler] subtask {subtask.get('id')} failed: {e}")
+            return e
+
+    async def run(
+        self,
+        subtasks: List[Dict[str, Any]],
+        worker: Callable[[Dict[str, Any]], Awaitable[Any]]
+    ) -> List[Any]:
+        """
+        Run `worker(subtask)` for every subtask.
+
+        Returns:
+            Worker results in input order; a failed subtask yields its exception.
+        """
+        graph = self._dependency_graph(subtasks)
+        results: List[Any] = [None] * len(subtasks)
+        pending = list(range(len(subtasks)))
+        done: Set[int] = set()
+        running: Dict[asyncio.Task, int] = {}
+
+        try:
+            while pending or running:
+                ready = [i for i in pending if graph[i] <= done]
+                if not ready and not running:
+                    logger.warning(
+                        f"[SubtaskScheduler] dependency cycle, starting {subtasks[pending[0]].get('id')} anyway"
+                    )
+                    ready = pending[:1]
+
+                for i in ready[:self.max_concurrency - len(running)]:
+                    pending.remove(i)
+                    running[asyncio.create_task(self._run_one(worker, subtasks[i]))] = i
+
+                finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    i = running.pop(task)
+                    results[i] = task.result()
+                    done.add(i)
+        finally:
+            for task in running:
+                task.cancel()
+
+        return results
+
+
+class UpstreamFindings:
+    """Summaries of finished subtasks, keyed by subtask id."""
+
+    def __init__(self, max_tokens: int = UPSTREAM_SUMMARY_TOKENS):
+        self.max_tokens = max_tokens
+        self._summaries: Dict[str, Dict[str, str]] = {}
+
+    def record(self, subtask: Dict[str, Any], summary: str):
+        """Keep the refined summary of a finished subtask (capped at `max_tokens`)."""
+        if summary:
+            self._summaries[str(subtask.get("id"))] = {
+                "id": str(subtask.get("id")),
+                "title": subtask.get("title", ""),
+                "summary": truncate_to_tokens(summary, self.max_tokens),
+            }
+
+    def attach(self, subtask: Dict[str, Any]) -> Dict[str, Any]:
+        """A copy of `subtask` with `upstream_findings` from its finished dependencies."""
+        upstream = [
+            self._summaries[dep] for dep in SubtaskScheduler.dependencies(subtask) if dep in self._summaries
+        ]
+        if not upstream:
+            return subtask
+        return {**subtask, "upstream_findings": upstream}
+
+
+def format_upstream_findings(subtask_context: Dict[str, Any]) -> str:
+    """Prompt section with the findings a subtask builds on; empty for independent subtasks."""
+    upstream = subtask_context.get("upstream_findings") or []
+    if not upstream:
+        return ""
+    lines = ["# Findings of the subtasks this one builds on", ""]
+    for finding in upstream:
+        lines.append(f"## {finding.get('title') or finding.get('id')}")
+        lines.append(finding.get("summary", ""))
+        lines.append("")
+    return "\n".join(lines)
@@ -61,7 +61,8 @@ class TaskDecomposer:
             client = self.llm_manager.get_client("default")
             response = await client.simple_chat(
                 decomposition_prompt,
-                ""
+                "",
+                cache=True
             )
             
             # 
@@ -205,7 +206,8 @@ JSON:
             "search_queries": ["1", "2"],
             "keywords": ["1", "2"],
             "priority": "high/medium/low",
-            "expected_results": 5
+            "expected_results": 5,
+            "depends_on": []
         }}
     ],
     "strategy": "comprehensive/focused/exploratory",
@@ -213,7 +215,7 @@ JSON:
     "estimated_time": 
 }}
 
-
+`depends_on` lists the ids of subtasks whose results this subtask builds on: it is searched after them and their summaries are handed to its analysis. Leave it empty for independent subtasks, they are searched in parallel.
 """
         return prompt
 
@@ -2,21 +2,28 @@
 
 import os
 import hashlib
-from typing import Optional
-from playwright.async_api import async_playwright, Browser, BrowserContext, Page
+from typing import List, Optional
+from playwright.async_api import Page
 from loguru import logger
 
 from .config import DeepSearchConfig
+from .tools.browser_pool import BrowserPool, get_browser_pool
 
 
 class BrowserManager:
-    """TODO: Add docstring."""
+    """
+    Page leases from the shared browser pool (see tools/browser_pool.py).
+
+    Entering the manager no longer launches a browser; pages opened with
+    new_page() are returned to the pool when the manager is closed. The
+    config's headless, user_agent and browser_timeout select the pool, so
+    managers with the same settings share one browser.
+    """
     
     def __init__(self, config: DeepSearchConfig):
         self.config = config
-        self.playwright = None
-        self.browser: Optional[Browser] = None
-        self.context: Optional[BrowserContext] = None
+        self.pool: Optional[BrowserPool] = None
+        self._pages: List[Page] = []
     
     async def __aenter__(self):
         """TODO: Add docstring."""
@@ -28,108 +35,36 @@ class BrowserManager:
         await self.close()
     
     async def start(self):
-        """TODO: Add docstring."""
-        try:
-            logger.info(f" (headless={self.config.headless})")
-            
-            self.playwright = await async_playwright().start()
-            
-            # Chromium - 
-            launch_args = [
-                '--no-sandbox',
-                '--disable-blink-features=AutomationControlled',
-                '--disable-web-security',
-                '--disable-features=VizDisplayCompositor',
-                '--disable-dev-shm-usage',
-                '--disable-extensions',
-                '--disable-plugins',
-                '--disable-images',  # 
-                '--disable-javascript-harmony-shipping',
-                '--disable-background-timer-throttling',
-                '--disable-renderer-backgrounding',
-                '--disable-backgrounding-occluded-windows',
-                '--disable-ipc-flooding-protection',
-                '--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-            ]
-            
-            self.browser = await self.playwright.chromium.launch(
-                headless=self.config.headless,
-                args=launch_args
-            )
-            
-            #  - 
-            self.context = await self.browser.new_context(
-                user_agent=self.config.user_agent,
-                viewport={'width': 1920, 'height': 1080},
-                extra_http_headers={
-                    'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                    'Accept-Encoding': 'gzip, deflate, br',
-                    'DNT': '1',
-                    'Connection': 'keep-alive',
-                    'Upgrade-Insecure-Requests': '1',
-                }
-            )
-            
-            # 
-            await self.context.add_init_script("""
-                Object.defineProperty(navigator, 'webdriver', {
-                    get: () => undefined,
-                });
-                
-                Object.defineProperty(navigator, 'plugins', {
-                    get: () => [1, 2, 3, 4, 5],
-                });
-                
-                Object.defineProperty(navigator, 'languages', {
-                    get: () => ['zh-CN', 'zh', 'en'],
-                });
-                
-                window.chrome = {
-                    runtime: {},
-                };
-            """)
-            
-            # 
-            self.context.set_default_timeout(self.config.browser_timeout)
-            
-            logger.info("")
-            
-        except Exception as e:
-            logger.error(f": {e}")
-            raise
+        """Attach to the browser pool of the running event loop with this config's settings."""
+        self.pool = get_browser_pool(
+            headless=self.config.headless,
+            user_agent=self.config.user_agent,
+            navigation_timeout=self.config.browser_timeout
+        )
     
     async def close(self):
-        """TODO: Add docstring."""
-        try:
-            if self.context:
-                await self.context.close()
-            if self.browser:
-                await self.browser.close()
-            if self.playwright:
-                await self.playwright.stop()
-            logger.info("")
-        except Exception as e:
-            logger.warning(f": {e}")
+        """Return every page leased through new_page()."""
+        pages, self._pages = self._pages, []
+        for page in pages:
+            try:
+                await self.pool.release(page)
+            except Exception as e:
+                logger.warning(f": {e}")
     
     async def get_page_content(self, url: str) -> Optional[str]:
         """TODO: Add docstring."""
         try:
             logger.debug(f": {url}")
             
-            page = await self.new_page()
-            
-            # 
-            await page.goto(url, wait_until="domcontentloaded", timeout=30000)
-            
-            # 
-            await self.wait_for_page_load(page)
-            
-            # HTML
-            content = await page.content()
-            
-            # 
-            await page.close()
+            async with self.pool.page() as page:
+                # 
+                await page.goto(url, wait_until="domcontentloaded", timeout=self.config.browser_timeout)
+                
+                # 
+                await self.wait_for_page_load(page)
+                
+                # HTML
+                content = await page.content()
             
             logger.debug(f": {url}")
             return content
@@ -139,15 +74,12 @@ class BrowserManager:
             return None
     
     async def new_page(self) -> Page:
-        """TODO: Add docstring."""
-        if not self.context:
+        """Lease a page; it goes back to the pool on close() (closing it early is fine)."""
+        if not self.pool:
             raise RuntimeError("")
         
-        page = await self.context.new_page()
-        
-        # 
-        page.on("console", lambda msg: logger.debug(f"Console: {msg.text}"))
-        
+        page = await self.pool.acquire()
+        self._pages.append(page)
         return page
     
     async def take_screenshot(self, page: Page, url: str) -> Optional[str]:
@@ -6,6 +6,8 @@ from pathlib import Path
 from typing import Dict, Any, Optional
 from loguru import logger
 
+from ..monitoring.metrics import phase
+
 
 class ExportManager:
     """TODO: Add docstring."""
@@ -19,6 +21,7 @@ class ExportManager:
         """
         self.base_dir = Path(base_dir)
 
+    @phase("export")
     async def export_project(
         self,
         project_id: str,
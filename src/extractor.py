@@ -1,13 +1,125 @@
 """TODO: Add docstring."""
 
 import re
-from typing import Optional, Tuple
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urljoin
 from playwright.async_api import Page
 from bs4 import BeautifulSoup
 import trafilatura
 from loguru import logger
 
 from .models import PageExtract
+from .tools.extraction_pool import HTML_PARSER, get_extraction_pool
+
+
+def extract_main_text(html_content: str, soup: Optional[BeautifulSoup] = None) -> str:
+    """Main text of a page: trafilatura, else the main-content element; runs in the extraction pool."""
+    try:
+        # trafilatura
+        text = trafilatura.extract(html_content)
+
+        if text and text.strip():
+            #
+            text = clean_text(text)
+            return text
+
+        # BeautifulSoup
+        soup = soup or BeautifulSoup(html_content, HTML_PARSER)
+
+        #
+        for script in soup(["script", "style", "nav", "header", "footer", "aside"]):
+            script.decompose()
+
+        #
+        main_content = soup.find('main') or soup.find('article') or soup.find('div', class_=re.compile(r'content|main|article'))
+
+        if main_content:
+            text = main_content.get_text(separator=' ', strip=True)
+        else:
+            text = soup.get_text(separator=' ', strip=True)
+
+        return clean_text(text)
+
+    except Exception as e:
+        logger.warning(f": {e}")
+        return ""
+
+
+def html_title(soup: BeautifulSoup) -> str:
+    """<title>, else og:title."""
+    title_tag = soup.find('title')
+    if title_tag and title_tag.text.strip():
+        return title_tag.text.strip()
+
+    # og:title
+    og_title = soup.find('meta', property='og:title')
+    if og_title and og_title.get('content'):
+        return og_title['content'].strip()
+
+    return ""
+
+
+def lead_images(soup: BeautifulSoup, url: str) -> Tuple[Optional[str], Optional[str]]:
+    """og:image and the first non-inline <img>, resolved against `url`."""
+    og_image_url = None
+    first_image_url = None
+
+    # og:image
+    og_image = soup.find('meta', property='og:image')
+    if og_image and og_image.get('content'):
+        og_image_url = og_image['content']
+        if og_image_url.startswith('//'):
+            og_image_url = 'https:' + og_image_url
+        elif og_image_url.startswith('/'):
+            og_image_url = urljoin(url, og_image_url)
+
+    #
+    for img in soup.find_all('img', src=True):
+        src = img['src']
+        if src and not src.startswith('data:'):  # base64
+            if src.startswith('//'):
+                first_image_url = 'https:' + src
+            elif src.startswith('/'):
+                first_image_url = urljoin(url, src)
+            elif src.startswith('http'):
+                first_image_url = src
+
+            if first_image_url:
+                break
+
+    return og_image_url, first_image_url
+
+
+def extract_page_fields(html_content: str, url: str) -> Dict[str, Any]:
+    """Title, main text and lead images of a page from one parse; runs in the extraction pool."""
+    try:
+        soup = BeautifulSoup(html_content, HTML_PARSER)
+        title = html_title(soup)
+        og_image_url, first_image_url = lead_images(soup, url)
+    except Exception as e:
+        logger.warning(f": {e}")
+        soup, title, og_image_url, first_image_url = None, "", None, None
+    # main-text extraction strips tags from the tree, so it goes last
+    return {
+        "title": title,
+        "text": extract_main_text(html_content, soup),
+        "og_image_url": og_image_url,
+        "first_image_url": first_image_url,
+    }
+
+
+def clean_text(text: str) -> str:
+    """Collapse whitespace and drop control characters."""
+    if not text:
+        return ""
+
+    #
+    text = re.sub(r'\s+', ' ', text)
+
+    #
+    text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]', '', text)
+
+    return text.strip()
 
 
 class ContentExtractor:
@@ -36,14 +148,13 @@ class ContentExtractor:
             # HTML
             html_content = await page.content()
             
-            # 
-            title = await self._extract_title(page, html_content)
-            
-            # 
-            text = self._extract_main_text(html_content)
-            
-            # 
-            og_image_url, first_image_url = await self._extract_images(page, html_content)
+            # title, text and images are parsed off the event loop
+            fields = await get_extraction_pool().run(
+                extract_page_fields, html_content, page.url or url, size=len(html_content)
+            )
+            title = await self._extract_title(page, fields["title"])
+            text = fields["text"]
+            og_image_url, first_image_url = fields["og_image_url"], fields["first_image_url"]
             
             result = PageExtract(
                 url=url,
@@ -69,216 +180,75 @@ class ContentExtractor:
                 error=str(e)
             )
     
-    async def _extract_title(self, page: Page, html_content: str) -> str:
-        """TODO: Add docstring."""
+    async def _extract_title(self, page: Page, parsed_title: str) -> str:
+        """The rendered document title, else the one parsed from the HTML."""
         try:
             # 
             title = await page.title()
             if title and title.strip():
                 return title.strip()
-            
-            # HTML
-            soup = BeautifulSoup(html_content, 'html.parser')
-            title_tag = soup.find('title')
-            if title_tag and title_tag.text.strip():
-                return title_tag.text.strip()
-            
-            # og:title
-            og_title = soup.find('meta', property='og:title')
-            if og_title and og_title.get('content'):
-                return og_title['content'].strip()
-            
-            return ""
-            
         except Exception as e:
             logger.warning(f": {e}")
-            return ""
+        return parsed_title
     
     def _extract_main_text(self, html_content: str) -> str:
         """TODO: Add docstring."""
-        try:
-            # trafilatura
-            text = trafilatura.extract(html_content)
-            
-            if text and text.strip():
-                # 
-                text = self._clean_text(text)
-                return text
-            
-            # BeautifulSoup
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # 
-            for script in soup(["script", "style", "nav", "header", "footer", "aside"]):
-                script.decompose()
-            
-            # 
-            main_content = soup.find('main') or soup.find('article') or soup.find('div', class_=re.compile(r'content|main|article'))
-            
-            if main_content:
-                text = main_content.get_text(separator=' ', strip=True)
-            else:
-                text = soup.get_text(separator=' ', strip=True)
-            
-            return self._clean_text(text)
-            
-        except Exception as e:
-            logger.warning(f": {e}")
-            return ""
+        return extract_main_text(html_content)
     
     def _clean_text(self, text: str) -> str:
         """TODO: Add docstring."""
-        if not text:
-            return ""
-        
-        # 
-        text = re.sub(r'\s+', ' ', text)
-        
-        # 
-        text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]', '', text)
-        
-        return text.strip()
-    
-    async def _extract_images(self, page: Page, html_content: str) -> Tuple[Optional[str], Optional[str]]:
-        """TODO: Add docstring."""
-        og_image_url = None
-        first_image_url = None
-        
-        try:
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # og:image
-            og_image = soup.find('meta', property='og:image')
-            if og_image and og_image.get('content'):
-                og_image_url = og_image['content']
-                if og_image_url.startswith('//'):
-                    og_image_url = 'https:' + og_image_url
-                elif og_image_url.startswith('/'):
-                    base_url = await page.evaluate('window.location.origin')
-                    og_image_url = base_url + og_image_url
-            
-            # 
-            img_tags = soup.find_all('img', src=True)
-            for img in img_tags:
-                src = img['src']
-                if src and not src.startswith('data:'):  # base64
-                    if src.startswith('//'):
-                        first_image_url = 'https:' + src
-                    elif src.startswith('/'):
-                        base_url = await page.evaluate('window.location.origin')
-                        first_image_url = base_url + src
-                    elif src.startswith('http'):
-                        first_image_url = src
-                    
-                    if first_image_url:
-                        break
-            
-        except Exception as e:
-            logger.warning(f": {e}")
-        
-        return og_image_url, first_image_url
+        return clean_text(text)
     
     def extract_content(self, html_content: str, url: str) -> dict:
-        """HTML"""
+        """HTML (parsed inline; from async code use extract_content_async)"""
         try:
             logger.debug(f": {url}")
-            
-            # 
-            title = self._extract_title_from_html(html_content)
-            
-            # 
-            text = self._extract_main_text(html_content)
-            
-            # 
-            og_image_url, first_image_url = self._extract_images_from_html(html_content, url)
-            
-            # 200
-            summary = text[:200] + "..." if len(text) > 200 else text
-            
-            result = {
-                'content': text,
-                'summary': summary,
-                'metadata': {
-                    'title': title,
-                    'url': url,
-                    'length': len(text),
-                    'og_image_url': og_image_url,
-                    'first_image_url': first_image_url
-                }
-            }
-            
-            logger.debug(f": {title[:50]}... ({len(text)} )")
-            return result
-            
+            return self._content_result(extract_page_fields(html_content, url), url)
         except Exception as e:
             logger.error(f" {url}: {e}")
-            return {
-                'content': '',
-                'summary': '',
-                'metadata': {
-                    'title': '',
-                    'url': url,
-                    'length': 0,
-                    'error': str(e)
-                }
-            }
+            return self._failed_content(url, e)
     
-    def _extract_title_from_html(self, html_content: str) -> str:
-        """HTML"""
+    async def extract_content_async(self, html_content: str, url: str) -> dict:
+        """Same result as extract_content, parsed in the extraction pool off the event loop."""
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # title
-            title_tag = soup.find('title')
-            if title_tag and title_tag.text.strip():
-                return title_tag.text.strip()
-            
-            # og:title
-            og_title = soup.find('meta', property='og:title')
-            if og_title and og_title.get('content'):
-                return og_title['content'].strip()
-            
-            return ""
-            
+            logger.debug(f": {url}")
+            fields = await get_extraction_pool().run(
+                extract_page_fields, html_content, url, size=len(html_content)
+            )
+            return self._content_result(fields, url)
         except Exception as e:
-            logger.warning(f": {e}")
-            return ""
+            logger.error(f" {url}: {e}")
+            return self._failed_content(url, e)
     
-    def _extract_images_from_html(self, html_content: str, url: str) -> Tuple[Optional[str], Optional[str]]:
-        """HTML"""
-        og_image_url = None
-        first_image_url = None
+    def _content_result(self, fields: Dict[str, Any], url: str) -> dict:
+        """content / summary / metadata of the parsed page fields"""
+        title, text = fields["title"], fields["text"]
         
-        try:
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # og:image
-            og_image = soup.find('meta', property='og:image')
-            if og_image and og_image.get('content'):
-                og_image_url = og_image['content']
-                if og_image_url.startswith('//'):
-                    og_image_url = 'https:' + og_image_url
-                elif og_image_url.startswith('/'):
-                    from urllib.parse import urljoin
-                    og_image_url = urljoin(url, og_image_url)
-            
-            # 
-            img_tags = soup.find_all('img', src=True)
-            for img in img_tags:
-                src = img['src']
-                if src and not src.startswith('data:'):  # base64
-                    if src.startswith('//'):
-                        first_image_url = 'https:' + src
-                    elif src.startswith('/'):
-                        from urllib.parse import urljoin
-                        first_image_url = urljoin(url, src)
-                    elif src.startswith('http'):
-                        first_image_url = src
-                    
-                    if first_image_url:
-                        break
-            
-        except Exception as e:
-            logger.warning(f": {e}")
+        # 200
+        summary = text[:200] + "..." if len(text) > 200 else text
         
-        return og_image_url, first_image_url
\ No newline at end of file
+        logger.debug(f": {title[:50]}... ({len(text)} )")
+        return {
+            'content': text,
+            'summary': summary,
+            'metadata': {
+                'title': title,
+                'url': url,
+                'length': len(text),
+                'og_image_url': fields["og_image_url"],
+                'first_image_url': fields["first_image_url"]
+            }
+        }
+    
+    def _failed_content(self, url: str, error: Exception) -> dict:
+        """TODO: Add docstring."""
+        return {
+            'content': '',
+            'summary': '',
+            'metadata': {
+                'title': '',
+                'url': url,
+                'length': 0,
+                'error': str(error)
+            }
+        }
@@ -4,6 +4,10 @@ from .client import LLMClient
 from .config import LLMConfig, LLMProvider, create_llm_config
 from .prompts import PromptManager, prompt_manager
 from .manager import LLMManager, llm_manager
+from .cache import LLMResponseCache, get_response_cache, configure_response_cache
+from .singleflight import SingleFlight
+from .budget import ContextBudgeter, BudgetItem, ContextOverflowError, get_context_window
+from .prompt_cache import build_cached_messages, cacheable
 
 __all__ = [
     "LLMClient",
@@ -13,5 +17,15 @@ __all__ = [
     "PromptManager",
     "prompt_manager",
     "LLMManager",
-    "llm_manager"
+    "llm_manager",
+    "LLMResponseCache",
+    "get_response_cache",
+    "configure_response_cache",
+    "SingleFlight",
+    "ContextBudgeter",
+    "BudgetItem",
+    "ContextOverflowError",
+    "get_context_window",
+    "build_cached_messages",
+    "cacheable"
 ]
\ No newline at end of file
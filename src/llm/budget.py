@@ -0,0 +1,230 @@
+"""
+Context budgeting for prompt construction.
+
+Agents build prompts from evidence (search results, references) through a
+ContextBudgeter, which fits prioritised items into a token limit derived
+from the model's context window instead of slicing every item to a fixed
+number of characters.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from loguru import logger
+
+from ..utils.tokens import estimate_tokens, truncate_to_tokens
+
+
+# context window (tokens) by model name prefix; the longest matching prefix wins
+MODEL_CONTEXT_WINDOWS: Dict[str, int] = {
+    "gpt-4o": 128000,
+    "gpt-4.1": 1000000,
+    "gpt-4-turbo": 128000,
+    "gpt-4": 8192,
+    "gpt-3.5-turbo": 16385,
+    "o1": 128000,
+    "o3": 200000,
+    "deepseek-chat": 64000,
+    "deepseek-reasoner": 64000,
+    "qwen-max": 32768,
+    "qwen-plus": 131072,
+    "qwen-turbo": 131072,
+    "qwen-long": 1000000,
+    "glm-4": 128000,
+    "glm-4-flash": 128000,
+    "claude": 200000,
+    "moonshot-v1-8k": 8192,
+    "moonshot-v1-32k": 32768,
+    "moonshot-v1-128k": 131072,
+}
+DEFAULT_CONTEXT_WINDOW = 32768
+
+# tokens kept free for chat formatting and estimator error
+SAFETY_MARGIN = 512
+MESSAGE_OVERHEAD = 4
+
+# smallest completion worth requesting once a prompt has eaten the window
+MIN_COMPLETION_TOKENS = 256
+
+
+class ContextOverflowError(ValueError):
+    """The prompt leaves too little of the context window for a completion."""
+
+
+def estimate_messages_tokens(messages: Sequence[Dict[str, Any]]) -> int:
+    """Estimated prompt tokens of a chat message list."""
+    total = 0
+    for message in messages:
+        content = message.get("content", "")
+        if isinstance(content, list):
+            content = " ".join(str(part.get("text", "")) for part in content if isinstance(part, dict))
+        total += estimate_tokens(str(content)) + MESSAGE_OVERHEAD
+    return total
+
+
+_context_windows: Dict[str, int] = {}
+
+
+def configure_context_windows(windows: Optional[Dict[str, int]]):
+    """Add or override context windows (`context_windows` section of llm_config.yaml)."""
+    _context_windows.update({k: int(v) for k, v in (windows or {}).items()})
+
+
+def get_context_window(model_name: Optional[str]) -> int:
+    """Context window of a model, by longest name-prefix match."""
+    name = (model_name or "").lower()
+    # strip a provider prefix such as "deepseek/deepseek-chat"
+    name = name.rsplit("/", 1)[-1]
+    table = {**MODEL_CONTEXT_WINDOWS, **{k.lower(): v for k, v in _context_windows.items()}}
+    matches = [prefix for prefix in table if name.startswith(prefix)]
+    if not matches:
+        return DEFAULT_CONTEXT_WINDOW
+    return table[max(matches, key=len)]
+
+
+def prompt_token_limit(model_name: Optional[str], max_output_tokens: int = 0) -> int:
+    """Tokens available for the prompt once the completion is reserved."""
+    return max(0, get_context_window(model_name) - (max_output_tokens or 0) - SAFETY_MARGIN)
+
+
+@dataclass
+class BudgetItem:
+    """A piece of evidence competing for prompt space."""
+    text: str
+    priority: float = 0.0
+    payload: Any = None
+    max_tokens: Optional[int] = None
+
+
+@dataclass
+class PackedItem:
+    """An item that made it into the budget, possibly truncated."""
+    text: str
+    tokens: int
+    truncated: bool
+    payload: Any = None
+    item: Optional[BudgetItem] = field(default=None, repr=False)
+
+
+class ContextBudgeter:
+    """
+    Packs prioritised evidence into a token budget.
+
+    Short items are kept whole; the remaining budget is shared evenly among
+    the longer ones, which are truncated. Items that would get less than
+    `min_item_tokens` are dropped, lowest priority first.
+    """
+
+    def __init__(self, max_tokens: int, min_item_tokens: int = 60):
+        self.max_tokens = max(0, int(max_tokens))
+        self.min_item_tokens = min_item_tokens
+        self.used = 0
+
+    @classmethod
+    def for_model(
+        cls,
+        model_name: Optional[str],
+        max_output_tokens: int = 0,
+        cap: Optional[int] = None,
+        reserved: int = 0,
+        **kwargs
+    ) -> "ContextBudgeter":
+        """
+        Budget bounded by the model's context window.
+
+        Args:
+            model_name: model the prompt is for
+            max_output_tokens: completion tokens to keep free
+            cap: upper bound for this piece of the prompt (keeps prompts lean
+                even on very long context models)
+            reserved: tokens already taken by the rest of the prompt
+        """
+        limit = prompt_token_limit(model_name, max_output_tokens) - reserved
+        if cap is not None:
+            limit = min(limit, cap)
+        return cls(limit, **kwargs)
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.max_tokens - self.used)
+
+    def reserve(self, text: str) -> int:
+        """Account for a fixed part of the prompt; returns its estimated tokens."""
+        tokens = estimate_tokens(text)
+        self.used += tokens
+        return tokens
+
+    def fit(self, text: str, max_tokens: Optional[int] = None) -> str:
+        """Truncate a single text to the remaining budget (and `max_tokens`) and account for it."""
+        limit = self.remaining if max_tokens is None else min(self.remaining, max_tokens)
+        fitted = truncate_to_tokens(text, limit)
+        self.used += estimate_tokens(fitted)
+        return fitted
+
+    def pack(
+        self,
+        items: Sequence[Union[BudgetItem, str]],
+        overhead_per_item: int = 0,
+        max_items: Optional[int] = None
+    ) -> List[PackedItem]:
+        """
+        Select and truncate items to fit the remaining budget.
+
+        Args:
+            items: evidence, as BudgetItem or plain strings (earlier = higher priority)
+            overhead_per_item: tokens of formatting added around each item (title, URL, ...)
+            max_items: hard cap on the number of items
+
+        Returns:
+            packed items, highest priority first
+        """
+        normalized = [
+            item if isinstance(item, BudgetItem) else BudgetItem(text=item or "", priority=-i)
+            for i, item in enumerate(items)
+        ]
+        ranked = sorted(
+            enumerate(normalized), key=lambda pair: (-pair[1].priority, pair[0])
+        )
+        if max_items is not None:
+            ranked = ranked[:max_items]
+
+        # drop the lowest priority items until everyone gets a useful share
+        while ranked and self.remaining < len(ranked) * (self.min_item_tokens + overhead_per_item):
+            ranked.pop()
+        if not ranked:
+            return []
+
+        costs = {}
+        for index, item in ranked:
+            cost = estimate_tokens(item.text)
+            if item.max_tokens is not None:
+                cost = min(cost, item.max_tokens)
+            costs[index] = cost
+
+        # water-filling: cheapest items first, each gets at most an even share of what is left
+        allocation: Dict[int, int] = {}
+        budget = self.remaining - len(ranked) * overhead_per_item
+        pending = sorted(costs, key=lambda index: costs[index])
+        while pending:
+            share = budget // len(pending)
+            index = pending.pop(0)
+            allocation[index] = min(costs[index], share)
+            budget -= allocation[index]
+
+        packed = []
+        for index, item in ranked:
+            text = truncate_to_tokens(item.text, allocation[index])
+            tokens = estimate_tokens(text)
+            self.used += tokens + overhead_per_item
+            packed.append(PackedItem(
+                text=text,
+                tokens=tokens,
+                truncated=len(text) < len(item.text),
+                payload=item.payload,
+                item=item
+            ))
+
+        dropped = len(normalized) - len(packed)
+        if dropped:
+            logger.debug(f"[ContextBudgeter] dropped {dropped} low-priority items (budget {self.max_tokens})")
+        return packed
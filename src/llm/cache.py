@@ -0,0 +1,125 @@
+"""
+Content-addressed response cache shared by every LLMClient in the process.
+Entries are keyed by provider, model, messages and sampling parameters and
+persisted through :class:`~src.storage.disk_cache.DiskCache`.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from ..storage.disk_cache import DiskCache
+
+
+DEFAULT_CACHE_DIR = "storage/cache"
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_MB = 256
+
+
+def make_request_key(
+    provider: str,
+    model: str,
+    messages: List[Dict[str, Any]],
+    params: Optional[Dict[str, Any]] = None
+) -> str:
+    """Stable hash of everything that determines an LLM response."""
+    payload = {
+        "provider": provider,
+        "model": model,
+        "messages": messages,
+        "params": params or {}
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """Persistent TTL + LRU cache for LLM responses."""
+
+    def __init__(
+        self,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        ttl_seconds: Optional[float] = DEFAULT_TTL_SECONDS,
+        max_mb: float = DEFAULT_MAX_MB,
+        enabled: bool = True
+    ):
+        self.enabled = enabled
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_mb = max_mb
+        self._store: Optional[DiskCache] = None
+
+        if enabled:
+            try:
+                self._store = DiskCache(
+                    os.path.join(cache_dir, "llm_responses.sqlite3"),
+                    max_bytes=int(max_mb * 1024 * 1024),
+                    default_ttl=ttl_seconds,
+                    name="LLMCache"
+                )
+            except Exception as e:
+                logger.warning(f"[LLMCache] disabled, cannot open store: {e}")
+                self.enabled = False
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a cached response without blocking the event loop."""
+        if not self.enabled or self._store is None:
+            return None
+        try:
+            return await asyncio.to_thread(self._store.get, key)
+        except Exception as e:
+            logger.warning(f"[LLMCache] read failed: {e}")
+            return None
+
+    async def set(self, key: str, value: Dict[str, Any]):
+        """Store a response without blocking the event loop."""
+        if not self.enabled or self._store is None:
+            return
+        try:
+            await asyncio.to_thread(self._store.set, key, value)
+        except Exception as e:
+            logger.warning(f"[LLMCache] write failed: {e}")
+
+    def clear(self):
+        """Drop all cached responses."""
+        if self._store is not None:
+            self._store.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and size of the cache."""
+        if self._store is None:
+            return {"enabled": False, "hits": 0, "misses": 0}
+        return {"enabled": self.enabled, "ttl_seconds": self.ttl_seconds, **self._store.stats()}
+
+
+_response_cache: Optional[LLMResponseCache] = None
+
+
+def configure_response_cache(**kwargs) -> LLMResponseCache:
+    """(Re)build the shared cache from env defaults overridden by the `cache` section of llm_config.yaml."""
+    global _response_cache
+    settings = {
+        "enabled": os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true",
+        "cache_dir": os.getenv("LLM_CACHE_DIR", DEFAULT_CACHE_DIR),
+        "ttl_seconds": float(os.getenv("LLM_CACHE_TTL", DEFAULT_TTL_SECONDS)),
+        "max_mb": float(os.getenv("LLM_CACHE_MAX_MB", DEFAULT_MAX_MB)),
+    }
+    settings.update({k: v for k, v in kwargs.items() if v is not None})
+    _response_cache = LLMResponseCache(**settings)
+    logger.info(
+        f"[LLMCache] enabled={_response_cache.enabled}, dir={settings['cache_dir']}, "
+        f"ttl={settings['ttl_seconds']}s, max={settings['max_mb']}MB"
+    )
+    return _response_cache
+
+
+def get_response_cache() -> LLMResponseCache:
+    """Process-wide response cache, created on first use."""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = configure_response_cache()
+    return _response_cache
@@ -1,6 +1,7 @@
 """LLM - """
 
 import asyncio
+import os
 import time
 from typing import List, Dict, Any, Optional, AsyncGenerator, Union
 from loguru import logger
@@ -15,6 +16,7 @@ except ImportError:
     logger.warning("")
 
 try:
+    import openai
     from openai import AsyncOpenAI
     OPENAI_AVAILABLE = True
 except ImportError:
@@ -29,6 +31,46 @@ except ImportError:
     logger.warning("AnthropicClaude")
 
 from .config import LLMConfig, LLMProvider
+from .cache import get_response_cache, make_request_key
+from .rate_limiter import get_rate_limiter, classify_error
+from .transport import get_http_client
+from .singleflight import SingleFlight
+from .prompt_cache import to_openai_messages, to_anthropic_request, cached_prompt_tokens
+from .budget import (
+    ContextBudgeter, ContextOverflowError, estimate_messages_tokens, get_context_window,
+    MIN_COMPLETION_TOKENS, SAFETY_MARGIN
+)
+from ..monitoring.metrics import metrics
+from ..utils.cassette import get_cassette
+
+
+# identical concurrent requests from any client share one upstream call
+_single_flight = SingleFlight("llm")
+
+# endpoints used when a config leaves base_url unset (the SDK defaults for OpenAI/Anthropic)
+DEFAULT_BASE_URLS = {
+    LLMProvider.OPENAI: "https://api.openai.com/v1",
+    LLMProvider.ANTHROPIC: "https://api.anthropic.com",
+    LLMProvider.ZHIPU: "https://open.bigmodel.cn/api/paas/v4",
+    LLMProvider.QWEN: "https://dashscope.aliyuncs.com/compatible-mode/v1",
+    LLMProvider.DEEPSEEK: "https://api.deepseek.com/v1",
+    LLMProvider.OLLAMA: "http://localhost:11434/v1",
+}
+
+
+# environment variables the OpenAI/Anthropic SDKs read before their built-in default
+SDK_BASE_URL_ENV = {
+    LLMProvider.OPENAI: "OPENAI_BASE_URL",
+    LLMProvider.ANTHROPIC: "ANTHROPIC_BASE_URL",
+}
+
+
+def resolve_base_url(config: LLMConfig) -> Optional[str]:
+    """API base URL a client for this config talks to (None for Azure without one)."""
+    if config.base_url:
+        return config.base_url
+    env = SDK_BASE_URL_ENV.get(config.provider)
+    return (os.getenv(env) if env else None) or DEFAULT_BASE_URLS.get(config.provider)
 
 
 class LLMClient:
@@ -37,6 +79,8 @@ class LLMClient:
     def __init__(self, config: LLMConfig):
         self.config = config
         self._client = None
+        # Shared by every client of the same provider/model in this process
+        self._limiter = get_rate_limiter(config.provider.value, config.model_name)
         self._initialize_client()
     
     def _initialize_client(self):
@@ -76,7 +120,8 @@ class LLMClient:
             api_key=self.config.api_key,
             base_url=self.config.base_url,
             timeout=self.config.timeout,
-            max_retries=self.config.max_retries
+            max_retries=self._sdk_max_retries(),
+            http_client=get_http_client(resolve_base_url(self.config), openai)
         )
     
     def _initialize_azure_openai(self):
@@ -100,7 +145,8 @@ class LLMClient:
             base_url=f"{azure_base_url}openai/deployments/{self.config.azure_deployment}",
             api_version=self.config.azure_api_version,
             timeout=self.config.timeout,
-            max_retries=self.config.max_retries
+            max_retries=self._sdk_max_retries(),
+            http_client=get_http_client(azure_base_url, openai)
         )
     
     def _initialize_anthropic(self):
@@ -114,7 +160,8 @@ class LLMClient:
         self._client = anthropic.AsyncAnthropic(
             api_key=self.config.api_key,
             timeout=self.config.timeout,
-            max_retries=self.config.max_retries
+            max_retries=self._sdk_max_retries(),
+            http_client=get_http_client(resolve_base_url(self.config), anthropic)
         )
     
     def _initialize_openai_compatible(self):
@@ -131,25 +178,16 @@ class LLMClient:
             api_key = self.config.api_key
         
         # base_url
-        base_url = self.config.base_url
+        base_url = resolve_base_url(self.config)
         if not base_url:
-            # URL
-            if self.config.provider == LLMProvider.ZHIPU:
-                base_url = "https://open.bigmodel.cn/api/paas/v4"
-            elif self.config.provider == LLMProvider.QWEN:
-                base_url = "https://dashscope.aliyuncs.com/compatible-mode/v1"
-            elif self.config.provider == LLMProvider.DEEPSEEK:
-                base_url = "https://api.deepseek.com/v1"
-            elif self.config.provider == LLMProvider.OLLAMA:
-                base_url = "http://localhost:11434/v1"
-            else:
-                raise ValueError(f" {self.config.provider} base_url")
+            raise ValueError(f" {self.config.provider} base_url")
         
         self._client = AsyncOpenAI(
             api_key=api_key,
             base_url=base_url,
             timeout=self.config.timeout,
-            max_retries=self.config.max_retries
+            max_retries=self._sdk_max_retries(),
+            http_client=get_http_client(base_url, openai)
         )
         
         logger.info(f"OpenAI: {self.config.provider} @ {base_url}")
@@ -158,9 +196,21 @@ class LLMClient:
         self,
         messages: List[Dict[str, str]],
         trace_id: Optional[str] = None,
+        cache: Optional[bool] = None,
+        coalesce: bool = True,
         **kwargs
     ) -> Dict[str, Any]:
-        """TODO: Add docstring."""
+        """
+        Send a chat completion request, served from the response cache when allowed.
+
+        Args:
+            messages: chat messages
+            trace_id: Langfuse trace ID
+            cache: None = only deterministic (temperature 0) calls are cached,
+                True = opt in regardless of temperature, False = bypass the cache
+            coalesce: share the upstream call with identical requests already in flight
+            **kwargs: extra request parameters
+        """
         start_time = time.time()
         
         try:
@@ -174,11 +224,45 @@ class LLMClient:
                 "stream": self.config.stream,
                 **kwargs
             }
+            params["max_tokens"] = self._fit_max_tokens(messages, params.get("max_tokens"))
+
+            metrics.incr("llm.requests")
+            request_key = self._make_cache_key(messages, params)
+            cache_key = None
+            if self._should_use_cache(cache, params):
+                cache_key = request_key
+                cached = await get_response_cache().get(cache_key)
+                if cached is not None:
+                    logger.debug(f"[LLMCache] hit ({self.config.provider.value}/{self.config.model_name})")
+                    metrics.incr("llm.cache_hits")
+                    return {**cached, "cached": True}
             
-            if self.config.provider == LLMProvider.ANTHROPIC:
-                result = await self._anthropic_chat_completion(messages, **kwargs)
+            estimated_tokens = self._estimate_request_tokens(messages, params.get("max_tokens"))
+
+            async def _upstream():
+                if self.config.provider == LLMProvider.ANTHROPIC:
+                    call = lambda: self._anthropic_chat_completion(
+                        messages, **{**kwargs, "max_tokens": params["max_tokens"]}
+                    )
+                else:
+                    call = lambda: self._openai_chat_completion(params)
+                # record/replay sits below the limiter so replayed latency still shapes concurrency
+                return await self._call_with_limits(
+                    lambda: get_cassette().call("llm", self._cassette_request(request_key), call),
+                    estimated_tokens
+                )
+
+            if coalesce and not params.get("stream"):
+                result = await _single_flight.do(request_key, _upstream)
             else:
-                result = await self._openai_chat_completion(params)
+                result = await _upstream()
+
+            if cache_key and result.get("content"):
+                await get_response_cache().set(cache_key, result)
+
+            usage = result.get("usage") or {}
+            if usage.get("cached_tokens"):
+                metrics.incr("llm.cached_prompt_tokens", usage["cached_tokens"])
             
             # LLMLangfuse
             if MONITORING_AVAILABLE and trace_id:
@@ -235,6 +319,7 @@ class LLMClient:
         system_prompt: Optional[str] = None,
         response_model: Any = None,
         trace_id: Optional[str] = None,
+        cache: Optional[bool] = None,
         **kwargs
     ):
         """
@@ -245,11 +330,50 @@ class LLMClient:
             system_prompt: 
             response_model: Pydantic
             trace_id: ID
+            cache: response cache policy, see chat_completion
             **kwargs: 
 
         Returns:
             Pydantic
         """
+        cache_key = None
+        cache_params = {
+            "temperature": kwargs.get("temperature", self.config.temperature),
+            "max_tokens": kwargs.get("max_tokens", self.config.max_tokens),
+            "response_model": self._response_model_signature(response_model)
+        }
+        cache_messages = [{"role": "system", "content": system_prompt or ""}, {"role": "user", "content": prompt}]
+        request_key = self._make_cache_key(cache_messages, cache_params)
+        if self._should_use_cache(cache, cache_params):
+            cache_key = request_key
+            cached = await get_response_cache().get(cache_key)
+            if cached is not None:
+                logger.debug(f"[LLMCache] structured hit: {getattr(response_model, '__name__', 'dict')}")
+                metrics.incr("llm.cache_hits")
+                return response_model(**cached) if response_model else cached
+
+        result = await _single_flight.do(
+            f"structured:{request_key}",
+            lambda: self._get_structured_response_uncached(
+                prompt, system_prompt, response_model, cache=cache, **kwargs
+            )
+        )
+
+        if cache_key and result is not None:
+            data = result.model_dump() if hasattr(result, "model_dump") else result
+            await get_response_cache().set(cache_key, data)
+
+        return result
+
+    async def _get_structured_response_uncached(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        response_model: Any = None,
+        cache: Optional[bool] = None,
+        **kwargs
+    ):
+        """Structured call without the response cache (instructor, then JSON fallback)."""
         try:
             # instructor
             import instructor
@@ -270,7 +394,7 @@ class LLMClient:
             else:
                 # providerJSON
                 logger.warning(f"{self.config.provider} JSON")
-                return await self._fallback_structured_response(prompt, system_prompt, response_model)
+                return await self._fallback_structured_response(prompt, system_prompt, response_model, cache=cache)
 
             # 
             messages = []
@@ -279,12 +403,28 @@ class LLMClient:
             messages.append({"role": "user", "content": prompt})
 
             # 
-            response = await client.chat.completions.create(
-                model=self.config.model_name,
-                messages=messages,
-                response_model=response_model,
-                temperature=kwargs.get("temperature", self.config.temperature),
-                max_tokens=kwargs.get("max_tokens", self.config.max_tokens),
+            max_tokens = kwargs.get("max_tokens", self.config.max_tokens)
+            temperature = kwargs.get("temperature", self.config.temperature)
+            request_key = self._make_cache_key(messages, {
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "response_model": self._response_model_signature(response_model)
+            })
+            response = await self._call_with_limits(
+                lambda: get_cassette().call(
+                    "llm_structured",
+                    self._cassette_request(request_key),
+                    lambda: client.chat.completions.create(
+                        model=self.config.model_name,
+                        messages=messages,
+                        response_model=response_model,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                    ),
+                    encode=lambda r: r.model_dump(),
+                    decode=lambda data: response_model(**data)
+                ),
+                self._estimate_request_tokens(messages, max_tokens)
             )
 
             logger.info(f": {response_model.__name__}")
@@ -292,17 +432,18 @@ class LLMClient:
 
         except ImportError:
             logger.warning("instructorJSON")
-            return await self._fallback_structured_response(prompt, system_prompt, response_model)
+            return await self._fallback_structured_response(prompt, system_prompt, response_model, cache=cache)
         except Exception as e:
             logger.error(f": {e}")
             # JSON
-            return await self._fallback_structured_response(prompt, system_prompt, response_model)
+            return await self._fallback_structured_response(prompt, system_prompt, response_model, cache=cache)
 
     async def _fallback_structured_response(
         self,
         prompt: str,
         system_prompt: Optional[str] = None,
-        response_model: Any = None
+        response_model: Any = None,
+        cache: Optional[bool] = None
     ):
         """JSON + """
         import json
@@ -331,6 +472,7 @@ JSON"""
         # chat_completion with JSON mode
         result = await self.chat_completion(
             messages=messages,
+            cache=cache,
             response_format={"type": "json_object"}
         )
 
@@ -358,6 +500,7 @@ JSON"""
     async def _openai_chat_completion(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """OpenAI"""
         try:
+            params = {**params, "messages": to_openai_messages(params["messages"])}
             response = await self._client.chat.completions.create(**params)
             
             return {
@@ -366,7 +509,8 @@ JSON"""
                 "usage": {
                     "prompt_tokens": response.usage.prompt_tokens if response.usage else 0,
                     "completion_tokens": response.usage.completion_tokens if response.usage else 0,
-                    "total_tokens": response.usage.total_tokens if response.usage else 0
+                    "total_tokens": response.usage.total_tokens if response.usage else 0,
+                    **cached_prompt_tokens(response.usage)
                 },
                 "finish_reason": response.choices[0].finish_reason
             }
@@ -395,15 +539,8 @@ JSON"""
         **kwargs
     ) -> Dict[str, Any]:
         """Anthropic"""
-        # 
-        system_message = None
-        converted_messages = []
-        
-        for msg in messages:
-            if msg["role"] == "system":
-                system_message = msg["content"]
-            else:
-                converted_messages.append(msg)
+        # system prompt + messages, with cache_control on cacheable blocks
+        system_message, converted_messages = to_anthropic_request(messages)
         
         params = {
             "model": self.config.model_name,
@@ -418,13 +555,21 @@ JSON"""
         
         response = await self._client.messages.create(**params)
         
+        # input_tokens excludes tokens read from / written to the prompt cache
+        cache_usage = cached_prompt_tokens(response.usage)
+        prompt_tokens = (
+            response.usage.input_tokens
+            + cache_usage["cached_tokens"]
+            + cache_usage["cache_creation_tokens"]
+        )
         return {
             "content": response.content[0].text,
             "model": response.model,
             "usage": {
-                "prompt_tokens": response.usage.input_tokens,
+                "prompt_tokens": prompt_tokens,
                 "completion_tokens": response.usage.output_tokens,
-                "total_tokens": response.usage.input_tokens + response.usage.output_tokens
+                "total_tokens": prompt_tokens + response.usage.output_tokens,
+                **cache_usage
             },
             "finish_reason": response.stop_reason
         }
@@ -446,12 +591,22 @@ JSON"""
                 **kwargs
             }
             
-            if self.config.provider == LLMProvider.ANTHROPIC:
-                async for chunk in self._anthropic_stream_chat(messages, **kwargs):
-                    yield chunk
-            else:
-                async for chunk in self._openai_stream_chat(params):
-                    yield chunk
+            estimated_tokens = self._estimate_request_tokens(messages, params.get("max_tokens"))
+            await self._limiter.acquire(estimated_tokens)
+            throttled = False
+            try:
+                if self.config.provider == LLMProvider.ANTHROPIC:
+                    async for chunk in self._anthropic_stream_chat(messages, **kwargs):
+                        yield chunk
+                else:
+                    async for chunk in self._openai_stream_chat(params):
+                        yield chunk
+            except Exception as e:
+                throttled = classify_error(e)[0]
+                raise
+            finally:
+                # stream duration depends on output length, so only 429s feed the window
+                await self._limiter.release(throttled=throttled)
                     
         except Exception as e:
             logger.error(f": {e}")
@@ -459,6 +614,7 @@ JSON"""
     
     async def _openai_stream_chat(self, params: Dict[str, Any]) -> AsyncGenerator[str, None]:
         """OpenAI"""
+        params = {**params, "messages": to_openai_messages(params["messages"])}
         stream = await self._client.chat.completions.create(**params)
         
         async for chunk in stream:
@@ -471,15 +627,8 @@ JSON"""
         **kwargs
     ) -> AsyncGenerator[str, None]:
         """Anthropic"""
-        # 
-        system_message = None
-        converted_messages = []
-        
-        for msg in messages:
-            if msg["role"] == "system":
-                system_message = msg["content"]
-            else:
-                converted_messages.append(msg)
+        # system prompt + messages, with cache_control on cacheable blocks
+        system_message, converted_messages = to_anthropic_request(messages)
         
         params = {
             "model": self.config.model_name,
@@ -499,7 +648,12 @@ JSON"""
             if chunk.type == "content_block_delta":
                 yield chunk.delta.text
     
-    async def simple_chat(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+    async def simple_chat(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        cache: Optional[bool] = None
+    ) -> str:
         """TODO: Add docstring."""
         messages = []
         
@@ -508,8 +662,126 @@ JSON"""
         
         messages.append({"role": "user", "content": prompt})
         
-        response = await self.chat_completion(messages)
+        response = await self.chat_completion(messages, cache=cache)
         return response["content"]
+
+    def _sdk_max_retries(self) -> int:
+        """SDK-level retries are disabled while the shared limiter owns retry/backoff."""
+        return 0 if self._limiter.enabled else self.config.max_retries
+
+    @staticmethod
+    def _estimate_request_tokens(messages: List[Dict[str, Any]], max_tokens: Optional[int]) -> int:
+        """Prompt + completion token reservation for the TPM bucket."""
+        return estimate_messages_tokens(messages) + (max_tokens or 0)
+
+    def _fit_max_tokens(self, messages: List[Dict[str, Any]], max_tokens: Optional[int]) -> Optional[int]:
+        """Shrink max_tokens when prompt + completion would overflow the context window."""
+        if not max_tokens:
+            return max_tokens
+        window = get_context_window(self.config.model_name)
+        available = window - estimate_messages_tokens(messages) - SAFETY_MARGIN
+        if max_tokens <= available:
+            return max_tokens
+        if available < MIN_COMPLETION_TOKENS:
+            # asking for a completion anyway would only get the request rejected upstream
+            raise ContextOverflowError(
+                f"{self.config.model_name}: prompt of ~{window - SAFETY_MARGIN - available} tokens leaves "
+                f"{available} of {window} for the completion (need {MIN_COMPLETION_TOKENS})"
+            )
+        fitted = available
+        logger.warning(
+            f"[ContextBudgeter] {self.config.model_name}: prompt leaves {available} of {window} tokens, "
+            f"max_tokens {max_tokens} -> {fitted}"
+        )
+        return fitted
+
+    def budgeter(self, cap: Optional[int] = None, reserved: int = 0) -> ContextBudgeter:
+        """Context budgeter for prompts sent with this client's model and max_tokens."""
+        return ContextBudgeter.for_model(
+            self.config.model_name, self.config.max_tokens, cap=cap, reserved=reserved
+        )
+
+    async def _call_with_limits(self, call, estimated_tokens: int = 0):
+        """
+        Run an upstream call under the shared rate limiter.
+
+        429s feed the AIMD window and honour Retry-After; 429s and transient
+        errors are retried here (up to config.max_retries) instead of inside the SDK.
+        """
+        attempt = 0
+        while True:
+            await self._limiter.acquire(estimated_tokens)
+            start_time = time.time()
+            metrics.incr("llm.upstream_calls")
+            # a cancelled call (CancelledError is not an Exception) is neither
+            # throttled nor a latency sample, but its slot is still released
+            outcome: Dict[str, Any] = {}
+            error = None
+            try:
+                result = await call()
+                usage = result.get("usage") if isinstance(result, dict) else None
+                outcome = {
+                    "latency": time.time() - start_time,
+                    "actual_tokens": usage.get("total_tokens") if usage else None
+                }
+            except Exception as e:
+                error = e
+                throttled, retryable, retry_after = classify_error(e)
+                outcome = {"throttled": throttled, "actual_tokens": 0}
+            finally:
+                await self._limiter.release(estimated_tokens=estimated_tokens, **outcome)
+
+            if error is None:
+                if usage:
+                    metrics.incr("llm.prompt_tokens", usage.get("prompt_tokens") or 0)
+                    metrics.incr("llm.completion_tokens", usage.get("completion_tokens") or 0)
+                return result
+
+            if not self._limiter.enabled or not retryable or attempt >= self.config.max_retries:
+                raise error
+
+            delay = retry_after if retry_after is not None else self._limiter.backoff(attempt)
+            if throttled:
+                self._limiter.block_for(delay)
+            self._limiter.stats["retries"] += 1
+            attempt += 1
+            logger.warning(
+                f"[RateLimiter] {self._limiter.name} {type(error).__name__}, "
+                f"retry {attempt}/{self.config.max_retries} in {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
+
+    def _should_use_cache(self, cache: Optional[bool], params: Dict[str, Any]) -> bool:
+        """Deterministic calls are cached by default; temperature > 0 needs an explicit opt-in."""
+        if cache is not None:
+            return cache and not params.get("stream")
+        return not params.get("stream") and params.get("temperature", self.config.temperature) == 0
+
+    def _make_cache_key(self, messages: List[Dict[str, Any]], params: Dict[str, Any]) -> str:
+        """Cache key from provider, model, messages and sampling parameters."""
+        sampling = {k: v for k, v in params.items() if k not in ("model", "messages", "stream")}
+        return make_request_key(self.config.provider.value, self.config.model_name, messages, sampling)
+
+    @staticmethod
+    def _response_model_signature(response_model: Any) -> Optional[Dict[str, Any]]:
+        """Schema of the structured response model, so schema changes invalidate entries."""
+        if response_model is None:
+            return None
+        if hasattr(response_model, "model_json_schema"):
+            return response_model.model_json_schema()
+        return {"name": getattr(response_model, "__name__", str(response_model))}
+
+    def _cassette_request(self, request_key: str) -> Dict[str, Any]:
+        """Identity of an upstream call in record/replay cassettes."""
+        return {
+            "provider": self.config.provider.value,
+            "model": self.config.model_name,
+            "request": request_key
+        }
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of the shared response cache."""
+        return get_response_cache().stats()
     
     def get_model_info(self) -> Dict[str, Any]:
         """TODO: Add docstring."""
@@ -518,7 +790,8 @@ JSON"""
             "model_name": self.config.model_name,
             "base_url": self.config.base_url,
             "temperature": self.config.temperature,
-            "max_tokens": self.config.max_tokens
+            "max_tokens": self.config.max_tokens,
+            "rate_limiter": self._limiter.get_status()
         }
     
     async def test_connection(self) -> bool:
@@ -11,8 +11,12 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from .config import LLMConfig, LLMProvider, create_llm_config
-from .client import LLMClient
+from .client import LLMClient, resolve_base_url
 from .prompts import PromptManager
+from .cache import configure_response_cache, get_response_cache
+from .rate_limiter import configure_rate_limits, get_rate_limiter_status
+from .transport import configure_http_pool, prewarm_connections, get_pool_status
+from .budget import configure_context_windows
 
 
 class LLMManager:
@@ -41,6 +45,22 @@ class LLMManager:
             
             # 
             self.provider_info = config_data.get("providers", {})
+
+            # LLM response cache
+            if config_data.get("cache"):
+                configure_response_cache(**config_data["cache"])
+
+            # Provider/model rate limits shared by all clients in the process
+            if config_data.get("rate_limits"):
+                configure_rate_limits(config_data["rate_limits"])
+
+            # Shared HTTP connection pool limits
+            if config_data.get("http_pool"):
+                configure_http_pool(**config_data["http_pool"])
+
+            # model context windows (tokens), overriding the built-in table
+            if config_data.get("context_windows"):
+                configure_context_windows(config_data["context_windows"])
             
             # 
             default_config = config_data.get("default", {})
@@ -347,6 +367,32 @@ class LLMManager:
         
         logger.info(f": {name}")
     
+    async def prewarm_connections(self) -> Dict[str, bool]:
+        """Open pooled connections to every configured provider before the first LLM call."""
+        openai_urls, anthropic_urls = set(), set()
+        for config in self.configs.values():
+            # configs without base_url talk to the provider's default endpoint
+            base_url = resolve_base_url(config)
+            if not base_url:
+                continue
+            if config.provider == LLMProvider.ANTHROPIC:
+                anthropic_urls.add(base_url)
+            else:
+                openai_urls.add(base_url)
+
+        results: Dict[str, bool] = {}
+        try:
+            import openai
+            results.update(await prewarm_connections(openai_urls, openai))
+        except ImportError:
+            pass
+        try:
+            import anthropic
+            results.update(await prewarm_connections(anthropic_urls, anthropic))
+        except ImportError:
+            pass
+        return results
+
     def get_prompt_manager(self) -> PromptManager:
         """TODO: Add docstring."""
         return self.prompt_manager
@@ -400,6 +446,9 @@ class LLMManager:
             "active_clients": len(self.clients),
             "available_configs": list(self.configs.keys()),
             "available_providers": self.get_available_providers(),
+            "response_cache": get_response_cache().stats(),
+            "rate_limiters": get_rate_limiter_status(),
+            "http_pool": get_pool_status(),
             "prompt_manager_info": {
                 "prompts_count": len(self.prompt_manager.list_prompts()),
                 "prompts_dir": str(self.prompt_manager.prompts_dir)
@@ -0,0 +1,168 @@
+"""
+Provider prompt-prefix caching.
+
+Agents mark the part of a prompt that repeats across calls (style guides,
+design specs, shared instructions) as cacheable, either on a whole message::
+
+    {"role": "system", "content": css_guide, "cacheable": True}
+
+or on a content part::
+
+    {"role": "user", "content": [
+        {"type": "text", "text": design_spec, "cacheable": True},
+        {"type": "text", "text": page_prompt},
+    ]}
+
+build_cached_messages() produces the second layout. Before sending, the
+messages are rewritten for the provider:
+
+- Anthropic: cacheable blocks get `cache_control: {"type": "ephemeral"}`
+  breakpoints (at most four per request).
+- OpenAI-compatible (OpenAI, DeepSeek, Qwen, ...): caching is automatic on
+  identical prefixes, so cacheable parts are moved to the front of their
+  message and parts are flattened to a plain string, keeping the shared
+  prefix byte-identical between calls.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+# Anthropic allows at most four cache breakpoints per request
+MAX_CACHE_BREAKPOINTS = 4
+PART_SEPARATOR = "\n\n"
+
+
+def cacheable(text: str) -> Dict[str, Any]:
+    """Content part that should be cached by the provider."""
+    return {"type": "text", "text": text, "cacheable": True}
+
+
+def build_cached_messages(
+    shared: str,
+    prompt: str,
+    system_prompt: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Messages with a cacheable shared prefix followed by the per-call prompt.
+
+    Args:
+        shared: text repeated verbatim across calls
+        prompt: text specific to this call
+        system_prompt: optional system prompt, also cached
+    """
+    messages: List[Dict[str, Any]] = []
+    if system_prompt:
+        messages.append({"role": "system", "content": system_prompt, "cacheable": True})
+    messages.append({
+        "role": "user",
+        "content": [cacheable(shared), {"type": "text", "text": prompt}]
+    })
+    return messages
+
+
+def has_cache_markers(messages: List[Dict[str, Any]]) -> bool:
+    """Whether any message or content part is marked cacheable."""
+    for message in messages:
+        if message.get("cacheable"):
+            return True
+        content = message.get("content")
+        if isinstance(content, list) and any(
+            isinstance(part, dict) and part.get("cacheable") for part in content
+        ):
+            return True
+    return False
+
+
+def _text_parts(message: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Content of a message as text parts carrying their cacheable flag."""
+    content = message.get("content", "")
+    if isinstance(content, list):
+        return [
+            {"text": part.get("text", ""), "cacheable": bool(part.get("cacheable"))}
+            for part in content if isinstance(part, dict)
+        ]
+    return [{"text": str(content), "cacheable": bool(message.get("cacheable"))}]
+
+
+def to_openai_messages(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Plain-string messages with cacheable parts first (stable prefix)."""
+    converted = []
+    for message in messages:
+        if "cacheable" not in message and not isinstance(message.get("content"), list):
+            converted.append(message)
+            continue
+
+        parts = _text_parts(message)
+        ordered = [p for p in parts if p["cacheable"]] + [p for p in parts if not p["cacheable"]]
+        clean = {k: v for k, v in message.items() if k not in ("cacheable", "content")}
+        clean["content"] = PART_SEPARATOR.join(p["text"] for p in ordered if p["text"])
+        converted.append(clean)
+    return converted
+
+
+def to_anthropic_request(
+    messages: List[Dict[str, Any]]
+) -> Tuple[Optional[Any], List[Dict[str, Any]]]:
+    """
+    Split messages into Anthropic `system` and `messages` with cache_control blocks.
+
+    Messages without cache markers keep their plain string content.
+    """
+    breakpoints = 0
+
+    def _blocks(parts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        nonlocal breakpoints
+        parts = [p for p in parts if p["text"]]
+        blocks = [{"type": "text", "text": p["text"]} for p in parts]
+        cached = [i for i, p in enumerate(parts) if p["cacheable"]]
+        # a breakpoint caches everything before it, so mark the last cacheable block only
+        if cached and breakpoints < MAX_CACHE_BREAKPOINTS:
+            blocks[cached[-1]]["cache_control"] = {"type": "ephemeral"}
+            breakpoints += 1
+        return blocks
+
+    def _is_cached(parts: List[Dict[str, Any]]) -> bool:
+        return any(p["cacheable"] for p in parts)
+
+    # the system prompt is the start of the prefix, so it gets the first breakpoint
+    system_parts = [p for m in messages if m["role"] == "system" for p in _text_parts(m)]
+    if not system_parts:
+        system = None
+    elif _is_cached(system_parts):
+        system = _blocks(system_parts)
+    else:
+        system = PART_SEPARATOR.join(p["text"] for p in system_parts)
+
+    converted: List[Dict[str, Any]] = []
+    for message in messages:
+        if message["role"] == "system":
+            continue
+        parts = _text_parts(message)
+        if _is_cached(parts):
+            content = _blocks(parts)
+        else:
+            content = PART_SEPARATOR.join(p["text"] for p in parts)
+        converted.append({"role": message["role"], "content": content})
+
+    return system, converted
+
+
+def cached_prompt_tokens(usage: Any) -> Dict[str, int]:
+    """
+    Prompt-cache counters from an SDK usage object.
+
+    OpenAI reports `prompt_tokens_details.cached_tokens`, DeepSeek
+    `prompt_cache_hit_tokens`, Anthropic `cache_read_input_tokens` and
+    `cache_creation_input_tokens`.
+    """
+    if usage is None:
+        return {"cached_tokens": 0, "cache_creation_tokens": 0}
+
+    cached = getattr(usage, "cache_read_input_tokens", None)
+    if cached is None:
+        cached = getattr(usage, "prompt_cache_hit_tokens", None)
+    if cached is None:
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", None) if details is not None else None
+
+    created = getattr(usage, "cache_creation_input_tokens", None)
+    return {"cached_tokens": int(cached or 0), "cache_creation_tokens": int(created or 0)}
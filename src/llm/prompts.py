@@ -2,117 +2,268 @@
 
 import os
 import json
+import time
+import threading
 import yaml
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from pathlib import Path
 from loguru import logger
-from jinja2 import Template, Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemLoader, FunctionLoader, FileSystemBytecodeCache
+
+
+SUPPORTED_EXTENSIONS = ['.json', '.yaml', '.yml', '.txt', '.md']
+
+
+class _LazyBytecodeCache(FileSystemBytecodeCache):
+    """
+    On-disk bytecode cache whose directory is created on the first compile,
+    not when the module is imported; an unwritable directory disables it.
+    """
+
+    def __init__(self, directory: str):
+        super().__init__(directory)
+        self._writable: Optional[bool] = None
+
+    def dump_bytecode(self, bucket):
+        if self._writable is None:
+            try:
+                Path(self.directory).mkdir(parents=True, exist_ok=True)
+                self._writable = True
+            except OSError as e:
+                logger.debug(f"[PromptManager] bytecode cache disabled: {e}")
+                self._writable = False
+        if not self._writable:
+            return
+        try:
+            super().dump_bytecode(bucket)
+        except OSError as e:
+            logger.debug(f"[PromptManager] bytecode cache write failed: {e}")
+
+
+class _PromptRegistry:
+    """
+    Prompts of one directory, shared by every PromptManager in the process.
+
+    Files are read on first access and re-read when their mtime changes
+    (checked at most every `reload_interval` seconds). Templates are compiled
+    once by a jinja Environment whose bytecode cache lives on disk.
+    """
+
+    def __init__(self, prompts_dir: Path):
+        self.prompts_dir = prompts_dir
+        self.reload_interval = float(os.getenv("PROMPT_RELOAD_INTERVAL", "2"))
+        # key -> {"path", "mtime", "data", "checked_at"}; path None = added in code
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        # keys known not to exist -> time of the last check
+        self.missing: Dict[str, float] = {}
+        self.versions: Dict[str, int] = {}
+        self.lock = threading.RLock()
+
+        # default settings, so rendering matches jinja2.Template(content)
+        self.env = Environment(
+            loader=FunctionLoader(self._load_template_source),
+            bytecode_cache=self._create_bytecode_cache(),
+            auto_reload=True,
+            cache_size=1000
+        )
+
+    @staticmethod
+    def _create_bytecode_cache() -> "_LazyBytecodeCache":
+        return _LazyBytecodeCache(os.getenv("PROMPT_BYTECODE_CACHE_DIR", "storage/cache/prompts"))
+
+    def _find_file(self, key: str) -> Optional[Path]:
+        if not key or "\\" in key or ".." in key.split("/"):
+            return None
+        for ext in SUPPORTED_EXTENSIONS:
+            path = self.prompts_dir / f"{key}{ext}"
+            if path.is_file():
+                return path
+        return None
+
+    @staticmethod
+    def _read_file(file_path: Path) -> Any:
+        if file_path.suffix.lower() == '.json':
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        if file_path.suffix.lower() in ['.yaml', '.yml']:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return yaml.safe_load(f)
+        # .txt, .md
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return {"content": f.read().strip()}
+
+    def _load(self, key: str, path: Path) -> Dict[str, Any]:
+        entry = {
+            "path": path,
+            "mtime": path.stat().st_mtime,
+            "data": self._read_file(path),
+            "checked_at": time.monotonic()
+        }
+        self.entries[key] = entry
+        self.versions[key] = self.versions.get(key, 0) + 1
+        self.missing.pop(key, None)
+        logger.debug(f"[PromptManager] loaded {key}")
+        return entry
+
+    def get_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """Prompt data for `key`, loading or reloading its file when needed."""
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and (entry["path"] is None or now - entry["checked_at"] < self.reload_interval):
+                return entry
+
+            if entry is None:
+                checked_at = self.missing.get(key)
+                if checked_at is not None and now - checked_at < self.reload_interval:
+                    return None
+                path = self._find_file(key)
+                if path is None:
+                    self.missing[key] = now
+                    return None
+                try:
+                    return self._load(key, path)
+                except Exception as e:
+                    logger.error(f"[PromptManager] failed to load {path}: {e}")
+                    self.missing[key] = now
+                    return None
+
+            # hot reload on mtime change
+            entry["checked_at"] = now
+            try:
+                if entry["path"].stat().st_mtime != entry["mtime"]:
+                    return self._load(key, entry["path"])
+            except FileNotFoundError:
+                del self.entries[key]
+                self.missing[key] = now
+                return None
+            except Exception as e:
+                logger.error(f"[PromptManager] failed to reload {key}: {e}")
+            return entry
+
+    def _load_template_source(self, key: str) -> Optional[Tuple[str, Optional[str], Any]]:
+        """jinja FunctionLoader hook: (source, filename, uptodate)."""
+        entry = self.get_entry(key)
+        if entry is None:
+            return None
+        data = entry["data"]
+        source = data if isinstance(data, str) else (data or {}).get("content", "")
+        version = self.versions.get(key)
+        filename = str(entry["path"]) if entry["path"] else None
+        return source, filename, lambda: self.get_entry(key) is entry and self.versions.get(key) == version
+
+    def add(self, key: str, data: Dict[str, Any]):
+        with self.lock:
+            self.entries[key] = {"path": None, "mtime": None, "data": data, "checked_at": time.monotonic()}
+            self.versions[key] = self.versions.get(key, 0) + 1
+            self.missing.pop(key, None)
+
+    def scan(self) -> List[str]:
+        """All keys available on disk or added in code (walks the directory)."""
+        keys = {key for key, entry in self.entries.items() if entry["path"] is None}
+        if self.prompts_dir.exists():
+            for file_path in self.prompts_dir.rglob('*'):
+                if file_path.is_file() and file_path.suffix.lower() in SUPPORTED_EXTENSIONS:
+                    keys.add(file_path.relative_to(self.prompts_dir).with_suffix('').as_posix())
+        return sorted(keys)
+
+    def clear(self):
+        with self.lock:
+            self.entries = {k: v for k, v in self.entries.items() if v["path"] is None}
+            self.missing.clear()
+            for key in list(self.versions):
+                self.versions[key] += 1
+
+
+_registries: Dict[Path, _PromptRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def _get_registry(prompts_dir: Path) -> _PromptRegistry:
+    resolved = prompts_dir.resolve()
+    with _registries_lock:
+        registry = _registries.get(resolved)
+        if registry is None:
+            registry = _PromptRegistry(prompts_dir)
+            _registries[resolved] = registry
+        return registry
 
 
 class PromptManager:
     """TODO: Add docstring."""
-    
+
     def __init__(self, prompts_dir: str = "prompts"):
         self.prompts_dir = Path(prompts_dir)
-        self.prompts_cache: Dict[str, Dict[str, Any]] = {}
-        self.jinja_env = Environment(
-            loader=FileSystemLoader(str(self.prompts_dir)),
-            trim_blocks=True,
-            lstrip_blocks=True
-        )
-        self._load_all_prompts()
-    
-    def _load_all_prompts(self):
-        """TODO: Add docstring."""
+        # all instances for the same directory share loaded prompts and compiled templates
+        self._registry = _get_registry(self.prompts_dir)
+        self._jinja_env: Optional[Environment] = None
         if not self.prompts_dir.exists():
             logger.warning(f": {self.prompts_dir}")
-            return
-        
-        # 
-        supported_extensions = ['.json', '.yaml', '.yml', '.txt', '.md']
-        
-        for file_path in self.prompts_dir.rglob('*'):
-            if file_path.is_file() and file_path.suffix.lower() in supported_extensions:
-                try:
-                    self._load_prompt_file(file_path)
-                except Exception as e:
-                    logger.error(f" {file_path}: {e}")
-        
-        logger.info(f" {len(self.prompts_cache)} ")
-    
-    def _load_prompt_file(self, file_path: Path):
-        """TODO: Add docstring."""
-        # key
-        relative_path = file_path.relative_to(self.prompts_dir)
-        key = relative_path.with_suffix('').as_posix()  # 
-        
-        if file_path.suffix.lower() == '.json':
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        elif file_path.suffix.lower() in ['.yaml', '.yml']:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
-        else:  # .txt, .md
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read().strip()
-                data = {"content": content}
-        
-        self.prompts_cache[key] = data
-        logger.debug(f": {key}")
-    
+
+    @property
+    def prompts_cache(self) -> Dict[str, Any]:
+        """Prompts loaded so far (key -> data)."""
+        return {key: entry["data"] for key, entry in self._registry.entries.items()}
+
+    @property
+    def jinja_env(self) -> Environment:
+        """Environment for standalone template files (render_template_file)."""
+        if self._jinja_env is None:
+            self._jinja_env = Environment(
+                loader=FileSystemLoader(str(self.prompts_dir)),
+                trim_blocks=True,
+                lstrip_blocks=True
+            )
+        return self._jinja_env
+
     def get_prompt(self, key: str, **kwargs) -> str:
         """TODO: Add docstring."""
-        if key not in self.prompts_cache:
+        entry = self._registry.get_entry(key)
+        if entry is None:
             raise KeyError(f": {key}")
-        
-        prompt_data = self.prompts_cache[key]
-        
-        # 
-        if isinstance(prompt_data, str):
-            template = Template(prompt_data)
-            return template.render(**kwargs)
-        
+
+        prompt_data = entry["data"]
+
         # content
-        content = prompt_data.get("content", "")
-        if not content:
+        if not isinstance(prompt_data, str) and not (prompt_data or {}).get("content", ""):
             raise ValueError(f": {key}")
-        
-        # Jinja2
-        template = Template(content)
+
+        # Jinja2 (compiled once, recompiled when the file changes)
+        template = self._registry.env.get_template(key)
         return template.render(**kwargs)
-    
+
     def get_prompt_metadata(self, key: str) -> Dict[str, Any]:
         """TODO: Add docstring."""
-        if key not in self.prompts_cache:
+        entry = self._registry.get_entry(key)
+        if entry is None:
             raise KeyError(f": {key}")
-        
-        prompt_data = self.prompts_cache[key]
-        
+
+        prompt_data = entry["data"]
+
         if isinstance(prompt_data, dict):
             # content
             metadata = {k: v for k, v in prompt_data.items() if k != "content"}
             return metadata
-        
+
         return {}
-    
+
     def list_prompts(self) -> List[str]:
         """TODO: Add docstring."""
-        return list(self.prompts_cache.keys())
-    
+        return self._registry.scan()
+
     def reload_prompts(self):
         """TODO: Add docstring."""
-        self.prompts_cache.clear()
-        self._load_all_prompts()
-    
+        self._registry.clear()
+
     def add_prompt(self, key: str, content: str, metadata: Optional[Dict[str, Any]] = None):
         """TODO: Add docstring."""
         prompt_data = {"content": content}
         if metadata:
             prompt_data.update(metadata)
-        
-        self.prompts_cache[key] = prompt_data
+
+        self._registry.add(key, prompt_data)
         logger.info(f": {key}")
-    
+
     def render_template_file(self, template_name: str, **kwargs) -> str:
         """TODO: Add docstring."""
         try:
@@ -121,22 +272,22 @@ class PromptManager:
         except Exception as e:
             logger.error(f" {template_name}: {e}")
             raise
-    
+
     def get_system_prompt(self, agent_name: str, **kwargs) -> str:
         """TODO: Add docstring."""
         key = f"agents/{agent_name}/system"
         return self.get_prompt(key, **kwargs)
-    
+
     def get_task_prompt(self, task_name: str, **kwargs) -> str:
         """TODO: Add docstring."""
         key = f"tasks/{task_name}"
         return self.get_prompt(key, **kwargs)
-    
+
     def get_tool_prompt(self, tool_name: str, **kwargs) -> str:
         """TODO: Add docstring."""
         key = f"tools/{tool_name}"
         return self.get_prompt(key, **kwargs)
 
 
-# 
-prompt_manager = PromptManager()
\ No newline at end of file
+#
+prompt_manager = PromptManager()
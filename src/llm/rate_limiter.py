@@ -0,0 +1,268 @@
+"""
+Provider-aware rate limiting and adaptive concurrency for LLM calls.
+
+Every LLMClient in the process shares one limiter per (provider, model):
+RPM/TPM token buckets keep us under the provider quota, and an AIMD
+concurrency window shrinks on 429s / latency spikes and grows back while
+calls stay healthy. Limits come from the `rate_limits` section of
+llm_config.yaml::
+
+    rate_limits:
+      default:
+        max_concurrency: 8
+      deepseek:
+        rpm: 500
+        tpm: 1000000
+      qwen/qwen-max:
+        rpm: 60
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from loguru import logger
+
+from ..utils.token_bucket import TokenBucket
+
+
+DEFAULT_LIMITS: Dict[str, Any] = {
+    "enabled": True,
+    "rpm": None,                # requests per minute (None = unlimited)
+    "tpm": None,                # tokens per minute (None = unlimited)
+    "max_concurrency": 16,      # AIMD upper bound
+    "min_concurrency": 1,       # AIMD lower bound
+    "initial_concurrency": 8,
+    "decrease_factor": 0.5,     # multiplicative decrease on 429
+    "latency_spike_factor": 3.0,  # latency above N x moving average counts as congestion
+    "backoff_base": 1.0,
+    "backoff_max": 30.0,
+}
+
+
+class AdaptiveConcurrency:
+    """Additive-increase / multiplicative-decrease concurrency window."""
+
+    def __init__(
+        self,
+        initial: float = 8,
+        minimum: float = 1,
+        maximum: float = 16,
+        decrease_factor: float = 0.5,
+        latency_spike_factor: float = 3.0
+    ):
+        self.limit = float(max(minimum, min(initial, maximum)))
+        self.minimum = float(minimum)
+        self.maximum = float(maximum)
+        self.decrease_factor = decrease_factor
+        self.latency_spike_factor = latency_spike_factor
+
+        self.in_flight = 0
+        self.latency_ewma: Optional[float] = None
+        self.samples = 0
+        self._last_decrease = 0.0
+        self._condition: Optional[asyncio.Condition] = None
+
+    def _get_condition(self) -> asyncio.Condition:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def acquire(self):
+        """Wait for a free slot in the current window."""
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(lambda: self.in_flight < max(1, int(self.limit)))
+            self.in_flight += 1
+
+    async def release(self, latency: Optional[float] = None, throttled: bool = False):
+        """Free a slot and adapt the window from the outcome of the call."""
+        if throttled:
+            self._decrease("throttled")
+        elif latency is not None:
+            if self._is_latency_spike(latency):
+                self._decrease(f"latency spike {latency:.1f}s")
+            else:
+                # additive increase: roughly +1 per window of successful calls
+                self.limit = min(self.maximum, self.limit + 1.0 / max(self.limit, 1.0))
+            self._update_latency(latency)
+
+        # freed before awaiting the lock, so a release interrupted by a cancel cannot leak the slot
+        self.in_flight = max(0, self.in_flight - 1)
+        condition = self._get_condition()
+        async with condition:
+            condition.notify_all()
+
+    def _is_latency_spike(self, latency: float) -> bool:
+        return (
+            self.latency_ewma is not None
+            and self.samples >= 5
+            and latency > self.latency_ewma * self.latency_spike_factor
+        )
+
+    def _update_latency(self, latency: float):
+        self.samples += 1
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma = 0.8 * self.latency_ewma + 0.2 * latency
+
+    def _decrease(self, reason: str):
+        # one multiplicative decrease per burst of failures
+        now = time.monotonic()
+        if now - self._last_decrease < 1.0:
+            return
+        self._last_decrease = now
+        old = self.limit
+        self.limit = max(self.minimum, self.limit * self.decrease_factor)
+        logger.warning(f"[RateLimiter] concurrency {old:.1f} -> {self.limit:.1f} ({reason})")
+
+
+class ProviderRateLimiter:
+    """RPM/TPM buckets plus adaptive concurrency for one provider/model."""
+
+    def __init__(self, name: str, settings: Dict[str, Any]):
+        self.name = name
+        self.settings = {**DEFAULT_LIMITS, **settings}
+        self.enabled = bool(self.settings["enabled"])
+
+        rpm = self.settings.get("rpm")
+        tpm = self.settings.get("tpm")
+        self.request_bucket = TokenBucket.per_minute(rpm, burst=max(1.0, rpm / 6)) if rpm else None
+        self.token_bucket = TokenBucket.per_minute(tpm) if tpm else None
+        self.concurrency = AdaptiveConcurrency(
+            initial=self.settings["initial_concurrency"],
+            minimum=self.settings["min_concurrency"],
+            maximum=self.settings["max_concurrency"],
+            decrease_factor=self.settings["decrease_factor"],
+            latency_spike_factor=self.settings["latency_spike_factor"]
+        )
+
+        self._blocked_until = 0.0
+        self.stats = {"requests": 0, "throttled": 0, "retries": 0, "wait_seconds": 0.0}
+
+    async def acquire(self, estimated_tokens: int = 0):
+        """Wait for rate budget and a concurrency slot."""
+        if not self.enabled:
+            return
+
+        start = time.monotonic()
+        blocked = self._blocked_until - time.monotonic()
+        if blocked > 0:
+            await asyncio.sleep(blocked)
+        if self.request_bucket:
+            await self.request_bucket.acquire(1)
+        if self.token_bucket and estimated_tokens:
+            await self.token_bucket.acquire(estimated_tokens)
+        await self.concurrency.acquire()
+
+        self.stats["requests"] += 1
+        self.stats["wait_seconds"] += time.monotonic() - start
+
+    async def release(
+        self,
+        latency: Optional[float] = None,
+        throttled: bool = False,
+        estimated_tokens: int = 0,
+        actual_tokens: Optional[int] = None
+    ):
+        """Report the outcome of a call."""
+        if not self.enabled:
+            return
+
+        if throttled:
+            self.stats["throttled"] += 1
+
+        # settle the TPM reservation against what the provider actually billed
+        if self.token_bucket and actual_tokens is not None and estimated_tokens:
+            delta = estimated_tokens - actual_tokens
+            if delta > 0:
+                self.token_bucket.refund(delta)
+            elif delta < 0:
+                self.token_bucket.consume(-delta)
+
+        await self.concurrency.release(latency=latency, throttled=throttled)
+
+    def block_for(self, seconds: float):
+        """Pause new requests, e.g. after a 429 with Retry-After."""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    def backoff(self, attempt: int) -> float:
+        """Exponential backoff delay for a retry attempt."""
+        delay = self.settings["backoff_base"] * (2 ** attempt)
+        return min(delay, self.settings["backoff_max"])
+
+    def get_status(self) -> Dict[str, Any]:
+        """Current limits, window size and counters."""
+        return {
+            "name": self.name,
+            "enabled": self.enabled,
+            "rpm": self.settings.get("rpm"),
+            "tpm": self.settings.get("tpm"),
+            "concurrency_limit": round(self.concurrency.limit, 2),
+            "in_flight": self.concurrency.in_flight,
+            "latency_ewma": self.concurrency.latency_ewma,
+            **self.stats
+        }
+
+
+_limit_settings: Dict[str, Dict[str, Any]] = {}
+_limiters: Dict[Tuple[str, str], ProviderRateLimiter] = {}
+
+
+def configure_rate_limits(settings: Optional[Dict[str, Dict[str, Any]]]):
+    """Load the `rate_limits` section of llm_config.yaml. Existing limiters are rebuilt."""
+    global _limit_settings
+    _limit_settings = dict(settings or {})
+    _limiters.clear()
+    logger.info(f"[RateLimiter] configured: {list(_limit_settings.keys()) or ['default']}")
+
+
+def resolve_limits(provider: str, model: str) -> Dict[str, Any]:
+    """Merge default -> provider -> provider/model settings."""
+    merged: Dict[str, Any] = {}
+    for key in ("default", provider, f"{provider}/{model}"):
+        merged.update(_limit_settings.get(key) or {})
+    return merged
+
+
+def get_rate_limiter(provider: str, model: str) -> ProviderRateLimiter:
+    """Process-wide limiter shared by every client using this provider/model."""
+    key = (provider, model)
+    limiter = _limiters.get(key)
+    if limiter is None:
+        limiter = ProviderRateLimiter(f"{provider}/{model}", resolve_limits(provider, model))
+        _limiters[key] = limiter
+    return limiter
+
+
+def get_rate_limiter_status() -> Dict[str, Dict[str, Any]]:
+    """Status of every limiter created so far."""
+    return {limiter.name: limiter.get_status() for limiter in _limiters.values()}
+
+
+def classify_error(error: Exception) -> Tuple[bool, bool, Optional[float]]:
+    """
+    Inspect an SDK exception.
+
+    Returns:
+        (throttled, retryable, retry_after_seconds)
+    """
+    status = getattr(error, "status_code", None)
+    name = type(error).__name__
+
+    retry_after = None
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is not None:
+        value = headers.get("retry-after")
+        try:
+            retry_after = float(value) if value is not None else None
+        except (TypeError, ValueError):
+            retry_after = None
+
+    throttled = status == 429 or name == "RateLimitError"
+    retryable = throttled or name in ("APIConnectionError", "APITimeoutError", "InternalServerError") or (
+        isinstance(status, int) and (status in (408, 409) or status >= 500)
+    )
+    return throttled, retryable, retry_after
@@ -0,0 +1,79 @@
+"""
+Single-flight coalescing of identical in-flight LLM requests.
+
+When several coroutines issue a byte-identical request at the same time,
+only the first one (the leader) goes upstream; the others await its
+result. Nothing is stored after the request completes, that is the
+response cache's job.
+"""
+
+import asyncio
+import copy
+import weakref
+from typing import Any, Awaitable, Callable, Dict
+
+from loguru import logger
+
+from ..monitoring.metrics import metrics
+
+
+class SingleFlight:
+    """Share one in-flight call between concurrent callers with the same key."""
+
+    def __init__(self, name: str = "llm"):
+        self.name = name
+        # futures are bound to a loop, so in-flight calls are tracked per loop
+        self._inflight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Future]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _loop_calls(self) -> Dict[str, asyncio.Future]:
+        loop = asyncio.get_running_loop()
+        calls = self._inflight.get(loop)
+        if calls is None:
+            calls = {}
+            self._inflight[loop] = calls
+        return calls
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run `fn` unless an identical call is already in flight, then share its result."""
+        calls = self._loop_calls()
+
+        future = calls.get(key)
+        if future is not None:
+            metrics.incr(f"{self.name}.coalesced")
+            logger.debug(f"[SingleFlight] coalesced {self.name} request {key[:12]}")
+            try:
+                result = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if future.cancelled():
+                    # the leader was cancelled, not us: run the call ourselves
+                    return await self.do(key, fn)
+                raise
+            return copy.deepcopy(result)
+
+        future = asyncio.get_running_loop().create_future()
+        # avoid "exception was never retrieved" when nobody joined
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        calls[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if calls.get(key) is future:
+                del calls[key]
+
+    def in_flight(self) -> int:
+        """Number of distinct calls currently in flight on this loop."""
+        try:
+            return len(self._loop_calls())
+        except RuntimeError:
+            return 0
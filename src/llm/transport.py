@@ -0,0 +1,187 @@
+"""
+Process-wide pooled HTTP transport for LLM SDK clients.
+
+Every AsyncOpenAI / AsyncAnthropic client gets its own thin httpx client,
+but all of them send through one connection pool per base URL (scheme,
+host and port), so TLS sessions and keep-alive connections survive across
+LLMManager and DeepSearchAgent instances. Pools are kept per event loop
+because httpx connections cannot be shared between loops.
+
+Pool limits come from the `http_pool` section of llm_config.yaml or the
+LLM_POOL_* environment variables.
+"""
+
+import asyncio
+import importlib.util
+import os
+import sys
+import weakref
+from typing import Any, Dict, Iterable, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+from loguru import logger
+
+
+_pool_settings: Dict[str, Any] = {}
+# event loop -> {(httpx module, pool key): transport}
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, str], Any]]" = weakref.WeakKeyDictionary()
+_transport_classes: Dict[str, type] = {}
+
+
+def configure_http_pool(**kwargs):
+    """Override pool limits (max_connections, max_keepalive, keepalive_expiry, http2)."""
+    _pool_settings.update({k: v for k, v in kwargs.items() if v is not None})
+    logger.info(f"[HTTPPool] settings: {get_pool_settings()}")
+
+
+def get_pool_settings() -> Dict[str, Any]:
+    """Effective pool limits."""
+    settings = {
+        "max_connections": int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "100")),
+        "max_keepalive": int(os.getenv("LLM_POOL_MAX_KEEPALIVE", "20")),
+        "keepalive_expiry": float(os.getenv("LLM_POOL_KEEPALIVE_EXPIRY", "120")),
+        "http2": os.getenv("LLM_POOL_HTTP2", "true").lower() == "true",
+    }
+    settings.update(_pool_settings)
+    return settings
+
+
+def pool_key(base_url: Optional[str]) -> str:
+    """Connections are reusable per scheme/host/port, whatever the API path."""
+    parts = urlsplit(base_url or "")
+    scheme = parts.scheme or "https"
+    port = parts.port or (443 if scheme == "https" else 80)
+    return f"{scheme}://{parts.hostname or ''}:{port}"
+
+
+def _httpx_module(sdk_module: Any = None):
+    """The httpx package the SDK was built against (its http_client must match)."""
+    client_cls = getattr(sdk_module, "DefaultAsyncHttpxClient", None)
+    if client_cls is not None:
+        for base in client_cls.__mro__:
+            if base.__name__ == "AsyncClient":
+                return sys.modules[base.__module__.split(".")[0]]
+    return httpx
+
+
+def _supports_http2(key: str) -> bool:
+    return (
+        get_pool_settings()["http2"]
+        and key.startswith("https://")
+        and importlib.util.find_spec("h2") is not None
+    )
+
+
+def _create_pool(httpx_mod, key: str):
+    settings = get_pool_settings()
+    limits = httpx_mod.Limits(
+        max_connections=settings["max_connections"],
+        max_keepalive_connections=settings["max_keepalive"],
+        keepalive_expiry=settings["keepalive_expiry"],
+    )
+    http2 = _supports_http2(key)
+    logger.debug(f"[HTTPPool] new pool {key} (http2={http2})")
+    return httpx_mod.AsyncHTTPTransport(limits=limits, http2=http2)
+
+
+def _get_pool(httpx_mod, key: str):
+    loop = asyncio.get_running_loop()
+    loop_pools = _pools.get(loop)
+    if loop_pools is None:
+        loop_pools = {}
+        _pools[loop] = loop_pools
+
+    pool_id = (httpx_mod.__name__, key)
+    pool = loop_pools.get(pool_id)
+    if pool is None:
+        pool = _create_pool(httpx_mod, key)
+        loop_pools[pool_id] = pool
+    return pool
+
+
+def _shared_transport_class(httpx_mod) -> type:
+    """AsyncBaseTransport subclass for the given httpx package."""
+    cls = _transport_classes.get(httpx_mod.__name__)
+    if cls is not None:
+        return cls
+
+    class SharedTransport(httpx_mod.AsyncBaseTransport):
+        """Delegates to the process-wide pool for this base URL and event loop."""
+
+        def __init__(self, key: str):
+            self.key = key
+
+        async def handle_async_request(self, request):
+            return await _get_pool(httpx_mod, self.key).handle_async_request(request)
+
+        async def aclose(self):
+            # The pool outlives individual SDK clients; see close_http_pools().
+            return None
+
+    _transport_classes[httpx_mod.__name__] = SharedTransport
+    return SharedTransport
+
+
+def get_http_client(base_url: Optional[str], sdk_module: Any = None):
+    """
+    httpx client for an SDK, backed by the shared pool of `base_url`.
+
+    Args:
+        base_url: provider API base URL
+        sdk_module: `openai` or `anthropic` module, so the client type matches the SDK
+    """
+    httpx_mod = _httpx_module(sdk_module)
+    transport = _shared_transport_class(httpx_mod)(pool_key(base_url))
+
+    client_cls = getattr(sdk_module, "DefaultAsyncHttpxClient", None)
+    if client_cls is not None:
+        return client_cls(transport=transport)
+    return httpx_mod.AsyncClient(transport=transport, follow_redirects=True)
+
+
+async def prewarm_connections(
+    base_urls: Iterable[str],
+    sdk_module: Any = None,
+    timeout: float = 5.0
+) -> Dict[str, bool]:
+    """
+    Open keep-alive connections (DNS + TCP + TLS) to each base URL ahead of the first call.
+
+    Must run on the event loop that will make the LLM calls. Any HTTP
+    response, even 401/404, counts as warmed.
+    """
+    results: Dict[str, bool] = {}
+    unique = {pool_key(url): url for url in base_urls if url}
+
+    async def _warm(key: str, url: str):
+        client = get_http_client(url, sdk_module)
+        try:
+            await client.head(url, timeout=timeout)
+            results[key] = True
+        except Exception as e:
+            logger.debug(f"[HTTPPool] prewarm {key} failed: {e}")
+            results[key] = False
+
+    await asyncio.gather(*[_warm(key, url) for key, url in unique.items()])
+    logger.info(f"[HTTPPool] prewarmed {sum(results.values())}/{len(results)} pools: {list(results.keys())}")
+    return results
+
+
+async def close_http_pools():
+    """Close all pools belonging to the running event loop."""
+    loop = asyncio.get_running_loop()
+    loop_pools = _pools.pop(loop, {})
+    for pool in loop_pools.values():
+        try:
+            await pool.aclose()
+        except Exception as e:
+            logger.debug(f"[HTTPPool] close failed: {e}")
+
+
+def get_pool_status() -> Dict[str, Any]:
+    """Pools per event loop, for diagnostics."""
+    return {
+        "settings": get_pool_settings(),
+        "pools": [f"{name}:{key}" for loop_pools in _pools.values() for name, key in loop_pools.keys()],
+    }
@@ -1,5 +1,6 @@
 """TODO: Add docstring."""
 
 from .langfuse_monitor import LangfuseMonitor
+from .metrics import TaskMetrics, metrics, task_scope, current_task_id, phase
 
-__all__ = ["LangfuseMonitor"]
\ No newline at end of file
+__all__ = ["LangfuseMonitor", "TaskMetrics", "metrics", "task_scope", "current_task_id", "phase"]
\ No newline at end of file
@@ -0,0 +1,177 @@
+"""
+Lightweight in-process counters, attributed to the task that is running.
+
+The current task id travels in a context variable, so every coroutine
+spawned while handling a task (including asyncio.gather children) reports
+into that task's counters without threading ids through call signatures.
+
+Pipeline stages can additionally be wrapped in a named phase::
+
+    @phase("task_decomposer")
+    async def _task_decomposer_node(self, state): ...
+
+Counters recorded while a phase is active are also attributed to it (the
+innermost one when phases nest), and on exit the phase records its wall
+time and the process peak RSS.
+"""
+
+import functools
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+GLOBAL_SCOPE = "global"
+
+_current_task: ContextVar[Optional[str]] = ContextVar("xunlong_task_id", default=None)
+_current_phase: ContextVar[Optional[str]] = ContextVar("xunlong_phase", default=None)
+
+
+def current_task_id() -> Optional[str]:
+    """Task id bound to the running context, if any."""
+    return _current_task.get()
+
+
+def bind_task(task_id: Optional[str]):
+    """Bind a task id to the current context; returns a token for unbind_task()."""
+    return _current_task.set(task_id)
+
+
+def unbind_task(token):
+    """Restore the task id that was active before bind_task()."""
+    _current_task.reset(token)
+
+
+@contextmanager
+def task_scope(task_id: Optional[str]):
+    """Attribute all metrics recorded inside the block to `task_id`."""
+    token = bind_task(task_id)
+    try:
+        yield
+    finally:
+        unbind_task(token)
+
+
+def current_phase() -> Optional[str]:
+    """Innermost phase active in the running context, if any."""
+    return _current_phase.get()
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB (0 when unavailable)."""
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, KiB elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class TaskMetrics:
+    """Counters per task, plus a process-wide total."""
+
+    def __init__(self):
+        self._counters: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        # scope -> phase -> counters
+        self._phases: Dict[str, Dict[str, Dict[str, float]]] = defaultdict(
+            lambda: defaultdict(lambda: defaultdict(float))
+        )
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, value: float = 1, task_id: Optional[str] = None):
+        """Add `value` to counter `name` for the current task and the global scope."""
+        task_id = task_id or current_task_id()
+        phase_name = current_phase()
+        with self._lock:
+            for scope in (GLOBAL_SCOPE, task_id):
+                if not scope:
+                    continue
+                self._counters[scope][name] += value
+                if phase_name:
+                    self._phases[scope][phase_name][name] += value
+
+    def record_phase(self, phase_name: str, seconds: float, task_id: Optional[str] = None):
+        """Account one completed run of a phase: wall time, call count, peak RSS."""
+        task_id = task_id or current_task_id()
+        rss = peak_rss_mb()
+        with self._lock:
+            for scope in (GLOBAL_SCOPE, task_id):
+                if not scope:
+                    continue
+                counters = self._phases[scope][phase_name]
+                counters["seconds"] += seconds
+                counters["calls"] += 1
+                counters["peak_rss_mb"] = max(counters["peak_rss_mb"], rss)
+
+    def get(self, task_id: Optional[str] = None) -> Dict[str, float]:
+        """Counters of one task (default: the current one, else global)."""
+        task_id = task_id or current_task_id() or GLOBAL_SCOPE
+        with self._lock:
+            return dict(self._counters.get(task_id, {}))
+
+    def phases(self, task_id: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        """Per-phase counters of one task (default: the current one, else global)."""
+        task_id = task_id or current_task_id() or GLOBAL_SCOPE
+        with self._lock:
+            return {name: dict(counters) for name, counters in self._phases.get(task_id, {}).items()}
+
+    def pop(self, task_id: str) -> Dict[str, float]:
+        """Return and forget the counters of a finished task."""
+        with self._lock:
+            self._phases.pop(task_id, None)
+            return dict(self._counters.pop(task_id, {}))
+
+    def reset(self):
+        """Drop all counters."""
+        with self._lock:
+            self._counters.clear()
+            self._phases.clear()
+
+
+metrics = TaskMetrics()
+
+
+class phase:
+    """
+    Named pipeline phase, usable as `async with phase(name):` / `with phase(name):`
+    or as a decorator on coroutine functions.
+
+    Records `seconds` (wall time) and `calls` for the phase and `peak_rss_mb`
+    on exit; counters recorded inside are attributed to the phase.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._token = None
+        self._start = 0.0
+
+    def __enter__(self):
+        self._token = _current_phase.set(self.name)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_phase.reset(self._token)
+        metrics.record_phase(self.name, time.perf_counter() - self._start)
+        return False
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return self.__exit__(exc_type, exc, tb)
+
+    def __call__(self, fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            # a fresh instance per call keeps concurrent calls independent
+            with phase(self.name):
+                return await fn(*args, **kwargs)
+        return wrapper
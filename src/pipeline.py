@@ -75,7 +75,8 @@ class DeepSearchPipeline:
                         
                         if page_content:
                             # 
-                            extracted_content = self.extractor.extract_content(
+                            # parsed in the extraction pool, off the event loop
+                            extracted_content = await self.extractor.extract_content_async(
                                 page_content, 
                                 result['url']
                             )
@@ -134,7 +135,7 @@ class DeepSearchPipeline:
                 page_content = await browser.get_page_content(url)
                 
                 if page_content:
-                    extracted_content = self.extractor.extract_content(page_content, url)
+                    extracted_content = await self.extractor.extract_content_async(page_content, url)
                     return {
                         'url': url,
                         'status': 'success',
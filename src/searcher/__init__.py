@@ -2,5 +2,6 @@
 
 from .base import BaseSearcher
 from .duckduckgo import DuckDuckGoSearcher
+from .duckduckgo_html import DuckDuckGoHTMLSearcher, DuckDuckGoBlockedError
 
-__all__ = ["BaseSearcher", "DuckDuckGoSearcher"]
\ No newline at end of file
+__all__ = ["BaseSearcher", "DuckDuckGoSearcher", "DuckDuckGoHTMLSearcher", "DuckDuckGoBlockedError"]
\ No newline at end of file
@@ -22,7 +22,8 @@ class DuckDuckGoSearcher(BaseSearcher):
         page: Page,
         query: str,
         time_filter: Optional[str] = None,
-        region: str = "cn-zh"
+        region: str = "cn-zh",
+        topk: Optional[int] = None
     ) -> List[SearchLink]:
         """
         DuckDuckGo
@@ -30,10 +31,13 @@ class DuckDuckGoSearcher(BaseSearcher):
         Args:
             page: Playwright
             query: 
+            topk: results wanted; defaults to `self.topk`
             
         Returns:
             
         """
+        # per call, not on the instance: the searcher is shared by concurrent searches
+        topk = topk or self.topk
         try:
             logger.info(f"DuckDuckGo: {query}")
 
@@ -102,7 +106,7 @@ class DuckDuckGoSearcher(BaseSearcher):
             
             logger.info(f" {len(result_elements)} ")
             
-            for i, element in enumerate(result_elements[:self.topk]):
+            for i, element in enumerate(result_elements[:topk]):
                 try:
                     #  - 
                     title_element = element.locator('a[data-testid="result-title-a"]')
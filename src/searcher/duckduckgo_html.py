@@ -0,0 +1,128 @@
+"""DuckDuckGo search over the static HTML endpoint (no browser)."""
+
+from typing import List, Optional
+from urllib.parse import parse_qs, urljoin, urlsplit
+
+from loguru import logger
+from lxml import html as lxml_html
+
+from .base import BaseSearcher
+from ..models import SearchLink
+
+
+HTML_ENDPOINT = "https://html.duckduckgo.com/html/"
+
+TIME_FILTERS = {
+    "day": "d",
+    "week": "w",
+    "month": "m",
+    "year": "y"
+}
+
+
+class DuckDuckGoBlockedError(RuntimeError):
+    """DuckDuckGo answered with a bot challenge instead of results."""
+
+
+def _class_xpath(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def _target_url(href: str) -> str:
+    """Resolve DuckDuckGo's `/l/?uddg=<url>` redirect links to the target URL."""
+    href = urljoin(HTML_ENDPOINT, href or "")
+    parts = urlsplit(href)
+    if parts.path.startswith("/l/"):
+        target = parse_qs(parts.query).get("uddg")
+        if target:
+            return target[0]
+    return href
+
+
+def parse_results(page_html: str, topk: int) -> List[SearchLink]:
+    """Organic results of an HTML endpoint response page (ads skipped)."""
+    tree = lxml_html.fromstring(page_html)
+    if tree.xpath("//*[contains(@class, 'anomaly-modal')]") or tree.xpath("//form[@id='challenge-form']"):
+        raise DuckDuckGoBlockedError("DuckDuckGo bot challenge")
+
+    results: List[SearchLink] = []
+    for node in tree.xpath(f"//div[{_class_xpath('result')} and not({_class_xpath('result--ad')})]"):
+        links = node.xpath(f".//a[{_class_xpath('result__a')}]")
+        if not links:
+            continue
+        title = links[0].text_content().strip()
+        url = _target_url(links[0].get("href", ""))
+        if not title or not url.startswith(("http://", "https://")) or "duckduckgo.com/y.js" in url:
+            continue
+
+        snippet_nodes = node.xpath(f".//*[{_class_xpath('result__snippet')}]")
+        snippet = snippet_nodes[0].text_content().strip() if snippet_nodes else None
+
+        results.append(SearchLink(url=url, title=title, snippet=snippet or None))
+        if len(results) >= topk:
+            break
+    return results
+
+
+class DuckDuckGoHTMLSearcher(BaseSearcher):
+    """DuckDuckGo results from html.duckduckgo.com over the shared HTTP session."""
+
+    def __init__(self, topk: int = 5, endpoint: str = HTML_ENDPOINT):
+        super().__init__(topk)
+        self.endpoint = endpoint
+
+    @property
+    def name(self) -> str:
+        return "duckduckgo_html"
+
+    async def search(
+        self,
+        page: Optional[object],
+        query: str,
+        time_filter: Optional[str] = None,
+        region: str = "cn-zh",
+        topk: Optional[int] = None
+    ) -> List[SearchLink]:
+        """
+        Search DuckDuckGo without a browser.
+
+        Args:
+            page: unused; kept so the searcher is interchangeable with DuckDuckGoSearcher
+            query: search query
+            time_filter: day/week/month/year
+            region: DuckDuckGo region code (kl)
+            topk: results wanted; defaults to `self.topk`
+
+        Returns:
+            Up to `topk` results. An empty list means DuckDuckGo found nothing.
+
+        Raises:
+            DuckDuckGoBlockedError or a network error, so callers can fall back to the browser.
+        """
+        # imported here: src.tools imports this package through the web searcher
+        from ..tools.http_session import get_http_session
+        from ..tools.host_scheduler import get_host_scheduler
+
+        topk = topk or self.topk
+        form = {"q": query, "kl": region}
+        mapped_filter = TIME_FILTERS.get((time_filter or "").lower())
+        if mapped_filter:
+            form["df"] = mapped_filter
+
+        logger.info(f"DuckDuckGo (HTML): {query}")
+        scheduler = get_host_scheduler()
+        async with scheduler.slot(self.endpoint), get_http_session().post(
+            self.endpoint,
+            data=form,
+            headers={"Referer": "https://html.duckduckgo.com/"}
+        ) as response:
+            scheduler.observe(self.endpoint, response.status, response.headers)
+            if response.status != 200:
+                if response.status in (202, 403, 429):
+                    raise DuckDuckGoBlockedError(f"HTTP {response.status}")
+                raise RuntimeError(f"DuckDuckGo HTML endpoint returned HTTP {response.status}")
+            page_html = await response.text(errors="ignore")
+
+        results = parse_results(page_html, topk)
+        logger.info(f"DuckDuckGo (HTML): {len(results)} results for {query}")
+        return results
@@ -1,4 +1,5 @@
 """Storage module for search data persistence."""
 from .search_storage import SearchStorage
+from .disk_cache import DiskCache
 
-__all__ = ["SearchStorage"]
+__all__ = ["SearchStorage", "DiskCache"]
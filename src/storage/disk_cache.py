@@ -0,0 +1,199 @@
+"""
+Disk-backed key/value cache with TTL and size-bounded LRU eviction.
+
+Values are stored as JSON in a single SQLite file so the cache survives
+process restarts and can be shared by several workers on the same host.
+"""
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+
+class DiskCache:
+    """SQLite-backed JSON cache with per-entry TTL and LRU eviction by size."""
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = 256 * 1024 * 1024,
+        default_ttl: Optional[float] = None,
+        name: str = "DiskCache"
+    ):
+        """
+        Args:
+            path: SQLite database file
+            max_bytes: total payload size above which least recently used entries are evicted
+            default_ttl: default time-to-live in seconds (None = never expires)
+            name: name used in log messages
+        """
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.name = name
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_access ON entries(last_access)")
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+            self.hits += 1
+
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError:
+            logger.warning(f"[{self.name}] corrupt entry dropped: {key}")
+            self.delete(key)
+            return None
+
+    def get_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the value with its metadata, including expired entries (for revalidation)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        value, created_at, expires_at = row
+        try:
+            decoded = json.loads(value)
+        except json.JSONDecodeError:
+            return None
+
+        return {
+            "value": decoded,
+            "created_at": created_at,
+            "expires_at": expires_at,
+            "expired": expires_at is not None and expires_at <= time.time()
+        }
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Store a JSON-serialisable value."""
+        payload = json.dumps(value, ensure_ascii=False)
+        size = len(payload.encode("utf-8"))
+        if size > self.max_bytes:
+            logger.debug(f"[{self.name}] entry larger than cache, skipped: {key}")
+            return
+
+        now = time.time()
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = now + ttl if ttl is not None else None
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created_at, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, payload, size, now, expires_at, now)
+            )
+            self._evict(now)
+
+    def touch(self, key: str, ttl: Optional[float] = None):
+        """Extend the lifetime of an existing entry."""
+        now = time.time()
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock:
+            self._conn.execute(
+                "UPDATE entries SET expires_at = ?, last_access = ? WHERE key = ?",
+                (expires_at, now, key)
+            )
+
+    def delete(self, key: str):
+        """Remove a single entry."""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self):
+        """Remove every entry and reset counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+        self.hits = self.misses = self.evictions = 0
+
+    def _evict(self, now: float):
+        """Drop expired entries, then least recently used ones until under max_bytes."""
+        self._conn.execute(
+            "DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+        )
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        excess = total - self.max_bytes
+        freed = 0
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY last_access ASC"):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+        self.evictions += len(victims)
+        logger.debug(f"[{self.name}] evicted {len(victims)} entries ({freed} bytes)")
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry count, size and hit/miss counters."""
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+
+        lookups = self.hits + self.misses
+        return {
+            "path": str(self.path),
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
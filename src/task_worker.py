@@ -1,6 +1,7 @@
 """TODO: Add docstring."""
 
 import asyncio
+import os
 import sys
 import traceback
 from pathlib import Path
@@ -12,20 +13,27 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from src.task_manager import TaskManager, TaskStatus, TaskType, get_task_manager
 from src.deep_search_agent import DeepSearchAgent
+from src.tools.browser_pool import close_browser_pool
+from src.tools.http_session import close_http_session
+from src.tools.extraction_pool import shutdown_extraction_pool
 
 
 class TaskWorker:
     """TODO: Add docstring."""
 
-    def __init__(self, task_manager: TaskManager = None):
+    def __init__(self, task_manager: TaskManager = None, prewarm_connections: bool = None):
         """
         
 
         Args:
             task_manager: 
+            prewarm_connections: open pooled LLM connections at start (default: WORKER_PREWARM_CONNECTIONS, true)
         """
         self.task_manager = task_manager or get_task_manager()
         self.is_running = False
+        if prewarm_connections is None:
+            prewarm_connections = os.getenv("WORKER_PREWARM_CONNECTIONS", "true").lower() == "true"
+        self.prewarm_connections = prewarm_connections
         logger.info("")
 
     async def execute_task(self, task_id: str) -> bool:
@@ -246,6 +254,9 @@ class TaskWorker:
         self.is_running = True
         logger.info(f" (: {interval})")
 
+        if self.prewarm_connections:
+            await self._prewarm_connections()
+
         while self.is_running:
             try:
                 # 
@@ -265,8 +276,20 @@ class TaskWorker:
                 logger.error(f": {e}")
                 await asyncio.sleep(interval)
 
+        # the browser pool, HTTP session and parse workers live across tasks; shut them down with the worker
+        await close_browser_pool()
+        await close_http_session()
+        shutdown_extraction_pool()
         logger.info("")
 
+    async def _prewarm_connections(self):
+        """Warm the shared LLM connection pools so the first task skips TLS setup."""
+        try:
+            from src.llm import llm_manager
+            await llm_manager.prewarm_connections()
+        except Exception as e:
+            logger.warning(f"prewarm failed: {e}")
+
     def stop(self):
         """TODO: Add docstring."""
         self.is_running = False
@@ -4,10 +4,29 @@
 from .time_tool import time_tool, TimeTool
 from .web_searcher import WebSearcher
 from .content_extractor import ContentExtractor
+from .browser_pool import BrowserPool, get_browser_pool, close_browser_pool
+from .host_scheduler import HostScheduler, get_host_scheduler
+from .url_registry import UrlRegistry, get_url_registry
+from .domain_health import DomainHealth, get_domain_health
+from .extraction_pool import ExtractionPool, get_extraction_pool
+from .document_fetcher import DocumentFetcher, get_document_fetcher
 
 __all__ = [
     "time_tool",
     "TimeTool", 
     "WebSearcher",
-    "ContentExtractor"
+    "ContentExtractor",
+    "BrowserPool",
+    "get_browser_pool",
+    "close_browser_pool",
+    "HostScheduler",
+    "get_host_scheduler",
+    "UrlRegistry",
+    "get_url_registry",
+    "DomainHealth",
+    "get_domain_health",
+    "ExtractionPool",
+    "get_extraction_pool",
+    "DocumentFetcher",
+    "get_document_fetcher"
 ]
\ No newline at end of file
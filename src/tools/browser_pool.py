@@ -0,0 +1,375 @@
+"""
+Process-wide Playwright browser pool shared by search and page fetching.
+
+One headless Chromium runs per event loop with a persistent profile, so the
+HTTP disk cache (and cookies) survive across queries and tasks. Callers
+lease pages instead of launching browsers:
+
+    async with get_browser_pool().page() as page:
+        await page.goto(url)
+
+Callers that need other settings (BrowserManager forwards the config's
+headless, user_agent and browser_timeout) pass them as overrides and share
+a separate pool per distinct set of values: `get_browser_pool(headless=False)`.
+
+Chromium locks its profile, so every pool claims a numbered profile under
+`profile_dir` (`<profile_dir>/0`, `/1`, ...) that no other process or
+event loop holds; when none can be claimed, or the persistent launch
+fails, the pool falls back to a non-persistent context.
+
+Idle pages are reused, at most `max_pages` are open at once, and the
+context is recycled after `recycle_after_leases` page leases to keep
+Chromium's memory in check (a lease may navigate more than once, e.g. a
+search that follows result pages). A watchdog probes the context
+periodically and relaunches it when it crashed or stopped responding.
+
+Settings come from configure_browser_pool() or the BROWSER_POOL_*
+environment variables.
+"""
+
+import asyncio
+import os
+import weakref
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+
+LAUNCH_ARGS = [
+    "--no-sandbox",
+    "--disable-setuid-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-blink-features=AutomationControlled",
+]
+
+# profile slots tried under profile_dir before falling back to a non-persistent context
+MAX_PROFILE_SLOTS = 16
+
+# hides the most common automation fingerprints
+STEALTH_SCRIPT = """
+    Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
+    Object.defineProperty(navigator, 'languages', {get: () => ['zh-CN', 'zh', 'en']});
+    window.chrome = window.chrome || {runtime: {}};
+"""
+
+_pool_settings: Dict[str, Any] = {}
+# event loop -> pools by their setting overrides (the default pool has none)
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple, BrowserPool]]" = weakref.WeakKeyDictionary()
+
+
+def configure_browser_pool(**kwargs):
+    """Override pool settings (max_pages, recycle_after_leases, headless, profile_dir, ...)."""
+    _pool_settings.update({k: v for k, v in kwargs.items() if v is not None})
+    logger.info(f"[BrowserPool] settings: {get_browser_pool_settings()}")
+
+
+def get_browser_pool_settings() -> Dict[str, Any]:
+    """Effective pool settings."""
+    settings = {
+        "max_pages": int(os.getenv("BROWSER_POOL_MAX_PAGES", "8")),
+        # BROWSER_POOL_RECYCLE_AFTER is the older name of the setting
+        "recycle_after_leases": int(
+            os.getenv("BROWSER_POOL_RECYCLE_AFTER_LEASES") or os.getenv("BROWSER_POOL_RECYCLE_AFTER") or "200"
+        ),
+        "headless": os.getenv("BROWSER_POOL_HEADLESS", "true").lower() == "true",
+        "profile_dir": os.getenv("BROWSER_POOL_PROFILE_DIR", "storage/browser_profile"),
+        "watchdog_interval": float(os.getenv("BROWSER_POOL_WATCHDOG_INTERVAL", "30")),
+        "navigation_timeout": int(os.getenv("BROWSER_POOL_NAVIGATION_TIMEOUT", "30000")),
+        "user_agent": os.getenv("BROWSER_POOL_USER_AGENT", DEFAULT_USER_AGENT),
+    }
+    settings.update(_pool_settings)
+    return settings
+
+
+class BrowserPool:
+    """Leases pages of one persistent headless Chromium context."""
+
+    def __init__(self, **overrides):
+        self.settings = {**get_browser_pool_settings(), **overrides}
+        self.name = "BrowserPool"
+        self._playwright = None
+        self._context = None
+        self._idle: List[Any] = []
+        # leased page -> context it belongs to; crashed pages are never reused
+        self._owners: Dict[Any, Any] = {}
+        self._crashed: "weakref.WeakSet[Any]" = weakref.WeakSet()
+        self._leased = 0
+        self._leases_since_launch = 0
+        self._launches = 0
+        self._crashes = 0
+        self._semaphore = asyncio.Semaphore(self.settings["max_pages"])
+        # guards launch/recycle and lets new leases wait for a drain
+        self._condition = asyncio.Condition()
+        self._watchdog: Optional[asyncio.Task] = None
+        self._closed = False
+        # claimed profile directory and the lock file holding it
+        self.profile_dir: Optional[Path] = None
+        self._profile_lock = None
+        # browser of a non-persistent context (a persistent context owns its browser)
+        self._browser = None
+
+    def _claim_profile_dir(self) -> Optional[Path]:
+        """
+        A profile directory no other pool uses: the first free `<profile_dir>/<n>`,
+        locked until the pool closes. None when every slot is taken.
+        """
+        if self.profile_dir is not None:
+            return self.profile_dir
+        base = Path(self.settings["profile_dir"])
+        base.mkdir(parents=True, exist_ok=True)
+        if fcntl is None:
+            # no advisory locks: a per-process profile
+            self.profile_dir = base / f"pid-{os.getpid()}-{id(self)}"
+            return self.profile_dir
+
+        for slot in range(MAX_PROFILE_SLOTS):
+            lock_file = open(base / f"{slot}.lock", "a")
+            try:
+                # flock locks belong to the open file, so other loops of this process conflict too
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                continue
+            self._profile_lock = lock_file
+            self.profile_dir = base / str(slot)
+            return self.profile_dir
+        return None
+
+    def _release_profile_dir(self):
+        lock_file, self._profile_lock = self._profile_lock, None
+        self.profile_dir = None
+        if lock_file is not None:
+            lock_file.close()
+
+    async def _launch(self):
+        """Start Playwright and a context: persistent on a claimed profile, else ephemeral."""
+        from playwright.async_api import async_playwright
+
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        options = {
+            "user_agent": self.settings["user_agent"],
+            "viewport": {"width": 1920, "height": 1080},
+            "extra_http_headers": {"Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8"},
+        }
+        chromium = self._playwright.chromium
+
+        profile_dir = self._claim_profile_dir()
+        if profile_dir is not None:
+            profile_dir.mkdir(parents=True, exist_ok=True)
+            try:
+                return await chromium.launch_persistent_context(
+                    str(profile_dir), headless=self.settings["headless"], args=LAUNCH_ARGS, **options
+                )
+            except Exception as e:
+                logger.warning(f"[{self.name}] persistent profile {profile_dir} unusable ({e}); using a fresh profile")
+                self._release_profile_dir()
+        else:
+            logger.warning(f"[{self.name}] every browser profile is in use; using a fresh profile")
+
+        self._browser = await chromium.launch(headless=self.settings["headless"], args=LAUNCH_ARGS)
+        return await self._browser.new_context(**options)
+
+    async def _ensure_context(self):
+        """Launch the context if it is missing, dead, or due for recycling."""
+        async with self._condition:
+            limit = self.settings["recycle_after_leases"]
+            while self._context is not None and self._leases_since_launch >= limit:
+                if self._leased == 0:
+                    logger.info(f"[{self.name}] recycling context after {self._leases_since_launch} leases")
+                    await self._close_context()
+                    break
+                # drain: the profile is locked while the old context is open
+                await self._condition.wait()
+
+            if self._context is None:
+                context = await self._launch()
+                context.set_default_timeout(self.settings["navigation_timeout"])
+                await context.add_init_script(STEALTH_SCRIPT)
+                context.on("close", lambda _=None, ctx=context: self._on_context_closed(ctx))
+                # the persistent context opens with one blank tab; keep it for reuse
+                self._idle = list(context.pages)
+                self._context = context
+                self._leases_since_launch = 0
+                self._launches += 1
+                logger.info(f"[{self.name}] context launched (headless={self.settings['headless']})")
+                self._start_watchdog()
+            return self._context
+
+    def _on_context_closed(self, context):
+        if context is self._context and not self._closed:
+            logger.warning(f"[{self.name}] context closed unexpectedly; relaunching on next lease")
+            self._crashes += 1
+            self._context = None
+            self._idle = []
+
+    async def _close_context(self):
+        context, self._context = self._context, None
+        browser, self._browser = self._browser, None
+        self._idle = []
+        if context is not None:
+            try:
+                await context.close()
+            except Exception as e:
+                logger.debug(f"[{self.name}] context close failed: {e}")
+        if browser is not None:
+            try:
+                await browser.close()
+            except Exception as e:
+                logger.debug(f"[{self.name}] browser close failed: {e}")
+
+    async def close(self):
+        """Close the context and stop Playwright."""
+        self._closed = True
+        if self._watchdog is not None:
+            self._watchdog.cancel()
+            self._watchdog = None
+        await self._close_context()
+        self._release_profile_dir()
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception as e:
+                logger.debug(f"[{self.name}] playwright stop failed: {e}")
+            self._playwright = None
+
+    def _start_watchdog(self):
+        interval = self.settings["watchdog_interval"]
+        if interval > 0 and (self._watchdog is None or self._watchdog.done()):
+            self._watchdog = asyncio.create_task(self._watch(interval))
+
+    async def _watch(self, interval: float):
+        while not self._closed:
+            await asyncio.sleep(interval)
+            context = self._context
+            if context is None:
+                continue
+            try:
+                await asyncio.wait_for(context.cookies(), timeout=min(interval, 10))
+            except Exception as e:
+                if context is self._context:
+                    logger.warning(f"[{self.name}] context unresponsive ({e!r}); restarting")
+                    self._crashes += 1
+                    await self._close_context()
+
+    async def acquire(self):
+        """Lease a page; release it with release(). Prefer `async with page()`."""
+        await self._semaphore.acquire()
+        try:
+            context = await self._ensure_context()
+            page = None
+            while self._idle:
+                candidate = self._idle.pop()
+                if not candidate.is_closed():
+                    page = candidate
+                    break
+            if page is None:
+                page = await context.new_page()
+                page.on("crash", self._crashed.add)
+            self._leased += 1
+            self._leases_since_launch += 1
+            self._owners[page] = context
+            return page
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    async def release(self, page):
+        """Return a leased page; crashed, closed or stale pages are closed instead of reused."""
+        try:
+            owner = self._owners.pop(page, None)
+            reusable = (
+                not page.is_closed()
+                and page not in self._crashed
+                and owner is not None
+                and owner is self._context
+            )
+            if reusable:
+                try:
+                    # stop scripts and timers of the previous site, drop per-lease routes
+                    await page.unroute_all(behavior="ignoreErrors")
+                    await page.goto("about:blank", timeout=5000)
+                except Exception:
+                    reusable = False
+            if reusable:
+                self._idle.append(page)
+            elif not page.is_closed():
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+        finally:
+            self._leased -= 1
+            self._semaphore.release()
+            async with self._condition:
+                self._condition.notify_all()
+
+    @asynccontextmanager
+    async def page(self):
+        """Lease a page for the duration of the block."""
+        page = await self.acquire()
+        try:
+            yield page
+        finally:
+            await self.release(page)
+
+    def status(self) -> Dict[str, Any]:
+        """Counters for diagnostics."""
+        return {
+            "running": self._context is not None,
+            "leased": self._leased,
+            "idle": len(self._idle),
+            "leases_since_launch": self._leases_since_launch,
+            "launches": self._launches,
+            "crashes": self._crashes,
+            "max_pages": self.settings["max_pages"],
+            "profile_dir": str(self.profile_dir) if self.profile_dir else None,
+        }
+
+
+def get_browser_pool(**overrides) -> BrowserPool:
+    """
+    The browser pool of the running event loop (created on first use).
+
+    `overrides` (e.g. headless, user_agent) select a pool with those settings,
+    shared by every caller passing the same values; None values are ignored.
+    """
+    loop = asyncio.get_running_loop()
+    overrides = {k: v for k, v in overrides.items() if v is not None}
+    key = tuple(sorted(overrides.items()))
+    loop_pools = _pools.get(loop)
+    if loop_pools is None:
+        loop_pools = {}
+        _pools[loop] = loop_pools
+    pool = loop_pools.get(key)
+    if pool is None or pool._closed:
+        pool = BrowserPool(**overrides)
+        loop_pools[key] = pool
+    return pool
+
+
+async def close_browser_pool():
+    """Close the pools of the running event loop, if any."""
+    loop_pools = _pools.pop(asyncio.get_running_loop(), {})
+    for pool in loop_pools.values():
+        await pool.close()
+
+
+def get_browser_pool_status() -> Dict[str, Any]:
+    """Pool counters per event loop, for diagnostics."""
+    return {
+        "settings": get_browser_pool_settings(),
+        "pools": [pool.status() for loop_pools in list(_pools.values()) for pool in loop_pools.values()],
+    }
@@ -2,11 +2,94 @@
  - 
 """
 import asyncio
+import time
 import aiohttp
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from loguru import logger
 from bs4 import BeautifulSoup
 import re
+from urllib.parse import urlparse
+
+from ..utils.tokens import truncate_to_chars
+from ..utils.cassette import get_cassette
+from ..monitoring.metrics import metrics
+from .http_session import get_http_session
+from .host_scheduler import get_host_scheduler
+from .page_cache import get_page_cache, conditional_headers
+from .tiered_fetcher import get_fetch_settings, response_validators
+from .stream_reader import is_binary, read_body
+from .url_registry import get_url_registry
+from .extraction_pool import HTML_PARSER, get_extraction_pool
+from .domain_health import get_domain_health
+from .document_fetcher import document_kind, get_document_fetcher
+
+# text kept per page, in characters: a token cap would keep a quarter as
+# much Chinese as English, since every CJK character costs a token
+MAX_CONTENT_CHARS = 5000
+
+
+def parse_html(html: str) -> Tuple[str, str]:
+    """Title and cleaned main text of a page; runs in the extraction pool."""
+    # HTML
+    soup = BeautifulSoup(html, HTML_PARSER)
+
+    # 
+    title = ""
+    title_tag = soup.find('title')
+    if title_tag:
+        title = title_tag.get_text().strip()
+
+    # 
+    for script in soup(["script", "style", "nav", "footer", "header", "aside"]):
+        script.decompose()
+
+    # 
+    content = ""
+
+    # 
+    main_selectors = [
+        'main', 'article', '.content', '.post', '.entry',
+        '#content', '#main', '.main-content', '.article-content'
+    ]
+
+    main_content = None
+    for selector in main_selectors:
+        main_content = soup.select_one(selector)
+        if main_content:
+            break
+
+    if main_content:
+        content = main_content.get_text()
+    else:
+        # body
+        body = soup.find('body')
+        if body:
+            content = body.get_text()
+        else:
+            content = soup.get_text()
+
+    # 
+    content = clean_text(content)
+    return title, content
+
+
+def clean_text(text: str) -> str:
+    """Collapse whitespace and drop symbols and short lines."""
+    if not text:
+        return ""
+
+    # 
+    text = re.sub(r'\s+', ' ', text)
+
+    # 
+    text = re.sub(r'[^\w\s\u4e00-\u9fff.,!?;:()""''\\-]', '', text)
+
+    # 
+    lines = text.split('\n')
+    cleaned_lines = [line.strip() for line in lines if len(line.strip()) > 10]
+
+    return '\n'.join(cleaned_lines).strip()
+
 
 class ContentExtractor:
     """TODO: Add docstring."""
@@ -17,97 +100,78 @@ class ContentExtractor:
         
     async def extract_content(self, url: str) -> Dict[str, Any]:
         """URL"""
+        # a URL already extracted (or being extracted) in this task is not fetched again
+        extracted = await get_url_registry().fetch(
+            url, "extract", lambda: self._extract(url),
+            keep=lambda r: bool(r.get("content")) and not r.get("error")
+        )
+        return {**extracted, "url": url}
+
+    async def _extract(self, url: str) -> Dict[str, Any]:
+        """Fetch and extract one page (page cache first)."""
 
         try:
             logger.debug(f"[{self.name}] : {url}")
 
-            # PDF
-            if url.lower().endswith('.pdf') or url.lower().endswith('.doc') or url.lower().endswith('.docx'):
+            # legacy Word files have no reader (PDF and .docx are fetched as documents below)
+            if urlparse(url).path.lower().endswith('.doc'):
                 logger.warning(f"[{self.name}] : {url}")
-                return {"url": url, "title": "", "content": "", "error": "PDF/DOC"}
+                return {"url": url, "title": "", "content": "", "error": "unsupported document format (.doc)"}
 
-            # 
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout)) as session:
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36',
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                    'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-                    'Accept-Encoding': 'gzip, deflate, br',
-                    'Connection': 'keep-alive',
-                    'Upgrade-Insecure-Requests': '1',
-                    'Sec-Fetch-Dest': 'document',
-                    'Sec-Fetch-Mode': 'navigate',
-                    'Sec-Fetch-Site': 'none',
-                    'Cache-Control': 'max-age=0'
-                }
-
-                async with session.get(url, headers=headers, allow_redirects=True) as response:
-                    if response.status != 200:
-                        logger.warning(f"[{self.name}] HTTP {response.status}: {url}")
-                        return {"url": url, "title": "", "content": "", "error": f"HTTP {response.status}"}
-
-                    # Content-TypePDF
-                    content_type = response.headers.get('Content-Type', '').lower()
-                    if 'pdf' in content_type or 'application/octet-stream' in content_type:
-                        logger.warning(f"[{self.name}] : {url} (Content-Type: {content_type})")
-                        return {"url": url, "title": "", "content": "", "error": ""}
+            cache = get_page_cache()
+            cached = await cache.lookup(url, "extract")
+            if cached and cached["fresh"]:
+                metrics.incr("web.page_cache.hits")
+                return dict(cached["data"])
 
-                    html = await response.text(errors='ignore')  # 
-            
-            # HTML
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            # 
-            title = ""
-            title_tag = soup.find('title')
-            if title_tag:
-                title = title_tag.get_text().strip()
-            
-            # 
-            for script in soup(["script", "style", "nav", "footer", "header", "aside"]):
-                script.decompose()
-            
-            # 
-            content = ""
-            
-            # 
-            main_selectors = [
-                'main', 'article', '.content', '.post', '.entry',
-                '#content', '#main', '.main-content', '.article-content'
-            ]
-            
-            main_content = None
-            for selector in main_selectors:
-                main_content = soup.select_one(selector)
-                if main_content:
-                    break
-            
-            if main_content:
-                content = main_content.get_text()
-            else:
-                # body
-                body = soup.find('body')
-                if body:
-                    content = body.get_text()
-                else:
-                    content = soup.get_text()
+            cooling = await get_domain_health().cooling_down(url)
+            if cooling:
+                metrics.incr("web.domain_health.skipped")
+                return {"url": url, "title": "", "content": "", "error": f"host cooling down ({cooling:.0f}s left)"}
+
+            # raw response (recorded/replayed by the cassette), parsed below
+            fetched = await get_cassette().call(
+                "extract", {"url": url}, lambda: self._fetch(url, conditional_headers(cached))
+            )
+            if fetched.get("status") == 304 and cached:
+                metrics.incr("web.page_cache.revalidated")
+                await cache.refresh(url, "extract", cached)
+                return dict(cached["data"])
+            metrics.incr("web.pages_fetched")
+            metrics.incr("web.bytes_downloaded", len((fetched.get("html") or "").encode("utf-8")))
+            if fetched.get("status") != 200:
+                logger.warning(f"[{self.name}] HTTP {fetched.get('status')}: {url}")
+                return {"url": url, "title": "", "content": "", "error": f"HTTP {fetched.get('status')}"}
+
+            if fetched.get("document"):
+                return await self._extract_document(url, fetched)
+
+            # Content-TypePDF
+            content_type = fetched.get("content_type", "")
+            if is_binary(content_type):
+                logger.warning(f"[{self.name}] : {url} (Content-Type: {content_type})")
+                return {"url": url, "title": "", "content": "", "error": f"unsupported content type {content_type}"}
+
+            html = fetched.get("html", "")
             
-            # 
-            content = self._clean_text(content)
+            # parsed off the event loop (process pool for large pages)
+            title, content = await get_extraction_pool().run(parse_html, html, size=len(html))
             
             # 
-            if len(content) > 5000:
-                content = content[:5000] + "..."
+            content = truncate_to_chars(content, MAX_CONTENT_CHARS)
             
             result = {
                 "url": url,
                 "title": title,
                 "content": content,
                 "content_length": len(content),
+                "final_url": fetched.get("final_url") or url,
                 "extraction_time": asyncio.get_event_loop().time()
             }
             
             logger.debug(f"[{self.name}] : {len(content)} ")
+            if content and not fetched.get("no_store"):
+                await cache.store(url, "extract", result, fetched.get("etag"), fetched.get("last_modified"))
             return result
             
         except asyncio.TimeoutError:
@@ -117,19 +181,87 @@ class ContentExtractor:
             logger.error(f"[{self.name}]  {url}: {e}")
             return {"url": url, "title": "", "content": "", "error": str(e)}
     
+    async def _extract_document(self, url: str, fetched: Dict[str, Any]) -> Dict[str, Any]:
+        """Result for a fetched PDF/.docx (`fetched["document"]`), cached under `url` like a page."""
+        document = fetched["document"]
+        final_url = document.get("final_url") or fetched.get("final_url") or url
+        if document.get("error"):
+            logger.warning(f"[{self.name}] document {final_url}: {document['error']}")
+            return {"url": url, "title": "", "content": "", "error": document["error"]}
+
+        content = truncate_to_chars(document["content"], MAX_CONTENT_CHARS)
+        result = {
+            "url": url,
+            "title": document.get("title") or "",
+            "content": content,
+            "content_length": len(content),
+            "final_url": final_url,
+            "document_pages": document.get("pages", 0),
+            "document_truncated": bool(document.get("truncated")),
+            "extraction_time": asyncio.get_event_loop().time()
+        }
+        if not fetched.get("no_store"):
+            await get_page_cache().store(url, "extract", result, fetched.get("etag"), fetched.get("last_modified"))
+        return result
+
+    async def _fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """
+        GET a page over the shared session: status, content type, validators and
+        (for HTML-ish responses) the decoded body. `headers` make the request conditional.
+        A PDF/.docx (by URL, Content-Type or sniffed bytes) is read from the same
+        response and its extracted text returned as `document`.
+        """
+        health = get_domain_health()
+        seconds = min(self.timeout, await health.timeout_for(url))
+        documents = get_document_fetcher()
+        timeout = aiohttp.ClientTimeout(total=seconds)
+        if document_kind(url):
+            # a document link: give the download the document budget, reads still bounded per host
+            timeout = aiohttp.ClientTimeout(total=documents.timeout, sock_read=seconds)
+        download = None
+        scheduler = get_host_scheduler()
+        async with scheduler.slot(url):
+            started = time.monotonic()
+            try:
+                async with get_http_session().get(url, allow_redirects=True, timeout=timeout, headers=headers) as response:
+                    scheduler.observe(url, response.status, response.headers)
+                    content_type = response.headers.get('Content-Type', '').lower()
+                    final_url = str(response.url)
+                    fetched = {
+                        "status": response.status,
+                        "content_type": content_type,
+                        "final_url": final_url,
+                        "html": "",
+                        **response_validators(response.headers)
+                    }
+                    head = b""
+                    if response.status == 200 and document_kind(final_url, content_type):
+                        # read from this response: a second GET would cost another slot and health sample
+                        download = await documents.read(response, keep_other=True)
+                        if download.get("not_document"):
+                            # e.g. a .pdf URL serving an HTML landing page: read on as a page
+                            head, content_type, download = download["head"], download["content_type"], None
+                            fetched["content_type"] = content_type
+                    if response.status == 200 and download is None and not is_binary(content_type):
+                        # streamed: stops at the byte budget, on non-HTML bytes or once the text cap is covered
+                        read = await read_body(
+                            response, get_fetch_settings()["max_bytes"], text_chars=MAX_CONTENT_CHARS,
+                            keep_binary=True, head=head
+                        )
+                        fetched["content_type"] = read["content_type"]
+                        fetched["html"] = read["body"].decode(response.charset or "utf-8", errors="ignore")
+                        if read["stopped"] == "binary" and document_kind(final_url, read["content_type"]):
+                            # a document served as HTML: the rest of the same response
+                            download = await documents.read(response, head=read["head"])
+            except Exception as e:
+                await health.record_error(url, e, seconds)
+                raise
+        await health.record_response(url, fetched["status"], time.monotonic() - started)
+        if download is not None:
+            # parsed once the host slot is released
+            fetched["document"] = await documents.extract(download)
+        return fetched
+
     def _clean_text(self, text: str) -> str:
         """TODO: Add docstring."""
-        if not text:
-            return ""
-        
-        # 
-        text = re.sub(r'\s+', ' ', text)
-        
-        # 
-        text = re.sub(r'[^\w\s\u4e00-\u9fff.,!?;:()""''\\-]', '', text)
-        
-        # 
-        lines = text.split('\n')
-        cleaned_lines = [line.strip() for line in lines if len(line.strip()) > 10]
-        
-        return '\n'.join(cleaned_lines).strip()
\ No newline at end of file
+        return clean_text(text)
@@ -0,0 +1,361 @@
+"""
+Remote PDF and .docx ingestion.
+
+Result pages that are documents (policy papers, filings, annual reports)
+used to be skipped. :class:`DocumentFetcher` downloads them and extracts
+their text with the pypdf / python-docx readers of
+`src/utils/document_loader.py`:
+
+- the body is streamed under a byte cap (`max_bytes`); a Content-Length
+  above it is refused before any byte is read, since a cut-off PDF cannot
+  be parsed anyway;
+- the host's fetch slot is held for the download only, parsing happens
+  after it is released;
+- at most `max_pages` pages are read, split into jobs of `pages_per_job`
+  pages (no more jobs than pool workers, since every job parses the file's
+  cross-reference table again) that run in parallel in the extraction
+  pool; a PDF handed to worker processes is shared through a temporary
+  file rather than pickled into every job;
+- a caller that already holds an open response (the HTTP tier finding a
+  PDF behind an ordinary result URL) passes it to :meth:`read` and then
+  :meth:`extract`, instead of having the document requested a second time;
+  with `keep_other`, a response that is no document after all (a `.pdf`
+  URL serving an HTML landing page) is left open for the caller to read;
+- extracted text is cached by the SHA-256 of the document bytes
+  (`storage/cache/documents.sqlite3`), so the same file is parsed once
+  whatever URL it is served from.
+
+Legacy `.doc` files are not supported. Settings come from the DOCUMENT_*
+environment variables; like the other caches, the text cache is bypassed
+while a cassette records or replays.
+"""
+
+import asyncio
+import hashlib
+import math
+import os
+import tempfile
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+import aiohttp
+from loguru import logger
+
+from ..storage.disk_cache import DiskCache
+from ..utils.cassette import get_cassette
+from ..utils.document_loader import pdf_info, pdf_pages_text, read_docx
+from ..monitoring.metrics import metrics
+from .http_session import get_http_session
+from .host_scheduler import get_host_scheduler
+from .domain_health import get_domain_health
+from .extraction_pool import get_extraction_pool
+from .stream_reader import iter_chunks, sniff_content_type
+
+
+DAY = 24 * 3600
+
+DEFAULT_CACHE_DIR = "storage/cache"
+
+KIND_PDF = "pdf"
+KIND_DOCX = "docx"
+
+DOCX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+# content types that say nothing about the format; the URL suffix decides
+_GENERIC_TYPES = ("", "application/octet-stream", "binary/octet-stream", "application/zip", "application/x-download")
+
+
+def document_kind(url: str, content_type: str = "") -> Optional[str]:
+    """`pdf` or `docx` when the URL / (sniffed) content type is a supported document, else None."""
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type == "application/pdf":
+        return KIND_PDF
+    if content_type == DOCX_CONTENT_TYPE:
+        return KIND_DOCX
+    if content_type in _GENERIC_TYPES:
+        path = urlparse(url).path.lower()
+        if path.endswith(".pdf"):
+            return KIND_PDF
+        if path.endswith(".docx"):
+            return KIND_DOCX
+    return None
+
+
+def parse_docx(data: bytes) -> Dict[str, Any]:
+    """Title and text of a .docx document; runs in the extraction pool."""
+    title, text = read_docx(data)
+    return {"title": title, "content": text, "pages": 0, "total_pages": 0}
+
+
+def _spill(data: bytes) -> str:
+    """Write a document to a temporary file for the worker processes; returns its path."""
+    handle, path = tempfile.mkstemp(prefix="xunlong-", suffix=".pdf")
+    with os.fdopen(handle, "wb") as f:
+        f.write(data)
+    return path
+
+
+def _unlink(path: str):
+    try:
+        os.unlink(path)
+    except OSError as e:
+        logger.debug(f"[DocumentFetcher] cannot remove {path}: {e}")
+
+
+class DocumentFetcher:
+    """Streaming download and page-parallel text extraction of PDF and .docx files."""
+
+    def __init__(
+        self,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        max_bytes: int = 20 * 1024 * 1024,
+        max_pages: int = 40,
+        pages_per_job: int = 8,
+        timeout: float = 60.0,
+        ttl: float = 30 * DAY,
+        enabled: bool = True
+    ):
+        self.enabled = enabled
+        self.max_bytes = max_bytes
+        self.max_pages = max_pages
+        self.pages_per_job = max(1, pages_per_job)
+        self.timeout = timeout
+        self._store: Optional[DiskCache] = None
+
+        if enabled:
+            try:
+                self._store = DiskCache(
+                    os.path.join(cache_dir, "documents.sqlite3"),
+                    max_bytes=64 * 1024 * 1024,
+                    default_ttl=ttl,
+                    name="DocumentCache"
+                )
+            except Exception as e:
+                logger.warning(f"[DocumentFetcher] text cache disabled, cannot open store: {e}")
+
+    @property
+    def caching(self) -> bool:
+        """Text cache open and not bypassed by a recording/replaying cassette."""
+        return self._store is not None and not get_cassette().enabled
+
+    async def fetch(self, url: str) -> Dict[str, Any]:
+        """
+        Download a document and extract its text.
+
+        Returns:
+            `title`, `content`, `pages` (pages read), `total_pages`, `truncated`
+            (pages beyond `max_pages` skipped), `content_hash` and `final_url`;
+            on failure `error` (with `not_document` set when the URL turned
+            out to serve something else, e.g. an HTML landing page)
+        """
+        if not self.enabled:
+            return {"error": "document fetching disabled"}
+        # the extracted text is what gets recorded, not the document bytes
+        return await get_cassette().call("document", {"url": url}, lambda: self._fetch(url))
+
+    async def _fetch(self, url: str) -> Dict[str, Any]:
+        try:
+            download = await self._download(url)
+        except asyncio.TimeoutError:
+            return {"error": "timeout"}
+        except Exception as e:
+            logger.warning(f"[DocumentFetcher] download failed {url}: {e}")
+            return {"error": str(e)}
+        return await self.extract(download)
+
+    async def read(self, response, head: bytes = b"", keep_other: bool = False) -> Dict[str, Any]:
+        """
+        Stream an open 200 response under the byte cap. For callers that
+        already sent the request (and hold the host slot); `head` is a first
+        chunk they consumed already. Pass the result to :meth:`extract` once
+        the slot is released.
+
+        With `keep_other`, a body that is not a document is not closed: the
+        result has `not_document` set and the consumed first chunk as `head`,
+        for the caller to continue reading the response itself.
+        """
+        if not self.enabled:
+            response.close()
+            return {"error": "document fetching disabled"}
+        return {**self._describe(response), **await self._read(response, head, keep_other)}
+
+    async def extract(self, download: Dict[str, Any]) -> Dict[str, Any]:
+        """Text of a downloaded document; same result fields as :meth:`fetch`."""
+        if download.get("error"):
+            return download
+
+        data = download.pop("body")
+        download["bytes"] = len(data)
+        kind = document_kind(download["final_url"], download["content_type"])
+        if kind is None:
+            described = download["content_type"] or "unknown type"
+            return {**download, "error": f"not a PDF/DOCX document ({described})", "not_document": True}
+
+        digest = hashlib.sha256(data).hexdigest()
+        key = f"{digest}:{self.max_pages}"
+        parsed = await self._cached(key)
+        if parsed is not None:
+            metrics.incr("web.documents.cache_hits")
+        else:
+            try:
+                parsed = await self._parse(kind, data)
+            except Exception as e:
+                logger.warning(f"[DocumentFetcher] cannot read {kind} {download['final_url']}: {e}")
+                return {**download, "error": f"unreadable {kind}: {e}"}
+            if not parsed["content"]:
+                # scanned PDFs have no text layer
+                return {**download, "error": f"no extractable text in {kind}"}
+            await self._remember(key, parsed)
+
+        return {**download, **parsed, "kind": kind, "content_hash": digest}
+
+    @staticmethod
+    def _describe(response) -> Dict[str, Any]:
+        return {
+            "status": response.status,
+            "final_url": str(response.url),
+            "content_type": response.headers.get("Content-Type", "").lower(),
+        }
+
+    async def _download(self, url: str) -> Dict[str, Any]:
+        """Stream the body under the byte cap; the host slot is released on return."""
+        health = get_domain_health()
+        # per-read timeout adapts to the host, the whole download gets `timeout`
+        read_timeout = await health.timeout_for(url)
+        timeout = aiohttp.ClientTimeout(total=self.timeout, sock_read=read_timeout)
+        scheduler = get_host_scheduler()
+        async with scheduler.slot(url):
+            started = time.monotonic()
+            try:
+                async with get_http_session().get(url, allow_redirects=True, timeout=timeout) as response:
+                    scheduler.observe(url, response.status, response.headers)
+                    latency = time.monotonic() - started
+                    download = self._describe(response)
+                    if response.status != 200:
+                        download["error"] = f"HTTP {response.status}"
+                    else:
+                        download.update(await self._read(response))
+            except Exception as e:
+                await health.record_error(url, e, read_timeout)
+                raise
+        await health.record_response(url, download["status"], latency)
+        return download
+
+    async def _read(self, response, head: bytes = b"", keep_other: bool = False) -> Dict[str, Any]:
+        declared = response.content_length
+        if declared is not None and declared > self.max_bytes:
+            metrics.incr("web.documents.too_large")
+            response.close()
+            return {"error": f"document too large ({declared} bytes)"}
+
+        chunks = []
+        size = 0
+        content_type = None
+        async for chunk in iter_chunks(response, head):
+            if content_type is None:
+                content_type = sniff_content_type(chunk, response.headers.get("Content-Type", ""))
+                if document_kind(str(response.url), content_type) is None:
+                    # an HTML landing page or the like: not worth downloading here
+                    if keep_other:
+                        return {"content_type": content_type, "body": b"", "not_document": True, "head": chunk}
+                    response.close()
+                    return {"content_type": content_type, "body": b""}
+            size += len(chunk)
+            if size > self.max_bytes:
+                metrics.incr("web.documents.too_large")
+                response.close()
+                return {"error": f"document too large (over {self.max_bytes} bytes)"}
+            chunks.append(chunk)
+
+        metrics.incr("web.documents.fetched")
+        metrics.incr("web.bytes_downloaded", size)
+        return {"content_type": content_type or "", "body": b"".join(chunks)}
+
+    async def _parse(self, kind: str, data: bytes) -> Dict[str, Any]:
+        pool = get_extraction_pool()
+        if kind == KIND_DOCX:
+            return await pool.run(parse_docx, data, size=len(data))
+
+        # worker processes read the PDF from one file instead of each getting a pickled copy
+        pooled = pool.enabled and len(data) >= pool.min_bytes
+        path = await asyncio.to_thread(_spill, data) if pooled else None
+        source = path or data
+        try:
+            total_pages, title = await pool.run(pdf_info, source, size=len(data))
+            pages = min(total_pages, self.max_pages)
+            # every job re-parses the xref: no point in more jobs than workers
+            jobs = max(1, min(math.ceil(pages / self.pages_per_job), pool.workers))
+            per_job = max(1, math.ceil(pages / jobs))
+            ranges = [(start, min(start + per_job, pages)) for start in range(0, pages, per_job)]
+            # page ranges are parsed in parallel worker processes
+            chunks = await asyncio.gather(*(
+                pool.run(pdf_pages_text, source, start, end, size=len(data)) for start, end in ranges
+            ))
+        finally:
+            if path:
+                _unlink(path)
+        metrics.incr("web.documents.pages", pages)
+        if total_pages > pages:
+            metrics.incr("web.documents.truncated")
+            logger.debug(f"[DocumentFetcher] read {pages} of {total_pages} pages")
+        return {
+            "title": title,
+            "content": "\n\n".join(text for chunk in chunks for text in chunk),
+            "pages": pages,
+            "total_pages": total_pages,
+            "truncated": total_pages > pages,
+        }
+
+    async def _cached(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.caching:
+            return None
+        try:
+            return await asyncio.to_thread(self._store.get, key)
+        except Exception as e:
+            logger.warning(f"[DocumentFetcher] cache read failed: {e}")
+            return None
+
+    async def _remember(self, key: str, parsed: Dict[str, Any]):
+        if not self.caching:
+            return
+        try:
+            await asyncio.to_thread(self._store.set, key, parsed)
+        except Exception as e:
+            logger.warning(f"[DocumentFetcher] cache write failed: {e}")
+
+    def clear(self):
+        """Drop every cached document text."""
+        if self._store is not None:
+            self._store.clear()
+
+
+_document_fetcher: Optional[DocumentFetcher] = None
+
+
+def configure_document_fetcher(**kwargs) -> DocumentFetcher:
+    """(Re)build the shared fetcher from DOCUMENT_* env defaults overridden by kwargs."""
+    global _document_fetcher
+    settings = {
+        "enabled": os.getenv("DOCUMENT_FETCH_ENABLED", "true").lower() == "true",
+        "cache_dir": os.getenv("DOCUMENT_CACHE_DIR", DEFAULT_CACHE_DIR),
+        "max_bytes": int(os.getenv("DOCUMENT_MAX_BYTES", str(20 * 1024 * 1024))),
+        "max_pages": int(os.getenv("DOCUMENT_MAX_PAGES", "40")),
+        "pages_per_job": int(os.getenv("DOCUMENT_PAGES_PER_JOB", "8")),
+        "timeout": float(os.getenv("DOCUMENT_TIMEOUT", "60")),
+    }
+    settings.update({k: v for k, v in kwargs.items() if v is not None})
+    _document_fetcher = DocumentFetcher(**settings)
+    logger.info(
+        f"[DocumentFetcher] enabled={_document_fetcher.enabled}, max_bytes={_document_fetcher.max_bytes}, "
+        f"max_pages={_document_fetcher.max_pages}, pages_per_job={_document_fetcher.pages_per_job}"
+    )
+    return _document_fetcher
+
+
+def get_document_fetcher() -> DocumentFetcher:
+    """Process-wide document fetcher, created on first use."""
+    global _document_fetcher
+    if _document_fetcher is None:
+        _document_fetcher = configure_document_fetcher()
+    return _document_fetcher
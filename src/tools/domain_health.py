@@ -0,0 +1,257 @@
+"""
+Persisted health table of the hosts pages are fetched from.
+
+Page fetches (HTTP tier, browser tier, content extraction) report their
+outcome and latency per host. From the last `window` outcomes the table
+derives:
+
+- a cool-down: after `max_consecutive_failures` failures in a row, or a
+  failure rate of `failure_threshold` over at least `min_samples` fetches,
+  the host is skipped for `cool_down` seconds (doubling on every repeated
+  cool-down without a success in between, up to 8x);
+- a timeout: `timeout_factor` times the host's p95 latency, clamped to
+  `[min_timeout, max_timeout]`; hosts with fewer than `min_samples`
+  latencies get `max_timeout`.
+
+Timeouts, connection errors and block signals (401/403/429/503) are
+failures. A timed-out fetch is recorded with the timeout as its latency,
+so a timeout that was too tight widens again.
+
+Entries live in a DiskCache (`storage/cache/domain_health.sqlite3`) so
+known-bad hosts stay known across runs. Like the caches, the table is
+bypassed while a cassette records or replays.
+"""
+
+import asyncio
+import math
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from ..storage.disk_cache import DiskCache
+from ..utils.cassette import get_cassette
+from ..utils.url_utils import url_host
+from ..monitoring.metrics import metrics
+
+
+DAY = 24 * 3600
+
+DEFAULT_CACHE_DIR = "storage/cache"
+
+OUTCOME_OK = "ok"
+OUTCOME_TIMEOUT = "timeout"
+OUTCOME_ERROR = "error"
+OUTCOME_BLOCKED = "blocked"
+
+# statuses that mean the host is refusing us rather than missing a page
+BLOCK_STATUSES = {401, 403, 429, 503}
+
+MAX_COOL_DOWN_FACTOR = 8
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile (q in [0, 1]) of a list, None when empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def status_outcome(status: Optional[int]) -> str:
+    """Outcome of a fetch that got a response."""
+    return OUTCOME_BLOCKED if status in BLOCK_STATUSES else OUTCOME_OK
+
+
+def error_outcome(error: BaseException) -> str:
+    """Outcome of a fetch that raised (aiohttp and Playwright timeouts included)."""
+    if isinstance(error, asyncio.TimeoutError) or "Timeout" in type(error).__name__:
+        return OUTCOME_TIMEOUT
+    return OUTCOME_ERROR
+
+
+def _empty_record() -> Dict[str, Any]:
+    return {"outcomes": [], "latencies": [], "consecutive_failures": 0, "cool_until": 0.0, "cool_downs": 0}
+
+
+class DomainHealth:
+    """Per-host latency and failure history with cool-downs and adaptive timeouts."""
+
+    def __init__(
+        self,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        window: int = 20,
+        min_samples: int = 5,
+        failure_threshold: float = 0.8,
+        max_consecutive_failures: int = 3,
+        cool_down: float = 900.0,
+        min_timeout: float = 5.0,
+        max_timeout: float = 30.0,
+        timeout_factor: float = 4.0,
+        retention: float = 7 * DAY,
+        enabled: bool = True
+    ):
+        self.enabled = enabled
+        self.window = window
+        self.min_samples = min_samples
+        self.failure_threshold = failure_threshold
+        self.max_consecutive_failures = max_consecutive_failures
+        self.cool_down = cool_down
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_factor = timeout_factor
+        self.retention = retention
+        self._hosts: Dict[str, Dict[str, Any]] = {}
+        self._store: Optional[DiskCache] = None
+
+        if enabled:
+            try:
+                self._store = DiskCache(
+                    os.path.join(cache_dir, "domain_health.sqlite3"),
+                    max_bytes=8 * 1024 * 1024,
+                    default_ttl=retention,
+                    name="DomainHealth"
+                )
+            except Exception as e:
+                logger.warning(f"[DomainHealth] disabled, cannot open store: {e}")
+                self.enabled = False
+
+    @property
+    def active(self) -> bool:
+        """Enabled and not bypassed by a recording/replaying cassette."""
+        return self.enabled and self._store is not None and not get_cassette().enabled
+
+    async def _record_of(self, host: str) -> Dict[str, Any]:
+        record = self._hosts.get(host)
+        if record is None:
+            try:
+                record = await asyncio.to_thread(self._store.get, host)
+            except Exception as e:
+                logger.warning(f"[DomainHealth] read failed: {e}")
+            record = {**_empty_record(), **(record or {})}
+            self._hosts[host] = record
+        return record
+
+    async def cooling_down(self, url: str) -> float:
+        """Seconds left in the host's cool-down (0 when it may be fetched)."""
+        host = url_host(url)
+        if not self.active or not host:
+            return 0.0
+        record = await self._record_of(host)
+        return max(0.0, record["cool_until"] - time.time())
+
+    async def timeout_for(self, url: str) -> float:
+        """Fetch timeout for the host, derived from its observed latency."""
+        host = url_host(url)
+        if not self.active or not host:
+            return self.max_timeout
+        record = await self._record_of(host)
+        if len(record["latencies"]) < self.min_samples:
+            return self.max_timeout
+        p95 = percentile(record["latencies"], 0.95)
+        return min(self.max_timeout, max(self.min_timeout, p95 * self.timeout_factor))
+
+    async def record(self, url: str, outcome: str, latency: Optional[float] = None):
+        """Record one fetch; failures may start a cool-down."""
+        host = url_host(url)
+        if not self.active or not host:
+            return
+        record = await self._record_of(host)
+        failed = outcome != OUTCOME_OK
+
+        record["outcomes"] = (record["outcomes"] + [outcome])[-self.window:]
+        if latency is not None:
+            record["latencies"] = (record["latencies"] + [round(latency, 3)])[-self.window:]
+        if failed:
+            record["consecutive_failures"] += 1
+            metrics.incr(f"web.domain_health.{outcome}")
+        else:
+            record["consecutive_failures"] = 0
+            record["cool_downs"] = 0
+
+        if failed and self._unhealthy(record):
+            factor = min(2 ** record["cool_downs"], MAX_COOL_DOWN_FACTOR)
+            record["cool_until"] = time.time() + self.cool_down * factor
+            record["cool_downs"] += 1
+            # judged afresh once the cool-down is over
+            record["outcomes"] = []
+            record["consecutive_failures"] = 0
+            metrics.incr("web.domain_health.cool_downs")
+            logger.warning(f"[DomainHealth] {host} keeps failing ({outcome}), skipping it for {self.cool_down * factor:.0f}s")
+
+        try:
+            await asyncio.to_thread(self._store.set, host, record)
+        except Exception as e:
+            logger.warning(f"[DomainHealth] write failed: {e}")
+
+    async def record_response(self, url: str, status: Optional[int], latency: float):
+        """Record a fetch that got a response."""
+        await self.record(url, status_outcome(status), latency)
+
+    async def record_error(self, url: str, error: BaseException, timeout: float):
+        """Record a fetch that raised; a timeout counts as a sample of `timeout` seconds."""
+        outcome = error_outcome(error)
+        await self.record(url, outcome, timeout if outcome == OUTCOME_TIMEOUT else None)
+
+    def _unhealthy(self, record: Dict[str, Any]) -> bool:
+        if record["consecutive_failures"] >= self.max_consecutive_failures:
+            return True
+        outcomes = record["outcomes"]
+        if len(outcomes) < self.min_samples:
+            return False
+        failures = sum(1 for outcome in outcomes if outcome != OUTCOME_OK)
+        return failures / len(outcomes) >= self.failure_threshold
+
+    def get_status(self) -> Dict[str, Dict[str, Any]]:
+        """Latency percentiles, failure rate and cool-down of the hosts seen by this process."""
+        now = time.time()
+        status = {}
+        for host, record in self._hosts.items():
+            outcomes = record["outcomes"]
+            failures = sum(1 for outcome in outcomes if outcome != OUTCOME_OK)
+            status[host] = {
+                "p50": percentile(record["latencies"], 0.5),
+                "p95": percentile(record["latencies"], 0.95),
+                "failure_rate": round(failures / len(outcomes), 2) if outcomes else 0.0,
+                "cooling_down_for": round(max(0.0, record["cool_until"] - now), 1),
+            }
+        return status
+
+    def clear(self):
+        """Forget every host."""
+        self._hosts.clear()
+        if self._store is not None:
+            self._store.clear()
+
+
+_domain_health: Optional[DomainHealth] = None
+
+
+def configure_domain_health(**kwargs) -> DomainHealth:
+    """(Re)build the shared health table from DOMAIN_HEALTH_* env defaults overridden by kwargs."""
+    global _domain_health
+    settings = {
+        "enabled": os.getenv("DOMAIN_HEALTH_ENABLED", "true").lower() == "true",
+        "cache_dir": os.getenv("DOMAIN_HEALTH_DIR", DEFAULT_CACHE_DIR),
+        "cool_down": float(os.getenv("DOMAIN_HEALTH_COOL_DOWN", "900")),
+        "failure_threshold": float(os.getenv("DOMAIN_HEALTH_FAILURE_THRESHOLD", "0.8")),
+        "min_timeout": float(os.getenv("DOMAIN_HEALTH_MIN_TIMEOUT", "5")),
+        "max_timeout": float(os.getenv("DOMAIN_HEALTH_MAX_TIMEOUT", "30")),
+        "timeout_factor": float(os.getenv("DOMAIN_HEALTH_TIMEOUT_FACTOR", "4")),
+    }
+    settings.update({k: v for k, v in kwargs.items() if v is not None})
+    _domain_health = DomainHealth(**settings)
+    logger.info(
+        f"[DomainHealth] enabled={_domain_health.enabled}, dir={settings['cache_dir']}, "
+        f"cool_down={settings['cool_down']}s, timeouts {settings['min_timeout']}-{settings['max_timeout']}s"
+    )
+    return _domain_health
+
+
+def get_domain_health() -> DomainHealth:
+    """Process-wide health table, created on first use."""
+    global _domain_health
+    if _domain_health is None:
+        _domain_health = configure_domain_health()
+    return _domain_health
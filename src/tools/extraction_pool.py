@@ -0,0 +1,183 @@
+"""
+Off-event-loop HTML parsing.
+
+trafilatura and BeautifulSoup are CPU-bound; on a multi-megabyte page they
+hold the event loop for long enough to stall every other coroutine of the
+worker (fetches, LLM streaming). :meth:`ExtractionPool.run` sends parse
+jobs to a process pool instead:
+
+- jobs are top-level functions (picklable by reference) and their arguments;
+- at most `max_pending` jobs are submitted at once, further callers wait
+  their turn (a bounded queue, so a burst of huge pages cannot pile up
+  unbounded memory in the executor);
+- documents smaller than `min_bytes` are parsed inline, where the process
+  hop would cost more than the parse;
+- a broken pool (a worker died) is replaced, and the job runs in a thread;
+- workers start from a fork server (or are spawned where there is none)
+  rather than forked: a fork of a process running an event loop, open
+  sockets and browser pipes copies them into every worker.
+
+Every document's parse time is counted in the `extract.parse_seconds`,
+`extract.documents` and `extract.slow_documents` metrics; :meth:`stats`
+gives recent percentiles.
+
+Settings come from the EXTRACTION_POOL_* environment variables.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+import weakref
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from loguru import logger
+
+from ..monitoring.metrics import metrics
+from .domain_health import percentile
+
+
+# HTML parser for BeautifulSoup (lxml is a hard dependency, see requirements.txt)
+HTML_PARSER = "lxml"
+
+# how worker processes are started (EXTRACTION_POOL_START_METHOD overrides)
+DEFAULT_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+# parses slower than this are counted in extract.slow_documents
+SLOW_PARSE_SECONDS = 0.5
+
+
+def _timed(fn: Callable, *args) -> Tuple[Any, float]:
+    """Run a parse job and measure it (executes in the worker)."""
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+class ExtractionPool:
+    """Process pool for parse jobs with a bounded number of pending jobs."""
+
+    def __init__(
+        self,
+        workers: int = 0,
+        max_pending: int = 0,
+        min_bytes: int = 16 * 1024,
+        start_method: str = DEFAULT_START_METHOD,
+        enabled: bool = True
+    ):
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.max_pending = max_pending or self.workers * 4
+        self.min_bytes = min_bytes
+        self.start_method = start_method or DEFAULT_START_METHOD
+        self.enabled = enabled
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._recent = deque(maxlen=256)
+        self._counts = {"inline": 0, "offloaded": 0, "broken": 0}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            context = multiprocessing.get_context(self.start_method)
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+        return self._executor
+
+    def _slot(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        slot = self._slots.get(loop)
+        if slot is None:
+            slot = asyncio.Semaphore(self.max_pending)
+            self._slots[loop] = slot
+        return slot
+
+    async def run(self, fn: Callable, *args, size: int = 0) -> Any:
+        """
+        Result of `fn(*args)`, computed off the event loop when the document is large enough.
+
+        Args:
+            fn: top-level function (it is pickled by reference)
+            size: document size in bytes, decides between inline and pooled parsing
+        """
+        if not self.enabled or size < self.min_bytes:
+            result, seconds = _timed(fn, *args)
+            self._account(seconds, size, "inline")
+            return result
+
+        async with self._slot():
+            loop = asyncio.get_running_loop()
+            try:
+                result, seconds = await loop.run_in_executor(self._get_executor(), _timed, fn, *args)
+            except BrokenProcessPool as e:
+                logger.warning(f"[ExtractionPool] worker pool broke ({e}), restarting it")
+                self._counts["broken"] += 1
+                self.shutdown()
+                result, seconds = await asyncio.to_thread(_timed, fn, *args)
+        self._account(seconds, size, "offloaded")
+        return result
+
+    def _account(self, seconds: float, size: int, mode: str):
+        self._counts[mode] += 1
+        self._recent.append(seconds)
+        metrics.incr("extract.documents")
+        metrics.incr("extract.parse_seconds", seconds)
+        if seconds >= SLOW_PARSE_SECONDS:
+            metrics.incr("extract.slow_documents")
+            logger.debug(f"[ExtractionPool] slow parse: {size} bytes in {seconds:.2f}s ({mode})")
+
+    def stats(self) -> Dict[str, Any]:
+        """Parse counts and recent per-document parse times."""
+        recent = list(self._recent)
+        return {
+            **self._counts,
+            "workers": self.workers,
+            "p50_seconds": percentile(recent, 0.5),
+            "p95_seconds": percentile(recent, 0.95),
+        }
+
+    def shutdown(self):
+        """Stop the worker processes; the next job starts new ones."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_extraction_pool: Optional[ExtractionPool] = None
+
+
+def configure_extraction_pool(**kwargs) -> ExtractionPool:
+    """(Re)build the shared pool from EXTRACTION_POOL_* env defaults overridden by kwargs."""
+    global _extraction_pool
+    settings = {
+        "enabled": os.getenv("EXTRACTION_POOL_ENABLED", "true").lower() == "true",
+        "workers": int(os.getenv("EXTRACTION_POOL_WORKERS", "0")),
+        "max_pending": int(os.getenv("EXTRACTION_POOL_MAX_PENDING", "0")),
+        "min_bytes": int(os.getenv("EXTRACTION_POOL_MIN_BYTES", str(16 * 1024))),
+        "start_method": os.getenv("EXTRACTION_POOL_START_METHOD") or None,
+    }
+    settings.update({k: v for k, v in kwargs.items() if v is not None})
+    if _extraction_pool is not None:
+        _extraction_pool.shutdown()
+    _extraction_pool = ExtractionPool(**settings)
+    logger.info(
+        f"[ExtractionPool] enabled={_extraction_pool.enabled}, workers={_extraction_pool.workers}, "
+        f"max_pending={_extraction_pool.max_pending}, min_bytes={_extraction_pool.min_bytes}"
+    )
+    return _extraction_pool
+
+
+def get_extraction_pool() -> ExtractionPool:
+    """Process-wide extraction pool, created on first use."""
+    global _extraction_pool
+    if _extraction_pool is None:
+        _extraction_pool = configure_extraction_pool()
+    return _extraction_pool
+
+
+def shutdown_extraction_pool():
+    """Stop the shared pool's workers, if any."""
+    if _extraction_pool is not None:
+        _extraction_pool.shutdown()
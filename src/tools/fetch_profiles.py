@@ -0,0 +1,185 @@
+"""
+Resource-blocking profiles for pages rendered in the browser.
+
+Pages are rendered only to read their text (and, when images are wanted,
+the image candidates), so most subresources are wasted bytes and render
+time. A profile names the resource types to block, plus requests to known
+ad/tracker hosts:
+
+- `text`: images, media, fonts, text tracks and manifests are blocked;
+- `text+images`: images load (their decoded size decides which ones are
+  content images), media, fonts, text tracks and manifests do not;
+- `full`: nothing is blocked.
+
+Blocking goes through a CDP session (`Network.setBlockedURLs`), not
+`page.route`: Chromium bypasses its HTTP cache for intercepted requests,
+which would defeat the browser pool's disk cache. URL patterns cannot see
+resource types, so types are matched by file extension and tracker hosts
+by host. Where no CDP session can be opened (a non-Chromium browser) the
+profile falls back to `page.route`, which never blocks the main document.
+
+`WebSearcher` picks `text+images` when it extracts images and `text`
+otherwise; `BROWSER_FETCH_PROFILE` forces a profile. Extra tracker domains
+go in `BROWSER_FETCH_BLOCK_HOSTS="ads.example.com,stats.example.org"`.
+"""
+
+import os
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import FrozenSet, List, Optional
+
+from loguru import logger
+
+from ..utils.url_utils import host_matches, url_host
+from ..monitoring.metrics import metrics
+
+
+PROFILE_TEXT = "text"
+PROFILE_TEXT_IMAGES = "text+images"
+PROFILE_FULL = "full"
+
+# ad, analytics and tracking hosts (subdomains included)
+TRACKER_HOSTS = (
+    "doubleclick.net", "googlesyndication.com", "googleadservices.com", "google-analytics.com",
+    "googletagmanager.com", "googletagservices.com", "adservice.google.com", "facebook.net",
+    "scorecardresearch.com", "hotjar.com", "criteo.com", "criteo.net", "taboola.com", "outbrain.com",
+    "amazon-adsystem.com", "adnxs.com", "quantserve.com", "chartbeat.com", "newrelic.com",
+    "hm.baidu.com", "pos.baidu.com", "cpro.baidu.com", "cnzz.com", "mmstat.com", "tanx.com",
+)
+
+# file extensions standing in for resource types in URL patterns
+TYPE_EXTENSIONS = {
+    "image": ("png", "jpg", "jpeg", "gif", "webp", "avif", "bmp", "ico", "svg"),
+    "font": ("woff", "woff2", "ttf", "otf", "eot"),
+    "media": ("mp4", "webm", "mov", "m4a", "mp3", "ogg", "oga", "ogv", "wav", "flac", "m3u8", "mpd"),
+    "texttrack": ("vtt", "srt"),
+    "manifest": ("webmanifest",),
+}
+
+
+@dataclass(frozen=True)
+class FetchProfile:
+    """Resource types (and whether tracker hosts) to abort while rendering a page."""
+
+    name: str
+    blocked_types: FrozenSet[str] = frozenset()
+    block_trackers: bool = False
+
+    @property
+    def intercepts(self) -> bool:
+        """Whether the profile needs request interception at all."""
+        return bool(self.blocked_types) or self.block_trackers
+
+    def blocks(self, resource_type: str, url: str, tracker_hosts=TRACKER_HOSTS) -> bool:
+        """Whether a request of this type to this URL is aborted."""
+        if resource_type == "document":
+            return False
+        if resource_type in self.blocked_types:
+            return True
+        if self.block_trackers:
+            host = url_host(url)
+            return bool(host) and any(host_matches(host, domain) for domain in tracker_hosts)
+        return False
+
+    def url_patterns(self, tracker_hosts=TRACKER_HOSTS) -> List[str]:
+        """`Network.setBlockedURLs` wildcard patterns approximating `blocks()`."""
+        patterns = []
+        for resource_type in sorted(self.blocked_types):
+            for extension in TYPE_EXTENSIONS.get(resource_type, ()):
+                for suffix in (extension, extension.upper()):
+                    patterns += [f"*.{suffix}", f"*.{suffix}?*"]
+        if self.block_trackers:
+            for domain in tracker_hosts:
+                patterns += [f"*://{domain}/*", f"*://*.{domain}/*"]
+        return patterns
+
+
+_LIGHT_TYPES = frozenset({"media", "font", "texttrack", "manifest"})
+
+PROFILES = {
+    PROFILE_TEXT: FetchProfile(PROFILE_TEXT, _LIGHT_TYPES | {"image"}, block_trackers=True),
+    PROFILE_TEXT_IMAGES: FetchProfile(PROFILE_TEXT_IMAGES, _LIGHT_TYPES, block_trackers=True),
+    PROFILE_FULL: FetchProfile(PROFILE_FULL),
+}
+
+
+def tracker_hosts():
+    """Built-in tracker hosts plus BROWSER_FETCH_BLOCK_HOSTS."""
+    extra = [h.strip().lower() for h in os.getenv("BROWSER_FETCH_BLOCK_HOSTS", "").split(",") if h.strip()]
+    return TRACKER_HOSTS + tuple(extra)
+
+
+def profile_for(extract_images: bool) -> FetchProfile:
+    """Profile for a fetch: BROWSER_FETCH_PROFILE, else by whether images are extracted."""
+    name = os.getenv("BROWSER_FETCH_PROFILE", "").lower()
+    if name in PROFILES:
+        return PROFILES[name]
+    if name:
+        logger.warning(f"[FetchProfile] unknown profile {name!r}, choosing by image extraction")
+    return PROFILES[PROFILE_TEXT_IMAGES if extract_images else PROFILE_TEXT]
+
+
+async def apply_fetch_profile(page, profile: FetchProfile, hosts: Optional[tuple] = None):
+    """
+    Block the profile's requests on a page.
+
+    Returns:
+        The CDP session holding the blocklist, to detach when the lease ends
+        (None when nothing is blocked or the page was routed instead)
+    """
+    if not profile.intercepts:
+        return None
+    hosts = tracker_hosts() if hosts is None else hosts
+
+    try:
+        session = await page.context.new_cdp_session(page)
+        await session.send("Network.enable")
+        await session.send("Network.setBlockedURLs", {"urls": profile.url_patterns(hosts)})
+    except Exception as e:
+        logger.debug(f"[FetchProfile] no CDP session ({e}), routing requests instead")
+        await _route_fetch_profile(page, profile, hosts)
+        return None
+
+    def count_blocked(event):
+        if event.get("blockedReason") == "inspector":
+            metrics.incr("web.fetch_profile.blocked")
+
+    session.on("Network.loadingFailed", count_blocked)
+    return session
+
+
+async def _route_fetch_profile(page, profile: FetchProfile, hosts: tuple):
+    """Fallback: abort blocked requests through `page.route` (disables the HTTP cache)."""
+
+    async def handle(route):
+        request = route.request
+        try:
+            if profile.blocks(request.resource_type, request.url, hosts):
+                metrics.incr("web.fetch_profile.blocked")
+                await route.abort()
+            else:
+                await route.continue_()
+        except Exception as e:
+            # the page navigated away or closed while the request was pending
+            logger.debug(f"[FetchProfile] route failed for {request.url}: {e}")
+
+    await page.route("**/*", handle)
+
+
+@asynccontextmanager
+async def fetch_profile(page, profile: FetchProfile, hosts: Optional[tuple] = None):
+    """
+    Apply a profile for the duration of the block. The blocklist is dropped
+    on exit so a pooled page goes back unblocked; routes of the fallback are
+    dropped by the browser pool on release.
+    """
+    session = await apply_fetch_profile(page, profile, hosts)
+    try:
+        yield
+    finally:
+        if session is not None:
+            try:
+                await session.detach()
+            except Exception as e:
+                # the page crashed or closed during the lease
+                logger.debug(f"[FetchProfile] detach failed: {e}")
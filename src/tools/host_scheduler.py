@@ -0,0 +1,189 @@
+"""
+Per-host politeness for every outbound fetch.
+
+Page fetches (HTTP and browser), content extraction, image downloads and
+search engine requests all take a slot from one scheduler per event loop
+before touching a host. Each host gets:
+
+- a token bucket (`rate` requests per second, bursts of `burst`),
+- a cap on concurrent requests (`max_per_host`),
+- a pause after a 429/503: the Retry-After delay when the server sends
+  one (capped at `max_retry_after`), `throttle_pause` seconds otherwise.
+
+Hosts are keyed by `url_host()`, so `www.` variants share a limiter.
+Per-domain rates override the default (`HOST_SCHEDULER_DOMAIN_RATES`).
+"""
+
+import asyncio
+import os
+import time
+import weakref
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+from ..utils.token_bucket import TokenBucket
+from ..utils.url_utils import domain_lookup, parse_domain_values, url_host
+from ..monitoring.metrics import metrics
+
+
+THROTTLE_STATUSES = {429, 503}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+class HostLimiter:
+    """Rate, concurrency and back-off state of one host."""
+
+    def __init__(self, host: str, rate: float, burst: float, max_concurrent: int):
+        self.host = host
+        self.bucket = TokenBucket(rate, burst)
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.blocked_until = 0.0
+        self.stats = {"requests": 0, "throttled": 0, "wait_seconds": 0.0}
+
+    def block_for(self, seconds: float):
+        """Hold back new requests to this host."""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class HostScheduler:
+    """Hands out per-host request slots."""
+
+    def __init__(
+        self,
+        rate: float = 4.0,
+        burst: float = 8.0,
+        max_per_host: int = 6,
+        domain_rates: Optional[Dict[str, float]] = None,
+        max_retry_after: float = 60.0,
+        throttle_pause: float = 5.0,
+        enabled: bool = True
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.max_per_host = max_per_host
+        self.domain_rates = dict(domain_rates or {})
+        self.max_retry_after = max_retry_after
+        self.throttle_pause = throttle_pause
+        self.enabled = enabled
+        self._limiters: Dict[str, HostLimiter] = {}
+
+    def limiter(self, url: str) -> Optional[HostLimiter]:
+        """Limiter of the URL's host (None when disabled or the URL has no host)."""
+        host = url_host(url)
+        if not self.enabled or not host:
+            return None
+        limiter = self._limiters.get(host)
+        if limiter is None:
+            rate = domain_lookup(url, self.domain_rates, self.rate)
+            limiter = HostLimiter(host, rate, max(self.burst * rate / self.rate, 1.0), self.max_per_host)
+            self._limiters[host] = limiter
+        return limiter
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        """Wait for the host's back-off, rate and concurrency limits, then hold a slot."""
+        limiter = self.limiter(url)
+        if limiter is None:
+            yield
+            return
+
+        start = time.monotonic()
+        async with limiter.semaphore:
+            while True:
+                blocked = limiter.blocked_until - time.monotonic()
+                if blocked <= 0:
+                    break
+                await asyncio.sleep(blocked)
+            await limiter.bucket.acquire()
+
+            waited = time.monotonic() - start
+            limiter.stats["requests"] += 1
+            limiter.stats["wait_seconds"] += waited
+            if waited > 0.01:
+                metrics.incr("web.host_wait_seconds", waited)
+            yield
+
+    def observe(self, url: str, status: Optional[int], headers: Optional[Any] = None) -> Optional[float]:
+        """
+        Record a response. A 429/503 pauses the host for its Retry-After delay.
+
+        Returns:
+            the pause in seconds, or None when the response was not a throttle
+        """
+        limiter = self.limiter(url)
+        if limiter is None or status not in THROTTLE_STATUSES:
+            return None
+
+        value = (headers.get("retry-after") or headers.get("Retry-After")) if headers is not None else None
+        retry_after = parse_retry_after(value)
+        pause = min(retry_after if retry_after is not None else self.throttle_pause, self.max_retry_after)
+        limiter.block_for(pause)
+        limiter.stats["throttled"] += 1
+        metrics.incr("web.host_throttled")
+        logger.warning(f"[HostScheduler] {limiter.host} answered {status}, pausing it for {pause:.1f}s")
+        return pause
+
+    def get_status(self) -> Dict[str, Dict[str, Any]]:
+        """Counters of every host seen so far."""
+        now = time.monotonic()
+        return {
+            host: {
+                **limiter.stats,
+                "rate": limiter.bucket.rate,
+                "blocked_for": round(max(0.0, limiter.blocked_until - now), 2),
+            }
+            for host, limiter in self._limiters.items()
+        }
+
+
+_scheduler_settings: Dict[str, Any] = {}
+_schedulers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, HostScheduler]" = weakref.WeakKeyDictionary()
+
+
+def configure_host_scheduler(**kwargs):
+    """Override scheduler settings; schedulers created afterwards use them."""
+    _scheduler_settings.update({k: v for k, v in kwargs.items() if v is not None})
+    _schedulers.clear()
+    logger.info(f"[HostScheduler] settings: {get_host_scheduler_settings()}")
+
+
+def get_host_scheduler_settings() -> Dict[str, Any]:
+    """Effective settings: HOST_SCHEDULER_* env defaults overridden by configure_host_scheduler()."""
+    settings = {
+        "enabled": os.getenv("HOST_SCHEDULER_ENABLED", "true").lower() == "true",
+        "rate": float(os.getenv("HOST_SCHEDULER_RATE", "4")),
+        "burst": float(os.getenv("HOST_SCHEDULER_BURST", "8")),
+        "max_per_host": int(os.getenv("HOST_SCHEDULER_MAX_PER_HOST", "6")),
+        "domain_rates": parse_domain_values(os.getenv("HOST_SCHEDULER_DOMAIN_RATES", "")),
+        "max_retry_after": float(os.getenv("HOST_SCHEDULER_MAX_RETRY_AFTER", "60")),
+        "throttle_pause": float(os.getenv("HOST_SCHEDULER_THROTTLE_PAUSE", "5")),
+    }
+    settings.update(_scheduler_settings)
+    return settings
+
+
+def get_host_scheduler() -> HostScheduler:
+    """The scheduler of the running event loop (created on first use)."""
+    loop = asyncio.get_running_loop()
+    scheduler = _schedulers.get(loop)
+    if scheduler is None:
+        scheduler = HostScheduler(**get_host_scheduler_settings())
+        _schedulers[loop] = scheduler
+    return scheduler
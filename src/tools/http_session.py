@@ -0,0 +1,75 @@
+"""
+Process-wide aiohttp session for page and image fetching.
+
+One keep-alive connection pool per event loop (aiohttp sessions cannot
+cross loops), so repeated fetches from the same hosts reuse TCP/TLS
+connections and the DNS cache instead of opening a session per URL.
+
+Limits come from configure_http_session() or the WEB_HTTP_* environment
+variables.
+"""
+
+import asyncio
+import os
+import weakref
+from typing import Any, Dict
+
+import aiohttp
+from loguru import logger
+
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+_session_settings: Dict[str, Any] = {}
+_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = weakref.WeakKeyDictionary()
+
+
+def configure_http_session(**kwargs):
+    """Override session limits (max_connections, max_per_host, timeout, dns_ttl)."""
+    _session_settings.update({k: v for k, v in kwargs.items() if v is not None})
+    logger.info(f"[HTTPSession] settings: {get_http_session_settings()}")
+
+
+def get_http_session_settings() -> Dict[str, Any]:
+    """Effective session limits."""
+    settings = {
+        "max_connections": int(os.getenv("WEB_HTTP_MAX_CONNECTIONS", "100")),
+        "max_per_host": int(os.getenv("WEB_HTTP_MAX_PER_HOST", "8")),
+        "timeout": float(os.getenv("WEB_HTTP_TIMEOUT", "30")),
+        "dns_ttl": int(os.getenv("WEB_HTTP_DNS_TTL", "300")),
+    }
+    settings.update(_session_settings)
+    return settings
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """The shared session of the running event loop (created on first use)."""
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        settings = get_http_session_settings()
+        connector = aiohttp.TCPConnector(
+            limit=settings["max_connections"],
+            limit_per_host=settings["max_per_host"],
+            ttl_dns_cache=settings["dns_ttl"],
+        )
+        session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=settings["timeout"]),
+            headers=DEFAULT_HEADERS,
+        )
+        _sessions[loop] = session
+    return session
+
+
+async def close_http_session():
+    """Close the session of the running event loop, if any."""
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None and not session.closed:
+        await session.close()
@@ -14,11 +14,15 @@ import asyncio
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 from loguru import logger
-import httpx
 import aiofiles
 from PIL import Image
 import io
 
+from ..utils.cassette import get_cassette, encode_bytes, decode_bytes
+from ..monitoring.metrics import metrics
+from .http_session import get_http_session
+from .host_scheduler import get_host_scheduler
+
 
 class ImageDownloader:
     """TODO: Add docstring."""
@@ -95,14 +99,17 @@ class ImageDownloader:
                     }
 
                 # 
-                async with httpx.AsyncClient() as client:
-                    response = await client.get(url, timeout=30.0, follow_redirects=True)
-
-                    if response.status_code != 200:
-                        logger.warning(f"[{self.name}]  ({response.status_code}): {url}")
-                        return None
-
-                    image_data = response.content
+                image_data = await get_cassette().call(
+                    "image",
+                    {"url": url},
+                    lambda: self._fetch_image(url),
+                    encode=encode_bytes,
+                    decode=decode_bytes
+                )
+                if image_data is None:
+                    return None
+                metrics.incr("web.images_fetched")
+                metrics.incr("web.bytes_downloaded", len(image_data))
 
                 # 
                 if optimize:
@@ -126,6 +133,17 @@ class ImageDownloader:
                 logger.error(f"[{self.name}]  {url[:100]}: {e}")
                 return None
 
+    async def _fetch_image(self, url: str) -> Optional[bytes]:
+        """GET the image bytes over the shared session; None on a non-200 response."""
+        scheduler = get_host_scheduler()
+        async with scheduler.slot(url), get_http_session().get(url, allow_redirects=True) as response:
+            scheduler.observe(url, response.status, response.headers)
+            if response.status != 200:
+                logger.warning(f"[{self.name}]  ({response.status}): {url}")
+                return None
+
+            return await response.read()
+
     async def download_images(
         self,
         images: List[Dict[str, Any]],
@@ -0,0 +1,204 @@
+"""
+Persistent cache of fetched and extracted pages, keyed by canonical URL.
+
+Entries hold the extracted page (text, title, images, ...) together with
+the ETag/Last-Modified validators of the response. While fresh an entry is
+served as is; once stale the next fetch sends a conditional GET and the
+entry is reused when the server answers 304. Freshness comes from
+per-domain TTLs (encyclopedias live long, news sites short). Entries sit in
+a :class:`~src.storage.disk_cache.DiskCache` with a size cap and LRU
+eviction, and are dropped for good after `max_stale_seconds`.
+
+The cache is bypassed while a cassette records or replays, so cassettes
+always see the real fetches.
+"""
+
+import asyncio
+import hashlib
+import os
+import time
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+from ..storage.disk_cache import DiskCache
+from ..utils.cassette import get_cassette
+from ..utils.url_utils import canonical_url, domain_lookup, parse_domain_values
+from ..monitoring.metrics import metrics
+
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+DEFAULT_CACHE_DIR = "storage/cache"
+DEFAULT_TTL_SECONDS = DAY
+DEFAULT_MAX_STALE_SECONDS = 30 * DAY
+DEFAULT_MAX_MB = 512
+
+# freshness lifetime per domain (subdomains included; the most specific match wins)
+DEFAULT_DOMAIN_TTLS: Dict[str, float] = {
+    "wikipedia.org": 7 * DAY,
+    "baike.baidu.com": 7 * DAY,
+    "baike.sogou.com": 7 * DAY,
+    "arxiv.org": 30 * DAY,
+    "github.com": DAY,
+    "zhihu.com": DAY,
+    "news.sina.com.cn": HOUR,
+    "news.163.com": HOUR,
+    "news.qq.com": HOUR,
+    "thepaper.cn": HOUR,
+    "36kr.com": HOUR,
+    "reuters.com": HOUR,
+    "bbc.com": HOUR,
+    "cnn.com": HOUR,
+    "nytimes.com": HOUR,
+}
+
+
+def parse_domain_ttls(spec: str) -> Dict[str, float]:
+    """Parse `domain=seconds,domain=seconds` (PAGE_CACHE_DOMAIN_TTLS)."""
+    return parse_domain_values(spec)
+
+
+def conditional_headers(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """If-None-Match / If-Modified-Since headers for revalidating a cached entry."""
+    headers = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+class PageCache:
+    """DiskCache-backed page store with per-domain freshness and conditional revalidation."""
+
+    def __init__(
+        self,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        max_mb: float = DEFAULT_MAX_MB,
+        default_ttl: float = DEFAULT_TTL_SECONDS,
+        max_stale_seconds: float = DEFAULT_MAX_STALE_SECONDS,
+        domain_ttls: Optional[Dict[str, float]] = None,
+        enabled: bool = True
+    ):
+        self.enabled = enabled
+        self.default_ttl = default_ttl
+        self.max_stale_seconds = max_stale_seconds
+        self.domain_ttls = {**DEFAULT_DOMAIN_TTLS, **(domain_ttls or {})}
+        self._store: Optional[DiskCache] = None
+
+        if enabled:
+            try:
+                self._store = DiskCache(
+                    os.path.join(cache_dir, "pages.sqlite3"),
+                    max_bytes=int(max_mb * 1024 * 1024),
+                    default_ttl=max_stale_seconds,
+                    name="PageCache"
+                )
+            except Exception as e:
+                logger.warning(f"[PageCache] disabled, cannot open store: {e}")
+                self.enabled = False
+
+    @property
+    def active(self) -> bool:
+        """Enabled and not bypassed by a recording/replaying cassette."""
+        return self.enabled and self._store is not None and not get_cassette().enabled
+
+    def ttl_for(self, url: str) -> float:
+        """Freshness lifetime of a URL."""
+        return domain_lookup(url, self.domain_ttls, self.default_ttl)
+
+    @staticmethod
+    def _key(url: str, namespace: str) -> str:
+        return hashlib.sha256(f"{namespace}|{canonical_url(url)}".encode("utf-8")).hexdigest()
+
+    async def lookup(self, url: str, namespace: str) -> Optional[Dict[str, Any]]:
+        """
+        Cached entry of a URL: `data`, `etag`, `last_modified` and whether it is `fresh`.
+        Stale entries are returned too, for revalidation.
+        """
+        if not self.active:
+            return None
+        try:
+            entry = await asyncio.to_thread(self._store.get, self._key(url, namespace))
+        except Exception as e:
+            logger.warning(f"[PageCache] read failed: {e}")
+            return None
+        if entry is None:
+            metrics.incr("web.page_cache.misses")
+            return None
+        entry["fresh"] = entry.get("fresh_until", 0) > time.time()
+        return entry
+
+    async def store(
+        self,
+        url: str,
+        namespace: str,
+        data: Dict[str, Any],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ):
+        """Cache the extracted page and its validators."""
+        if not self.active:
+            return
+        now = time.time()
+        entry = {
+            "url": canonical_url(url),
+            "data": data,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": now,
+            "fresh_until": now + self.ttl_for(url),
+        }
+        try:
+            await asyncio.to_thread(self._store.set, self._key(url, namespace), entry)
+        except Exception as e:
+            logger.warning(f"[PageCache] write failed: {e}")
+
+    async def refresh(self, url: str, namespace: str, entry: Dict[str, Any]):
+        """Start a new freshness lifetime after a 304."""
+        await self.store(url, namespace, entry["data"], entry.get("etag"), entry.get("last_modified"))
+
+    def clear(self):
+        """Drop all cached pages."""
+        if self._store is not None:
+            self._store.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and size of the cache."""
+        if self._store is None:
+            return {"enabled": False, "hits": 0, "misses": 0}
+        return {"enabled": self.enabled, "default_ttl": self.default_ttl, **self._store.stats()}
+
+
+_page_cache: Optional[PageCache] = None
+
+
+def configure_page_cache(**kwargs) -> PageCache:
+    """(Re)build the shared page cache from PAGE_CACHE_* env defaults overridden by kwargs."""
+    global _page_cache
+    settings = {
+        "enabled": os.getenv("PAGE_CACHE_ENABLED", "true").lower() == "true",
+        "cache_dir": os.getenv("PAGE_CACHE_DIR", DEFAULT_CACHE_DIR),
+        "max_mb": float(os.getenv("PAGE_CACHE_MAX_MB", DEFAULT_MAX_MB)),
+        "default_ttl": float(os.getenv("PAGE_CACHE_TTL", DEFAULT_TTL_SECONDS)),
+        "max_stale_seconds": float(os.getenv("PAGE_CACHE_MAX_STALE", DEFAULT_MAX_STALE_SECONDS)),
+        "domain_ttls": parse_domain_ttls(os.getenv("PAGE_CACHE_DOMAIN_TTLS", "")),
+    }
+    settings.update({k: v for k, v in kwargs.items() if v is not None})
+    _page_cache = PageCache(**settings)
+    logger.info(
+        f"[PageCache] enabled={_page_cache.enabled}, dir={settings['cache_dir']}, "
+        f"ttl={settings['default_ttl']}s, max={settings['max_mb']}MB"
+    )
+    return _page_cache
+
+
+def get_page_cache() -> PageCache:
+    """Process-wide page cache, created on first use."""
+    global _page_cache
+    if _page_cache is None:
+        _page_cache = configure_page_cache()
+    return _page_cache
@@ -0,0 +1,197 @@
+"""
+In-page extraction for browser-rendered result pages.
+
+One injected script returns the main text, the title and the image
+candidates of a page in a single `page.evaluate` call, instead of one
+`query_selector` + `inner_text` round trip per main-content selector plus
+separate body and image evaluations.
+
+The script picks the selector with the longest text. The winner is
+remembered per domain (a selector recipe): later visits try it first and
+only scan every selector again when it no longer yields at least
+`FETCH_MIN_CHARS` characters. Recipes are kept in a DiskCache
+(`storage/cache/selector_recipes.sqlite3`).
+"""
+
+import asyncio
+import os
+from typing import Any, Dict, Optional
+from urllib.parse import urljoin
+
+from loguru import logger
+
+from ..storage.disk_cache import DiskCache
+from ..utils.url_utils import url_host
+from ..monitoring.metrics import metrics
+from .tiered_fetcher import MAIN_SELECTORS, MAX_IMAGES, MIN_IMAGE_SIZE, get_fetch_settings
+
+
+DEFAULT_CACHE_DIR = "storage/cache"
+
+EXTRACTION_SCRIPT = """
+({selectors, preferred, minChars, withImages, maxImages, minImageSize}) => {
+    const textOf = (selector) => {
+        try {
+            const element = document.querySelector(selector);
+            return element ? (element.innerText || '') : '';
+        } catch (e) {
+            return '';
+        }
+    };
+
+    let selector = null;
+    let text = '';
+    if (preferred) {
+        const candidate = textOf(preferred);
+        if (candidate.trim().length >= minChars) {
+            selector = preferred;
+            text = candidate;
+        }
+    }
+    if (selector === null) {
+        for (const candidateSelector of selectors) {
+            const candidate = textOf(candidateSelector);
+            if (candidate.length > text.length) {
+                selector = candidateSelector;
+                text = candidate;
+            }
+        }
+    }
+    if (!text && document.body) {
+        text = document.body.innerText || '';
+    }
+
+    let images = [];
+    if (withImages) {
+        images = Array.from(document.querySelectorAll('img'))
+            .map(img => ({
+                src: img.currentSrc || img.src || '',
+                alt: img.alt || '',
+                width: img.naturalWidth || img.width || 0,
+                height: img.naturalHeight || img.height || 0
+            }))
+            .filter(img => img.width >= minImageSize && img.height >= minImageSize)
+            .slice(0, maxImages);
+    }
+
+    return {title: document.title || '', text, selector, images};
+}
+"""
+
+
+class SelectorRecipes:
+    """Per-domain memory of the main-content selector that worked last time."""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, enabled: bool = True):
+        self.enabled = enabled
+        self._recipes: Dict[str, Optional[str]] = {}
+        self._store: Optional[DiskCache] = None
+
+        if enabled:
+            try:
+                self._store = DiskCache(
+                    os.path.join(cache_dir, "selector_recipes.sqlite3"),
+                    max_bytes=4 * 1024 * 1024,
+                    name="SelectorRecipes"
+                )
+            except Exception as e:
+                logger.warning(f"[SelectorRecipes] disabled, cannot open store: {e}")
+                self.enabled = False
+
+    async def preferred(self, url: str) -> Optional[str]:
+        """Selector that won on the URL's domain before, if any."""
+        host = url_host(url)
+        if not self.enabled or not host:
+            return None
+        if host not in self._recipes:
+            try:
+                entry = await asyncio.to_thread(self._store.get, host)
+            except Exception as e:
+                logger.warning(f"[SelectorRecipes] read failed: {e}")
+                entry = None
+            self._recipes[host] = entry["selector"] if entry else None
+        return self._recipes[host]
+
+    async def learn(self, url: str, preferred: Optional[str], selector: Optional[str]):
+        """Record the selector that won; nothing changes when the recipe held."""
+        host = url_host(url)
+        if not self.enabled or not host or not selector:
+            return
+        if selector == preferred:
+            metrics.incr("web.selector_recipe.hits")
+            return
+        self._recipes[host] = selector
+        metrics.incr("web.selector_recipe.learned")
+        try:
+            await asyncio.to_thread(self._store.set, host, {"selector": selector})
+        except Exception as e:
+            logger.warning(f"[SelectorRecipes] write failed: {e}")
+
+    def clear(self):
+        """Forget every recipe."""
+        self._recipes.clear()
+        if self._store is not None:
+            self._store.clear()
+
+
+_selector_recipes: Optional[SelectorRecipes] = None
+
+
+def configure_selector_recipes(**kwargs) -> SelectorRecipes:
+    """(Re)build the shared recipe store from SELECTOR_RECIPES_* env defaults overridden by kwargs."""
+    global _selector_recipes
+    settings = {
+        "enabled": os.getenv("SELECTOR_RECIPES_ENABLED", "true").lower() == "true",
+        "cache_dir": os.getenv("SELECTOR_RECIPES_DIR", DEFAULT_CACHE_DIR),
+    }
+    settings.update({k: v for k, v in kwargs.items() if v is not None})
+    _selector_recipes = SelectorRecipes(**settings)
+    return _selector_recipes
+
+
+def get_selector_recipes() -> SelectorRecipes:
+    """Process-wide recipe store, created on first use."""
+    global _selector_recipes
+    if _selector_recipes is None:
+        _selector_recipes = configure_selector_recipes()
+    return _selector_recipes
+
+
+async def extract_page(page, url: str, with_images: bool = True) -> Dict[str, Any]:
+    """
+    Title, main text and content images of a loaded page, in one evaluate call.
+
+    Returns:
+        `title`, `text`, `images` (url/alt/width/height, resolved against the
+        page URL) and the `selector` the text came from (None for the body fallback)
+    """
+    recipes = get_selector_recipes()
+    preferred = await recipes.preferred(url)
+    data = await page.evaluate(EXTRACTION_SCRIPT, {
+        "selectors": MAIN_SELECTORS,
+        "preferred": preferred,
+        "minChars": get_fetch_settings()["min_chars"],
+        "withImages": with_images,
+        "maxImages": MAX_IMAGES,
+        "minImageSize": MIN_IMAGE_SIZE,
+    })
+    await recipes.learn(url, preferred, data.get("selector"))
+
+    images = []
+    for image in data.get("images") or []:
+        src = image.get("src") or ""
+        if not src or src.startswith("data:"):
+            continue
+        images.append({
+            "url": urljoin(url, src),
+            "alt": image.get("alt", ""),
+            "width": image.get("width", 0),
+            "height": image.get("height", 0)
+        })
+
+    return {
+        "title": (data.get("title") or "").strip(),
+        "text": (data.get("text") or "").strip(),
+        "images": images,
+        "selector": data.get("selector"),
+    }
@@ -0,0 +1,173 @@
+"""
+Persistent cache of search engine result pages.
+
+Results are keyed by engine, normalised query, region and time filter and
+live for a time that depends on the filter: a `day` search goes stale
+within the hour, an unfiltered one lasts days. An entry fetched with
+`max_results=N` serves any request for up to N results. Entries sit in a
+:class:`~src.storage.disk_cache.DiskCache` with a size cap and LRU
+eviction; empty result lists (usually a blocked or failed search) are not
+stored.
+
+Like the page cache it is bypassed while a cassette records or replays.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from ..storage.disk_cache import DiskCache
+from ..utils.cassette import get_cassette
+from ..monitoring.metrics import metrics
+
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+DEFAULT_CACHE_DIR = "storage/cache"
+DEFAULT_MAX_MB = 64
+
+# lifetime per time filter; None is an unfiltered search
+DEFAULT_FILTER_TTLS: Dict[Optional[str], float] = {
+    "day": HOUR,
+    "week": 6 * HOUR,
+    "month": DAY,
+    "year": 3 * DAY,
+    None: 3 * DAY,
+}
+
+
+def normalize_query(query: str) -> str:
+    """Case-, width- and whitespace-insensitive form of a query."""
+    query = unicodedata.normalize("NFKC", query or "")
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+
+class SearchResultCache:
+    """DiskCache-backed SERP store with time-filter dependent TTLs."""
+
+    def __init__(
+        self,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        max_mb: float = DEFAULT_MAX_MB,
+        filter_ttls: Optional[Dict[Optional[str], float]] = None,
+        enabled: bool = True
+    ):
+        self.enabled = enabled
+        self.filter_ttls = {**DEFAULT_FILTER_TTLS, **(filter_ttls or {})}
+        self._store: Optional[DiskCache] = None
+
+        if enabled:
+            try:
+                self._store = DiskCache(
+                    os.path.join(cache_dir, "serp.sqlite3"),
+                    max_bytes=int(max_mb * 1024 * 1024),
+                    name="SerpCache"
+                )
+            except Exception as e:
+                logger.warning(f"[SerpCache] disabled, cannot open store: {e}")
+                self.enabled = False
+
+    @property
+    def active(self) -> bool:
+        """Enabled and not bypassed by a recording/replaying cassette."""
+        return self.enabled and self._store is not None and not get_cassette().enabled
+
+    def ttl_for(self, time_filter: Optional[str]) -> float:
+        """Lifetime of results for a time filter."""
+        key = time_filter.lower() if time_filter else None
+        return self.filter_ttls.get(key, self.filter_ttls[None])
+
+    @staticmethod
+    def make_key(engine: str, query: str, region: str, time_filter: Optional[str]) -> str:
+        """Stable key of a search, independent of the number of results requested."""
+        raw = json.dumps(
+            [engine, normalize_query(query), (region or "").lower(), (time_filter or "").lower()],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    async def get(
+        self,
+        engine: str,
+        query: str,
+        max_results: int,
+        region: str,
+        time_filter: Optional[str]
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Cached results, if an entry covering `max_results` is still fresh."""
+        if not self.active:
+            return None
+        try:
+            entry = await asyncio.to_thread(self._store.get, self.make_key(engine, query, region, time_filter))
+        except Exception as e:
+            logger.warning(f"[SerpCache] read failed: {e}")
+            return None
+        # an entry holding fewer results than asked for only counts if the engine had no more
+        if entry is None or (entry["max_results"] < max_results and len(entry["results"]) >= entry["max_results"]):
+            metrics.incr("web.serp_cache.misses")
+            return None
+        metrics.incr("web.serp_cache.hits")
+        return entry["results"][:max_results]
+
+    async def set(
+        self,
+        engine: str,
+        query: str,
+        max_results: int,
+        region: str,
+        time_filter: Optional[str],
+        results: List[Dict[str, Any]]
+    ):
+        """Store the results of a successful search."""
+        if not self.active or not results:
+            return
+        entry = {"query": query, "max_results": max_results, "results": results}
+        try:
+            await asyncio.to_thread(
+                self._store.set, self.make_key(engine, query, region, time_filter), entry, self.ttl_for(time_filter)
+            )
+        except Exception as e:
+            logger.warning(f"[SerpCache] write failed: {e}")
+
+    def clear(self):
+        """Drop all cached result pages."""
+        if self._store is not None:
+            self._store.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and size of the cache."""
+        if self._store is None:
+            return {"enabled": False, "hits": 0, "misses": 0}
+        return {"enabled": self.enabled, **self._store.stats()}
+
+
+_serp_cache: Optional[SearchResultCache] = None
+
+
+def configure_serp_cache(**kwargs) -> SearchResultCache:
+    """(Re)build the shared SERP cache from SERP_CACHE_* env defaults overridden by kwargs."""
+    global _serp_cache
+    settings = {
+        "enabled": os.getenv("SERP_CACHE_ENABLED", "true").lower() == "true",
+        "cache_dir": os.getenv("SERP_CACHE_DIR", DEFAULT_CACHE_DIR),
+        "max_mb": float(os.getenv("SERP_CACHE_MAX_MB", DEFAULT_MAX_MB)),
+    }
+    settings.update({k: v for k, v in kwargs.items() if v is not None})
+    _serp_cache = SearchResultCache(**settings)
+    logger.info(f"[SerpCache] enabled={_serp_cache.enabled}, dir={settings['cache_dir']}, max={settings['max_mb']}MB")
+    return _serp_cache
+
+
+def get_serp_cache() -> SearchResultCache:
+    """Process-wide SERP cache, created on first use."""
+    global _serp_cache
+    if _serp_cache is None:
+        _serp_cache = configure_serp_cache()
+    return _serp_cache
@@ -0,0 +1,184 @@
+"""
+Streaming response bodies with a byte budget and early termination.
+
+:func:`read_body` reads a response chunk by chunk instead of buffering it:
+
+- the first bytes are sniffed (`sniff_content_type`), so a PDF, archive or
+  image, even one served under a wrong or missing Content-Type, stops the
+  read at the first chunk instead of being downloaded in full;
+- HTML is fed to an incremental lxml parser that counts the text of
+  paragraph-like elements; once it holds `text_margin` times the character
+  cap the page will be truncated to anyway, the rest of the body is skipped;
+- nothing beyond `max_bytes` is read.
+
+Each chunk is parsed as it arrives, so the counting never holds the event
+loop for more than one chunk's worth of parsing.
+"""
+
+from typing import Any, Dict, Optional
+
+from loguru import logger
+from lxml import etree
+
+from ..monitoring.metrics import metrics
+
+
+CHUNK_SIZE = 64 * 1024
+
+# elements whose text counts as main text, and the shortest text that counts (menus, buttons)
+TEXT_TAGS = ("p", "li", "pre", "blockquote", "td", "h1", "h2", "h3", "h4", "dd")
+MIN_BLOCK_CHARS = 40
+
+# later extraction drops boilerplate, so collect more than the cap before stopping
+DEFAULT_TEXT_MARGIN = 1.5
+
+_SIGNATURES = (
+    (b"%PDF-", "application/pdf"),
+    (b"PK\x03\x04", "application/zip"),
+    (b"\xd0\xcf\x11\xe0", "application/msword"),
+    (b"\x89PNG", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF8", "image/gif"),
+    (b"\x1f\x8b", "application/gzip"),
+)
+_BINARY_PREFIXES = (
+    "application/pdf", "application/zip", "application/msword", "application/gzip",
+    "application/octet-stream", "application/vnd.openxmlformats-", "application/vnd.ms-",
+    "image/", "audio/", "video/",
+)
+_HTML_MARKERS = (b"<!doctype html", b"<html", b"<head", b"<body", b"<meta", b"<title", b"<div", b"<p>", b"<script")
+
+
+def _is_zip_container(content_type: str) -> bool:
+    return "officedocument" in content_type or content_type.endswith("+zip")
+
+
+def sniff_content_type(head: bytes, declared: str = "") -> str:
+    """
+    Content type judged from the first bytes of a body; the declared type
+    (lower-cased, parameters dropped) when the bytes do not say otherwise.
+    """
+    declared = (declared or "").split(";")[0].strip().lower()
+    for signature, content_type in _SIGNATURES:
+        if head.startswith(signature):
+            if content_type == "application/zip" and _is_zip_container(declared):
+                # .docx, .xlsx, .epub: zip files whose declared type is more specific
+                return declared
+            return content_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+
+    start = head[:1024].lstrip(b"\xef\xbb\xbf \t\r\n").lower()
+    if start.startswith(b"<?xml"):
+        return declared if "html" in declared or "xml" in declared else "application/xml"
+    if any(marker in start for marker in _HTML_MARKERS):
+        return "text/html"
+    return declared
+
+
+def is_html(content_type: str) -> bool:
+    """Whether a (sniffed) content type is parsed as a web page."""
+    return not content_type or "html" in content_type or "xml" in content_type
+
+
+def is_binary(content_type: str) -> bool:
+    """Whether a (sniffed) content type is a document, archive or media file rather than text."""
+    return content_type.startswith(_BINARY_PREFIXES)
+
+
+class TextCounter:
+    """Incremental HTML parse that tallies the characters of paragraph-like elements."""
+
+    def __init__(self):
+        self.chars = 0
+        self._parser = etree.HTMLPullParser(events=("end",), tag=TEXT_TAGS)
+
+    def feed(self, chunk: bytes) -> int:
+        """Parse one more chunk; returns the running character count."""
+        try:
+            self._parser.feed(chunk)
+            for _, element in self._parser.read_events():
+                text = " ".join("".join(element.itertext()).split())
+                if len(text) >= MIN_BLOCK_CHARS:
+                    self.chars += len(text)
+                # nested blocks are not counted twice, and the tree stays small
+                element.clear()
+        except etree.LxmlError as e:
+            logger.debug(f"[StreamReader] incremental parse failed: {e}")
+        return self.chars
+
+
+async def iter_chunks(response, head: bytes = b"", chunk_size: int = CHUNK_SIZE):
+    """Body chunks of a response, starting with a `head` chunk a reader consumed already."""
+    if head:
+        yield head
+    async for chunk in response.content.iter_chunked(chunk_size):
+        yield chunk
+
+
+async def read_body(
+    response,
+    max_bytes: int,
+    text_chars: Optional[int] = None,
+    text_margin: float = DEFAULT_TEXT_MARGIN,
+    chunk_size: int = CHUNK_SIZE,
+    keep_binary: bool = False,
+    head: bytes = b""
+) -> Dict[str, Any]:
+    """
+    Read an aiohttp response body within a byte budget.
+
+    Args:
+        response: response whose body has not been read yet
+        max_bytes: never read more than this
+        text_chars: character cap the page text will be cut to; None reads HTML to the budget
+        keep_binary: leave the response open on binary content, so the caller
+            can read the rest (starting with `head`)
+        head: first chunk of the body, already consumed by another reader
+
+    Returns:
+        `body` (bytes read; empty for binary content), `content_type` (sniffed), and
+        `stopped`: None when the whole body was read, otherwise `binary`,
+        `enough_text` or `max_bytes`; with `keep_binary`, `head` is the first chunk of
+        binary content
+    """
+    declared = response.headers.get("Content-Type", "")
+    chunks = []
+    size = 0
+    content_type = None
+    counter = TextCounter() if text_chars else None
+    stopped = None
+    binary_head = b""
+
+    async for chunk in iter_chunks(response, head, chunk_size):
+        if size + len(chunk) > max_bytes:
+            chunk = chunk[:max_bytes - size]
+            stopped = "max_bytes"
+        chunks.append(chunk)
+        size += len(chunk)
+
+        if content_type is None:
+            content_type = sniff_content_type(chunk, declared)
+            if is_binary(content_type):
+                stopped = "binary"
+                binary_head, chunks = chunk, []
+                break
+        if stopped:
+            break
+        if counter is not None and counter.feed(chunk) >= text_chars * text_margin:
+            stopped = "enough_text"
+            break
+
+    if stopped:
+        metrics.incr(f"web.body_read.stopped.{stopped}")
+        if not (stopped == "binary" and keep_binary):
+            # drop the connection rather than download the rest
+            response.close()
+    read = {
+        "body": b"".join(chunks),
+        "content_type": content_type if content_type is not None else sniff_content_type(b"", declared),
+        "stopped": stopped,
+    }
+    if keep_binary:
+        read["head"] = binary_head
+    return read
@@ -0,0 +1,295 @@
+"""
+HTTP-first page fetching for search result enrichment.
+
+Tier 1 is a GET over the shared aiohttp session plus static extraction
+(trafilatura, falling back to the main-content selectors). The page goes
+to tier 2, the headless browser, only when the static result is not good
+enough: blocked or non-HTML responses, JS-gated shells, or too little text.
+PDF and .docx results are handed to the document fetcher instead, which
+reads them from the tier-1 response rather than requesting them again.
+Every result records the tier that served it (`fetch_tier`) and, when it
+escalated, why (`escalation_reason`).
+
+Settings come from the FETCH_* environment variables.
+"""
+
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+import aiohttp
+import trafilatura
+from bs4 import BeautifulSoup
+from loguru import logger
+
+from .http_session import get_http_session
+from .host_scheduler import get_host_scheduler
+from .domain_health import get_domain_health
+from .extraction_pool import HTML_PARSER, get_extraction_pool
+from .stream_reader import is_html, read_body
+from .document_fetcher import document_kind, get_document_fetcher
+from ..monitoring.metrics import metrics
+from ..utils.tokens import truncate_to_chars
+
+
+TIER_HTTP = "http"
+TIER_BROWSER = "browser"
+
+# statuses that usually mean bot protection rather than a missing page
+ESCALATE_STATUSES = {401, 403, 429, 503}
+
+# markers of pages that only render with JavaScript
+JS_GATE_PATTERNS = [
+    re.compile(p, re.IGNORECASE) for p in (
+        r"enable javascript",
+        r"javascript is (?:disabled|required)",
+        r"please turn on javascript",
+        r"cf-browser-verification|challenge-platform|just a moment\.\.\.",
+        r"<div id=\"(?:root|app|__next)\">\s*</div>",
+    )
+]
+
+MAIN_SELECTORS = [
+    "article", "main", "[role='main']", ".content", ".article-content",
+    ".post-content", "#content", ".main-content",
+]
+
+MAX_IMAGES = 10
+MIN_IMAGE_SIZE = 200
+
+
+def get_fetch_settings() -> Dict[str, Any]:
+    """Effective tiering settings."""
+    return {
+        "http_first": os.getenv("FETCH_HTTP_FIRST", "true").lower() == "true",
+        "min_chars": int(os.getenv("FETCH_MIN_CHARS", "500")),
+        "max_bytes": int(os.getenv("FETCH_MAX_BYTES", str(5 * 1024 * 1024))),
+    }
+
+
+def extract_text(html: str) -> str:
+    """Main text of an HTML page: trafilatura first, then the largest main-content block."""
+    try:
+        text = trafilatura.extract(html, include_tables=True, include_comments=False)
+    except Exception as e:
+        logger.debug(f"[TieredFetcher] trafilatura failed: {e}")
+        text = None
+    if text and text.strip():
+        return text.strip()
+
+    soup = BeautifulSoup(html, HTML_PARSER)
+    for tag in soup(["script", "style", "nav", "header", "footer", "aside", "noscript"]):
+        tag.decompose()
+    best = ""
+    for selector in MAIN_SELECTORS:
+        element = soup.select_one(selector)
+        if element:
+            candidate = element.get_text("\n", strip=True)
+            if len(candidate) > len(best):
+                best = candidate
+    if not best and soup.body:
+        best = soup.body.get_text("\n", strip=True)
+    return best.strip()
+
+
+def parse_page(html: str, base_url: str, with_images: bool) -> Tuple[str, List[Dict[str, Any]]]:
+    """Main text and (optionally) content images of a page; runs in the extraction pool."""
+    text = extract_text(html) if html else ""
+    images = extract_images(html, base_url) if with_images and text else []
+    return text, images
+
+
+def _size(value: Any) -> Optional[int]:
+    match = re.match(r"\s*(\d+)", str(value or ""))
+    return int(match.group(1)) if match else None
+
+
+def extract_images(html: str, base_url: str) -> List[Dict[str, Any]]:
+    """
+    Content images of a static page, same shape as the browser extraction.
+
+    Without layout the natural size is unknown, so images are kept when
+    their width/height attributes are large enough or absent.
+    """
+    soup = BeautifulSoup(html, HTML_PARSER)
+    root = soup.find("article") or soup.find("main") or soup
+    images = []
+    seen = set()
+    for img in root.find_all("img"):
+        src = img.get("src") or img.get("data-src") or ""
+        if not src or src.startswith("data:"):
+            continue
+        width, height = _size(img.get("width")), _size(img.get("height"))
+        if (width is not None and width < MIN_IMAGE_SIZE) or (height is not None and height < MIN_IMAGE_SIZE):
+            continue
+        url = urljoin(base_url, src)
+        if url in seen:
+            continue
+        seen.add(url)
+        images.append({"url": url, "alt": img.get("alt", ""), "width": width or 0, "height": height or 0})
+        if len(images) >= MAX_IMAGES:
+            break
+    return images
+
+
+def response_validators(headers) -> Dict[str, Any]:
+    """ETag/Last-Modified of a response and whether it may be stored at all."""
+    headers = {k.lower(): v for k, v in headers.items()}
+    return {
+        "etag": headers.get("etag"),
+        "last_modified": headers.get("last-modified"),
+        "no_store": "no-store" in (headers.get("cache-control") or "").lower(),
+    }
+
+
+def escalation_reason(status: int, content_type: str, html: str, text: str, min_chars: int) -> Optional[str]:
+    """Why a static fetch is not good enough, or None when it is."""
+    if status in ESCALATE_STATUSES:
+        return f"http_{status}"
+    if status != 200:
+        return None
+    if content_type and "html" not in content_type and "xml" not in content_type:
+        return None
+    if not text:
+        return "empty"
+    if len(text) < min_chars:
+        head = html[:20000]
+        if any(pattern.search(head) for pattern in JS_GATE_PATTERNS):
+            return "js_gated"
+        return "thin"
+    return None
+
+
+class TieredFetcher:
+    """Tier-1 (plain HTTP) fetch and the decision to escalate to the browser."""
+
+    def __init__(self, max_chars: int = 10000):
+        self.max_chars = max_chars
+        self.settings = get_fetch_settings()
+        self.name = "TieredFetcher"
+
+    async def fetch_http(
+        self,
+        result: Dict[str, Any],
+        with_images: bool = True,
+        headers: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Fetch one search result over HTTP.
+
+        Returns the page fields (plus the response `validators`) on success.
+        Otherwise `escalate` is set (with `escalation_reason`) when the
+        browser may do better, or the result is a final failure
+        (`has_full_content` False, e.g. a 404). With conditional `headers`
+        a 304 returns `{"not_modified": True}`.
+        """
+        url = result.get("url", "")
+        health = get_domain_health()
+        timeout = await health.timeout_for(url)
+        documents = get_document_fetcher()
+        client_timeout = aiohttp.ClientTimeout(total=timeout)
+        if document_kind(url):
+            # a document link: give the download the document budget, reads still bounded per host
+            client_timeout = aiohttp.ClientTimeout(total=documents.timeout, sock_read=timeout)
+        started = None
+        download = None
+        try:
+            session = get_http_session()
+            scheduler = get_host_scheduler()
+            async with scheduler.slot(url):
+                started = time.monotonic()
+                async with session.get(
+                    url, allow_redirects=True, headers=headers, timeout=client_timeout
+                ) as response:
+                    status = response.status
+                    scheduler.observe(url, status, response.headers)
+                    if status == 304:
+                        await health.record_response(url, status, time.monotonic() - started)
+                        return {"not_modified": True}
+                    validators = response_validators(response.headers)
+                    content_type = response.headers.get("Content-Type", "").lower()
+                    body = b""
+                    if status == 200 and document_kind(str(response.url), content_type):
+                        # read from this response: a second GET would cost another slot and health sample
+                        download = await documents.read(response)
+                    elif status == 200 and is_html(content_type):
+                        # stops at the byte budget, on non-HTML bytes, or once the text cap is covered
+                        read = await read_body(
+                            response, self.settings["max_bytes"], text_chars=self.max_chars, keep_binary=True
+                        )
+                        body, content_type = read["body"], read["content_type"]
+                        if read["stopped"] == "binary" and document_kind(str(response.url), content_type):
+                            # a document served as HTML: the rest of the same response
+                            download = await documents.read(response, head=read["head"])
+                    charset = response.charset or "utf-8"
+                    final_url = str(response.url)
+        except Exception as e:
+            logger.debug(f"[{self.name}] HTTP fetch failed {url}: {e}")
+            if started is not None:
+                await health.record_error(url, e, timeout)
+            return {"escalate": True, "escalation_reason": "http_error", "fetch_error": str(e)}
+        await health.record_response(url, status, time.monotonic() - started)
+        if download is not None:
+            # parsed once the host slot is released
+            return self.document_page(result, await documents.extract(download), final_url)
+
+        try:
+            html = body.decode(charset, errors="ignore")
+        except LookupError:
+            html = body.decode("utf-8", errors="ignore")
+        # parsed off the event loop: multi-MB pages would stall every other coroutine
+        text, images = await get_extraction_pool().run(parse_page, html, final_url, with_images, size=len(body))
+        reason = escalation_reason(status, content_type, html, text, self.settings["min_chars"])
+        if reason:
+            return {"escalate": True, "escalation_reason": reason, "page_bytes": len(body)}
+        if status != 200 or not text:
+            # 404s, PDFs and the like: the browser would not do better
+            return {
+                "full_content": result.get("snippet", ""),
+                "images": [],
+                "has_full_content": False,
+                "fetch_error": f"HTTP {status}" if status != 200 else f"unsupported content type {content_type}",
+                "fetch_tier": TIER_HTTP,
+            }
+
+        return {
+            "full_content": truncate_to_chars(text, self.max_chars),
+            "images": images,
+            "has_full_content": True,
+            "image_count": len(images),
+            "page_bytes": len(body),
+            "fetch_tier": TIER_HTTP,
+            "final_url": final_url,
+            "validators": validators,
+        }
+
+    def document_page(self, result: Dict[str, Any], document: Dict[str, Any], url: str) -> Dict[str, Any]:
+        """Page fields of a result that is a PDF/.docx: its text, no images, never escalated."""
+        if document.get("error"):
+            return {
+                "full_content": result.get("snippet", ""),
+                "images": [],
+                "has_full_content": False,
+                "fetch_error": document["error"],
+                "fetch_tier": TIER_HTTP,
+            }
+        return {
+            "full_content": truncate_to_chars(document["content"], self.max_chars),
+            "images": [],
+            "has_full_content": True,
+            "image_count": 0,
+            "page_bytes": document.get("bytes", 0),
+            "fetch_tier": TIER_HTTP,
+            "final_url": document.get("final_url") or url,
+            "page_title": document.get("title", ""),
+        }
+
+    @staticmethod
+    def record(tier: str, reason: Optional[str] = None):
+        """Count which tier served a page and why pages escalated."""
+        metrics.incr(f"web.fetch_tier.{tier}")
+        if reason:
+            metrics.incr("web.escalations")
+            metrics.incr(f"web.escalation.{reason}")
@@ -0,0 +1,152 @@
+"""
+Registry of URL fetches within a task.
+
+Different queries and subtasks of one task keep returning the same pages.
+Fetch paths (WebSearcher page fetches, ContentExtractor) go through
+:meth:`UrlRegistry.fetch`: a URL already being fetched is awaited instead
+of fetched again, and a finished fetch is reused for the rest of the task.
+URLs are compared by :func:`fetch_key` (canonical URL without the scheme),
+and a result that names its redirect target in `final_url` is registered
+under that URL as well.
+
+Scope (`URL_REGISTRY_SCOPE`):
+
+- `task` (default): finished fetches are shared within the task bound by
+  `bind_task()`; outside a task only in-flight fetches are coalesced.
+- `process`: finished fetches are shared process-wide.
+- `off`: in-flight coalescing only.
+
+Entries expire after `URL_REGISTRY_TTL` seconds (default 600).
+"""
+
+import copy
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from loguru import logger
+
+from ..llm.singleflight import SingleFlight
+from ..monitoring.metrics import metrics, current_task_id
+from ..utils.url_utils import canonical_url
+
+
+PROCESS_SCOPE = "*"
+
+
+def fetch_key(url: str) -> str:
+    """Registry key of a URL: canonical form with http and https treated alike."""
+    canonical = canonical_url(url)
+    return canonical.split("://", 1)[-1]
+
+
+class UrlRegistry:
+    """In-flight coalescing plus a per-task memo of finished fetches."""
+
+    def __init__(self, scope: str = "task", ttl: float = 600.0, max_entries: int = 2048):
+        self.scope = scope
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._flight = SingleFlight("web.url_registry")
+        self._results: Dict[str, "OrderedDict[str, Tuple[float, Any]]"] = {}
+
+    def _scope_key(self) -> Optional[str]:
+        if self.scope == "process":
+            return PROCESS_SCOPE
+        if self.scope == "task":
+            return current_task_id()
+        return None
+
+    def _lookup(self, scope: Optional[str], key: str) -> Optional[Any]:
+        entries = self._results.get(scope) if scope is not None else None
+        if not entries or key not in entries:
+            return None
+        stored_at, result = entries[key]
+        if time.monotonic() - stored_at > self.ttl:
+            del entries[key]
+            return None
+        entries.move_to_end(key)
+        return result
+
+    def _remember(self, scope: str, key: str, result: Any):
+        entries = self._results.setdefault(scope, OrderedDict())
+        entries[key] = (time.monotonic(), result)
+        entries.move_to_end(key)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+    async def fetch(
+        self,
+        url: str,
+        namespace: str,
+        fn: Callable[[], Awaitable[Dict[str, Any]]],
+        keep: Optional[Callable[[Dict[str, Any]], bool]] = None
+    ) -> Dict[str, Any]:
+        """
+        Result of fetching `url`, shared with every other fetch of the same page.
+
+        Args:
+            url: page URL
+            namespace: kind of fetch (results of different kinds are not shared)
+            fn: performs the fetch
+            keep: whether a result may be reused once finished (default: always);
+                failures should not be, so a later attempt can retry
+        """
+        key = f"{namespace}|{fetch_key(url)}"
+        scope = self._scope_key()
+
+        cached = self._lookup(scope, key)
+        if cached is not None:
+            metrics.incr("web.url_registry.hits")
+            logger.debug(f"[UrlRegistry] reusing {namespace} fetch of {url}")
+            return copy.deepcopy(cached)
+
+        # in-flight fetches are coalesced within the scope (process-wide without one)
+        result = await self._flight.do(f"{scope or ''}|{key}", fn)
+
+        if scope is not None and (keep is None or keep(result)):
+            # callers may mutate what they got back, the memo keeps its own copy
+            stored = copy.deepcopy(result)
+            self._remember(scope, key, stored)
+            final_url = result.get("final_url") if isinstance(result, dict) else None
+            if final_url and fetch_key(final_url) != fetch_key(url):
+                self._remember(scope, f"{namespace}|{fetch_key(final_url)}", stored)
+        return result
+
+    def forget(self, scope: Optional[str]):
+        """Drop the finished fetches of a task (or of the process scope)."""
+        self._results.pop(scope if scope is not None else PROCESS_SCOPE, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Entries held per scope."""
+        return {
+            "scope": self.scope,
+            "in_flight": self._flight.in_flight(),
+            "entries": {scope: len(entries) for scope, entries in self._results.items()},
+        }
+
+
+_url_registry: Optional[UrlRegistry] = None
+
+
+def configure_url_registry(**kwargs) -> UrlRegistry:
+    """(Re)build the shared registry from URL_REGISTRY_* env defaults overridden by kwargs."""
+    global _url_registry
+    settings = {
+        "scope": os.getenv("URL_REGISTRY_SCOPE", "task").lower(),
+        "ttl": float(os.getenv("URL_REGISTRY_TTL", "600")),
+        "max_entries": int(os.getenv("URL_REGISTRY_MAX_ENTRIES", "2048")),
+    }
+    settings.update({k: v for k, v in kwargs.items() if v is not None})
+    _url_registry = UrlRegistry(**settings)
+    logger.info(f"[UrlRegistry] scope={settings['scope']}, ttl={settings['ttl']}s")
+    return _url_registry
+
+
+def get_url_registry() -> UrlRegistry:
+    """Process-wide registry, created on first use."""
+    global _url_registry
+    if _url_registry is None:
+        _url_registry = configure_url_registry()
+    return _url_registry
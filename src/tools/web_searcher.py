@@ -2,16 +2,46 @@
 Web - DuckDuckGo + MCP+ 
 """
 import asyncio
-from typing import List, Dict, Any, Optional
+import os
+import time
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 from loguru import logger
-from playwright.async_api import async_playwright
 import base64
 from pathlib import Path
 
 from ..searcher.duckduckgo import DuckDuckGoSearcher
+from ..searcher.duckduckgo_html import DuckDuckGoHTMLSearcher
 # from ..mcp.mcp_manager import get_mcp_manager  # MCP
 from ..utils.image_processor import ImageProcessor
 from .image_downloader import ImageDownloader
+from .browser_pool import get_browser_pool
+from .tiered_fetcher import TieredFetcher, TIER_HTTP, TIER_BROWSER, response_validators
+from .page_cache import get_page_cache, conditional_headers
+from .serp_cache import SearchResultCache, get_serp_cache
+from .host_scheduler import get_host_scheduler
+from .url_registry import get_url_registry
+from .domain_health import get_domain_health
+from .page_extraction import extract_page
+from .fetch_profiles import fetch_profile, profile_for
+from ..llm.singleflight import SingleFlight
+from ..utils.tokens import truncate_to_chars
+from ..utils.cassette import get_cassette
+from ..monitoring.metrics import metrics
+
+# text kept per page, in characters (as for MAX_CONTENT_CHARS in the content extractor)
+MAX_PAGE_CHARS = 10000
+
+# page fields produced by a fetch (recorded by the cassette; the rest comes from the search hit)
+PAGE_FIELDS = (
+    "full_content", "images", "has_full_content", "image_count", "fetch_error", "page_bytes",
+    "fetch_tier", "escalation_reason", "final_url", "page_title",
+)
+
+# host the browser searcher is scheduled under
+DUCKDUCKGO_URL = "https://duckduckgo.com/"
+
+_serp_flight = SingleFlight("web.serp")
+
 
 class WebSearcher:
     """Web - MCP + """
@@ -38,6 +68,9 @@ class WebSearcher:
                 - "none": 
         """
         self.duckduckgo_searcher = DuckDuckGoSearcher()
+        # static HTML endpoint by default; the browser searcher is the fallback
+        self.duckduckgo_html_searcher = DuckDuckGoHTMLSearcher()
+        self.serp_backend = os.getenv("SEARCH_DDG_BACKEND", "html").lower()
         # TODO: MCP
         # self.mcp_manager = get_mcp_manager()
         self.mcp_manager = None
@@ -46,6 +79,8 @@ class WebSearcher:
         self.extract_images = extract_images  # 
         self.image_insert_mode = image_insert_mode
         self.name = "Web"
+        # plain HTTP first, the browser only for pages that need it
+        self.tiered_fetcher = TieredFetcher(max_chars=MAX_PAGE_CHARS)
 
         # 
         if extract_images:
@@ -123,6 +158,71 @@ class WebSearcher:
             logger.error(f"[{self.name}] : {e}")
             return []
 
+    async def search_stream(
+        self,
+        query: str,
+        max_results: int = 10,
+        region: str = "cn-zh",
+        time_filter: Optional[str] = None
+    ) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Like :meth:`search`, but yields `(rank, result)` as soon as each page is ready
+        instead of waiting for the slowest one. Fetches still running when the
+        consumer stops iterating are cancelled.
+        """
+        search_results = await self._get_search_results(query, max_results, time_filter=time_filter, region=region)
+        if not search_results:
+            logger.warning(f"[{self.name}] ")
+            return
+
+        if not self.extract_content:
+            for rank, result in enumerate(search_results):
+                yield rank, result
+            return
+
+        pool = None if get_cassette().replaying else get_browser_pool()
+        tasks = [
+            asyncio.create_task(self._complete_result(pool, i, result, len(search_results)))
+            for i, result in enumerate(search_results)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _complete_result(
+        self,
+        pool,
+        index: int,
+        result: Dict[str, Any],
+        total: int
+    ) -> Tuple[int, Dict[str, Any]]:
+        """Fetch, download images for and image-enhance a single result."""
+        try:
+            page = await self._fetch_single_url(pool, index, result, total)
+        except Exception as e:
+            logger.error(f"[{self.name}]  {index+1} : {e}")
+            page = self._snippet_only(result, e)
+
+        if self.extract_images and self.image_downloader:
+            page = (await self._download_images_for_results([page]))[0]
+        if self.extract_images and self.image_insert_mode != "none":
+            page = ImageProcessor.enhance_search_results_with_images([page], mode=self.image_insert_mode)[0]
+        return index, page
+
+    @staticmethod
+    def _snippet_only(result: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+        """Result whose page could not be fetched: the snippet stands in for the content."""
+        return {
+            **result,
+            "full_content": result.get("snippet", ""),
+            "images": [],
+            "has_full_content": False,
+            "fetch_error": str(error)
+        }
+
     async def _get_search_results(
         self,
         query: str,
@@ -160,8 +260,22 @@ class WebSearcher:
         #         logger.error(f"[{self.name}] MCP: {e}")
         #         logger.info(f"[{self.name}] DuckDuckGo")
 
-        # DuckDuckGo
-        return await self._search_duckduckgo(query, max_results, time_filter=time_filter, region=region)
+        serp_cache = get_serp_cache()
+        cached = await serp_cache.get("duckduckgo", query, max_results, region, time_filter)
+        if cached is not None:
+            logger.info(f"[{self.name}] SERP cache hit: {query}")
+            return cached
+
+        # DuckDuckGo; concurrent identical searches share one request
+        flight_key = f"{SearchResultCache.make_key('duckduckgo', query, region, time_filter)}:{max_results}"
+        results = await _serp_flight.do(flight_key, lambda: get_cassette().call(
+            "search",
+            {"engine": "duckduckgo", "query": query, "max_results": max_results,
+             "time_filter": time_filter, "region": region},
+            lambda: self._search_duckduckgo(query, max_results, time_filter=time_filter, region=region)
+        ))
+        await serp_cache.set("duckduckgo", query, max_results, region, time_filter, results)
+        return results
 
     async def _search_duckduckgo(
         self,
@@ -183,50 +297,39 @@ class WebSearcher:
         try:
             logger.info(f"[{self.name}] DuckDuckGo")
 
-            # 
-            self.duckduckgo_searcher.topk = max_results
-
-            # Playwright
-            async with async_playwright() as p:
-                #  - 
-                browser = await p.chromium.launch(
-                    headless=False,  # 
-                    args=[
-                        '--no-sandbox',
-                        '--disable-setuid-sandbox'
-                    ]
-                )
-
+            search_results = None
+            if self.serp_backend == "html":
                 try:
-                    # 
-                    page = await browser.new_page()
+                    search_results = await self.duckduckgo_html_searcher.search(
+                        None, query, time_filter=time_filter, region=region, topk=max_results
+                    )
+                    metrics.incr("web.serp_backend.html")
+                except Exception as e:
+                    logger.warning(f"[{self.name}] DuckDuckGo HTML endpoint failed, using the browser: {e}")
+                    metrics.incr("web.serp_backend.fallbacks")
+
+            if search_results is None:
+                # leased from the shared headless browser
+                async with get_browser_pool().page() as page:
+                    async with get_host_scheduler().slot(DUCKDUCKGO_URL):
+                        search_results = await self.duckduckgo_searcher.search(
+                            page, query, time_filter=time_filter, region=region, topk=max_results
+                        )
+                metrics.incr("web.serp_backend.browser")
 
-                    # 
-                    await page.set_extra_http_headers({
-                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
-                                     '(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                    })
+            # 
+            formatted_results = []
+            for result in search_results:
+                formatted_result = {
+                    "title": result.title,
+                    "url": result.url,
+                    "snippet": result.snippet or "",
+                    "source": "duckduckgo"
+                }
+                formatted_results.append(formatted_result)
 
-                    # 
-                    search_results = await self.duckduckgo_searcher.search(page, query, time_filter=time_filter, region=region)
-
-                    # 
-                    formatted_results = []
-                    for result in search_results:
-                        formatted_result = {
-                            "title": result.title,
-                            "url": result.url,
-                            "snippet": result.snippet or "",
-                            "source": "duckduckgo"
-                        }
-                        formatted_results.append(formatted_result)
-
-                    logger.info(f"[{self.name}] DuckDuckGo {len(formatted_results)} ")
-                    return formatted_results
-
-                finally:
-                    # 
-                    await browser.close()
+            logger.info(f"[{self.name}] DuckDuckGo {len(formatted_results)} ")
+            return formatted_results
 
         except Exception as e:
             logger.error(f"[{self.name}] DuckDuckGo: {e}")
@@ -245,51 +348,43 @@ class WebSearcher:
         Returns:
             
         """
-        async with async_playwright() as p:
-            # 
-            browser = await p.chromium.launch(
-                headless=True,  # 
-                args=[
-                    '--no-sandbox',
-                    '--disable-setuid-sandbox',
-                    '--disable-dev-shm-usage'
-                ]
-            )
+        if get_cassette().replaying:
+            # every page comes from the cassette, no browser needed
+            return await self._fetch_all(None, search_results)
 
-            try:
-                # URL
-                logger.info(f"[{self.name}]  {len(search_results)} URL...")
-                tasks = [
-                    self._fetch_single_url(browser, i, result, len(search_results))
-                    for i, result in enumerate(search_results)
-                ]
+        # pages are leased from the shared browser, which also caps concurrency
+        return await self._fetch_all(get_browser_pool(), search_results)
+
+    async def _fetch_all(
+        self,
+        pool,
+        search_results: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Fetch every result page concurrently; failed fetches fall back to the snippet."""
+        # URL
+        logger.info(f"[{self.name}]  {len(search_results)} URL...")
+        tasks = [
+            self._fetch_single_url(pool, i, result, len(search_results))
+            for i, result in enumerate(search_results)
+        ]
 
-                enriched_results = await asyncio.gather(*tasks, return_exceptions=True)
+        enriched_results = await asyncio.gather(*tasks, return_exceptions=True)
 
-                # 
-                final_results = []
-                for i, result in enumerate(enriched_results):
-                    if isinstance(result, Exception):
-                        logger.error(f"[{self.name}]  {i+1} : {result}")
-                        final_results.append({
-                            **search_results[i],
-                            "full_content": search_results[i].get("snippet", ""),
-                            "images": [],
-                            "has_full_content": False,
-                            "fetch_error": str(result)
-                        })
-                    else:
-                        final_results.append(result)
-
-                logger.info(f"[{self.name}] ")
-                return final_results
-
-            finally:
-                await browser.close()
+        # 
+        final_results = []
+        for i, result in enumerate(enriched_results):
+            if isinstance(result, Exception):
+                logger.error(f"[{self.name}]  {i+1} : {result}")
+                final_results.append(self._snippet_only(search_results[i], result))
+            else:
+                final_results.append(result)
+
+        logger.info(f"[{self.name}] ")
+        return final_results
 
     async def _fetch_single_url(
         self,
-        browser,
+        pool,
         index: int,
         result: Dict[str, Any],
         total: int
@@ -298,7 +393,7 @@ class WebSearcher:
         URL
 
         Args:
-            browser: 
+            pool: BrowserPool (None when replaying)
             index: 
             result: 
             total: 
@@ -310,31 +405,139 @@ class WebSearcher:
         if not url:
             return result
 
+        # other queries/subtasks of the task may be fetching (or have fetched) the same page
+        namespace = "web_page+images" if self.extract_images else "web_page"
+        fields = await get_url_registry().fetch(
+            url,
+            namespace,
+            lambda: self._fetch_page_fields(pool, index, result, total, namespace),
+            keep=lambda f: bool(f.get("has_full_content"))
+        )
+        page = {**result, **fields}
+        if not page.get("title") and fields.get("page_title"):
+            page["title"] = fields["page_title"]
+        return page
+
+    async def _fetch_page_fields(
+        self,
+        pool,
+        index: int,
+        result: Dict[str, Any],
+        total: int,
+        namespace: str
+    ) -> Dict[str, Any]:
+        """Page fields of one result: from the page cache when fresh or revalidated, live otherwise."""
+        url = result["url"]
+        cache = get_page_cache()
+        cached = await cache.lookup(url, namespace)
+        if cached and cached["fresh"]:
+            metrics.incr("web.page_cache.hits")
+            return dict(cached["data"])
+
+        # checked outside the cassette call, so a skipped page is never recorded as the page
+        cooling = await get_domain_health().cooling_down(url)
+        if cooling:
+            metrics.incr("web.domain_health.skipped")
+            logger.info(f"[{self.name}]  ({index+1}/{total}) host cooling down for {cooling:.0f}s: {url}")
+            skipped = self._snippet_only(result, f"host cooling down ({cooling:.0f}s left)")
+            return {k: v for k, v in skipped.items() if k in PAGE_FIELDS}
+
+        page_data = await get_cassette().call(
+            "page",
+            {"url": url, "images": self.extract_images},
+            lambda: self._fetch_page_live(pool, index, result, total, conditional_headers(cached)),
+            encode=lambda r: {k: r[k] for k in PAGE_FIELDS if k in r}
+        )
+        if page_data.get("not_modified") and cached:
+            metrics.incr("web.page_cache.revalidated")
+            await cache.refresh(url, namespace, cached)
+            return dict(cached["data"])
+
+        fields = {k: v for k, v in page_data.items() if k in PAGE_FIELDS}
+        if page_data.get("has_full_content"):
+            metrics.incr("web.pages_fetched")
+            metrics.incr("web.bytes_downloaded", page_data.get("page_bytes") or 0)
+            validators = page_data.get("validators") or {}
+            if not validators.get("no_store"):
+                await cache.store(url, namespace, fields, validators.get("etag"), validators.get("last_modified"))
+        return fields
+
+    async def _fetch_page_live(
+        self,
+        pool,
+        index: int,
+        result: Dict[str, Any],
+        total: int,
+        headers: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Fetch one page over HTTP, escalating to the browser when the static result is not usable.
+        `headers` makes the HTTP request conditional (a cached copy exists).
+        """
+        reason = None
+        if self.tiered_fetcher.settings["http_first"]:
+            page_data = await self.tiered_fetcher.fetch_http(result, with_images=self.extract_images, headers=headers)
+            if page_data.get("not_modified"):
+                return page_data
+            if not page_data.get("escalate"):
+                TieredFetcher.record(TIER_HTTP)
+                logger.info(
+                    f"[{self.name}]  ({index+1}/{total}) [http]: {len(page_data.get('full_content', ''))} , "
+                    f"{page_data.get('image_count', 0)} "
+                )
+                return {**result, **page_data}
+            reason = page_data["escalation_reason"]
+            logger.info(f"[{self.name}]  ({index+1}/{total}) escalating to browser ({reason}): {result.get('url', '')}")
+
+        page_data = await self._fetch_page_with_browser(pool, index, result, total)
+        TieredFetcher.record(TIER_BROWSER, reason)
+        page_data["fetch_tier"] = TIER_BROWSER
+        if reason:
+            page_data["escalation_reason"] = reason
+        return page_data
+
+    async def _fetch_page_with_browser(
+        self,
+        pool,
+        index: int,
+        result: Dict[str, Any],
+        total: int
+    ) -> Dict[str, Any]:
+        """Load one page in the browser and extract its text and images."""
+        url = result.get("url", "")
         logger.info(f"[{self.name}]  ({index+1}/{total}): {url}")
 
         try:
-            # 
-            page = await browser.new_page()
-
-            # 
-            page.set_default_timeout(30000)  # 30
-
-            # 
-            await page.goto(url, wait_until="domcontentloaded")
-
-            # 
-            await page.wait_for_timeout(1500)  # 1.5
-
-            # 
-            full_content = await self._extract_content_from_page(page)
+            # skip the subresources extraction does not need
+            async with pool.page() as page, fetch_profile(page, profile_for(self.extract_images)):
+                scheduler = get_host_scheduler()
+                health = get_domain_health()
+                timeout = await health.timeout_for(url)
+                async with scheduler.slot(url):
+                    started = time.monotonic()
+                    try:
+                        response = await page.goto(url, wait_until="domcontentloaded", timeout=timeout * 1000)
+                    except Exception as e:
+                        await health.record_error(url, e, timeout)
+                        raise
+                status = response.status if response is not None else None
+                await health.record_response(url, status, time.monotonic() - started)
+                page_bytes = 0
+                if response is not None:
+                    scheduler.observe(url, response.status, response.headers)
+                    try:
+                        page_bytes = len(await response.body())
+                    except Exception:
+                        pass
 
-            # 
-            images = []
-            if self.extract_images:
-                images = await self._extract_images_from_page(page, url)
+                # 
+                await page.wait_for_timeout(1500)  # 1.5
 
-            # 
-            await page.close()
+                # text, title and images in a single round trip
+                extracted = await self._extract_from_page(page, url)
+                full_content = extracted["text"]
+                images = extracted["images"]
+                final_url = page.url
 
             logger.info(f"[{self.name}]  ({index+1}/{total}): {len(full_content)} , {len(images)} ")
 
@@ -344,7 +547,11 @@ class WebSearcher:
                 "full_content": full_content,
                 "images": images,
                 "has_full_content": True,
-                "image_count": len(images)
+                "image_count": len(images),
+                "page_bytes": page_bytes,
+                "final_url": final_url,
+                "page_title": extracted["title"],
+                "validators": response_validators(response.headers) if response is not None else {}
             }
 
         except Exception as e:
@@ -358,122 +565,15 @@ class WebSearcher:
                 "fetch_error": str(e)
             }
 
-    async def _extract_content_from_page(self, page) -> str:
-        """
-        
-
-        Args:
-            page: Playwright
-
-        Returns:
-            
-        """
+    async def _extract_from_page(self, page, url: str) -> Dict[str, Any]:
+        """Main text, title and images of a loaded page (one in-page evaluation)."""
         try:
-            # 
-            content_selectors = [
-                "article",
-                "main",
-                "[role='main']",
-                ".content",
-                ".article-content",
-                ".post-content",
-                "#content",
-                ".main-content"
-            ]
-
-            content = ""
-
-            # 
-            for selector in content_selectors:
-                try:
-                    element = await page.query_selector(selector)
-                    if element:
-                        text = await element.inner_text()
-                        if len(text) > len(content):
-                            content = text
-                except:
-                    continue
-
-            # body
-            if not content:
-                try:
-                    content = await page.evaluate("document.body.innerText")
-                except:
-                    content = ""
-
-            # 
-            content = content.strip()
-
-            # 
-            if len(content) > 10000:
-                content = content[:10000] + "..."
-
-            return content
-
+            extracted = await extract_page(page, url, with_images=self.extract_images)
         except Exception as e:
             logger.error(f"[{self.name}] : {e}")
-            return ""
-
-    async def _extract_images_from_page(self, page, base_url: str) -> List[Dict[str, Any]]:
-        """
-        
-
-        Args:
-            page: Playwright
-            base_url: URL
-
-        Returns:
-            url, alt, width, height
-        """
-        try:
-            # 
-            images_data = await page.evaluate("""
-                () => {
-                    const images = Array.from(document.querySelectorAll('img'));
-                    return images
-                        .filter(img => {
-                            // 
-                            const width = img.naturalWidth || img.width;
-                            const height = img.naturalHeight || img.height;
-                            return width >= 200 && height >= 200;  // 
-                        })
-                        .map(img => ({
-                            src: img.src,
-                            alt: img.alt || '',
-                            width: img.naturalWidth || img.width,
-                            height: img.naturalHeight || img.height
-                        }))
-                        .slice(0, 10);  // 10
-                }
-            """)
-
-            images = []
-            for img_data in images_data:
-                img_url = img_data.get("src", "")
-                if not img_url or img_url.startswith("data:"):
-                    continue
-
-                # 
-                if img_url.startswith("//"):
-                    img_url = "https:" + img_url
-                elif img_url.startswith("/"):
-                    from urllib.parse import urlparse
-                    parsed = urlparse(base_url)
-                    img_url = f"{parsed.scheme}://{parsed.netloc}{img_url}"
-
-                images.append({
-                    "url": img_url,
-                    "alt": img_data.get("alt", ""),
-                    "width": img_data.get("width", 0),
-                    "height": img_data.get("height", 0)
-                })
-
-            logger.info(f"[{self.name}]  {len(images)} ")
-            return images
-
-        except Exception as e:
-            logger.error(f"[{self.name}] : {e}")
-            return []
+            return {"title": "", "text": "", "images": []}
+        extracted["text"] = truncate_to_chars(extracted["text"], MAX_PAGE_CHARS)
+        return extracted
 
     async def _download_images_for_results(
         self,
@@ -0,0 +1,176 @@
+"""
+Record/replay of external I/O (LLM calls, searches, page fetches, images).
+
+In record mode every wrapped call goes out as usual and its response is
+written to a cassette directory, one JSON file per distinct request. In
+replay mode the responses are served from the cassette without touching
+the network, optionally sleeping for the recorded (or a fixed) latency, so
+whole workflows can be timed offline and repeatably.
+
+Configured with environment variables (or configure_cassette())::
+
+    CASSETTE_MODE=off|record|replay|auto   # auto: replay when recorded, else record
+    CASSETTE_DIR=storage/cassettes/default
+    CASSETTE_LATENCY=none|recorded|<seconds>
+    CASSETTE_LATENCY_SCALE=1.0
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from loguru import logger
+
+
+MODES = ("off", "record", "replay", "auto")
+
+
+class CassetteMissError(LookupError):
+    """Replay mode and the request was never recorded."""
+
+
+def encode_bytes(data: Optional[bytes]) -> Optional[str]:
+    return base64.b64encode(data).decode("ascii") if data is not None else None
+
+
+def decode_bytes(data: Optional[str]) -> Optional[bytes]:
+    return base64.b64decode(data) if data is not None else None
+
+
+class Cassette:
+    """A directory of recorded interactions."""
+
+    def __init__(
+        self,
+        path: str = "storage/cassettes/default",
+        mode: str = "off",
+        latency: str = "none",
+        latency_scale: float = 1.0
+    ):
+        if mode not in MODES:
+            raise ValueError(f"unknown cassette mode: {mode}")
+        self.path = Path(path)
+        self.mode = mode
+        self.latency = latency
+        self.latency_scale = latency_scale
+        self.stats = {"recorded": 0, "replayed": 0, "misses": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    @property
+    def replaying(self) -> bool:
+        """True when calls never reach the network (browser etc. can be skipped)."""
+        return self.mode == "replay"
+
+    @staticmethod
+    def make_key(request: Dict[str, Any]) -> str:
+        payload = json.dumps(request, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _file(self, kind: str, key: str) -> Path:
+        return self.path / kind / f"{key}.json"
+
+    def _load(self, kind: str, key: str) -> Optional[Dict[str, Any]]:
+        file_path = self._file(kind, key)
+        if not file_path.exists():
+            return None
+        with open(file_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save(self, kind: str, key: str, request: Dict[str, Any], response: Any, duration: float):
+        file_path = self._file(kind, key)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = file_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"kind": kind, "request": request, "response": response, "duration": round(duration, 4)},
+                f, ensure_ascii=False, indent=1, default=str
+            )
+        os.replace(tmp_path, file_path)
+
+    def _replay_delay(self, recorded: float) -> float:
+        if self.latency in ("", "none", "0"):
+            return 0.0
+        if self.latency == "recorded":
+            return recorded * self.latency_scale
+        return float(self.latency) * self.latency_scale
+
+    async def call(
+        self,
+        kind: str,
+        request: Dict[str, Any],
+        fn: Callable[[], Awaitable[Any]],
+        encode: Optional[Callable[[Any], Any]] = None,
+        decode: Optional[Callable[[Any], Any]] = None
+    ) -> Any:
+        """
+        Run `fn`, or replay its recorded result.
+
+        Args:
+            kind: interaction type, also the cassette subdirectory ("llm", "search", ...)
+            request: JSON-serialisable description of the request; identifies the recording
+            fn: performs the real call
+            encode/decode: convert the result to/from JSON-serialisable data
+        """
+        if not self.enabled:
+            return await fn()
+
+        key = self.make_key(request)
+        if self.mode in ("replay", "auto"):
+            entry = self._load(kind, key)
+            if entry is not None:
+                delay = self._replay_delay(entry.get("duration", 0.0))
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                self.stats["replayed"] += 1
+                response = entry["response"]
+                return decode(response) if decode else response
+            if self.mode == "replay":
+                self.stats["misses"] += 1
+                raise CassetteMissError(f"cassette miss: {kind}/{key[:16]} not recorded in {self.path}")
+
+        start = time.perf_counter()
+        result = await fn()
+        duration = time.perf_counter() - start
+        try:
+            self._save(kind, key, request, encode(result) if encode else result, duration)
+            self.stats["recorded"] += 1
+        except Exception as e:
+            logger.warning(f"[Cassette] failed to record {kind}/{key[:16]}: {e}")
+        return result
+
+
+_cassette: Optional[Cassette] = None
+
+
+def configure_cassette(
+    mode: Optional[str] = None,
+    path: Optional[str] = None,
+    latency: Optional[str] = None,
+    latency_scale: Optional[float] = None
+) -> Cassette:
+    """(Re)create the process-wide cassette; unset arguments fall back to the environment."""
+    global _cassette
+    _cassette = Cassette(
+        path=path or os.getenv("CASSETTE_DIR", "storage/cassettes/default"),
+        mode=(mode or os.getenv("CASSETTE_MODE", "off")).lower(),
+        latency=str(latency if latency is not None else os.getenv("CASSETTE_LATENCY", "none")).lower(),
+        latency_scale=latency_scale if latency_scale is not None else float(os.getenv("CASSETTE_LATENCY_SCALE", "1.0"))
+    )
+    if _cassette.enabled:
+        logger.info(f"[Cassette] mode={_cassette.mode} dir={_cassette.path} latency={_cassette.latency}")
+    return _cassette
+
+
+def get_cassette() -> Cassette:
+    """Process-wide cassette, configured from the environment on first use."""
+    if _cassette is None:
+        return configure_cassette()
+    return _cassette
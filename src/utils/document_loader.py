@@ -2,13 +2,16 @@
 Document loader utilities for ingesting user-provided context files.
 
 Supports plain text (.txt), PDF (.pdf), and Word documents (.docx).
+The PDF and .docx readers also accept raw bytes, for documents fetched
+from the web (see src/tools/document_fetcher.py).
 """
 
 from __future__ import annotations
 
+import io
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Tuple
+from typing import List, Optional, Tuple, Union
 
 from loguru import logger
 
@@ -98,14 +101,36 @@ def _load_txt(path: Path) -> str:
 
 
 def _load_docx(path: Path) -> str:
+    return read_docx(str(path))[1]
+
+
+def _load_pdf(path: Path) -> str:
+    return "\n\n".join(pdf_pages_text(str(path)))
+
+
+def _docx_module():
     try:
         import docx
     except ImportError as exc:  # pragma: no cover - dependency missing
         raise DocumentLoadError(
             "python-docx is required to parse .docx files"
         ) from exc
+    return docx
+
+
+def _pdf_reader(source: Union[str, bytes]):
+    try:
+        from pypdf import PdfReader
+    except ImportError as exc:  # pragma: no cover - dependency missing
+        raise DocumentLoadError("pypdf is required to parse .pdf files") from exc
+
+    return PdfReader(io.BytesIO(source) if isinstance(source, bytes) else source)
+
 
-    document = docx.Document(str(path))
+def read_docx(source: Union[str, bytes]) -> Tuple[str, str]:
+    """Core-properties title and paragraph/table text of a .docx file (path or raw bytes)."""
+    docx = _docx_module()
+    document = docx.Document(io.BytesIO(source) if isinstance(source, bytes) else source)
     parts = []
     for paragraph in document.paragraphs:
         text = paragraph.text.strip()
@@ -119,18 +144,34 @@ def _load_docx(path: Path) -> str:
             if cells:
                 parts.append(" | ".join(cells))
 
-    return "\n".join(parts)
+    return (document.core_properties.title or "").strip(), "\n".join(parts)
 
 
-def _load_pdf(path: Path) -> str:
+def pdf_info(source: Union[str, bytes]) -> Tuple[int, str]:
+    """Page count and metadata title of a PDF (path or raw bytes)."""
+    reader = _pdf_reader(source)
+    title = ""
     try:
-        from pypdf import PdfReader
-    except ImportError as exc:  # pragma: no cover - dependency missing
-        raise DocumentLoadError("pypdf is required to parse .pdf files") from exc
+        title = (reader.metadata.title or "").strip() if reader.metadata else ""
+    except Exception:  # pragma: no cover - pdf quirks
+        pass
+    return len(reader.pages), title
+
 
-    reader = PdfReader(str(path))
+def pdf_pages_text(
+    source: Union[str, bytes],
+    start: int = 0,
+    end: Optional[int] = None
+) -> List[str]:
+    """
+    Text of PDF pages `start` (inclusive) to `end` (exclusive), one string
+    per non-empty page. Bytes and page ranges let a large PDF be split
+    across worker processes.
+    """
+    reader = _pdf_reader(source)
+    pages = reader.pages[start:end]
     pages_text = []
-    for page_number, page in enumerate(reader.pages, start=1):
+    for page_number, page in enumerate(pages, start=start + 1):
         try:
             text = page.extract_text() or ""
         except Exception as exc:  # pragma: no cover - pdf quirks
@@ -139,4 +180,4 @@ def _load_pdf(path: Path) -> str:
         if text.strip():
             pages_text.append(text.strip())
 
-    return "\n\n".join(pages_text)
+    return pages_text
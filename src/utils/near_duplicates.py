@@ -0,0 +1,188 @@
+"""
+Near-duplicate detection for fetched documents.
+
+Syndicated articles, mobile/desktop variants and mirrors have different
+URLs but (nearly) the same text. Documents are reduced to shingles: runs of
+three tokens, where a token is a Latin word/number or a single CJK
+character, so Chinese text without spaces shingles as well as English.
+Shingle sets are sketched with one-permutation MinHash (one CRC32 per
+shingle, the minimum kept per bin), and candidate pairs come from LSH
+bands of the sketch, so a batch is neither hashed 64 times per shingle nor
+compared pairwise. Sketches are memoised per text, since the same
+documents are deduplicated again at every stage. Two documents are duplicates when the estimated Jaccard
+similarity of their shingles reaches the threshold.
+
+:func:`deduplicate_documents` clusters a result list, keeps the richest
+document of every cluster at the position of the cluster's best-ranked
+member, and reports the prompt tokens saved.
+"""
+
+import os
+import re
+import zlib
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from loguru import logger
+
+from .tokens import estimate_tokens
+from ..monitoring.metrics import metrics
+
+
+SHINGLE_SIZE = 3
+NUM_BINS = 64
+BAND_SIZE = 4
+DEFAULT_THRESHOLD = 0.8
+# documents with fewer shingles than this are never merged (snippets, stubs)
+MIN_SHINGLES = 20
+
+_CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff"
+_TOKEN_RE = re.compile(rf"[{_CJK}]|(?:(?![{_CJK}])[^\W_])+")
+_BIN_SHIFT = 32 - (NUM_BINS - 1).bit_length()
+
+Sketch = Tuple[Optional[int], ...]
+
+
+def shingles(text: Optional[str], size: int = SHINGLE_SIZE) -> Set[str]:
+    """Token k-grams of a text; CJK characters count as one token each."""
+    tokens = _TOKEN_RE.findall((text or "").lower())
+    if len(tokens) < size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def minhash_sketch(features: Set[str]) -> Sketch:
+    """One-permutation MinHash: the smallest feature hash per bin (None for empty bins)."""
+    sketch: List[Optional[int]] = [None] * NUM_BINS
+    for feature in features:
+        value = zlib.crc32(feature.encode("utf-8"))
+        slot = value >> _BIN_SHIFT
+        if sketch[slot] is None or value < sketch[slot]:
+            sketch[slot] = value
+    return tuple(sketch)
+
+
+@lru_cache(maxsize=512)
+def text_sketch(text: str) -> Optional[Sketch]:
+    """Sketch of a text, None when it is too short to compare."""
+    features = shingles(text)
+    return minhash_sketch(features) if len(features) >= MIN_SHINGLES else None
+
+
+def estimated_jaccard(left: Sketch, right: Sketch) -> float:
+    """Share of equal bins among the bins used by either sketch."""
+    used = matches = 0
+    for a, b in zip(left, right):
+        if a is None and b is None:
+            continue
+        used += 1
+        matches += a == b
+    return matches / used if used else 0.0
+
+
+class NearDuplicateIndex:
+    """Clusters near-duplicate texts with MinHash-LSH candidate lookup."""
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self._sketches: List[Optional[Sketch]] = []
+        self._parents: List[int] = []
+        self._buckets: Dict[Tuple[int, Sketch], List[int]] = defaultdict(list)
+
+    def _find(self, i: int) -> int:
+        while self._parents[i] != i:
+            self._parents[i] = self._parents[self._parents[i]]
+            i = self._parents[i]
+        return i
+
+    def add(self, text: Optional[str]) -> int:
+        """Index a text; returns its id (ids are assigned in insertion order)."""
+        doc_id = len(self._parents)
+        self._parents.append(doc_id)
+        sketch = text_sketch(text or "")
+        self._sketches.append(sketch)
+        if sketch is None:
+            return doc_id
+
+        candidates = set()
+        for band in range(0, NUM_BINS, BAND_SIZE):
+            key = (band, sketch[band:band + BAND_SIZE])
+            candidates.update(self._buckets[key])
+            self._buckets[key].append(doc_id)
+
+        for other in sorted(candidates):
+            if estimated_jaccard(sketch, self._sketches[other]) >= self.threshold:
+                self._parents[self._find(doc_id)] = self._find(other)
+        return doc_id
+
+    def clusters(self) -> List[List[int]]:
+        """Ids grouped by cluster, each cluster and the list ordered by first id."""
+        groups: Dict[int, List[int]] = defaultdict(list)
+        for doc_id in range(len(self._parents)):
+            groups[self._find(doc_id)].append(doc_id)
+        return sorted(groups.values(), key=lambda ids: ids[0])
+
+
+def document_text(document: Dict[str, Any]) -> str:
+    """Text a document contributes to prompts."""
+    return document.get("full_content") or document.get("content") or document.get("snippet") or ""
+
+
+def _richness(document: Dict[str, Any]) -> Tuple[int, int, int]:
+    return (
+        1 if document.get("has_full_content", True) else 0,
+        len(document_text(document)),
+        len(document.get("images") or []),
+    )
+
+
+def deduplicate_documents(
+    documents: List[Dict[str, Any]],
+    threshold: Optional[float] = None,
+    label: str = "documents",
+    record: bool = True
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Collapse near-duplicate documents.
+
+    The kept document of a cluster is its richest member (full text first,
+    then length, then images), placed where the best-ranked member was. It
+    lists the URLs it absorbed in `near_duplicates`. NEAR_DUP_ENABLED and
+    NEAR_DUP_THRESHOLD configure the defaults. With `record` off the
+    removals are not added to the dedup.* metrics, for intermediate passes
+    over a list that is deduplicated again once complete.
+
+    Returns:
+        (kept documents, report with `clusters`, `removed` and `tokens_saved`)
+    """
+    if os.getenv("NEAR_DUP_ENABLED", "true").lower() != "true" or len(documents) < 2:
+        return documents, {"clusters": len(documents), "removed": 0, "tokens_saved": 0}
+
+    if threshold is None:
+        threshold = float(os.getenv("NEAR_DUP_THRESHOLD", DEFAULT_THRESHOLD))
+    index = NearDuplicateIndex(threshold)
+    for document in documents:
+        index.add(document_text(document))
+
+    kept = []
+    removed = 0
+    tokens_saved = 0
+    for cluster in index.clusters():
+        members = [documents[i] for i in cluster]
+        best = max(members, key=_richness)
+        if len(members) > 1:
+            others = [m for m in members if m is not best]
+            removed += len(others)
+            tokens_saved += sum(estimate_tokens(document_text(m)) for m in others)
+            urls = list(best.get("near_duplicates") or [])
+            urls += [m["url"] for m in others if m.get("url") and m["url"] not in urls]
+            best = {**best, "near_duplicates": urls}
+        kept.append(best)
+
+    report = {"clusters": len(kept), "removed": removed, "tokens_saved": tokens_saved}
+    if removed and record:
+        metrics.incr("dedup.near_duplicates", removed)
+        metrics.incr("dedup.tokens_saved", tokens_saved)
+        logger.info(f"[NearDup] {label}: dropped {removed} near-duplicates, ~{tokens_saved} tokens saved")
+    return kept, report
@@ -0,0 +1,78 @@
+"""
+Async token bucket used for request/token rate limiting.
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Classic token bucket: refills at `rate` tokens per second up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate: tokens added per second
+            capacity: burst size (defaults to one second worth of tokens, at least 1)
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def per_minute(cls, amount: float, burst: Optional[float] = None) -> "TokenBucket":
+        """Bucket allowing `amount` tokens per minute."""
+        return cls(amount / 60.0, burst if burst is not None else amount)
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self._updated = now
+
+    def try_acquire(self, amount: float = 1.0) -> bool:
+        """Take tokens without waiting; False if not enough are available."""
+        amount = min(amount, self.capacity)
+        self._refill()
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return True
+        return False
+
+    async def acquire(self, amount: float = 1.0) -> float:
+        """
+        Wait until `amount` tokens are available and take them.
+
+        Requests larger than the bucket are clamped to its capacity so they
+        can never block forever.
+
+        Returns:
+            seconds spent waiting
+        """
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                delay = (amount - self.tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+
+    def refund(self, amount: float):
+        """Give back tokens that were reserved but not used."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+    def consume(self, amount: float):
+        """Charge tokens after the fact (may drive the bucket negative)."""
+        self._refill()
+        self.tokens -= amount
@@ -0,0 +1,75 @@
+"""
+Local token estimation.
+
+Dependency free and model agnostic: CJK characters cost about one token each
+with the tokenizers we use (DeepSeek, Qwen, GLM, GPT-4), other text about
+four characters per token. It errs on the high side, which is what budgets
+need.
+"""
+
+import math
+import re
+from typing import Optional
+
+
+_CJK_RE = re.compile(
+    r"[\u3000-\u303f\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff\uff00-\uffef]"
+)
+_SENTENCE_END_RE = re.compile(r"[。！？!?；;.\n]")
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Estimated token count of `text`."""
+    if not text:
+        return 0
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+def truncate_to_tokens(text: Optional[str], max_tokens: int, suffix: str = "...") -> str:
+    """
+    Cut `text` to at most `max_tokens` estimated tokens.
+
+    Prefers to end on a sentence boundary when one is close to the cut.
+    """
+    if not text:
+        return ""
+    if max_tokens <= 0:
+        return ""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    budget = max(0, max_tokens - estimate_tokens(suffix)) * 4  # cost in quarter tokens
+    cost = 0
+    cut = 0
+    for i, ch in enumerate(text):
+        cost += 4 if _CJK_RE.match(ch) else 1
+        if cost > budget:
+            break
+        cut = i + 1
+
+    return _cut(text, cut, suffix)
+
+
+def truncate_to_chars(text: Optional[str], max_chars: int, suffix: str = "...") -> str:
+    """
+    Cut `text` to at most `max_chars` characters (plus `suffix`).
+
+    For per-page caps, which keep the same share of a page whatever its
+    script; like :func:`truncate_to_tokens` it prefers a sentence boundary.
+    """
+    if not text:
+        return ""
+    if max_chars <= 0:
+        return ""
+    if len(text) <= max_chars:
+        return text
+    return _cut(text, max_chars, suffix)
+
+
+def _cut(text: str, cut: int, suffix: str) -> str:
+    head = text[:cut]
+    boundary = max((m.end() for m in _SENTENCE_END_RE.finditer(head)), default=0)
+    if boundary >= cut * 0.8:
+        head = head[:boundary]
+    return head.rstrip() + suffix
@@ -0,0 +1,103 @@
+"""
+URL helpers shared by the fetch, cache and dedup layers.
+
+canonical_url() maps the spellings of one page that search engines and
+sites hand out (tracking parameters, fragments, default ports, parameter
+order, host case) onto a single key.
+"""
+
+import re
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, quote, unquote, urlencode, urlsplit, urlunsplit
+
+# query parameters that never change the page content
+TRACKING_PARAMS = {
+    "utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content", "utm_id",
+    "gclid", "dclid", "fbclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "spm", "scm", "ref_src", "share_token", "wfr", "vd_source",
+    "_hsenc", "_hsmi", "__twitter_impression",
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "hmsr", "hmpl", "hmcu", "hmkw", "hmci")
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+# characters left unescaped in paths after normalisation
+_PATH_SAFE = "/:@!$&'()*+,;=-._~"
+
+
+def _is_tracking(name: str) -> bool:
+    lowered = name.lower()
+    return lowered in TRACKING_PARAMS or lowered.startswith(TRACKING_PREFIXES)
+
+
+def canonical_url(url: str) -> str:
+    """
+    Canonical form of an http(s) URL, used as a cache/dedup key.
+
+    Lower-cases scheme and host, drops default ports, fragments, tracking
+    parameters and empty query strings, sorts the remaining parameters,
+    collapses duplicate slashes and normalises percent-encoding. Other
+    schemes and unparsable input are returned stripped but unchanged.
+    """
+    url = (url or "").strip()
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    if scheme not in _DEFAULT_PORTS or not parts.hostname:
+        return url
+
+    host = parts.hostname.lower().rstrip(".")
+    try:
+        host = host.encode("idna").decode("ascii")
+    except UnicodeError:
+        pass
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host if port in (None, _DEFAULT_PORTS[scheme]) else f"{host}:{port}"
+
+    path = re.sub(r"/{2,}", "/", parts.path or "/")
+    # encoded slashes are significant, everything else is decoded and re-encoded uniformly
+    path = "%2F".join(quote(unquote(segment), safe=_PATH_SAFE) for segment in re.split("%2[fF]", path))
+
+    params = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _is_tracking(k)]
+    query = urlencode(sorted(params), doseq=True)
+
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+def url_host(url: str) -> str:
+    """Lower-cased host of a URL without port or a leading `www.`."""
+    try:
+        host = (urlsplit(url).hostname or "").lower()
+    except ValueError:
+        return ""
+    return host[4:] if host.startswith("www.") else host
+
+
+def host_matches(host: str, domain: str) -> bool:
+    """Whether `host` is `domain` or one of its subdomains."""
+    domain = domain.lower().lstrip(".")
+    return host == domain or host.endswith("." + domain)
+
+
+def domain_lookup(url: str, table: dict, default: Optional[object] = None):
+    """Value of the most specific domain in `table` matching the URL's host."""
+    host = url_host(url)
+    best = None
+    for domain in table:
+        if host_matches(host, domain) and (best is None or len(domain) > len(best)):
+            best = domain
+    return table[best] if best is not None else default
+
+
+def parse_domain_values(spec: str) -> Dict[str, float]:
+    """Parse a `domain=number,domain=number` setting into a lookup table."""
+    values = {}
+    for item in (spec or "").split(","):
+        domain, _, value = item.partition("=")
+        if domain.strip() and value.strip():
+            values[domain.strip().lower()] = float(value)
+    return values
@@ -0,0 +1,242 @@
+"""Browser pool leasing, recycling and crash recovery tests."""
+
+import sys
+import os
+import asyncio
+import pytest
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.browser import BrowserManager
+from src.config import DeepSearchConfig
+from src.tools.browser_pool import BrowserPool, MAX_PROFILE_SLOTS, close_browser_pool, get_browser_pool
+
+
+class FakePage:
+    def __init__(self):
+        self.closed = False
+        self.handlers = {}
+        self.urls = []
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    def is_closed(self):
+        return self.closed
+
+    async def goto(self, url, **kwargs):
+        self.urls.append(url)
+
+    async def unroute_all(self, **kwargs):
+        pass
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self):
+        self.pages = []
+        self.closed = False
+        self.handlers = {}
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    def set_default_timeout(self, timeout):
+        pass
+
+    async def add_init_script(self, script):
+        pass
+
+    async def new_page(self):
+        page = FakePage()
+        self.pages.append(page)
+        return page
+
+    async def cookies(self):
+        return []
+
+    async def close(self):
+        self.closed = True
+        for page in self.pages:
+            page.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.closed = False
+
+    async def new_context(self, **options):
+        return FakeContext()
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeChromium:
+    def __init__(self, locked_profiles=()):
+        self.locked_profiles = set(locked_profiles)
+        self.persistent = []
+        self.browsers = []
+
+    async def launch_persistent_context(self, profile_dir, **options):
+        if profile_dir in self.locked_profiles:
+            raise RuntimeError("profile in use")
+        self.persistent.append(profile_dir)
+        return FakeContext()
+
+    async def launch(self, **options):
+        browser = FakeBrowser()
+        self.browsers.append(browser)
+        return browser
+
+
+class FakeBrowserPool(BrowserPool):
+    def __init__(self, **overrides):
+        super().__init__(watchdog_interval=0, **overrides)
+        self.contexts = []
+
+    async def _launch(self):
+        context = FakeContext()
+        self.contexts.append(context)
+        return context
+
+
+class TestBrowserPool:
+    """BrowserPool"""
+
+    @pytest.mark.asyncio
+    async def test_pages_are_reused_and_one_context_is_launched(self):
+        pool = FakeBrowserPool()
+        async with pool.page() as first:
+            await first.goto("https://a.example")
+        async with pool.page() as second:
+            pass
+
+        assert second is first
+        assert first.urls[-1] == "about:blank"
+        assert len(pool.contexts) == 1
+        assert pool.status()["launches"] == 1
+        await pool.close()
+        assert pool.contexts[0].closed
+
+    @pytest.mark.asyncio
+    async def test_max_pages_caps_concurrent_leases(self):
+        pool = FakeBrowserPool(max_pages=2)
+        peak = 0
+
+        async def work():
+            nonlocal peak
+            async with pool.page():
+                peak = max(peak, pool.status()["leased"])
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*[work() for _ in range(6)])
+        assert peak == 2
+        assert len(pool.contexts[0].pages) == 2
+
+    @pytest.mark.asyncio
+    async def test_context_is_recycled_after_drain(self):
+        pool = FakeBrowserPool(recycle_after_leases=2)
+        for _ in range(2):
+            async with pool.page():
+                pass
+        async with pool.page():
+            pass
+
+        assert len(pool.contexts) == 2
+        assert pool.contexts[0].closed
+        assert not pool.contexts[1].closed
+
+    @pytest.mark.asyncio
+    async def test_crashed_pages_and_contexts_are_replaced(self):
+        pool = FakeBrowserPool()
+        async with pool.page() as page:
+            page.handlers["crash"](page)
+        assert page.closed
+
+        async with pool.page() as page:
+            pass
+        # the browser dies: the next lease relaunches
+        pool.contexts[0].handlers["close"](pool.contexts[0])
+        async with pool.page() as fresh:
+            assert fresh is not page
+
+        assert len(pool.contexts) == 2
+        assert pool.status()["crashes"] == 1
+
+    @pytest.mark.asyncio
+    async def test_each_pool_claims_its_own_profile(self, tmp_path):
+        first = BrowserPool(profile_dir=str(tmp_path), watchdog_interval=0)
+        second = BrowserPool(profile_dir=str(tmp_path), watchdog_interval=0)
+        first._playwright = SimpleNamespace(chromium=FakeChromium(), stop=_noop)
+        second._playwright = SimpleNamespace(chromium=FakeChromium(), stop=_noop)
+
+        async with first.page(), second.page():
+            pass
+        assert first.profile_dir != second.profile_dir
+        assert first._playwright.chromium.persistent == [str(tmp_path / "0")]
+        assert second._playwright.chromium.persistent == [str(tmp_path / "1")]
+
+        await first.close()
+        third = BrowserPool(profile_dir=str(tmp_path), watchdog_interval=0)
+        assert third._claim_profile_dir() == tmp_path / "0"
+        third._release_profile_dir()
+        await second.close()
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_a_fresh_profile(self, tmp_path):
+        chromium = FakeChromium(locked_profiles={str(tmp_path / "0")})
+        pool = BrowserPool(profile_dir=str(tmp_path), watchdog_interval=0)
+        pool._playwright = SimpleNamespace(chromium=chromium, stop=_noop)
+
+        async with pool.page() as page:
+            assert page is not None
+        assert chromium.persistent == [] and len(chromium.browsers) == 1
+        assert pool.profile_dir is None
+
+        await pool.close()
+        assert chromium.browsers[0].closed
+
+    def test_all_slots_taken(self, tmp_path):
+        holders = [BrowserPool(profile_dir=str(tmp_path)) for _ in range(MAX_PROFILE_SLOTS)]
+        assert all(pool._claim_profile_dir() is not None for pool in holders)
+        assert BrowserPool(profile_dir=str(tmp_path))._claim_profile_dir() is None
+        for pool in holders:
+            pool._release_profile_dir()
+
+    @pytest.mark.asyncio
+    async def test_overrides_select_a_pool_per_setting(self):
+        try:
+            default = get_browser_pool()
+            visible = get_browser_pool(headless=False, user_agent=None)
+            assert get_browser_pool() is default
+            assert get_browser_pool(headless=False) is visible
+            assert visible is not default
+            assert visible.settings["headless"] is False
+        finally:
+            await close_browser_pool()
+        assert default._closed and visible._closed
+
+    @pytest.mark.asyncio
+    async def test_browser_manager_forwards_its_config(self):
+        config = DeepSearchConfig(headless=False, user_agent="TestAgent/1.0", browser_timeout=12000)
+        try:
+            manager = BrowserManager(config)
+            await manager.start()
+            assert manager.pool.settings["headless"] is False
+            assert manager.pool.settings["user_agent"] == "TestAgent/1.0"
+            assert manager.pool.settings["navigation_timeout"] == 12000
+
+            other = BrowserManager(DeepSearchConfig(headless=False, user_agent="TestAgent/1.0", browser_timeout=12000))
+            await other.start()
+            assert other.pool is manager.pool
+            assert manager.pool is not get_browser_pool()
+        finally:
+            await close_browser_pool()
+
+
+async def _noop():
+    pass
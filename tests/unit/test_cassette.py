@@ -0,0 +1,69 @@
+"""Record/replay cassette tests."""
+
+import sys
+import os
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+import src.tools.web_searcher as web_searcher_module
+from src.tools.page_cache import PageCache
+from src.tools.web_searcher import WebSearcher
+from src.utils.cassette import Cassette, CassetteMissError, encode_bytes, decode_bytes
+
+
+class TestCassette:
+    """Cassette"""
+
+    @pytest.mark.asyncio
+    async def test_record_then_replay(self, tmp_path):
+        calls = []
+
+        async def live():
+            calls.append(1)
+            return {"content": "live answer"}
+
+        recorder = Cassette(str(tmp_path), mode="record")
+        assert await recorder.call("llm", {"q": 1}, live) == {"content": "live answer"}
+
+        player = Cassette(str(tmp_path), mode="replay")
+        assert await player.call("llm", {"q": 1}, live) == {"content": "live answer"}
+        assert len(calls) == 1
+        assert player.stats["replayed"] == 1
+
+        with pytest.raises(CassetteMissError):
+            await player.call("llm", {"q": 2}, live)
+
+    @pytest.mark.asyncio
+    async def test_binary_payload_and_off_mode(self, tmp_path):
+        async def image():
+            return b"\x89PNG\r\n"
+
+        recorder = Cassette(str(tmp_path), mode="auto")
+        await recorder.call("image", {"url": "u"}, image, encode=encode_bytes, decode=decode_bytes)
+        player = Cassette(str(tmp_path), mode="replay", latency="0.01")
+        assert await player.call("image", {"url": "u"}, image, encode=encode_bytes, decode=decode_bytes) == b"\x89PNG\r\n"
+
+        off = Cassette(str(tmp_path / "unused"), mode="off")
+        assert await off.call("image", {"url": "u"}, image) == b"\x89PNG\r\n"
+        assert not (tmp_path / "unused").exists()
+
+    @pytest.mark.asyncio
+    async def test_skipped_pages_are_not_recorded(self, tmp_path, monkeypatch):
+        class CoolingHealth:
+            async def cooling_down(self, url):
+                return 120.0
+
+        recorder = Cassette(str(tmp_path), mode="record")
+        monkeypatch.setattr(web_searcher_module, "get_cassette", lambda: recorder)
+        monkeypatch.setattr(web_searcher_module, "get_domain_health", lambda: CoolingHealth())
+        monkeypatch.setattr(web_searcher_module, "get_page_cache", lambda: PageCache(enabled=False))
+        searcher = WebSearcher(extract_images=False)
+
+        result = {"url": "https://slow.example.com/a", "snippet": "snippet text"}
+        fields = await searcher._fetch_page_fields(None, 0, result, 1, "web_page")
+
+        assert fields["full_content"] == "snippet text" and not fields["has_full_content"]
+        assert fields["fetch_error"].startswith("host cooling down")
+        assert recorder.stats["recorded"] == 0
+        assert not (tmp_path / "page").exists()
@@ -0,0 +1,76 @@
+"""Token estimation / context budgeter tests."""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.utils.tokens import estimate_tokens, truncate_to_chars, truncate_to_tokens
+import pytest
+
+from src.llm.budget import ContextBudgeter, BudgetItem, ContextOverflowError, get_context_window
+from src.llm.client import LLMClient
+from src.llm.config import LLMConfig
+
+
+class TestTokenEstimate:
+    """estimate_tokens / truncate_to_tokens / truncate_to_chars"""
+
+    def test_cjk_costs_more_than_latin(self):
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("人工智能") == 4
+        assert estimate_tokens("abcdefgh") == 2
+
+    def test_truncate_respects_limit(self):
+        text = "这是一个测试句子。" * 100
+        cut = truncate_to_tokens(text, 50)
+        assert estimate_tokens(cut) <= 50
+        assert cut.endswith("...")
+        assert truncate_to_tokens("short", 50) == "short"
+
+    def test_character_caps_keep_the_same_share_in_every_script(self):
+        chinese = truncate_to_chars("人工智能" * 3000, 5000)
+        english = truncate_to_chars("word " * 3000, 5000)
+        assert len(chinese) == 5000 + len("...")
+        assert 4900 <= len(english) <= 5003
+        assert truncate_to_chars("short", 50) == "short"
+
+
+class TestContextBudgeter:
+    """ContextBudgeter"""
+
+    def test_pack_keeps_short_items_and_shares_the_rest(self):
+        budgeter = ContextBudgeter(300, min_item_tokens=20)
+        packed = budgeter.pack(["短", "a" * 4000, "中" * 1000])
+
+        assert [p.truncated for p in packed] == [False, True, True]
+        assert budgeter.used <= 300
+
+    def test_pack_drops_lowest_priority_when_budget_is_tight(self):
+        budgeter = ContextBudgeter(100, min_item_tokens=40)
+        items = [BudgetItem(text="x" * 400, priority=p, payload=p) for p in (1, 3, 2)]
+        packed = budgeter.pack(items)
+
+        assert [p.payload for p in packed] == [3, 2]
+
+    def test_context_window_lookup(self):
+        assert get_context_window("gpt-4o-mini") == 128000
+        assert get_context_window("deepseek/deepseek-chat") == 64000
+        assert ContextBudgeter.for_model("gpt-4", 2000, cap=100000).max_tokens < 8192
+
+
+class TestFitMaxTokens:
+    """LLMClient._fit_max_tokens"""
+
+    def test_shrinks_or_refuses(self):
+        client = LLMClient(LLMConfig(api_key="sk-test", model_name="gpt-4"))
+        short = [{"role": "user", "content": "hi"}]
+        assert client._fit_max_tokens(short, 2000) == 2000
+
+        long = [{"role": "user", "content": "word " * 5300}]
+        fitted = client._fit_max_tokens(long, 4000)
+        assert 256 <= fitted < 4000
+
+        overflowing = [{"role": "user", "content": "word " * 7000}]
+        with pytest.raises(ContextOverflowError):
+            client._fit_max_tokens(overflowing, 4000)
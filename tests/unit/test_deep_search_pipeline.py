@@ -0,0 +1,122 @@
+"""Streaming subtask pipeline tests."""
+
+import sys
+import os
+import asyncio
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.agents.deep_searcher import DeepSearcher
+from src.llm.manager import LLMManager
+from src.llm.prompts import PromptManager
+from src.monitoring.metrics import metrics, task_scope
+
+
+class FakeWebSearcher:
+    """Yields pages after per-URL delays; None never finishes. `text` gives every page the same body."""
+
+    def __init__(self, delays, text=None):
+        self.delays = delays
+        self.text = text
+        self.cancelled = []
+
+    async def search_stream(self, query, max_results=10, region="cn-zh", time_filter=None):
+        async def fetch(rank, url, delay):
+            try:
+                await asyncio.sleep(3600 if delay is None else delay)
+            except asyncio.CancelledError:
+                self.cancelled.append(url)
+                raise
+            return rank, {"url": url, "title": url, "full_content": self.text or f"{query} text from {url}"}
+
+        tasks = [
+            asyncio.create_task(fetch(rank, f"https://{query}.example/{rank}", delay))
+            for rank, delay in enumerate(self.delays[query])
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+class FakeAgent:
+    """Records the documents it was given."""
+
+    def __init__(self):
+        self.seen = []
+
+    async def _record(self, query, search_results, subtask_context, analysis_results=None):
+        self.seen.append([r["url"] for r in search_results])
+        await asyncio.sleep(0.1)
+        return {"status": "success", "result": {"synthesized_content": "summary", "key_points": []}}
+
+    analyze_subtask = _record
+    synthesize_subtask = _record
+
+
+def make_searcher(delays, ratio=0.75, deadline=5.0):
+    searcher = DeepSearcher(LLMManager(), PromptManager())
+    searcher.web_searcher = FakeWebSearcher(delays)
+    searcher.analyzer = FakeAgent()
+    searcher.synthesizer = FakeAgent()
+    searcher.sufficient_ratio = ratio
+    searcher.fetch_deadline = deadline
+    return searcher
+
+
+SUBTASK = {"id": "t1", "type": "search", "title": "chips", "search_queries": ["a", "b"], "expected_results": 2}
+
+
+class TestSubtaskPipeline:
+    """DeepSearcher._execute_subtask_pipeline"""
+
+    @pytest.mark.asyncio
+    async def test_hung_url_does_not_hold_the_subtask(self):
+        searcher = make_searcher({"a": [0.03, 0.01], "b": [0.02, None]})
+
+        result = await asyncio.wait_for(searcher._execute_subtask_pipeline(SUBTASK, {}, 0), timeout=2)
+
+        # analysis started at 3 of 4 documents, in query/rank order
+        assert searcher.analyzer.seen == [["https://a.example/0", "https://a.example/1", "https://b.example/0"]]
+        assert [r["url"] for r in result["content"]] == searcher.analyzer.seen[0]
+        assert result["abandoned"] == 1
+        await asyncio.sleep(0)
+        assert searcher.web_searcher.cancelled == ["https://b.example/1"]
+
+    @pytest.mark.asyncio
+    async def test_late_documents_reach_synthesis(self):
+        searcher = make_searcher({"a": [0.01, 0.02], "b": [0.03, 0.05]}, ratio=0.5)
+
+        result = await searcher._execute_subtask_pipeline(SUBTASK, {}, 0)
+
+        assert len(searcher.analyzer.seen[0]) == 2
+        assert searcher.synthesizer.seen[0] == [
+            "https://a.example/0", "https://a.example/1", "https://b.example/0", "https://b.example/1"
+        ]
+        assert result["abandoned"] == 0 and len(result["content"]) == 4
+
+    @pytest.mark.asyncio
+    async def test_deadline_starts_analysis_with_what_is_there(self):
+        searcher = make_searcher({"a": [0.01, None], "b": [None, None]}, deadline=0.1)
+
+        result = await asyncio.wait_for(searcher._execute_subtask_pipeline(SUBTASK, {}, 0), timeout=2)
+
+        assert searcher.analyzer.seen == [["https://a.example/0"]]
+        assert result["abandoned"] == 2
+
+    @pytest.mark.asyncio
+    async def test_near_duplicates_are_counted_once(self):
+        searcher = make_searcher({"a": [0.01, 0.02], "b": [0.03, 0.05]}, ratio=0.5)
+        mirrored = " ".join(f"Chip exports rose {i} percent in region {i} during the quarter." for i in range(20))
+        searcher.web_searcher.text = mirrored
+
+        with task_scope("dedup-once"):
+            result = await searcher._execute_subtask_pipeline(SUBTASK, {}, 0)
+        counters = metrics.pop("dedup-once")
+
+        # analysis, synthesis and the final list each deduplicate; the mirrors count once
+        assert len(result["content"]) == 1
+        assert counters["dedup.near_duplicates"] == 3
@@ -0,0 +1,59 @@
+"""DiskCache / LLM response cache tests."""
+
+import sys
+import os
+import time
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.storage.disk_cache import DiskCache
+from src.llm.cache import make_request_key
+
+
+class TestDiskCache:
+    """DiskCache"""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        return DiskCache(str(tmp_path / "cache.sqlite3"), max_bytes=1000)
+
+    def test_roundtrip_and_counters(self, cache):
+        assert cache.get("missing") is None
+        cache.set("k", {"content": "hello"})
+        assert cache.get("k") == {"content": "hello"}
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["entries"] == 1
+
+    def test_ttl_expiry(self, cache):
+        cache.set("k", "v", ttl=0.01)
+        time.sleep(0.02)
+        assert cache.get("k") is None
+        assert cache.get_entry("k") is None or cache.get_entry("k")["expired"]
+
+    def test_lru_eviction(self, cache):
+        payload = "x" * 300
+        cache.set("a", payload)
+        cache.set("b", payload)
+        time.sleep(0.01)
+        cache.get("a")  # a is now more recently used than b
+        cache.set("c", payload)
+        cache.set("d", payload)
+
+        assert cache.get("b") is None
+        assert cache.get("d") == payload
+        assert cache.stats()["bytes"] <= 1000
+        assert cache.stats()["evictions"] >= 1
+
+
+def test_request_key_is_stable_and_param_sensitive():
+    messages = [{"role": "user", "content": ""}]
+    key1 = make_request_key("deepseek", "deepseek-chat", messages, {"temperature": 0, "max_tokens": 10})
+    key2 = make_request_key("deepseek", "deepseek-chat", messages, {"max_tokens": 10, "temperature": 0})
+    key3 = make_request_key("deepseek", "deepseek-chat", messages, {"temperature": 0.7, "max_tokens": 10})
+
+    assert key1 == key2
+    assert key1 != key3
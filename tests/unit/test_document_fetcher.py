@@ -0,0 +1,248 @@
+"""Remote PDF/DOCX ingestion tests."""
+
+import io
+import sys
+import os
+import pytest
+from aiohttp import web
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+import src.tools.content_extractor as content_extractor_module
+import src.tools.document_fetcher as document_fetcher_module
+import src.tools.tiered_fetcher as tiered_fetcher_module
+from src.monitoring.metrics import metrics, task_scope
+from src.tools.content_extractor import ContentExtractor
+from src.tools.document_fetcher import DOCX_CONTENT_TYPE, DocumentFetcher, document_kind
+from src.tools.http_session import close_http_session
+from src.tools.page_cache import PageCache
+from src.tools.tiered_fetcher import TieredFetcher
+from src.tools.url_registry import UrlRegistry
+from src.utils.document_loader import pdf_info, pdf_pages_text
+
+
+def make_pdf(pages, title="Annual Report"):
+    """A minimal PDF with one line of Helvetica text per page."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+    objects.append(f"<< /Title ({title}) >>")
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R /Info {len(objects)} 0 R >>\n"
+        f"startxref\n{xref}\n%%EOF\n"
+    ).encode()
+    return out
+
+
+def make_docx(paragraphs, title="Policy Brief"):
+    import docx
+    document = docx.Document()
+    document.core_properties.title = title
+    for paragraph in paragraphs:
+        document.add_paragraph(paragraph)
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
+
+
+REPORT = make_pdf([f"Page {i} of the tariff schedule lists duties on imported steel." for i in range(1, 13)])
+
+
+async def _serve(routes, requests=None):
+    app = web.Application()
+    for path, (body, content_type) in routes.items():
+        async def handler(request, body=body, content_type=content_type):
+            if requests is not None:
+                requests.append(request.path)
+            return web.Response(body=body, headers={"Content-Type": content_type})
+        app.router.add_get(path, handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner, f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+
+class TestDocumentFetcher:
+    """DocumentFetcher"""
+
+    def test_document_kind(self):
+        assert document_kind("https://gov.cn/a/report.PDF") == "pdf"
+        assert document_kind("https://gov.cn/download?id=3", "application/pdf") == "pdf"
+        assert document_kind("https://gov.cn/brief.docx", "application/octet-stream") == "docx"
+        assert document_kind("https://gov.cn/file", DOCX_CONTENT_TYPE) == "docx"
+        assert document_kind("https://gov.cn/report.pdf", "text/html") is None
+        assert document_kind("https://gov.cn/old.doc") is None
+
+    def test_page_ranges(self):
+        assert pdf_info(REPORT) == (12, "Annual Report")
+        assert pdf_pages_text(REPORT, 3, 5) == [
+            "Page 4 of the tariff schedule lists duties on imported steel.",
+            "Page 5 of the tariff schedule lists duties on imported steel.",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_page_cap_and_content_hash_cache(self, tmp_path):
+        runner, base = await _serve({
+            "/report.pdf": (REPORT, "application/pdf"),
+            "/mirror": (REPORT, "application/octet-stream; name=report.pdf"),
+            "/brief": (make_docx(["Export controls tighten.", "Licences are reviewed yearly."]), DOCX_CONTENT_TYPE),
+        })
+        fetcher = DocumentFetcher(cache_dir=str(tmp_path), max_pages=10, pages_per_job=3)
+        try:
+            with task_scope("documents"):
+                first = await fetcher.fetch(f"{base}/report.pdf")
+                # same bytes under another URL (and a generic type, sniffed): parsed once
+                second = await fetcher.fetch(f"{base}/mirror")
+                brief = await fetcher.fetch(f"{base}/brief")
+        finally:
+            await close_http_session()
+            await runner.cleanup()
+        counts = metrics.pop("documents")
+
+        assert first["title"] == "Annual Report"
+        assert (first["pages"], first["total_pages"], first["truncated"]) == (10, 12, True)
+        assert "Page 1 of" in first["content"] and "Page 10 of" in first["content"]
+        assert "Page 11 of" not in first["content"]
+        assert first["content"].index("Page 3 of") < first["content"].index("Page 4 of")
+        assert second["content"] == first["content"]
+        assert second["content_hash"] == first["content_hash"]
+        assert counts["web.documents.cache_hits"] == 1
+        assert counts["web.documents.pages"] == 10
+
+        assert brief["kind"] == "docx" and brief["title"] == "Policy Brief"
+        assert brief["content"] == "Export controls tighten.\nLicences are reviewed yearly."
+
+    @pytest.mark.asyncio
+    async def test_oversized_and_non_documents(self, tmp_path):
+        runner, base = await _serve({
+            "/big.pdf": (REPORT, "application/pdf"),
+            "/landing.pdf": (b"<!DOCTYPE html><html><body>Download the report</body></html>", "text/html"),
+        })
+        fetcher = DocumentFetcher(cache_dir=str(tmp_path), max_bytes=1024)
+        try:
+            big = await fetcher.fetch(f"{base}/big.pdf")
+            landing = await fetcher.fetch(f"{base}/landing.pdf")
+        finally:
+            await close_http_session()
+            await runner.cleanup()
+
+        assert big["error"].startswith("document too large")
+        assert landing["not_document"] and "text/html" in landing["error"]
+
+    @pytest.mark.asyncio
+    async def test_content_extractor_reads_documents(self, tmp_path, monkeypatch):
+        landing_page = (
+            b"<html><body><article>" + b"The full tariff schedule is available as a download. " * 5
+            + b"</article></body></html>"
+        )
+        requests = []
+        runner, base = await _serve({
+            "/report.pdf": (REPORT, "application/pdf"),
+            "/download": (REPORT, "application/pdf"),
+            "/landing.pdf": (landing_page, "text/html"),
+            # only sniffing the body tells this is no PDF
+            "/mirror.pdf": (landing_page, "application/octet-stream"),
+        }, requests)
+        fetcher = DocumentFetcher(cache_dir=str(tmp_path))
+        monkeypatch.setattr(content_extractor_module, "get_document_fetcher", lambda: fetcher)
+        monkeypatch.setattr(content_extractor_module, "get_page_cache", lambda: PageCache(enabled=False))
+        monkeypatch.setattr(content_extractor_module, "get_url_registry", lambda: UrlRegistry(scope="off"))
+        extractor = ContentExtractor()
+        try:
+            direct = await extractor.extract_content(f"{base}/report.pdf")
+            sniffed = await extractor.extract_content(f"{base}/download")
+            landing = await extractor.extract_content(f"{base}/landing.pdf")
+            mirror = await extractor.extract_content(f"{base}/mirror.pdf")
+            legacy = await extractor.extract_content(f"{base}/old.doc")
+        finally:
+            await close_http_session()
+            await runner.cleanup()
+
+        assert "error" not in direct
+        assert direct["title"] == "Annual Report" and direct["document_pages"] == 12
+        assert "Page 12 of" in direct["content"]
+        assert sniffed["content"] == direct["content"]
+        assert "tariff schedule is available" in landing["content"]
+        assert mirror["content"] == landing["content"]
+        assert legacy["error"] == "unsupported document format (.doc)"
+        # documents and landing pages are read from a single response each
+        assert requests == ["/report.pdf", "/download", "/landing.pdf", "/mirror.pdf"]
+
+    @pytest.mark.asyncio
+    async def test_http_tier_reads_document_results(self, tmp_path, monkeypatch):
+        requests = []
+
+        async def handler(request):
+            requests.append(request.path)
+            return web.Response(body=REPORT, headers={"Content-Type": "application/pdf"})
+
+        app = web.Application()
+        app.router.add_get("/report.pdf", handler)
+        app.router.add_get("/download", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        base = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+        fetcher = DocumentFetcher(cache_dir=str(tmp_path), max_pages=2)
+        monkeypatch.setattr(tiered_fetcher_module, "get_document_fetcher", lambda: fetcher)
+        try:
+            page = await TieredFetcher().fetch_http({"url": f"{base}/report.pdf", "snippet": "s"})
+            # only the Content-Type says it is a PDF
+            sniffed = await TieredFetcher().fetch_http({"url": f"{base}/download", "snippet": "s"})
+        finally:
+            await close_http_session()
+            await runner.cleanup()
+
+        assert page["has_full_content"] and not page.get("escalate")
+        assert page["page_title"] == "Annual Report" and page["images"] == []
+        assert page["full_content"].count("tariff schedule") == 2
+        assert sniffed["full_content"] == page["full_content"]
+        # the document is read from the tier-1 response, not requested again
+        assert requests == ["/report.pdf", "/download"]
+
+    @pytest.mark.asyncio
+    async def test_pdf_jobs_share_a_file_and_follow_the_worker_count(self, tmp_path, monkeypatch):
+        class RecordingPool:
+            enabled = True
+            min_bytes = 0
+            workers = 2
+
+            def __init__(self):
+                self.calls = []
+
+            async def run(self, fn, *args, size=0):
+                self.calls.append((fn.__name__, args))
+                return fn(*args)
+
+        pool = RecordingPool()
+        monkeypatch.setattr(document_fetcher_module, "get_extraction_pool", lambda: pool)
+        fetcher = DocumentFetcher(cache_dir=str(tmp_path), max_pages=10, pages_per_job=3)
+
+        parsed = await fetcher._parse("pdf", REPORT)
+
+        sources = {args[0] for _, args in pool.calls}
+        assert len(sources) == 1 and isinstance(next(iter(sources)), str)
+        assert not os.path.exists(next(iter(sources)))
+        # 10 pages at 3 per job would be 4 jobs; 2 workers get 5 pages each
+        assert [args[1:] for name, args in pool.calls if name == "pdf_pages_text"] == [(0, 5), (5, 10)]
+        assert parsed["pages"] == 10 and "Page 10 of" in parsed["content"]
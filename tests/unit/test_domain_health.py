@@ -0,0 +1,96 @@
+"""Domain health table tests."""
+
+import sys
+import os
+import asyncio
+import pytest
+from aiohttp import web
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.tools import content_extractor as content_extractor_module
+from src.tools.content_extractor import ContentExtractor
+from src.tools.domain_health import DomainHealth, percentile
+from src.tools.http_session import close_http_session
+from src.tools.page_cache import PageCache
+from src.tools.url_registry import UrlRegistry
+
+
+class TestDomainHealth:
+    """DomainHealth"""
+
+    def test_percentile(self):
+        assert percentile([], 0.5) is None
+        assert percentile([3, 1, 2, 4], 0.5) == 2
+        assert percentile(list(range(1, 21)), 0.95) == 19
+
+    @pytest.mark.asyncio
+    async def test_consecutive_failures_cool_the_host_down(self, tmp_path):
+        health = DomainHealth(cache_dir=str(tmp_path), cool_down=60)
+        for _ in range(2):
+            await health.record_response("https://www.slow.com/a", 403, 0.1)
+        assert await health.cooling_down("https://slow.com/b") == 0
+        await health.record_error("https://slow.com/c", asyncio.TimeoutError(), 30)
+
+        assert 55 < await health.cooling_down("https://slow.com/") <= 60
+        assert await health.cooling_down("https://fast.com/") == 0
+
+        # persisted: a new process still skips the host
+        restarted = DomainHealth(cache_dir=str(tmp_path))
+        assert await restarted.cooling_down("https://slow.com/") > 0
+
+    @pytest.mark.asyncio
+    async def test_repeated_cool_downs_grow_until_a_success(self, tmp_path):
+        health = DomainHealth(cache_dir=str(tmp_path), cool_down=10, max_consecutive_failures=1)
+        await health.record_response("https://a.com/", 429, 0.1)
+        await health.record_response("https://a.com/", 429, 0.1)
+        assert await health.cooling_down("https://a.com/") > 15
+
+        await health.record_response("https://a.com/", 200, 0.1)
+        await health.record_response("https://a.com/", 429, 0.1)
+        assert await health.cooling_down("https://a.com/") <= 10
+
+    @pytest.mark.asyncio
+    async def test_timeouts_follow_observed_latency(self, tmp_path):
+        health = DomainHealth(cache_dir=str(tmp_path), min_timeout=0.5, max_timeout=30, timeout_factor=4)
+        assert await health.timeout_for("https://a.com/") == 30
+
+        for latency in (0.2, 0.3, 0.25, 0.2, 0.5):
+            await health.record_response("https://a.com/", 200, latency)
+        assert await health.timeout_for("https://a.com/") == 2.0
+
+        # a timeout widens the next one
+        await health.record_error("https://a.com/", asyncio.TimeoutError(), 2.0)
+        assert await health.timeout_for("https://a.com/") == 8.0
+
+    @pytest.mark.asyncio
+    async def test_extractor_skips_hosts_that_keep_blocking(self, tmp_path, monkeypatch):
+        hits = []
+
+        async def handler(request):
+            hits.append(request.path)
+            return web.Response(status=403)
+
+        app = web.Application()
+        app.router.add_get("/{name}", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        base = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+        health = DomainHealth(cache_dir=str(tmp_path))
+        cache = PageCache(enabled=False)
+        monkeypatch.setattr(content_extractor_module, "get_domain_health", lambda: health)
+        monkeypatch.setattr(content_extractor_module, "get_page_cache", lambda: cache)
+        monkeypatch.setattr(content_extractor_module, "get_url_registry", lambda: UrlRegistry(scope="off"))
+        extractor = ContentExtractor()
+        try:
+            results = [await extractor.extract_content(f"{base}/{i}") for i in range(4)]
+        finally:
+            await close_http_session()
+            await runner.cleanup()
+
+        assert len(hits) == 3
+        assert results[2]["error"] == "HTTP 403"
+        assert results[3]["error"].startswith("host cooling down")
@@ -0,0 +1,128 @@
+"""DuckDuckGo HTML endpoint searcher tests."""
+
+import asyncio
+import sys
+import os
+import pytest
+from aiohttp import web
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.models import SearchLink
+from src.searcher.duckduckgo_html import DuckDuckGoHTMLSearcher, DuckDuckGoBlockedError, parse_results
+from src.tools.http_session import close_http_session
+from src.tools.web_searcher import WebSearcher
+
+RESULTS_PAGE = """
+<html><body><div id="links" class="results">
+  <div class="result results_links result--ad">
+    <a class="result__a" href="https://duckduckgo.com/y.js?ad_provider=x">Sponsored</a>
+  </div>
+  <div class="result results_links results_links_deep web-result">
+    <h2 class="result__title">
+      <a rel="nofollow" class="result__a" href="//duckduckgo.com/l/?uddg=https%3A%2F%2Fexample.com%2Fa%3Fx%3D1&amp;rut=abc">Example <b>A</b></a>
+    </h2>
+    <a class="result__snippet" href="#">First <b>snippet</b>.</a>
+  </div>
+  <div class="result results_links web-result">
+    <a class="result__a" href="https://example.org/b">Example B</a>
+  </div>
+  <div class="result results_links web-result">
+    <a class="result__a" href="https://example.net/c">Example C</a>
+    <a class="result__snippet">Third.</a>
+  </div>
+</div></body></html>
+"""
+
+CHALLENGE_PAGE = '<html><body><div class="anomaly-modal__title">Unfortunately, bots use DuckDuckGo too.</div></body></html>'
+
+
+class TestParseResults:
+    """parse_results"""
+
+    def test_organic_results_with_decoded_redirects(self):
+        results = parse_results(RESULTS_PAGE, topk=5)
+        assert results == [
+            SearchLink(url="https://example.com/a?x=1", title="Example A", snippet="First snippet."),
+            SearchLink(url="https://example.org/b", title="Example B", snippet=None),
+            SearchLink(url="https://example.net/c", title="Example C", snippet="Third."),
+        ]
+        assert len(parse_results(RESULTS_PAGE, topk=2)) == 2
+
+    def test_challenge_and_empty_pages(self):
+        with pytest.raises(DuckDuckGoBlockedError):
+            parse_results(CHALLENGE_PAGE, topk=5)
+        assert parse_results('<html><body><div class="no-results">No results.</div></body></html>', topk=5) == []
+
+
+class TestDuckDuckGoHTMLSearcher:
+    """DuckDuckGoHTMLSearcher.search"""
+
+    @pytest.mark.asyncio
+    async def test_query_region_and_time_filter_are_sent(self):
+        forms = []
+
+        async def handler(request):
+            forms.append(dict(await request.post()))
+            return web.Response(text=RESULTS_PAGE, content_type="text/html")
+
+        app = web.Application()
+        app.router.add_post("/html/", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        endpoint = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/html/"
+
+        searcher = DuckDuckGoHTMLSearcher(topk=1, endpoint=endpoint)
+        try:
+            results = await searcher.search(None, "ai chips", time_filter="Week", region="us-en")
+            await searcher.search(None, "ai chips", time_filter="decade")
+        finally:
+            await close_http_session()
+            await runner.cleanup()
+
+        assert [r.url for r in results] == ["https://example.com/a?x=1"]
+        assert forms == [
+            {"q": "ai chips", "kl": "us-en", "df": "w"},
+            {"q": "ai chips", "kl": "cn-zh"},
+        ]
+
+
+class TestWebSearcherBackend:
+    """WebSearcher._search_duckduckgo"""
+
+    @pytest.mark.asyncio
+    async def test_blocked_html_endpoint_falls_back_to_the_browser(self, monkeypatch):
+        searcher = WebSearcher(extract_images=False)
+        browser_calls = []
+
+        async def blocked(page, query, time_filter=None, region="cn-zh", topk=None):
+            raise DuckDuckGoBlockedError("challenge")
+
+        async def browser_search(page, query, time_filter=None, region="cn-zh", topk=None):
+            browser_calls.append((query, topk))
+            return [SearchLink(url="https://example.com/", title="From browser")]
+
+        class FakePool:
+            def page(self):
+                class Lease:
+                    async def __aenter__(self):
+                        # other searches run while this one waits for a page
+                        await asyncio.sleep(0.01)
+                        return object()
+
+                    async def __aexit__(self, *exc):
+                        return False
+                return Lease()
+
+        monkeypatch.setattr("src.tools.web_searcher.get_browser_pool", lambda: FakePool())
+        searcher.duckduckgo_html_searcher.search = blocked
+        searcher.duckduckgo_searcher.search = browser_search
+
+        results, _ = await asyncio.gather(
+            searcher._search_duckduckgo("ai", 5),
+            searcher._search_duckduckgo("chips", 9)
+        )
+        assert sorted(browser_calls) == [("ai", 5), ("chips", 9)]
+        assert results == [{"title": "From browser", "url": "https://example.com/", "snippet": "", "source": "duckduckgo"}]
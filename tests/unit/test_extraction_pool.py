@@ -0,0 +1,143 @@
+"""Extraction pool tests."""
+
+import sys
+import os
+import time
+import asyncio
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.monitoring.metrics import metrics, task_scope
+from src.tools.extraction_pool import ExtractionPool
+from src.extractor import ContentExtractor, extract_page_fields
+from src.pipeline import DeepSearchPipeline
+from src.tools.tiered_fetcher import parse_page
+
+
+ARTICLE = "<html><body><article>" + "<p>Semiconductor supply chains keep shifting east.</p>" * 400 + \
+    "<img src='/chart.png' width='640' height='480'></article></body></html>"
+
+
+RENDERED = (
+    "<html><head><title>Chip report</title><meta property='og:image' content='/og.png'></head><body>"
+    "<img src='data:image/png;base64,AAAA'><img src='//cdn.chips.com/lead.jpg'>"
+    "<article>" + "<p>Semiconductor supply chains keep shifting east.</p>" * 400 + "</article></body></html>"
+)
+
+
+class FakeRenderedPage:
+    url = "https://chips.com/news/a"
+
+    async def content(self):
+        return RENDERED
+
+    async def title(self):
+        # nothing from the live document: the parsed title is used
+        return ""
+
+
+class TestExtractionPool:
+    """ExtractionPool"""
+
+    def test_workers_are_not_forked(self):
+        assert ExtractionPool().start_method in ("forkserver", "spawn")
+        assert ExtractionPool(start_method="spawn").start_method == "spawn"
+
+    @pytest.mark.asyncio
+    async def test_large_pages_are_parsed_in_workers(self):
+        pool = ExtractionPool(workers=1, min_bytes=1024)
+        try:
+            with task_scope("parse-task"):
+                pooled = await pool.run(parse_page, ARTICLE, "https://chips.com/a", True, size=len(ARTICLE))
+                inline = await pool.run(parse_page, "<p>short</p>", "https://chips.com/b", True, size=12)
+        finally:
+            pool.shutdown()
+
+        assert pooled == parse_page(ARTICLE, "https://chips.com/a", True)
+        assert pooled[1][0]["url"] == "https://chips.com/chart.png"
+        assert inline[0] == "short"
+        assert pool.stats()["offloaded"] == 1 and pool.stats()["inline"] == 1
+        assert metrics.pop("parse-task")["extract.documents"] == 2
+
+    @pytest.mark.asyncio
+    async def test_event_loop_keeps_running_during_a_parse(self):
+        pool = ExtractionPool(workers=1, min_bytes=0)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        try:
+            # a blocking job: inline it would freeze the ticker
+            await pool.run(time.sleep, 0.3)
+        finally:
+            task.cancel()
+            pool.shutdown()
+        assert ticks >= 10
+
+    @pytest.mark.asyncio
+    async def test_pending_jobs_are_bounded(self):
+        pool = ExtractionPool(workers=2, max_pending=1, min_bytes=0)
+        try:
+            await pool.run(time.sleep, 0)  # start the workers
+            start = time.monotonic()
+            await asyncio.gather(pool.run(time.sleep, 0.15), pool.run(time.sleep, 0.15))
+            elapsed = time.monotonic() - start
+        finally:
+            pool.shutdown()
+        assert elapsed >= 0.28
+
+
+class TestPageExtract:
+    """ContentExtractor.extract_page_content"""
+
+    @pytest.mark.asyncio
+    async def test_title_and_images_come_from_the_pooled_parse(self, monkeypatch):
+        pool = ExtractionPool(workers=1, min_bytes=1024)
+        monkeypatch.setattr("src.extractor.get_extraction_pool", lambda: pool)
+        try:
+            extract = await ContentExtractor().extract_page_content(FakeRenderedPage(), "https://chips.com/news/a")
+        finally:
+            pool.shutdown()
+
+        assert pool.stats()["offloaded"] == 1 and pool.stats()["inline"] == 0
+        assert extract.title == "Chip report"
+        assert extract.og_image_url == "https://chips.com/og.png"
+        assert extract.first_image_url == "https://cdn.chips.com/lead.jpg"
+        assert "supply chains" in extract.text
+        assert extract.text == extract_page_fields(RENDERED, FakeRenderedPage.url)["text"]
+
+    @pytest.mark.asyncio
+    async def test_pipeline_extracts_rendered_html_in_the_pool(self, monkeypatch):
+        class FakeBrowserManager:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            async def get_page_content(self, url):
+                return RENDERED
+
+        pool = ExtractionPool(workers=1, min_bytes=1024)
+        monkeypatch.setattr("src.extractor.get_extraction_pool", lambda: pool)
+        pipeline = DeepSearchPipeline()
+        pipeline.browser_manager = FakeBrowserManager()
+        try:
+            extracted = await pipeline.extract_url_content(FakeRenderedPage.url)
+        finally:
+            pool.shutdown()
+
+        # trafilatura and BeautifulSoup ran in a worker, not on the event loop
+        assert pool.stats()["offloaded"] == 1 and pool.stats()["inline"] == 0
+        assert extracted["status"] == "success"
+        assert extracted == {
+            "url": FakeRenderedPage.url, "status": "success",
+            **ContentExtractor().extract_content(RENDERED, FakeRenderedPage.url)
+        }
+        assert extracted["metadata"]["og_image_url"] == "https://chips.com/og.png"
@@ -0,0 +1,133 @@
+"""Browser fetch profile tests."""
+
+import sys
+import os
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.tools.fetch_profiles import PROFILES, apply_fetch_profile, fetch_profile, profile_for
+
+
+class FakeRequest:
+    def __init__(self, resource_type, url):
+        self.resource_type = resource_type
+        self.url = url
+
+
+class FakeRoute:
+    def __init__(self, resource_type, url):
+        self.request = FakeRequest(resource_type, url)
+        self.action = None
+
+    async def abort(self):
+        self.action = "abort"
+
+    async def continue_(self):
+        self.action = "continue"
+
+
+class FakeSession:
+    def __init__(self):
+        self.sent = []
+        self.handlers = {}
+        self.detached = False
+
+    async def send(self, method, params=None):
+        self.sent.append((method, params))
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    async def detach(self):
+        self.detached = True
+
+
+class FakeContext:
+    def __init__(self, cdp):
+        self.cdp = cdp
+        self.sessions = []
+
+    async def new_cdp_session(self, page):
+        if not self.cdp:
+            raise RuntimeError("CDP session is only available in Chromium")
+        self.sessions.append(FakeSession())
+        return self.sessions[-1]
+
+
+class FakePage:
+    def __init__(self, cdp=False):
+        self.routes = []
+        self.context = FakeContext(cdp)
+
+    async def route(self, pattern, handler):
+        self.routes.append((pattern, handler))
+
+
+async def routed(page, resource_type, url):
+    route = FakeRoute(resource_type, url)
+    await page.routes[0][1](route)
+    return route.action
+
+
+class TestFetchProfiles:
+    """FetchProfile"""
+
+    def test_profile_follows_image_extraction(self, monkeypatch):
+        monkeypatch.delenv("BROWSER_FETCH_PROFILE", raising=False)
+        assert profile_for(True).name == "text+images"
+        assert profile_for(False).name == "text"
+        monkeypatch.setenv("BROWSER_FETCH_PROFILE", "full")
+        assert profile_for(False).name == "full"
+
+    def test_blocking_rules(self):
+        text, images = PROFILES["text"], PROFILES["text+images"]
+        assert text.blocks("image", "https://news.com/a.jpg")
+        assert not images.blocks("image", "https://news.com/a.jpg")
+        assert images.blocks("font", "https://news.com/a.woff2")
+        assert images.blocks("script", "https://www.googletagmanager.com/gtm.js")
+        assert images.blocks("script", "https://hm.baidu.com/hm.js")
+        assert not images.blocks("script", "https://www.baidu.com/app.js")
+        # the page itself always loads
+        assert not text.blocks("document", "https://ad.doubleclick.net/page")
+
+    def test_url_patterns(self):
+        patterns = PROFILES["text"].url_patterns(("doubleclick.net",))
+        assert "*.png" in patterns and "*.JPG?*" in patterns and "*.woff2" in patterns
+        assert "*://doubleclick.net/*" in patterns and "*://*.doubleclick.net/*" in patterns
+        assert "*.png" not in PROFILES["text+images"].url_patterns(())
+        assert PROFILES["full"].url_patterns() == []
+
+    @pytest.mark.asyncio
+    async def test_blocklist_goes_through_cdp_without_routing(self):
+        page = FakePage(cdp=True)
+        async with fetch_profile(page, PROFILES["text+images"], hosts=("hotjar.com",)):
+            session = page.context.sessions[0]
+            # page.route would turn off Chromium's HTTP cache
+            assert page.routes == []
+            assert session.sent[0] == ("Network.enable", None)
+            method, params = session.sent[1]
+            assert method == "Network.setBlockedURLs"
+            assert "*.woff2" in params["urls"] and "*://*.hotjar.com/*" in params["urls"]
+            assert "*.png" not in params["urls"]
+        # a pooled page goes back without the blocklist
+        assert session.detached
+
+        full = FakePage(cdp=True)
+        async with fetch_profile(full, PROFILES["full"]):
+            pass
+        assert full.context.sessions == []
+
+    @pytest.mark.asyncio
+    async def test_routes_abort_blocked_requests_without_cdp(self, monkeypatch):
+        monkeypatch.setenv("BROWSER_FETCH_BLOCK_HOSTS", "stats.example.org")
+        page = FakePage()
+        await apply_fetch_profile(page, PROFILES["text"])
+
+        assert await routed(page, "image", "https://news.com/a.png") == "abort"
+        assert await routed(page, "xhr", "https://stats.example.org/collect") == "abort"
+        assert await routed(page, "stylesheet", "https://news.com/site.css") == "continue"
+
+        full = FakePage()
+        await apply_fetch_profile(full, PROFILES["full"])
+        assert full.routes == []
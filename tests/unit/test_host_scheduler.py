@@ -0,0 +1,97 @@
+"""Per-host scheduler tests."""
+
+import sys
+import os
+import time
+import asyncio
+import pytest
+from aiohttp import web
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.tools import content_extractor as content_extractor_module
+from src.tools.content_extractor import ContentExtractor
+from src.tools.host_scheduler import HostScheduler, parse_retry_after
+from src.tools.http_session import close_http_session
+
+
+class TestHostScheduler:
+    """HostScheduler"""
+
+    def test_parse_retry_after(self):
+        assert parse_retry_after("3") == 3.0
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after(None) is None
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_capped_per_host(self):
+        scheduler = HostScheduler(rate=1000, burst=1000, max_per_host=2)
+        active = {"a.com": 0, "b.com": 0}
+        peak = {"a.com": 0, "b.com": 0}
+
+        async def fetch(url, host):
+            async with scheduler.slot(url):
+                active[host] += 1
+                peak[host] = max(peak[host], active[host])
+                await asyncio.sleep(0.02)
+                active[host] -= 1
+
+        await asyncio.gather(*[fetch(f"https://www.a.com/{i}", "a.com") for i in range(6)],
+                             *[fetch(f"https://b.com/{i}", "b.com") for i in range(2)])
+        assert peak == {"a.com": 2, "b.com": 2}
+        assert scheduler.get_status()["a.com"]["requests"] == 6
+
+    @pytest.mark.asyncio
+    async def test_rate_and_domain_overrides(self):
+        scheduler = HostScheduler(rate=1000, burst=1, domain_rates={"slow.com": 10})
+        start = time.monotonic()
+        for i in range(3):
+            async with scheduler.slot(f"https://news.slow.com/{i}"):
+                pass
+        assert time.monotonic() - start >= 0.18
+        assert scheduler.limiter("https://fast.com/").bucket.rate == 1000
+
+    @pytest.mark.asyncio
+    async def test_retry_after_pauses_the_host(self):
+        scheduler = HostScheduler(rate=1000, burst=1000, max_retry_after=0.3)
+        assert scheduler.observe("https://a.com/x", 200, {}) is None
+        assert scheduler.observe("https://a.com/x", 429, {"Retry-After": "120"}) == 0.3
+
+        start = time.monotonic()
+        async with scheduler.slot("https://a.com/y"):
+            pass
+        assert time.monotonic() - start >= 0.25
+        async with scheduler.slot("https://b.com/"):
+            pass
+
+    @pytest.mark.asyncio
+    async def test_fetch_paths_honour_retry_after(self, monkeypatch):
+        hits = []
+
+        async def handler(request):
+            hits.append(time.monotonic())
+            if len(hits) == 1:
+                return web.Response(status=429, headers={"Retry-After": "0.2"})
+            return web.Response(text="<html><title>ok</title></html>", content_type="text/html")
+
+        app = web.Application()
+        app.router.add_get("/page", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/page"
+
+        scheduler = HostScheduler()
+        monkeypatch.setattr(content_extractor_module, "get_host_scheduler", lambda: scheduler)
+        extractor = ContentExtractor()
+        try:
+            first = await extractor._fetch(url)
+            second = await extractor._fetch(url)
+        finally:
+            await close_http_session()
+            await runner.cleanup()
+
+        assert (first["status"], second["status"]) == (429, 200)
+        assert hits[1] - hits[0] >= 0.18
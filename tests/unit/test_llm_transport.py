@@ -0,0 +1,111 @@
+"""Pooled LLM transport tests."""
+
+import sys
+import os
+import asyncio
+import pytest
+import httpx
+from aiohttp import web
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+import src.llm.manager as manager_module
+from src.llm.client import resolve_base_url
+from src.llm.config import LLMConfig, LLMProvider
+from src.llm.manager import LLMManager
+from src.llm.transport import (
+    _get_pool, close_http_pools, get_http_client, get_pool_status, pool_key, prewarm_connections
+)
+
+
+async def _serve():
+    app = web.Application()
+    app.router.add_route("*", "/{tail:.*}", lambda request: web.Response(status=404))
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner, f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+
+class TestTransport:
+    """transport"""
+
+    def test_pool_key(self):
+        assert pool_key("https://api.deepseek.com/v1") == "https://api.deepseek.com:443"
+        assert pool_key("https://api.deepseek.com/beta/") == "https://api.deepseek.com:443"
+        assert pool_key("http://localhost:11434/v1") == "http://localhost:11434"
+        assert pool_key("https://example.com:8443/api") == "https://example.com:8443"
+        assert pool_key(None) == "https://:443"
+
+    def test_pools_are_shared_per_event_loop(self):
+        key = pool_key("https://api.example.com/v1")
+
+        async def pools():
+            first, second = _get_pool(httpx, key), _get_pool(httpx, key)
+            other = _get_pool(httpx, pool_key("https://other.example.com/v1"))
+            await close_http_pools()
+            return first, second, other
+
+        first, second, other = asyncio.run(pools())
+        assert first is second and first is not other
+        assert asyncio.run(pools())[0] is not first
+
+    @pytest.mark.asyncio
+    async def test_clients_share_connections(self):
+        runner, base = await _serve()
+        try:
+            for path in ("/v1", "/v2"):
+                client = get_http_client(base + path)
+                response = await client.get(base + path + "/models")
+                assert response.status_code == 404
+                await client.aclose()
+
+            pool = _get_pool(httpx, pool_key(base))
+            assert len(pool._pool.connections) == 1
+            assert f"httpx:{pool_key(base)}" in get_pool_status()["pools"]
+        finally:
+            await close_http_pools()
+            await runner.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_prewarm_opens_keep_alive_connections(self):
+        runner, base = await _serve()
+        try:
+            results = await prewarm_connections([base + "/v1", base + "/v1/", "http://127.0.0.1:9/v1", ""], timeout=2)
+            pool = _get_pool(httpx, pool_key(base))
+            assert len(pool._pool.connections) == 1
+        finally:
+            await close_http_pools()
+            await runner.cleanup()
+
+        assert results == {pool_key(base): True, "http://127.0.0.1:9": False}
+
+    @pytest.mark.asyncio
+    async def test_manager_prewarms_default_endpoints(self, monkeypatch):
+        monkeypatch.delenv("OPENAI_BASE_URL", raising=False)
+        warmed = []
+
+        async def fake_prewarm(urls, sdk_module=None, timeout=5.0):
+            warmed.extend(urls)
+            return {}
+
+        monkeypatch.setattr(manager_module, "prewarm_connections", fake_prewarm)
+        manager = LLMManager.__new__(LLMManager)
+        manager.configs = {
+            "default": LLMConfig(provider=LLMProvider.OPENAI, base_url=None, api_key="k"),
+            "deepseek": LLMConfig(provider=LLMProvider.DEEPSEEK, base_url=None, api_key="k"),
+            "custom": LLMConfig(provider=LLMProvider.OPENAI, base_url="https://gw.example.com/v1", api_key="k"),
+        }
+        await manager.prewarm_connections()
+
+        assert sorted(warmed) == [
+            "https://api.deepseek.com/v1", "https://api.openai.com/v1", "https://gw.example.com/v1"
+        ]
+
+    def test_resolve_base_url_follows_the_sdk_environment(self, monkeypatch):
+        monkeypatch.setenv("OPENAI_BASE_URL", "https://proxy.example.com/v1")
+        config = LLMConfig(provider=LLMProvider.OPENAI, base_url=None, api_key="k")
+        assert resolve_base_url(config) == "https://proxy.example.com/v1"
+        azure = LLMConfig(provider=LLMProvider.AZURE_OPENAI, base_url=None, api_key="k")
+        assert resolve_base_url(azure) is None
@@ -0,0 +1,66 @@
+"""Near-duplicate detection tests."""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.utils.near_duplicates import NearDuplicateIndex, deduplicate_documents, shingles
+
+ARTICLE_EN = (
+    "Global shipments of AI accelerators rose 42 percent in 2024 as cloud providers expanded "
+    "their data centre fleets. Analysts expect supply constraints on high bandwidth memory to ease "
+    "in the second half of 2025, while power availability becomes the main bottleneck for new sites. "
+    "Chip designers are responding with more efficient inference parts and custom silicon programmes."
+)
+ARTICLE_ZH = (
+    "2024年全球人工智能加速器出货量增长百分之四十二，云服务商持续扩建数据中心。"
+    "分析人士预计高带宽内存的供应紧张将在2025年下半年缓解，而电力供应将成为新建数据中心的主要瓶颈。"
+    "芯片设计公司正在推出能效更高的推理芯片和定制芯片项目。"
+)
+
+
+class TestShingles:
+    """shingles"""
+
+    def test_cjk_text_is_shingled_per_character(self):
+        assert "人 工 智" in shingles("人工智能")
+        assert "ai 芯 片" in shingles("AI芯片市场")
+        assert shingles("") == set()
+
+
+class TestDeduplicateDocuments:
+    """deduplicate_documents"""
+
+    def test_mirrors_collapse_to_the_richest_copy(self):
+        docs = [
+            {"url": "https://a.com/story", "full_content": ARTICLE_EN},
+            {"url": "https://b.com/other", "full_content": ARTICLE_ZH},
+            {"url": "https://m.a.com/story", "full_content": ARTICLE_EN + " Related: subscribe for more.",
+             "images": [{"url": "x"}]},
+            {"url": "https://mirror.cn/1", "full_content": "转载：" + ARTICLE_ZH},
+        ]
+        kept, report = deduplicate_documents(docs, threshold=0.8)
+
+        assert [d["url"] for d in kept] == ["https://m.a.com/story", "https://mirror.cn/1"]
+        assert kept[0]["near_duplicates"] == ["https://a.com/story"]
+        assert report["removed"] == 2 and report["clusters"] == 2
+        assert report["tokens_saved"] > 100
+
+    def test_distinct_and_short_documents_are_kept(self):
+        docs = [
+            {"url": "https://a.com/", "full_content": ARTICLE_EN},
+            {"url": "https://b.com/", "full_content": ARTICLE_EN.replace("AI accelerators", "smartphones")
+             .replace("cloud providers", "handset makers").replace("data centre fleets", "retail channels")
+             .replace("inference parts", "camera modules")},
+            {"url": "https://c.com/", "snippet": "AI chips"},
+            {"url": "https://d.com/", "snippet": "AI chips"},
+        ]
+        kept, report = deduplicate_documents(docs, threshold=0.9)
+        assert len(kept) == 4 and report["removed"] == 0
+
+    def test_index_clusters_in_insertion_order(self):
+        index = NearDuplicateIndex(0.8)
+        for text in (ARTICLE_ZH, ARTICLE_EN, ARTICLE_ZH + "。"):
+            index.add(text)
+        assert index.clusters() == [[0, 2], [1]]
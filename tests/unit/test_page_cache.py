@@ -0,0 +1,98 @@
+"""Page cache and URL canonicalisation tests."""
+
+import sys
+import os
+import time
+import pytest
+from aiohttp import web
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.utils.url_utils import canonical_url, domain_lookup
+from src.tools.page_cache import PageCache, conditional_headers, parse_domain_ttls
+from src.tools.http_session import close_http_session
+from src.tools import content_extractor as content_extractor_module
+from src.tools.content_extractor import ContentExtractor
+
+ARTICLE = "<html><head><title>Cached</title></head><body><article>" + "<p>Adoption grew 42% in 2024 across regions.</p>" * 30 + "</article></body></html>"
+
+
+class TestCanonicalUrl:
+    """canonical_url"""
+
+    def test_equivalent_spellings_share_a_key(self):
+        variants = [
+            "https://Example.com/a/b?b=2&a=1",
+            "HTTPS://example.com:443//a/b?a=1&b=2&utm_source=feed#section",
+            "https://example.com/a/b?spm=1.2.3&a=1&b=2",
+        ]
+        assert {canonical_url(u) for u in variants} == {"https://example.com/a/b?a=1&b=2"}
+
+    def test_meaningful_differences_are_kept(self):
+        assert canonical_url("http://example.com/a") != canonical_url("https://example.com/a")
+        assert canonical_url("https://example.com/a?page=2") != canonical_url("https://example.com/a?page=3")
+        assert canonical_url("https://zh.wikipedia.org/wiki/人工智能") == canonical_url(
+            "https://zh.wikipedia.org/wiki/%E4%BA%BA%E5%B7%A5%E6%99%BA%E8%83%BD"
+        )
+
+    def test_domain_lookup_prefers_the_most_specific_domain(self):
+        table = {"qq.com": 1, "news.qq.com": 2}
+        assert domain_lookup("https://news.qq.com/x", table) == 2
+        assert domain_lookup("https://www.qq.com/x", table) == 1
+        assert domain_lookup("https://notqq.com/x", table, 0) == 0
+
+
+class TestPageCache:
+    """PageCache"""
+
+    @pytest.mark.asyncio
+    async def test_fresh_and_stale_entries(self, tmp_path):
+        cache = PageCache(cache_dir=str(tmp_path), default_ttl=60, domain_ttls={"news.example.com": -1})
+        await cache.store("https://example.com/a?utm_source=x", "page", {"full_content": "text"}, etag='"v1"')
+
+        entry = await cache.lookup("https://example.com/a", "page")
+        assert entry["fresh"] and entry["data"] == {"full_content": "text"}
+        assert conditional_headers(entry) == {"If-None-Match": '"v1"'}
+        assert await cache.lookup("https://example.com/a", "other") is None
+
+        await cache.store("https://news.example.com/story", "page", {"full_content": "old"}, last_modified="Mon")
+        stale = await cache.lookup("https://news.example.com/story", "page")
+        assert stale is not None and not stale["fresh"]
+        assert cache.ttl_for("https://en.wikipedia.org/wiki/AI") == 7 * 24 * 3600
+
+    def test_parse_domain_ttls(self):
+        assert parse_domain_ttls("a.com=60, News.B.com=5,") == {"a.com": 60.0, "news.b.com": 5.0}
+
+    @pytest.mark.asyncio
+    async def test_stale_entry_is_revalidated_with_a_conditional_get(self, tmp_path, monkeypatch):
+        requests = []
+
+        async def handler(request):
+            requests.append(request.headers.get("If-None-Match"))
+            if request.headers.get("If-None-Match") == '"v1"':
+                return web.Response(status=304)
+            return web.Response(text=ARTICLE, content_type="text/html", headers={"ETag": '"v1"'})
+
+        app = web.Application()
+        app.router.add_get("/article", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/article"
+
+        # expire immediately so the second lookup has to revalidate
+        cache = PageCache(cache_dir=str(tmp_path), default_ttl=0)
+        monkeypatch.setattr(content_extractor_module, "get_page_cache", lambda: cache)
+        extractor = ContentExtractor()
+        try:
+            first = await extractor.extract_content(url)
+            time.sleep(0.01)
+            second = await extractor.extract_content(url)
+        finally:
+            await close_http_session()
+            await runner.cleanup()
+
+        assert requests == [None, '"v1"']
+        assert first["title"] == second["title"] == "Cached"
+        assert second["content"] == first["content"]
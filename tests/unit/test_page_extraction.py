@@ -0,0 +1,67 @@
+"""In-page extraction and selector recipe tests."""
+
+import sys
+import os
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.tools import page_extraction
+from src.tools.page_extraction import SelectorRecipes, extract_page
+
+
+class FakePage:
+    """Answers evaluate() like the extraction script, with the selector that would win."""
+
+    def __init__(self, winner):
+        self.winner = winner
+        self.calls = []
+
+    async def evaluate(self, script, args):
+        self.calls.append(args)
+        selector = args["preferred"] or self.winner
+        return {
+            "title": " Chip supply ",
+            "text": f"text of {selector}",
+            "selector": selector,
+            "images": [
+                {"src": "/img/a.png", "alt": "a", "width": 400, "height": 300},
+                {"src": "data:image/png;base64,xx", "alt": "", "width": 400, "height": 300},
+            ],
+        }
+
+
+class TestPageExtraction:
+    """extract_page / SelectorRecipes"""
+
+    @pytest.mark.asyncio
+    async def test_one_round_trip_and_recipe_reuse(self, tmp_path, monkeypatch):
+        recipes = SelectorRecipes(cache_dir=str(tmp_path))
+        monkeypatch.setattr(page_extraction, "get_selector_recipes", lambda: recipes)
+
+        first = FakePage(winner=".post-content")
+        extracted = await extract_page(first, "https://www.news.com/a/1")
+        assert len(first.calls) == 1 and first.calls[0]["preferred"] is None
+        assert extracted["title"] == "Chip supply"
+        assert extracted["images"] == [{"url": "https://www.news.com/img/a.png", "alt": "a", "width": 400, "height": 300}]
+
+        second = FakePage(winner="article")
+        await extract_page(second, "https://news.com/b/2", with_images=False)
+        assert second.calls[0]["preferred"] == ".post-content"
+        assert second.calls[0]["withImages"] is False
+
+        # recipes survive a restart, per domain
+        restarted = SelectorRecipes(cache_dir=str(tmp_path))
+        assert await restarted.preferred("https://news.com/c") == ".post-content"
+        assert await restarted.preferred("https://other.com/") is None
+
+    @pytest.mark.asyncio
+    async def test_recipe_is_relearned_when_it_stops_working(self, tmp_path):
+        recipes = SelectorRecipes(cache_dir=str(tmp_path))
+        await recipes.learn("https://a.com/", None, "article")
+        await recipes.learn("https://a.com/", "article", "main")
+        assert await recipes.preferred("https://a.com/x") == "main"
+
+        # the body fallback is never learned
+        await recipes.learn("https://a.com/", "main", None)
+        assert await recipes.preferred("https://a.com/x") == "main"
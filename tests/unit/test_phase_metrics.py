@@ -0,0 +1,110 @@
+"""Per-phase metrics and benchmark comparison tests."""
+
+import sys
+import os
+import asyncio
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.monitoring.metrics import TaskMetrics, metrics, phase, task_scope, current_phase
+from benchmarks.compare import compare
+from benchmarks.fake_llm import synthesize
+
+
+class TestPhaseMetrics:
+    """phase"""
+
+    def setup_method(self):
+        metrics.reset()
+
+    @pytest.mark.asyncio
+    async def test_counters_are_attributed_to_the_innermost_phase(self):
+        with task_scope("task-p"):
+            async with phase("outer"):
+                metrics.incr("llm.upstream_calls")
+                async with phase("inner"):
+                    assert current_phase() == "inner"
+                    metrics.incr("llm.upstream_calls", 2)
+                assert current_phase() == "outer"
+
+        phases = metrics.phases("task-p")
+        assert phases["outer"]["llm.upstream_calls"] == 1
+        assert phases["inner"]["llm.upstream_calls"] == 2
+        assert phases["outer"]["calls"] == 1
+        assert phases["outer"]["seconds"] >= phases["inner"]["seconds"]
+        assert metrics.get("task-p")["llm.upstream_calls"] == 3
+        assert current_phase() is None
+
+    @pytest.mark.asyncio
+    async def test_decorator_times_concurrent_calls_independently(self):
+        @phase("writing")
+        async def write(delay):
+            await asyncio.sleep(delay)
+            metrics.incr("sections")
+            return delay
+
+        assert await asyncio.gather(write(0.02), write(0.01)) == [0.02, 0.01]
+
+        counters = metrics.phases()["writing"]
+        assert counters["calls"] == 2
+        assert counters["sections"] == 2
+        assert counters["seconds"] >= 0.03
+        assert counters["peak_rss_mb"] > 0
+
+    def test_phase_is_recorded_when_the_body_raises(self):
+        with pytest.raises(ValueError):
+            with phase("failing"):
+                raise ValueError("boom")
+        assert metrics.phases()["failing"]["calls"] == 1
+        assert current_phase() is None
+
+    def test_pop_drops_task_phases(self):
+        local = TaskMetrics()
+        local.record_phase("export", 0.5, task_id="t1")
+        assert local.phases("t1")["export"]["seconds"] == 0.5
+        local.pop("t1")
+        assert local.phases("t1") == {}
+        assert local.phases()["export"]["calls"] == 1
+
+
+class TestBenchmarkCompare:
+    """benchmarks.compare"""
+
+    @staticmethod
+    def _report(seconds, calls):
+        return {"scenarios": {"report": {
+            "total": {"wall_seconds": seconds, "llm_calls": calls},
+            "phases": {"export": {"wall_seconds": 0.01, "llm_calls": 0}},
+        }}}
+
+    def test_relative_regression_is_flagged(self):
+        rows = compare(self._report(10.0, 20), self._report(10.5, 30), max_regression=0.15)
+        flagged = {(r["phase"], r["field"]) for r in rows if r["regressed"]}
+        assert flagged == {("total", "llm_calls")}
+
+    def test_small_absolute_time_changes_are_noise(self):
+        base = self._report(10.0, 20)
+        new = self._report(10.0, 20)
+        new["scenarios"]["report"]["phases"]["export"]["wall_seconds"] = 0.03
+        assert not any(r["regressed"] for r in compare(base, new, min_seconds=0.05))
+
+
+class TestSchemaSynthesis:
+    """benchmarks.fake_llm.synthesize"""
+
+    def test_refs_defaults_and_enums(self):
+        schema = {
+            "type": "object",
+            "properties": {
+                "items": {"type": "array", "items": {"$ref": "#/$defs/Item"}},
+                "mode": {"enum": ["fast", "slow"]},
+                "limit": {"type": "integer", "default": 7},
+            },
+            "$defs": {"Item": {"type": "object", "properties": {"score": {"type": "number"}}}},
+        }
+        value = synthesize(schema)
+        assert value["mode"] == "fast"
+        assert value["limit"] == 7
+        assert len(value["items"]) == 3
+        assert value["items"][0]["score"] == 0.8
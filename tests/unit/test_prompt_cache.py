@@ -0,0 +1,48 @@
+"""Prompt-prefix caching layout tests."""
+
+import sys
+import os
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.llm.prompt_cache import (
+    build_cached_messages, to_openai_messages, to_anthropic_request, cached_prompt_tokens
+)
+
+
+class TestPromptCache:
+    """prompt_cache"""
+
+    def test_openai_layout_puts_shared_prefix_first(self):
+        messages = [{"role": "user", "content": [
+            {"type": "text", "text": "slide 3"},
+            {"type": "text", "text": "CSS GUIDE", "cacheable": True},
+        ]}]
+        converted = to_openai_messages(messages)
+
+        assert converted == [{"role": "user", "content": "CSS GUIDE\n\nslide 3"}]
+
+    def test_plain_messages_are_untouched(self):
+        messages = [{"role": "system", "content": "sys"}, {"role": "user", "content": "hi"}]
+        assert to_openai_messages(messages) == messages
+        assert to_anthropic_request(messages) == ("sys", [{"role": "user", "content": "hi"}])
+
+    def test_anthropic_cache_control_blocks(self):
+        system, messages = to_anthropic_request(
+            build_cached_messages("CSS GUIDE", "slide 3", system_prompt="sys")
+        )
+
+        assert system == [{"type": "text", "text": "sys", "cache_control": {"type": "ephemeral"}}]
+        assert messages[0]["content"][0]["cache_control"] == {"type": "ephemeral"}
+        assert "cache_control" not in messages[0]["content"][1]
+
+    def test_cached_token_usage(self):
+        openai_usage = SimpleNamespace(prompt_tokens_details=SimpleNamespace(cached_tokens=1024))
+        deepseek_usage = SimpleNamespace(prompt_cache_hit_tokens=512)
+        anthropic_usage = SimpleNamespace(cache_read_input_tokens=2048, cache_creation_input_tokens=0)
+
+        assert cached_prompt_tokens(openai_usage)["cached_tokens"] == 1024
+        assert cached_prompt_tokens(deepseek_usage)["cached_tokens"] == 512
+        assert cached_prompt_tokens(anthropic_usage)["cached_tokens"] == 2048
+        assert cached_prompt_tokens(None)["cached_tokens"] == 0
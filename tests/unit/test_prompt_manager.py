@@ -0,0 +1,47 @@
+"""PromptManager lazy loading / template cache tests."""
+
+import sys
+import os
+import time
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.llm.prompts import PromptManager
+
+
+class TestPromptManager:
+    """PromptManager"""
+
+    def test_lazy_load_shared_registry_and_hot_reload(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("PROMPT_RELOAD_INTERVAL", "0")
+        monkeypatch.setenv("PROMPT_BYTECODE_CACHE_DIR", str(tmp_path / "bytecode"))
+        prompt_file = tmp_path / "prompts" / "agents" / "demo" / "system.yaml"
+        prompt_file.parent.mkdir(parents=True)
+        prompt_file.write_text('content: "Hello {{ name }}"\n', encoding="utf-8")
+
+        first = PromptManager(str(tmp_path / "prompts"))
+        second = PromptManager(str(tmp_path / "prompts"))
+        assert first.prompts_cache == {}
+        # the bytecode cache directory appears with the first compiled template, not before
+        assert not (tmp_path / "bytecode").exists()
+
+        assert first.get_prompt("agents/demo/system", name="A") == "Hello A"
+        assert list((tmp_path / "bytecode").iterdir())
+        assert "agents/demo/system" in second.prompts_cache
+        assert second.list_prompts() == ["agents/demo/system"]
+
+        prompt_file.write_text('content: "Bye {{ name }}"\n', encoding="utf-8")
+        mtime = time.time() + 5
+        os.utime(prompt_file, (mtime, mtime))
+        assert second.get_prompt("agents/demo/system", name="B") == "Bye B"
+
+    def test_missing_and_added_prompts(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("PROMPT_BYTECODE_CACHE_DIR", str(tmp_path / "bytecode"))
+        manager = PromptManager(str(tmp_path / "prompts"))
+        with pytest.raises(KeyError):
+            manager.get_prompt("does/not/exist")
+
+        manager.add_prompt("custom/inline", "{{ a }}+{{ b }}", {"version": 2})
+        assert manager.get_prompt("custom/inline", a=1, b=2) == "1+2"
+        assert manager.get_prompt_metadata("custom/inline") == {"version": 2}
@@ -0,0 +1,200 @@
+"""Rate limiter, AIMD window and LLM retry loop tests."""
+
+import sys
+import os
+import time
+import asyncio
+import pytest
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.llm.client import LLMClient
+from src.llm.config import LLMConfig
+from src.llm.rate_limiter import AdaptiveConcurrency, ProviderRateLimiter, classify_error
+from src.utils.token_bucket import TokenBucket
+
+
+class UpstreamError(Exception):
+    """SDK-style error carrying a status code and response headers."""
+
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+class RateLimitError(Exception):
+    pass
+
+
+def _client(limiter, max_retries=3):
+    client = LLMClient(LLMConfig(api_key="sk-test", model_name="rate-limiter-test", max_retries=max_retries))
+    client._limiter = limiter
+    return client
+
+
+class TestAdaptiveConcurrency:
+    """AdaptiveConcurrency"""
+
+    @pytest.mark.asyncio
+    async def test_additive_increase_multiplicative_decrease(self):
+        window = AdaptiveConcurrency(initial=4, minimum=1, maximum=5)
+        await window.acquire()
+        await window.release(latency=1.0)
+        assert window.limit == pytest.approx(4.25)
+
+        await window.acquire()
+        await window.release(throttled=True)
+        assert window.limit == pytest.approx(2.125)
+        # one decrease per burst of failures
+        await window.acquire()
+        await window.release(throttled=True)
+        assert window.limit == pytest.approx(2.125)
+
+        for _ in range(200):
+            await window.acquire()
+            await window.release(latency=1.0)
+        assert window.limit == 5.0
+        assert window.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_latency_spike_shrinks_the_window(self):
+        window = AdaptiveConcurrency(initial=8, latency_spike_factor=3.0)
+        for _ in range(5):
+            await window.acquire()
+            await window.release(latency=1.0)
+        before = window.limit
+        await window.acquire()
+        await window.release(latency=10.0)
+        assert window.limit == pytest.approx(before * 0.5)
+
+    @pytest.mark.asyncio
+    async def test_acquire_waits_for_a_free_slot(self):
+        window = AdaptiveConcurrency(initial=1, maximum=1)
+        await window.acquire()
+        waiter = asyncio.create_task(window.acquire())
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+        await window.release()
+        await asyncio.wait_for(waiter, 1)
+        assert window.in_flight == 1
+
+
+class TestTokenBucket:
+    """TokenBucket"""
+
+    def test_burst_then_empty(self):
+        bucket = TokenBucket(rate=1.0, capacity=3)
+        assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+        bucket.refund(2)
+        assert bucket.try_acquire(2)
+        bucket.consume(5)
+        assert bucket.tokens < 0
+
+    @pytest.mark.asyncio
+    async def test_acquire_waits_for_refill(self):
+        bucket = TokenBucket(rate=20.0, capacity=1)
+        await bucket.acquire()
+        start = time.monotonic()
+        waited = await bucket.acquire()
+        assert waited > 0 and time.monotonic() - start >= 0.04
+
+    @pytest.mark.asyncio
+    async def test_oversized_requests_are_clamped(self):
+        bucket = TokenBucket.per_minute(600, burst=10)
+        assert bucket.rate == 10.0
+        assert await asyncio.wait_for(bucket.acquire(1000), 1) == 0.0
+
+    def test_rate_must_be_positive(self):
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
+
+
+class TestClassifyError:
+    """classify_error"""
+
+    def test_throttling_and_retry_after(self):
+        assert classify_error(UpstreamError(429, {"retry-after": "7"})) == (True, True, 7.0)
+        assert classify_error(RateLimitError()) == (True, True, None)
+        assert classify_error(UpstreamError(429, {"retry-after": "Wed, 21 Oct 2026 07:28:00 GMT"})) == (True, True, None)
+
+    def test_transient_and_permanent_errors(self):
+        assert classify_error(UpstreamError(503)) == (False, True, None)
+        assert classify_error(UpstreamError(408)) == (False, True, None)
+        assert classify_error(UpstreamError(400)) == (False, False, None)
+        assert classify_error(ValueError("bad")) == (False, False, None)
+
+
+class TestRetryLoop:
+    """LLMClient._call_with_limits"""
+
+    @pytest.mark.asyncio
+    async def test_retry_after_then_backoff_then_success(self):
+        limiter = ProviderRateLimiter("test/retry", {"backoff_base": 0.02})
+        client = _client(limiter)
+        errors = [UpstreamError(429, {"retry-after": "0.05"}), UpstreamError(500)]
+        calls = []
+
+        async def call():
+            calls.append(time.monotonic())
+            if errors:
+                raise errors.pop(0)
+            return {"content": "ok", "usage": {"total_tokens": 10}}
+
+        result = await client._call_with_limits(call, estimated_tokens=10)
+
+        assert result["content"] == "ok"
+        assert len(calls) == 3
+        assert calls[1] - calls[0] >= 0.05      # Retry-After honoured
+        assert calls[2] - calls[1] >= 0.04      # backoff_base * 2 ** 1
+        assert limiter.stats["retries"] == 2 and limiter.stats["throttled"] == 1
+        assert limiter.concurrency.limit < 8
+        assert limiter.concurrency.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_permanent_errors_and_exhausted_retries_raise(self):
+        limiter = ProviderRateLimiter("test/raise", {"backoff_base": 0.001})
+        client = _client(limiter, max_retries=1)
+        attempts = 0
+
+        async def flaky():
+            nonlocal attempts
+            attempts += 1
+            raise UpstreamError(502)
+
+        async def rejected():
+            raise UpstreamError(400)
+
+        with pytest.raises(UpstreamError):
+            await client._call_with_limits(flaky)
+        assert attempts == 2
+        with pytest.raises(UpstreamError):
+            await client._call_with_limits(rejected)
+        assert limiter.stats["retries"] == 1
+        assert limiter.concurrency.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_call_releases_its_slot(self):
+        limiter = ProviderRateLimiter("test/cancel", {"initial_concurrency": 1, "max_concurrency": 1})
+        client = _client(limiter)
+        started = asyncio.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(10)
+
+        task = asyncio.create_task(client._call_with_limits(slow))
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert limiter.concurrency.in_flight == 0
+        assert limiter.concurrency.limit == 1.0 and limiter.concurrency.samples == 0
+        assert limiter.stats["throttled"] == 0
+
+        async def quick():
+            return {"content": "ok"}
+
+        assert (await asyncio.wait_for(client._call_with_limits(quick), 1))["content"] == "ok"
@@ -0,0 +1,68 @@
+"""SERP cache tests."""
+
+import sys
+import os
+import asyncio
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.tools import web_searcher as web_searcher_module
+from src.tools.serp_cache import SearchResultCache, normalize_query
+from src.tools.web_searcher import WebSearcher
+
+RESULTS = [{"title": f"r{i}", "url": f"https://example.com/{i}", "snippet": "", "source": "duckduckgo"} for i in range(10)]
+
+
+class TestSearchResultCache:
+    """SearchResultCache"""
+
+    def test_query_normalisation(self):
+        assert normalize_query("  AI   Trends ２０２５ ") == "ai trends 2025"
+        assert SearchResultCache.make_key("duckduckgo", "AI trends", "cn-zh", None) == \
+            SearchResultCache.make_key("duckduckgo", "ai  TRENDS", "CN-ZH", None)
+        assert SearchResultCache.make_key("duckduckgo", "ai", "cn-zh", "day") != \
+            SearchResultCache.make_key("duckduckgo", "ai", "cn-zh", None)
+
+    def test_ttl_depends_on_time_filter(self, tmp_path):
+        cache = SearchResultCache(cache_dir=str(tmp_path))
+        assert cache.ttl_for("day") < cache.ttl_for("week") < cache.ttl_for(None)
+        assert cache.ttl_for("Month") == cache.ttl_for("month")
+
+    @pytest.mark.asyncio
+    async def test_entries_cover_smaller_requests_only(self, tmp_path):
+        cache = SearchResultCache(cache_dir=str(tmp_path))
+        await cache.set("duckduckgo", "ai", 5, "cn-zh", None, RESULTS[:5])
+        assert await cache.get("duckduckgo", "AI", 3, "cn-zh", None) == RESULTS[:3]
+        assert await cache.get("duckduckgo", "ai", 10, "cn-zh", None) is None
+
+        # the engine had only 4 results: larger requests cannot do better
+        await cache.set("duckduckgo", "rare", 10, "cn-zh", None, RESULTS[:4])
+        assert await cache.get("duckduckgo", "rare", 20, "cn-zh", None) == RESULTS[:4]
+
+        await cache.set("duckduckgo", "blocked", 10, "cn-zh", None, [])
+        assert await cache.get("duckduckgo", "blocked", 10, "cn-zh", None) is None
+
+
+class TestWebSearcherSerpCache:
+    """WebSearcher._get_search_results"""
+
+    @pytest.mark.asyncio
+    async def test_repeated_and_concurrent_searches_hit_the_engine_once(self, tmp_path, monkeypatch):
+        cache = SearchResultCache(cache_dir=str(tmp_path))
+        monkeypatch.setattr(web_searcher_module, "get_serp_cache", lambda: cache)
+        searcher = WebSearcher(extract_images=False)
+        calls = []
+
+        async def engine(query, max_results=10, time_filter=None, region="cn-zh"):
+            calls.append(query)
+            await asyncio.sleep(0.02)
+            return RESULTS[:max_results]
+
+        searcher._search_duckduckgo = engine
+        first = await asyncio.gather(*[searcher._get_search_results("AI chips", 5) for _ in range(3)])
+        again = await searcher._get_search_results("ai  chips", 5)
+
+        assert calls == ["AI chips"]
+        assert all(r == RESULTS[:5] for r in first)
+        assert again == RESULTS[:5]
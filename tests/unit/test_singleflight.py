@@ -0,0 +1,52 @@
+"""SingleFlight request coalescing tests."""
+
+import sys
+import os
+import asyncio
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.llm.singleflight import SingleFlight
+from src.monitoring.metrics import metrics, task_scope
+
+
+class TestSingleFlight:
+    """SingleFlight"""
+
+    @pytest.mark.asyncio
+    async def test_identical_calls_share_one_upstream_call(self):
+        flight = SingleFlight("test")
+        calls = 0
+
+        async def upstream():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return {"content": "ok"}
+
+        with task_scope("task-a"):
+            results = await asyncio.gather(*[flight.do("same", upstream) for _ in range(4)])
+
+        assert calls == 1
+        assert all(r == {"content": "ok"} for r in results)
+        assert metrics.pop("task-a")["test.coalesced"] == 4 - 1
+        assert flight.in_flight() == 0
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate_and_are_not_remembered(self):
+        flight = SingleFlight("test")
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise ValueError("upstream down")
+
+        results = await asyncio.gather(
+            flight.do("k", failing), flight.do("k", failing), return_exceptions=True
+        )
+        assert all(isinstance(r, ValueError) for r in results)
+
+        async def ok():
+            return "recovered"
+
+        assert await flight.do("k", ok) == "recovered"
@@ -0,0 +1,104 @@
+"""Streaming body reader tests."""
+
+import sys
+import os
+import pytest
+from aiohttp import web
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.tools.http_session import close_http_session, get_http_session
+from src.tools.stream_reader import read_body, sniff_content_type
+from src.tools.tiered_fetcher import TieredFetcher
+
+HUGE_ARTICLE = (
+    "<html><head><title>Long read</title></head><body><article>"
+    + "".join(f"<p>Paragraph {i}: fabs in the region added capacity while demand for chips kept rising.</p>"
+              for i in range(40000))
+    + "</article></body></html>"
+).encode()
+CHINESE_ARTICLE = (
+    "<html><head><meta charset='utf-8'><title>长文</title></head><body><article>"
+    + "".join(f"<p>第{i}段：该地区的晶圆厂持续扩产，而芯片需求仍在增长，供应链继续向东转移，多家企业宣布了新的投资计划。</p>" for i in range(4000))
+    + "</article></body></html>"
+).encode("utf-8")
+PDF = b"%PDF-1.7\n" + b"0" * 500000
+
+
+async def _serve(routes):
+    app = web.Application()
+    for path, (body, content_type) in routes.items():
+        async def handler(request, body=body, content_type=content_type):
+            return web.Response(body=body, headers={"Content-Type": content_type})
+        app.router.add_get(path, handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner, f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+
+class TestStreamReader:
+    """read_body"""
+
+    def test_sniffing(self):
+        assert sniff_content_type(b"%PDF-1.4 ...", "text/html; charset=utf-8") == "application/pdf"
+        assert sniff_content_type(b"PK\x03\x04...", "") == "application/zip"
+        docx = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+        assert sniff_content_type(b"PK\x03\x04...", docx) == docx
+        assert sniff_content_type(b"\xef\xbb\xbf  <!DOCTYPE html><html>", "application/octet-stream") == "text/html"
+        assert sniff_content_type(b"plain words", "Text/Plain; charset=utf-8") == "text/plain"
+
+    @pytest.mark.asyncio
+    async def test_reads_stop_early(self):
+        runner, base = await _serve({
+            "/huge": (HUGE_ARTICLE, "text/html"),
+            "/fake.html": (PDF, "text/html"),
+        })
+        session = get_http_session()
+        try:
+            async with session.get(f"{base}/huge") as response:
+                enough = await read_body(response, 10 * 1024 * 1024, text_chars=12000)
+            async with session.get(f"{base}/huge") as response:
+                capped = await read_body(response, 100 * 1024)
+            async with session.get(f"{base}/fake.html") as response:
+                binary = await read_body(response, 10 * 1024 * 1024, text_chars=12000)
+        finally:
+            await close_http_session()
+            await runner.cleanup()
+
+        assert enough["stopped"] == "enough_text"
+        assert len(enough["body"]) < 256 * 1024 < len(HUGE_ARTICLE)
+        assert capped["stopped"] == "max_bytes" and len(capped["body"]) == 100 * 1024
+        assert binary == {"body": b"", "content_type": "application/pdf", "stopped": "binary"}
+
+    @pytest.mark.asyncio
+    async def test_http_tier_keeps_the_text_cap(self):
+        runner, base = await _serve({"/huge": (HUGE_ARTICLE, "text/html"), "/fake.html": (PDF, "text/html")})
+        fetcher = TieredFetcher(max_chars=8000)
+        try:
+            page = await fetcher.fetch_http({"url": f"{base}/huge"}, with_images=False)
+            pdf = await fetcher.fetch_http({"url": f"{base}/fake.html", "snippet": "s"}, with_images=False)
+        finally:
+            await close_http_session()
+            await runner.cleanup()
+
+        assert page["has_full_content"] and page["page_bytes"] < 256 * 1024
+        assert page["full_content"].endswith("...")
+        assert pdf["has_full_content"] is False
+        # sniffed as a PDF and handed to the document fetcher, which cannot read the filler bytes
+        assert pdf["fetch_error"].startswith("unreadable pdf")
+
+    @pytest.mark.asyncio
+    async def test_chinese_pages_keep_the_full_character_cap(self):
+        runner, base = await _serve({"/zh": (CHINESE_ARTICLE, "text/html; charset=utf-8")})
+        try:
+            page = await TieredFetcher().fetch_http({"url": f"{base}/zh"}, with_images=False)
+        finally:
+            await close_http_session()
+            await runner.cleanup()
+
+        # the same 10,000 characters an English page keeps, not a quarter of them
+        assert page["has_full_content"]
+        assert 9000 <= len(page["full_content"]) <= 10003
+        assert page["page_bytes"] < len(CHINESE_ARTICLE)
@@ -0,0 +1,106 @@
+"""Subtask scheduler tests."""
+
+import sys
+import os
+import asyncio
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.agents.subtask_scheduler import SubtaskScheduler, UpstreamFindings, format_upstream_findings
+
+
+class TestSubtaskScheduler:
+    """SubtaskScheduler"""
+
+    @pytest.mark.asyncio
+    async def test_runs_concurrently_under_the_limit_in_input_order(self):
+        active = 0
+        peak = 0
+
+        async def worker(subtask):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            # later subtasks finish first
+            await asyncio.sleep(0.05 - 0.01 * int(subtask["id"]))
+            active -= 1
+            return subtask["id"]
+
+        subtasks = [{"id": str(i)} for i in range(5)]
+        results = await SubtaskScheduler(max_concurrency=2).run(subtasks, worker)
+
+        assert results == ["0", "1", "2", "3", "4"]
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_dependencies_finish_first(self):
+        order = []
+
+        async def worker(subtask):
+            order.append(("start", subtask["id"]))
+            await asyncio.sleep(0.01)
+            order.append(("end", subtask["id"]))
+            return subtask["id"]
+
+        subtasks = [
+            {"id": "summary", "depends_on": ["a", "b"]},
+            {"id": "a"},
+            {"id": "b", "depends_on": "a"},
+            {"id": "c", "depends_on": ["missing"]},
+        ]
+        results = await SubtaskScheduler(max_concurrency=4).run(subtasks, worker)
+
+        assert results == ["summary", "a", "b", "c"]
+        assert order.index(("end", "a")) < order.index(("start", "b"))
+        assert order.index(("end", "b")) < order.index(("start", "summary"))
+        assert order.index(("start", "c")) < order.index(("end", "a"))
+
+    @pytest.mark.asyncio
+    async def test_failures_and_cycles_do_not_stall_the_run(self):
+        async def worker(subtask):
+            if subtask["id"] == "x":
+                raise RuntimeError("search failed")
+            return subtask["id"]
+
+        subtasks = [
+            {"id": "x"},
+            {"id": "y", "depends_on": ["x", "z"]},
+            {"id": "z", "depends_on": ["y"]},
+        ]
+        results = await asyncio.wait_for(SubtaskScheduler(2).run(subtasks, worker), timeout=1)
+
+        assert isinstance(results[0], RuntimeError)
+        assert results[1:] == ["y", "z"]
+
+
+class TestUpstreamFindings:
+    """UpstreamFindings"""
+
+    @pytest.mark.asyncio
+    async def test_dependents_see_their_dependencies_summaries(self):
+        upstream = UpstreamFindings(max_tokens=20)
+        seen = {}
+
+        async def worker(subtask):
+            subtask = upstream.attach(subtask)
+            seen[subtask["id"]] = subtask.get("upstream_findings", [])
+            upstream.record(subtask, f"{subtask['title']} findings " + "detail " * 100)
+            return subtask["id"]
+
+        subtasks = [
+            {"id": "task_1", "title": "Market size"},
+            {"id": "task_2", "title": "Players"},
+            {"id": "task_3", "title": "Outlook", "depends_on": ["task_1", "task_2"]},
+        ]
+        await SubtaskScheduler(max_concurrency=3).run(subtasks, worker)
+
+        assert seen["task_1"] == [] and seen["task_2"] == []
+        assert [f["id"] for f in seen["task_3"]] == ["task_1", "task_2"]
+        assert seen["task_3"][0]["summary"].startswith("Market size findings")
+        assert len(seen["task_3"][0]["summary"]) < 200
+        assert "upstream_findings" not in subtasks[2]
+
+        section = format_upstream_findings({"upstream_findings": seen["task_3"]})
+        assert "## Market size" in section and "## Players" in section
+        assert format_upstream_findings(subtasks[0]) == ""
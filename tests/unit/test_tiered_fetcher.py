@@ -0,0 +1,119 @@
+"""Tiered (HTTP-first) fetcher tests."""
+
+import asyncio
+import sys
+import os
+import pytest
+from aiohttp import web
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.tools.tiered_fetcher import TieredFetcher, escalation_reason, extract_images
+from src.tools.http_session import close_http_session
+
+ARTICLE = (
+    "<html><head><title>Report</title></head><body><nav>Home</nav><article><h1>Report</h1>"
+    + "".join(f"<p>Paragraph {i}: adoption grew 42% in 2024 while costs fell across regions.</p>" for i in range(20))
+    + '<img src="/img/chart.png" width="640" height="360" alt="chart"><img src="/icon.png" width="16" height="16">'
+    + "</article></body></html>"
+)
+SPA_SHELL = '<html><body><div id="root"></div><noscript>Please enable JavaScript</noscript></body></html>'
+
+
+async def _serve(routes):
+    app = web.Application()
+    for path, (status, body) in routes.items():
+        async def handler(request, status=status, body=body):
+            return web.Response(status=status, text=body, content_type="text/html")
+        app.router.add_get(path, handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+class TestEscalation:
+    """escalation_reason"""
+
+    def test_reasons(self):
+        assert escalation_reason(200, "text/html", "<p>x</p>", "x" * 800, 500) is None
+        assert escalation_reason(403, "text/html", "", "", 500) == "http_403"
+        assert escalation_reason(404, "text/html", "", "", 500) is None
+        assert escalation_reason(200, "text/html", SPA_SHELL, "", 500) == "empty"
+        assert escalation_reason(200, "text/html", SPA_SHELL, "Please enable JavaScript", 500) == "js_gated"
+        assert escalation_reason(200, "text/html", "<p>short</p>", "short", 500) == "thin"
+        assert escalation_reason(200, "application/pdf", "", "", 500) is None
+
+    def test_static_images_skip_icons_and_resolve_urls(self):
+        images = extract_images(ARTICLE, "https://example.com/news/a.html")
+        assert [img["url"] for img in images] == ["https://example.com/img/chart.png"]
+        assert images[0]["width"] == 640
+
+
+class TestTieredFetcher:
+    """TieredFetcher"""
+
+    @pytest.mark.asyncio
+    async def test_http_tier_serves_articles_and_flags_shells(self):
+        runner, base = await _serve({
+            "/article": (200, ARTICLE),
+            "/app": (200, SPA_SHELL),
+            "/missing": (404, "not found"),
+            "/blocked": (403, "denied"),
+        })
+        fetcher = TieredFetcher()
+        try:
+            article = await fetcher.fetch_http({"url": f"{base}/article"})
+            assert article["fetch_tier"] == "http"
+            assert article["has_full_content"]
+            assert "adoption grew 42%" in article["full_content"]
+            assert article["image_count"] == 1
+
+            shell = await fetcher.fetch_http({"url": f"{base}/app"})
+            assert shell["escalate"] and shell["escalation_reason"] in ("empty", "js_gated")
+
+            blocked = await fetcher.fetch_http({"url": f"{base}/blocked"})
+            assert blocked["escalation_reason"] == "http_403"
+
+            missing = await fetcher.fetch_http({"url": f"{base}/missing", "snippet": "snip"})
+            assert not missing.get("escalate")
+            assert missing["has_full_content"] is False
+            assert missing["full_content"] == "snip"
+        finally:
+            await close_http_session()
+            await runner.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_http_tier_reads_bodies_streamed_in_pieces(self):
+        # the article arrives after the first network chunk: reading only the
+        # buffered bytes would leave an empty <body> and escalate a good page
+        head = "<html><head><title>Report</title></head><body>" + " " * 2048
+        pieces = [ARTICLE[i:i + 512] for i in range(ARTICLE.index("<nav>"), len(ARTICLE), 512)]
+
+        async def streamed(request):
+            response = web.StreamResponse(headers={"Content-Type": "text/html"})
+            await response.prepare(request)
+            await response.write(head.encode())
+            for piece in pieces:
+                await asyncio.sleep(0.01)
+                await response.write(piece.encode())
+            await response.write_eof()
+            return response
+
+        app = web.Application()
+        app.router.add_get("/streamed", streamed)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            article = await TieredFetcher().fetch_http({"url": f"http://127.0.0.1:{port}/streamed"})
+            assert not article.get("escalate")
+            assert article["has_full_content"]
+            assert "Paragraph 19" in article["full_content"]
+        finally:
+            await close_http_session()
+            await runner.cleanup()
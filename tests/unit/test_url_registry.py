@@ -0,0 +1,129 @@
+"""URL registry tests."""
+
+import sys
+import os
+import asyncio
+import pytest
+from aiohttp import web
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.monitoring.metrics import task_scope
+from src.tools import content_extractor as content_extractor_module
+from src.tools.content_extractor import ContentExtractor
+from src.tools.http_session import close_http_session
+from src.tools.page_cache import PageCache
+from src.tools.url_registry import UrlRegistry, fetch_key
+
+
+class CountingFetch:
+    """Fetch function that counts its calls."""
+
+    def __init__(self, result=None, delay=0.02):
+        self.calls = 0
+        self.result = result or {"content": "page text"}
+        self.delay = delay
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return dict(self.result)
+
+
+class TestUrlRegistry:
+    """UrlRegistry"""
+
+    def test_fetch_key_ignores_scheme_tracking_and_fragment(self):
+        assert fetch_key("http://Example.com/a?utm_source=x#top") == fetch_key("https://example.com/a")
+        assert fetch_key("https://example.com/a?id=1") != fetch_key("https://example.com/a?id=2")
+
+    @pytest.mark.asyncio
+    async def test_concurrent_variants_are_fetched_once(self):
+        registry = UrlRegistry()
+        fetch = CountingFetch()
+        urls = ["https://example.com/a", "http://example.com/a", "https://example.com/a?utm_medium=rss#x"]
+
+        results = await asyncio.gather(*[registry.fetch(url, "extract", fetch) for url in urls])
+
+        assert fetch.calls == 1
+        assert all(r["content"] == "page text" for r in results)
+
+    @pytest.mark.asyncio
+    async def test_finished_fetches_are_reused_within_a_task_only(self):
+        registry = UrlRegistry()
+        fetch = CountingFetch()
+
+        with task_scope("task-1"):
+            await registry.fetch("https://example.com/a", "extract", fetch)
+            reused = await registry.fetch("https://example.com/a", "extract", fetch)
+            reused["content"] = "mutated"
+            again = await registry.fetch("https://example.com/a", "extract", fetch)
+            await registry.fetch("https://example.com/a", "web_page", fetch)
+        assert fetch.calls == 2
+        assert again["content"] == "page text"
+
+        with task_scope("task-2"):
+            await registry.fetch("https://example.com/a", "extract", fetch)
+        assert fetch.calls == 3
+
+        registry.forget("task-1")
+        with task_scope("task-1"):
+            await registry.fetch("https://example.com/a", "extract", fetch)
+        assert fetch.calls == 4
+
+    @pytest.mark.asyncio
+    async def test_redirect_targets_and_failures(self):
+        registry = UrlRegistry()
+        fetch = CountingFetch({"content": "moved", "final_url": "https://example.com/new"})
+        failing = CountingFetch({"content": "", "error": "timeout"})
+        keep = lambda r: not r.get("error")
+
+        with task_scope("task-1"):
+            await registry.fetch("https://example.com/old", "extract", fetch)
+            result = await registry.fetch("https://example.com/new", "extract", fetch)
+            await registry.fetch("https://example.com/down", "extract", failing, keep=keep)
+            await registry.fetch("https://example.com/down", "extract", failing, keep=keep)
+
+        assert fetch.calls == 1 and result["content"] == "moved"
+        assert failing.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_content_extractor_shares_fetches(self, monkeypatch):
+        hits = []
+
+        async def handler(request):
+            hits.append(request.path)
+            await asyncio.sleep(0.05)
+            return web.Response(
+                text="<html><title>ok</title><body><main>A paragraph long enough to be kept.</main></body></html>",
+                content_type="text/html"
+            )
+
+        app = web.Application()
+        app.router.add_get("/page", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/page"
+
+        registry = UrlRegistry()
+        cache = PageCache(enabled=False)
+        monkeypatch.setattr(content_extractor_module, "get_url_registry", lambda: registry)
+        monkeypatch.setattr(content_extractor_module, "get_page_cache", lambda: cache)
+        extractor = ContentExtractor()
+        try:
+            with task_scope("task-1"):
+                results = await asyncio.gather(
+                    extractor.extract_content(url),
+                    extractor.extract_content(f"{url}?utm_source=feed"),
+                    extractor.extract_content(f"{url}#intro")
+                )
+                later = await extractor.extract_content(url)
+        finally:
+            await close_http_session()
+            await runner.cleanup()
+
+        assert hits == ["/page"]
+        assert [r["url"] for r in results] == [url, f"{url}?utm_source=feed", f"{url}#intro"]
+        assert later["title"] == "ok" and later["content"]
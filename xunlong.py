@@ -19,6 +19,19 @@ if str(SRC_DIR) not in sys.path:
 
 from src.deep_search_agent import DeepSearchAgent
 from src.utils.document_loader import load_document, LoadedDocument, DocumentLoadError
+from src.tools.browser_pool import close_browser_pool
+from src.tools.http_session import close_http_session
+
+
+def _run(coro):
+    """Run a command coroutine, then shut down the shared browser and HTTP session."""
+    async def _main():
+        try:
+            return await coro
+        finally:
+            await close_browser_pool()
+            await close_http_session()
+    return asyncio.run(_main())
 
 
 # CLI
@@ -111,7 +124,7 @@ def report(query, report_type, depth, max_results, output_format, html_template,
         xunlong report "" --type analysis --depth deep -o html
         xunlong report "" -t research -m 30 -o md -v
     """
-    asyncio.run(_execute_report(query, report_type, depth, max_results, output_format, html_template, html_theme, input_file, verbose))
+    _run(_execute_report(query, report_type, depth, max_results, output_format, html_template, html_theme, input_file, verbose))
 
 
 async def _execute_report(query: str, report_type: str, depth: str, max_results: int,
@@ -226,7 +239,7 @@ def fiction(query, genre, length, viewpoint, constraint, output_format, html_tem
         xunlong fiction "" -g scifi -l medium -vp third -o html
         xunlong fiction "" -g mystery -c "" -o md -v
     """
-    asyncio.run(_execute_fiction(query, genre, length, viewpoint, list(constraint), output_format, html_template, html_theme, input_file, verbose))
+    _run(_execute_fiction(query, genre, length, viewpoint, list(constraint), output_format, html_template, html_theme, input_file, verbose))
 
 
 async def _execute_fiction(query: str, genre: str, length: str, viewpoint: str,
@@ -357,7 +370,7 @@ def ppt(topic, style, slides, depth, theme, speech_notes, input_file, verbose):
         xunlong ppt "" -s academic -d deep --theme blue
         xunlong ppt "" --speech-notes "" -v
     """
-    asyncio.run(_execute_ppt(topic, style, slides, depth, theme, speech_notes, input_file, verbose))
+    _run(_execute_ppt(topic, style, slides, depth, theme, speech_notes, input_file, verbose))
 
 
 async def _execute_ppt(topic: str, style: str, slides: int, depth: str, theme: str,